@@ -25,16 +25,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from conf import BASE_DIR
 from utils.files_times import get_title_and_hashtags, generate_schedule_time_next_day
 
-# 导入各平台的上传模块
-from uploader.douyin_uploader.main import douyin_setup, DouYinVideo
-from uploader.bilibili_uploader.main import random_emoji, BilibiliVideo, bilibili_setup
-from utils.video_converter import VideoConverter
-from uploader.ks_uploader.main import KSVideo, ks_setup
-from uploader.xiaohongshu_uploader.main import XiaoHongShuVideo, xiaohongshu_setup
-from uploader.tk_uploader.main import TiktokVideo, tiktok_setup
-from uploader.baijiahao_uploader.main import BaiJiaHaoVideo, baijiahao_setup
-from uploader.tencent_uploader.main import TencentVideo, weixin_setup
-from utils.constant import VideoZoneTypes
+from uploader.base_uploader import UploadJob
+from uploader.registry import get_platform_info, get_supported_platforms, create_uploader
+
+
+# 批量上传启用的平台
+ENABLED_PLATFORMS = ['douyin', 'bilibili', 'kuaishou', 'xiaohongshu', 'baijiahao']
 
 
 class BatchUploader:
@@ -50,51 +46,15 @@ class BatchUploader:
         self.daily_times = daily_times if daily_times else [16]  # 默认下午4点
         self.start_days = start_days
         
-        # 支持的平台配置
-        self.platforms = {
-            'douyin': {
-                'name': '抖音',
-                'domains': ['douyin.com', 'creator.douyin.com'],
+        # 支持的平台配置（元数据来自插件注册表，视频号、TikTok 暂不参与批量上传）
+        self.platforms = {}
+        for platform in ENABLED_PLATFORMS:
+            info = get_platform_info(platform)
+            self.platforms[platform] = {
+                'name': info['name'],
+                'domains': info['domains'],
                 'account_file': None,  # 动态设置
-                'upload_func': self.upload_to_douyin
-            },
-            'bilibili': {
-                'name': 'B站',
-                'domains': ['bilibili.com'],
-                'account_file': None,
-                'upload_func': self.upload_to_bilibili
-            },
-            'kuaishou': {
-                'name': '快手',
-                'domains': ['kuaishou.com'],
-                'account_file': None,
-                'upload_func': self.upload_to_kuaishou
-            },
-            'xiaohongshu': {
-                'name': '小红书',
-                'domains': ['xiaohongshu.com'],
-                'account_file': None,
-                'upload_func': self.upload_to_xiaohongshu
-            },
-            # 'tiktok': {
-            #     'name': 'TikTok',
-            #     'domains': ['tiktok.com'],
-            #     'account_file': None,
-            #     'upload_func': self.upload_to_tiktok
-            # },
-            'baijiahao': {
-                'name': '百家号',
-                'domains': ['baijiahao.baidu.com', 'baidu.com'],
-                'account_file': None,
-                'upload_func': self.upload_to_baijiahao
             }
-            # 'tencent': {
-            #     'name': '视频号',
-            #     'domains': ['weixin.qq.com', 'channels.weixin.qq.com'],
-            #     'account_file': None,
-            #     'upload_func': self.upload_to_tencent
-            # }
-        }
         
         # 动态查找每个平台的账号文件
         self._match_account_files()
@@ -218,286 +178,50 @@ class BatchUploader:
         
         return publish_datetimes
     
-    async def upload_to_douyin(self, video_files):
-        """上传到抖音"""
-        print(f"🎵 开始上传到抖音...")
-        account_file = self.platforms['douyin']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = self.get_publish_schedule(file_num)
-        
-        try:
-            cookie_setup = await douyin_setup(account_file, handle=False)
-        except Exception as e:
-            print(f"❌ 抖音登录失败: {e}")
-            return
-        
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                print(f"   地理位置: 北京市")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                app = DouYinVideo(title, file, tags, publish_datetimes[index], account_file)
-                # 设置固定地理位置
-                app.default_location = "北京市"
-                await app.main()
-                
-                print(f"✅ {file.name} 上传成功")
-                time.sleep(5)  # 防止频率过快
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_bilibili(self, video_files):
-        """上传到B站"""
-        print(f"📺 开始上传到B站...")
-        account_file = self.platforms['bilibili']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = self.get_publish_schedule(file_num)
-        
-        try:
-            # 使用新的bilibili_setup函数验证cookie
-            cookie_valid = await bilibili_setup(account_file, handle=False)
-            if not cookie_valid:
-                print(f"❌ B站登录失败: cookie无效或不存在")
-                return
-        except Exception as e:
-            print(f"❌ B站登录失败: {e}")
-            return
-        
-        tid = VideoZoneTypes.MUSIC_OTHER.value  # 设置分区id为音乐综合
-        
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                # 清理标题中的特殊字符，避免B站审核问题
-                title = title.replace(" - ", " ").replace("(", "").replace(")", "")
-                title += random_emoji()  # B站不允许相同标题
-                
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M') if publish_datetimes[index] != 0 else '立即发布'}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                # 创建视频描述
-                desc = title
-                
-                # 创建BilibiliVideo实例
-                bili_video = BilibiliVideo(
-                    title=title,
-                    file_path=file,
-                    desc=desc,
-                    tid=tid,
-                    tags=tags,
-                    publish_date=publish_datetimes[index],
-                    account_file=account_file
-                )
-                
-                # 使用异步方法上传视频
-                success = await bili_video.main()
-                
-                if success:
-                    print(f"✅ {file.name} 上传成功")
-                else:
-                    print(f"❌ {file.name} 上传失败")
-                
-                # 增加B站上传后的等待时间，从30秒增加到60秒
-                time.sleep(60)  # B站需要较长间隔
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_kuaishou(self, video_files):
-        """上传到快手"""
-        print(f"🎬 开始上传到快手...")
-        account_file = self.platforms['kuaishou']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = self.get_publish_schedule(file_num)
-        
-        try:
-            cookie_setup = await ks_setup(account_file, handle=False)
-        except Exception as e:
-            print(f"❌ 快手登录失败: {e}")
-            return
-        
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                app = KSVideo(title, file, tags, publish_datetimes[index], account_file)
-                await app.main()
-                
-                print(f"✅ {file.name} 上传成功")
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_xiaohongshu(self, video_files):
-        """上传到小红书"""
-        print(f"📖 开始上传到小红书...")
-        account_file = self.platforms['xiaohongshu']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = self.get_publish_schedule(file_num)
-        
-        try:
-            cookie_setup = await xiaohongshu_setup(account_file, handle=False)
-        except Exception as e:
-            print(f"❌ 小红书登录失败: {e}")
-            return
-        
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                app = XiaoHongShuVideo(title, file, tags, publish_datetimes[index], account_file, location="北京市")
-                await app.main()
-                
-                print(f"✅ {file.name} 上传成功")
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_tiktok(self, video_files):
-        """上传到TikTok"""
-        print(f"🎵 开始上传到TikTok...")
-        account_file = self.platforms['tiktok']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = generate_schedule_time_next_day(file_num, 1, daily_times=[16])
-        
-        try:
-            cookie_setup = await tiktok_setup(account_file, handle=False)
-        except Exception as e:
-            print(f"❌ TikTok登录失败: {e}")
+    async def upload_to_platform(self, platform, video_files):
+        """上传到指定平台（通过插件注册表创建上传器）"""
+        if platform not in self.platforms:
+            print(f"❌ 不支持的平台: {platform}")
             return
         
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                
-                app = TiktokVideo(title, file, tags, publish_datetimes[index], account_file)
-                await app.main()
-                
-                print(f"✅ {file.name} 上传成功")
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_baijiahao(self, video_files):
-        """上传到百家号"""
-        print(f"📰 开始上传到百家号...")
-        account_file = self.platforms['baijiahao']['account_file']
-        
-        file_num = len(video_files)
-        publish_datetimes = self.get_publish_schedule(file_num)
-        
-        try:
-            cookie_setup = await baijiahao_setup(account_file, handle=False)
-        except Exception as e:
-            print(f"❌ 百家号登录失败: {e}")
+        if not self.check_platform_account(platform):
             return
         
-        for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                app = BaiJiaHaoVideo(title, file, tags, publish_datetimes[index], account_file)
-                await app.main()
-                
-                print(f"✅ {file.name} 上传成功")
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_tencent(self, video_files):
-        """上传到视频号"""
-        print(f"🎬 开始上传到视频号...")
-        account_file = self.platforms['tencent']['account_file']
+        platform_name = self.platforms[platform]['name']
+        account_file = self.platforms[platform]['account_file']
+        uploader = create_uploader(platform, account_file)
+        print(f"🚀 开始上传到{platform_name}...")
         
         file_num = len(video_files)
         publish_datetimes = self.get_publish_schedule(file_num)
         
         try:
-            cookie_setup = await weixin_setup(account_file, handle=False)
+            if not await uploader.validate(handle=False):
+                print(f"❌ {platform_name}登录失败: cookie无效或不存在")
+                return
         except Exception as e:
-            print(f"❌ 视频号登录失败: {e}")
+            print(f"❌ {platform_name}登录失败: {e}")
             return
         
         for index, file in enumerate(video_files):
-            try:
-                title, tags = self.get_video_info(file)
-                print(f"📤 正在上传: {file.name}")
-                print(f"   标题: {title}")
-                print(f"   标签: {tags}")
-                if self.enable_schedule:
-                    print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
-                else:
-                    print(f"   发布方式: 立即发布")
-                
-                app = TencentVideo(title, file, tags, publish_datetimes[index], account_file)
-                await app.main()
-                
+            title, tags = self.get_video_info(file)
+            print(f"📤 正在上传: {file.name}")
+            print(f"   标题: {title}")
+            print(f"   标签: {tags}")
+            if self.enable_schedule and publish_datetimes[index] != 0:
+                print(f"   发布时间: {publish_datetimes[index].strftime('%Y-%m-%d %H:%M')}")
+            else:
+                print(f"   发布方式: 立即发布")
+            
+            # 固定地理位置（抖音、小红书使用）
+            job = UploadJob(file, title, tags, publish_datetimes[index], location="北京市")
+            result = await uploader.run(job)
+            
+            if result['success']:
                 print(f"✅ {file.name} 上传成功")
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"❌ {file.name} 上传失败: {e}")
-    
-    async def upload_to_platform(self, platform, video_files):
-        """上传到指定平台"""
-        if platform not in self.platforms:
-            print(f"❌ 不支持的平台: {platform}")
-            return
-        
-        if not self.check_platform_account(platform):
-            return
-        
-        upload_func = self.platforms[platform]['upload_func']
-        if asyncio.iscoroutinefunction(upload_func):
-            await upload_func(video_files)
-        else:
-            upload_func(video_files)
+            else:
+                print(f"❌ {file.name} 上传失败: {result['error'] or '未知错误'}")
+            time.sleep(uploader.upload_interval)  # 防止频率过快
     
     async def upload_to_all_platforms(self, video_files):
         """上传到所有平台"""
@@ -562,7 +286,7 @@ class BatchUploader:
 def main():
     parser = argparse.ArgumentParser(description='按日期目录批量上传视频')
     parser.add_argument('--platform', '-p', 
-                       choices=['douyin', 'kuaishou', 'xiaohongshu', 'baijiahao', 'bilibili', 'tencent', 'tiktok', 'all'],
+                       choices=get_supported_platforms() + ['all'],
                        default='all',
                        help='目标平台 (默认: all)')
     parser.add_argument('--date', '-d',
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章排版耗时基准
+
+对 articles/ 下保存的 Markdown 文章逐篇执行转发工具（examples/forward_article_to_toutiao.py）的排版流程，统计各阶段耗时：
+- markdown：段落整理，生成保存用的 Markdown（save_article_file）
+- rich_text：Markdown -> HTML -> 文本，生成发布用的富文本（forward_to_toutiao）
+- format_article：一次生成上面两种结果
+- html_to_text：已转换好的 HTML 直接转文本（提取正文时的路径）
+- plain_fallback：Markdown 转换失败时的纯文本备用方案
+--scale N 把每篇文章的正文重复 N 次，模拟长篇技术文章
+
+使用方法：
+python bench/bench_article_format.py
+python bench/bench_article_format.py --runs 20 --scale 10
+python bench/bench_article_format.py --dir articles/2025-06-16 --output /tmp/format_bench.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FORWARDER_PATH = ROOT_DIR / "examples" / "forward_article_to_toutiao.py"
+sys.path.insert(0, str(ROOT_DIR))
+
+
+def load_forwarder_module():
+    """examples 不是包，按文件路径加载转发工具"""
+    spec = importlib.util.spec_from_file_location('forward_article_to_toutiao', FORWARDER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_corpus(directory, scale):
+    """返回 [(文件名, Markdown 正文)]"""
+    corpus = []
+    for path in sorted(Path(directory).rglob('*.md')):
+        text = path.read_text(encoding='utf-8')
+        corpus.append((str(path.relative_to(ROOT_DIR) if path.is_absolute() else path), '\n\n'.join([text] * scale)))
+    return corpus
+
+
+def time_stage(func, runs):
+    """执行 runs 次，返回每次耗时（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章排版耗时基准')
+    parser.add_argument('--dir', default=str(ROOT_DIR / 'articles'), help='文章目录，递归读取 *.md (默认: articles/)')
+    parser.add_argument('--runs', type=int, default=10, help='每个阶段每篇文章的执行次数 (默认: 10)')
+    parser.add_argument('--scale', type=int, default=1, help='正文重复次数，模拟长文章 (默认: 1)')
+    parser.add_argument('--output', '-o', help='把结果以 JSON 写入指定文件')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.dir, max(args.scale, 1))
+    if not corpus:
+        parser.error(f'{args.dir} 下没有 Markdown 文章')
+
+    module = load_forwarder_module()
+    forwarder = module.EnhancedArticleForwarder()
+    formatter = forwarder.formatter
+    url = 'https://example.com/bench'
+
+    stages = {
+        'markdown': lambda text: forwarder._enhance_content_format('基准文章', text, url, use_rich_text=False),
+        'rich_text': lambda text: forwarder._enhance_content_format('基准文章', text, url, use_rich_text=True),
+        'format_article': lambda text: forwarder.format_article('基准文章', text, url),
+        'html_to_text': None,  # 输入是预先转换好的 HTML，见下方
+        'plain_fallback': lambda text: forwarder._markdown_to_plain_text(text),
+    }
+
+    print(f"📚 文章: {len(corpus)} 篇，正文 x{args.scale}，每阶段 {args.runs} 次，解析器: {module.HTML_PARSER}\n")
+    print(f"{'阶段':<18}{'总字符':>10}{'p50(ms)':>12}{'max(ms)':>12}{'字符/ms':>12}")
+
+    report = {'runs': args.runs, 'scale': args.scale, 'parser': module.HTML_PARSER, 'stages': {}}
+    for name, func in stages.items():
+        totals = []
+        chars = 0
+        for _, text in corpus:
+            if name == 'html_to_text':
+                formatter.markdown_converter.reset()
+                html = formatter.markdown_converter.convert(text)
+                call = lambda html=html: formatter.html_to_text(html)
+            else:
+                call = lambda text=text, func=func: func(text)
+            # 排版过程中的提示信息不计入输出
+            with contextlib.redirect_stdout(io.StringIO()):
+                call()  # 预热
+                samples = time_stage(call, args.runs)
+            totals.append(samples)
+            chars += len(text)
+        # 每次运行把所有文章的耗时相加
+        per_run = [sum(run) for run in zip(*totals)]
+        p50 = statistics.median(per_run)
+        report['stages'][name] = {'chars': chars, 'p50_ms': round(p50, 3), 'max_ms': round(max(per_run), 3)}
+        print(f"{name:<18}{chars:>10}{p50:>12.2f}{max(per_run):>12.2f}{chars / p50 if p50 else 0:>12.0f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n📄 结果已写入: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+入口模块导入耗时基准
+
+每个场景在全新的 Python 进程中执行导入，统计多次运行的中位数/最大值，
+并列出导入后已加载的平台上传模块和已创建的业务日志。
+"eager" 场景模拟按需加载之前的行为（导入全部平台插件、创建全部业务日志），作为对照。
+
+使用方法：
+python bench/bench_import_time.py
+python bench/bench_import_time.py --runs 10 --importtime
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 场景名 -> 子进程中执行的导入代码
+SCENARIOS = {
+    'cli_main': "import cli_main",
+    'batch_upload_by_date': "import batch_upload_by_date",
+    'sau_backend': "import sau_backend",
+    'registry+douyin': (
+        "from uploader.registry import get_uploader_class\n"
+        "get_uploader_class('douyin')"
+    ),
+    'eager': (
+        "import batch_upload_by_date\n"
+        "import utils.log\n"
+        "from uploader.registry import get_supported_platforms, get_uploader_class\n"
+        "for platform in get_supported_platforms():\n"
+        "    get_uploader_class(platform)\n"
+        "for name in utils.log.BUSINESS_LOGGERS:\n"
+        "    getattr(utils.log, name)"
+    ),
+}
+
+# 导入完成后在子进程中输出统计信息
+REPORT_CODE = """
+import json, sys, time
+elapsed = time.perf_counter() - _bench_start
+log_module = sys.modules.get('utils.log')
+loggers = [name for name in getattr(log_module, 'BUSINESS_LOGGERS', {}) if name in vars(log_module)] if log_module else []
+uploaders = sorted(name for name in sys.modules if name.startswith('uploader.') and name.endswith(('.main', '.main_chrome', '.plugin')))
+print('__BENCH__' + json.dumps({'elapsed': elapsed, 'uploaders': uploaders, 'loggers': loggers, 'playwright': 'playwright' in sys.modules}))
+"""
+
+
+def run_once(code, importtime=False):
+    """在全新进程中执行一次导入，返回统计信息"""
+    source = "import time\n_bench_start = time.perf_counter()\n" + code + "\n" + REPORT_CODE
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', source]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else '导入失败')
+    line = [l for l in proc.stdout.splitlines() if l.startswith('__BENCH__')][-1]
+    stats = json.loads(line[len('__BENCH__'):])
+    stats['wall'] = wall
+    if importtime:
+        stats['importtime'] = parse_importtime(proc.stderr)
+    return stats
+
+
+def parse_importtime(stderr, top=10):
+    """解析 -X importtime 输出，返回累计耗时最高的模块"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 格式: import time: self [us] | cumulative | imported package
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='入口模块导入耗时基准')
+    parser.add_argument('--runs', type=int, default=5, help='每个场景运行次数 (默认: 5)')
+    parser.add_argument('--scenario', '-s', choices=list(SCENARIOS.keys()), action='append',
+                        help='只运行指定场景，可重复指定')
+    parser.add_argument('--importtime', action='store_true', help='输出累计耗时最高的模块')
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS.keys())
+    print(f"🐍 Python {sys.version.split()[0]}，每个场景运行 {args.runs} 次\n")
+    print(f"{'场景':<24}{'导入中位数(ms)':>14}{'导入最大值(ms)':>14}{'进程中位数(ms)':>14}  {'平台模块':>6}  {'业务日志':>6}  playwright")
+    for name in scenarios:
+        try:
+            results = [run_once(SCENARIOS[name]) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<24}❌ {e}")
+            continue
+        times = [r['elapsed'] * 1000 for r in results]
+        walls = [r['wall'] * 1000 for r in results]
+        last = results[-1]
+        print(f"{name:<24}{statistics.median(times):>14.1f}{max(times):>14.1f}{statistics.median(walls):>14.1f}  "
+              f"{len(last['uploaders']):>6}  {len(last['loggers']):>6}  {'是' if last['playwright'] else '否'}")
+        if args.importtime:
+            for cumulative_us, module in run_once(SCENARIOS[name], importtime=True)['importtime']:
+                print(f"    {cumulative_us / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == '__main__':
+    main()
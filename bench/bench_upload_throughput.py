@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传吞吐量基准
+
+在本地 mock 创作者中心（bench/mock_creator_center.py）上跑真实的 Playwright 上传流程，统计：
+- 吞吐量（视频/小时）、成功/失败数
+- 各阶段耗时 p50/p95（来自 UploadTimer）
+- 进程树（含浏览器子进程）峰值 RSS、CPU 时间和平均 CPU 占用
+
+场景：
+- files：N 个文件 × 1 个账号
+- accounts：1 个文件 × N 个账号
+- fanout：1 个文件 × 1 个账号，同时发往所有平台
+每个场景按 浏览器池开/关 × 并发数 组合运行。
+
+结果以 JSON 写入 bench/results/，传入 --baseline 时与基线比较，
+吞吐量下降或耗时、内存、CPU 上升超过阈值即视为回退，以退出码 1 结束。
+
+使用方法：
+python bench/bench_upload_throughput.py --platform douyin -n 4 --concurrency 1 2 4
+python bench/bench_upload_throughput.py --scenario fanout --pool on
+python bench/bench_upload_throughput.py --save-baseline bench/baseline_throughput.json
+python bench/bench_upload_throughput.py --baseline bench/baseline_throughput.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT_DIR / "bench" / "results"
+sys.path.insert(0, str(ROOT_DIR))
+
+import mock_creator_center  # noqa: E402  与本脚本同目录
+
+SCENARIOS = ['files', 'accounts', 'fanout']
+# mock 服务提供了页面的视频平台
+MOCK_PLATFORMS = ['douyin', 'kuaishou', 'tencent', 'xiaohongshu', 'bilibili', 'baijiahao']
+
+# 与基线比较的指标：(字段, 越大越好)
+COMPARED_METRICS = [
+    ('videos_per_hour', True),
+    ('duration_p95', False),
+    ('peak_rss_mb', False),
+    ('cpu_seconds', False),
+]
+
+
+class ResourceSampler(object):
+    """后台线程定期采样当前进程及其子进程（浏览器）的内存和 CPU"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_rss = 0
+        self._cpu_by_pid = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self.elapsed = 0.0
+
+    def _sample(self):
+        rss = 0
+        for proc in [self.process] + self.process.children(recursive=True):
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    cpu = proc.cpu_times()
+                # 子进程退出后就读不到了，按进程保留最后一次的累计 CPU 时间
+                self._cpu_by_pid[proc.pid] = cpu.user + cpu.system
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        cpu = self.process.cpu_times()
+        self._cpu_offset = cpu.user + cpu.system
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._sample()
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started_at
+        return False
+
+    @property
+    def cpu_seconds(self):
+        return max(sum(self._cpu_by_pid.values()) - self._cpu_offset, 0.0)
+
+
+def prepare_inputs(work_dir, base_url, platforms, file_count, account_count, file_size_mb):
+    """生成测试视频文件和可登录 mock 服务的 cookie 文件"""
+    video_dir = work_dir / "videos"
+    video_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for index in range(file_count):
+        path = video_dir / f"bench_{index + 1}.mp4"
+        with open(path, 'wb') as f:
+            f.write(os.urandom(int(file_size_mb * 1024 * 1024)))
+        files.append(path)
+
+    accounts = {}
+    for platform in platforms:
+        accounts[platform] = [
+            mock_creator_center.write_cookie_file(work_dir / "cookies" / f"{platform}_{index + 1}.json", base_url, platform)
+            for index in range(account_count)
+        ]
+    return files, accounts
+
+
+def build_cases(args):
+    """展开 场景 × 浏览器池 × 并发数 的组合"""
+    pools = {'on': [True], 'off': [False], 'both': [True, False]}[args.pool]
+    cases = []
+    for scenario in args.scenario or SCENARIOS:
+        for use_pool in pools:
+            for concurrency in args.concurrency:
+                cases.append({'scenario': scenario, 'use_pool': use_pool, 'concurrency': concurrency})
+    return cases
+
+
+def case_key(case, platform):
+    target = 'all' if case['scenario'] == 'fanout' else platform
+    return f"{case['scenario']}/{target}/pool={'on' if case['use_pool'] else 'off'}/c={case['concurrency']}"
+
+
+async def run_case(case, platform, files, accounts):
+    from myUtils.postVideo import post_video_fanout
+    from uploader.base_uploader import UploadJob
+
+    def make_jobs(paths):
+        return [UploadJob(path, f"压测视频{index + 1}", ['压测'], 0) for index, path in enumerate(paths)]
+
+    if case['scenario'] == 'files':
+        return await post_video_fanout(platform, make_jobs(files), accounts[platform][:1],
+                                       case['concurrency'], use_browser_pool=case['use_pool'])
+    if case['scenario'] == 'accounts':
+        return await post_video_fanout(platform, make_jobs(files[:1]), accounts[platform],
+                                       case['concurrency'], use_browser_pool=case['use_pool'])
+    # fanout：每个平台各自受并发上限约束
+    grouped = await asyncio.gather(*[
+        post_video_fanout(target, make_jobs(files[:1]), accounts[target][:1],
+                          case['concurrency'], use_browser_pool=case['use_pool'])
+        for target in MOCK_PLATFORMS
+    ])
+    return [result for results in grouped for result in results]
+
+
+def summarize_case(results, sampler):
+    from utils.timing import percentile
+
+    succeeded = [r for r in results if r['success']]
+    durations = [r['duration'] for r in results]
+    stages = {}
+    for result in results:
+        for stage, duration in result.get('stages', {}).items():
+            stages.setdefault(f"{result['platform']}.{stage}", []).append(duration)
+
+    return {
+        'uploads': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'errors': sorted({r['error'].splitlines()[0] for r in results if r['error']}),
+        'wall_seconds': round(sampler.elapsed, 2),
+        'videos_per_hour': round(len(succeeded) / sampler.elapsed * 3600, 1) if sampler.elapsed else 0.0,
+        'duration_p50': round(percentile(durations, 50), 2),
+        'duration_p95': round(percentile(durations, 95), 2),
+        'peak_rss_mb': round(sampler.peak_rss / 1024 / 1024, 1),
+        'cpu_seconds': round(sampler.cpu_seconds, 2),
+        'cpu_percent': round(sampler.cpu_seconds / sampler.elapsed * 100, 1) if sampler.elapsed else 0.0,
+        'stages': {
+            name: {
+                'p50': round(percentile(values, 50), 3),
+                'p95': round(percentile(values, 95), 3),
+            }
+            for name, values in sorted(stages.items())
+        },
+    }
+
+
+def compare_with_baseline(report, baseline, threshold):
+    """返回回退列表 [(场景, 指标, 基线值, 当前值, 变化比例)]"""
+    regressions = []
+    for key, current in report['cases'].items():
+        previous = baseline.get('cases', {}).get(key)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+                regressions.append((key, metric, old, new, change))
+    return regressions
+
+
+def print_case(key, summary):
+    print(f"{key:<40}{summary['succeeded']:>4}/{summary['uploads']:<4}{summary['videos_per_hour']:>10.1f}"
+          f"{summary['duration_p50']:>10.2f}{summary['duration_p95']:>10.2f}{summary['peak_rss_mb']:>10.1f}"
+          f"{summary['cpu_percent']:>8.1f}")
+    for error in summary['errors']:
+        print(f"    ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上传吞吐量基准（基于本地 mock 创作者中心）')
+    parser.add_argument('--platform', '-p', default='douyin', choices=MOCK_PLATFORMS, help='files/accounts 场景的平台 (默认: douyin)')
+    parser.add_argument('--scenario', '-s', choices=SCENARIOS, action='append', help='只运行指定场景，可重复指定')
+    parser.add_argument('-n', type=int, default=3, help='files 场景的文件数、accounts 场景的账号数 (默认: 3)')
+    parser.add_argument('--concurrency', '-c', type=int, nargs='+', default=[1, 3], help='并发数列表 (默认: 1 3)')
+    parser.add_argument('--pool', choices=['on', 'off', 'both'], default='both', help='浏览器池开关 (默认: both)')
+    parser.add_argument('--file-size', type=float, default=1, help='测试视频大小，MB (默认: 1)')
+    parser.add_argument('--upload-latency', type=float, default=2, help='mock 上传耗时，秒 (默认: 2)')
+    parser.add_argument('--upload-failure-rate', type=float, default=0, help='mock 首次上传失败概率 (默认: 0)')
+    parser.add_argument('--publish-failure-rate', type=float, default=0, help='mock 首次发布被拒绝概率 (默认: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='失败注入随机种子 (默认: 0)')
+    parser.add_argument('--output', '-o', help='结果文件路径 (默认: bench/results/throughput_<时间>.json)')
+    parser.add_argument('--baseline', help='与指定基线文件比较')
+    parser.add_argument('--save-baseline', metavar='PATH', help='把本次结果另存为基线')
+    parser.add_argument('--threshold', type=float, default=0.1, help='回退判定阈值，比例 (默认: 0.1)')
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='sau_bench_'))
+    server, base_url = mock_creator_center.start_server(
+        upload_latency=args.upload_latency,
+        upload_failure_rate=args.upload_failure_rate,
+        publish_failure_rate=args.publish_failure_rate,
+        seed=args.seed,
+    )
+    # 上传器在创建时读取这些环境变量，需在导入和创建前设置
+    os.environ['SAU_MOCK_BASE_URL'] = base_url
+    os.environ['SAU_HEADLESS'] = '1'
+    os.environ['SAU_TIMINGS_FILE'] = str(work_dir / "timings.jsonl")
+
+    platforms = MOCK_PLATFORMS if 'fanout' in (args.scenario or SCENARIOS) else [args.platform]
+    files, accounts = prepare_inputs(work_dir, base_url, platforms, args.n, args.n, args.file_size)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'save_baseline')},
+        'cases': {},
+    }
+    print(f"🧪 mock 服务: {base_url}，工作目录: {work_dir}\n")
+    print(f"{'场景':<40}{'成功':>9}{'视频/小时':>10}{'p50(s)':>10}{'p95(s)':>10}{'峰值RSS':>10}{'CPU%':>8}")
+    try:
+        for case in build_cases(args):
+            key = case_key(case, args.platform)
+            mock_creator_center.reset_stats()
+            with ResourceSampler() as sampler:
+                results = asyncio.run(run_case(case, args.platform, files, accounts))
+            summary = summarize_case(results, sampler)
+            summary['mock_stats'] = mock_creator_center.get_stats()
+            report['cases'][key] = summary
+            print_case(key, summary)
+    finally:
+        server.shutdown()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"throughput_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n📄 结果已写入: {output}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"📌 基线已保存: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠️  发现 {len(regressions)} 项回退（阈值 {args.threshold:.0%}）:")
+            for key, metric, old, new, change in regressions:
+                print(f"    {key:<40}{metric:<18}{old:>10} -> {new:<10}({change:+.1%})")
+            return 1
+        print(f"\n✅ 与基线相比无回退（阈值 {args.threshold:.0%}）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
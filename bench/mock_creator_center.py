@@ -0,0 +1,757 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟创作者中心
+
+为每个平台提供最小化的上传/发布页面，复现上传器实际使用的选择器（文件输入框、"重新上传"、
+"发布"/"发表"按钮、定时发布控件、未登录时的登录提示等），用于在不访问真实平台的情况下
+调试上传流程和做吞吐量压测。支持配置上传耗时、页面响应延迟以及上传/发布失败注入。
+
+各平台页面挂在 /<平台>/ 前缀下，与 utils.base_social_media.get_base_url 的覆盖规则一致：
+    douyin / kuaishou / tencent / xiaohongshu / bilibili / bilibili_space / toutiao / baijiahao
+
+使用方法：
+# 启动服务（上传耗时 3 秒，20% 的上传首次失败）
+python bench/mock_creator_center.py --upload-latency 3 --upload-failure-rate 0.2
+
+# 生成可登录 mock 服务的 cookie 文件
+python bench/mock_creator_center.py --write-cookie cookies/douyin_uploader/mock.json --platform douyin
+
+# 让上传器指向 mock 服务（无头运行）
+SAU_MOCK_BASE_URL=http://127.0.0.1:8765 SAU_HEADLESS=1 python cli_main.py douyin mock upload videos/demo.mp4
+
+在压测脚本中以线程方式启动（见 bench/bench_upload_throughput.py）：
+    server, base_url = start_server(port=0, upload_latency=1)
+    ...
+    server.shutdown()
+
+运行时调整与统计：
+GET  /__mock__/config          当前配置
+POST /__mock__/config          修改配置，如 {"upload_latency": 5, "publish_failure_rate": 0.5}
+GET  /__mock__/stats           各平台页面访问、上传、发布次数
+POST /__mock__/reset           清空统计
+
+失败注入说明：
+- 上传失败：首次上传按概率失败。抖音、视频号、B站展示平台自身的失败提示，由上传器走重试逻辑；
+  其余平台页面没有重试入口，失败提示展示 1 秒后由页面自动重传（耗时翻倍）
+- 发布失败：首次点击发布按概率被拒绝（页面不跳转），上传器需要再次点击
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from flask import Flask, jsonify, make_response, request
+from werkzeug.serving import make_server
+
+SESSION_COOKIE = 'sau_mock_session'
+
+# 各平台真实域名，写入 cookie 文件时附带一条该域名的 cookie，便于按域名识别账号所属平台
+PLATFORM_DOMAINS = {
+    'douyin': '.douyin.com',
+    'kuaishou': '.kuaishou.com',
+    'tencent': 'channels.weixin.qq.com',
+    'xiaohongshu': '.xiaohongshu.com',
+    'bilibili': '.bilibili.com',
+    'bilibili_space': '.bilibili.com',
+    'toutiao': '.toutiao.com',
+    'baijiahao': '.baidu.com',
+}
+
+DEFAULT_CONFIG = {
+    'upload_latency': 3.0,  # 视频上传耗时（秒）
+    'upload_jitter': 0.2,  # 上传耗时随机浮动比例
+    'page_latency': 0.0,  # 页面响应延迟（秒）
+    'upload_failure_rate': 0.0,  # 首次上传失败概率
+    'publish_failure_rate': 0.0,  # 首次点击发布被拒绝的概率
+}
+
+app = Flask(__name__)
+
+_lock = threading.Lock()
+_config = dict(DEFAULT_CONFIG)
+_stats = {}
+_random = random.Random()
+
+
+def _count(platform, event):
+    with _lock:
+        platform_stats = _stats.setdefault(platform, {})
+        platform_stats[event] = platform_stats.get(event, 0) + 1
+
+
+def update_config(**config):
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"未知配置项: {', '.join(sorted(unknown))}")
+    with _lock:
+        _config.update({key: float(value) for key, value in config.items()})
+        return dict(_config)
+
+
+def get_stats():
+    with _lock:
+        return json.loads(json.dumps(_stats))
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+def _page_settings(platform):
+    """每次打开页面时按配置抽取本次的上传耗时和失败注入"""
+    with _lock:
+        config = dict(_config)
+        latency = config['upload_latency'] * (1 + _random.uniform(-1, 1) * config['upload_jitter'])
+        fail_upload = _random.random() < config['upload_failure_rate']
+        fail_publish = _random.random() < config['publish_failure_rate']
+    return {
+        'platform': platform,
+        'base': f'/{platform}',
+        'upload_ms': int(max(latency, 0) * 1000),
+        'fail_upload': fail_upload,
+        'fail_publish': fail_publish,
+    }
+
+
+# 所有页面共用的脚本：事件上报、模拟上传、发布失败注入
+COMMON_JS = """
+const MOCK = __MOCK__;
+function report(event) {
+  fetch('/__mock__/event', {method: 'POST', keepalive: true, headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({platform: MOCK.platform, event: event})});
+}
+function $(selector) { return document.querySelector(selector); }
+let uploadAttempts = 0;
+function simulateUpload(onProgress, onDone, onFail) {
+  uploadAttempts += 1;
+  report('upload_started');
+  onProgress();
+  setTimeout(() => {
+    if (MOCK.fail_upload && uploadAttempts === 1) {
+      report('upload_failed');
+      onFail();
+    } else {
+      report('upload_succeeded');
+      onDone();
+    }
+  }, MOCK.upload_ms);
+}
+// 没有重试入口的页面：展示失败提示 1 秒后自动重传
+function simulateUploadWithAutoRetry(onProgress, onDone, onFail) {
+  simulateUpload(onProgress, onDone, () => {
+    onFail();
+    setTimeout(() => simulateUploadWithAutoRetry(onProgress, onDone, onFail), 1000);
+  });
+}
+let publishAttempts = 0;
+function tryPublish(onSuccess) {
+  publishAttempts += 1;
+  if (MOCK.fail_publish && publishAttempts === 1) {
+    report('publish_rejected');
+    const toast = document.createElement('div');
+    toast.className = 'mock-toast';
+    toast.textContent = '网络繁忙，请稍后重试';
+    document.body.appendChild(toast);
+    setTimeout(() => toast.remove(), 1500);
+    return;
+  }
+  report('published');
+  onSuccess();
+}
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+input, textarea, [contenteditable] {{ border: 1px solid #ccc; min-width: 240px; min-height: 20px; padding: 4px; }}
+button, .clickable {{ cursor: pointer; margin: 4px; padding: 4px 12px; }}
+.hidden {{ display: none; }}
+.mock-toast {{ position: fixed; top: 8px; right: 8px; background: #333; color: #fff; padding: 8px; }}
+</style>
+</head>
+<body>
+{body}
+<script>
+{common_js}
+{script}
+</script>
+</body>
+</html>"""
+
+
+def render_page(platform, title, body, script=''):
+    common_js = COMMON_JS.replace('__MOCK__', json.dumps(_page_settings(platform)))
+    return PAGE_TEMPLATE.format(title=title, body=body, common_js=common_js, script=script)
+
+
+def render_login(platform):
+    body = LOGIN_BODIES[platform]
+    return render_page(platform, '登录', body)
+
+
+# 未登录时各平台 cookie 校验所识别的页面内容
+LOGIN_BODIES = {
+    'douyin': '<div class="login"><span>扫码登录</span><span>手机号登录</span></div>',
+    'xiaohongshu': '<div class="login"><span>扫码登录</span><span>手机号登录</span></div>',
+    'kuaishou': '<div class="names"><div class="container"><div class="name">机构服务</div></div></div>',
+    'tencent': '<div class="login"><span>微信扫码登录</span></div>',
+    'bilibili': '<div class="login"><a href="#">登录</a></div>',
+    'bilibili_space': '<div class="login"><a href="#">登录</a></div>',
+    'toutiao': '<div class="login"><span>登录</span><span>扫码登录</span></div>',
+    'baijiahao': '<div class="login"><span>注册/登录百家号</span></div>',
+}
+
+# ---------------------------------------------------------------- 抖音
+
+DOUYIN_UPLOAD_BODY = """
+<div id="upload-view" class="container-drag">
+  <p>点击上传 或直接将视频文件拖入此区域</p>
+  <input type="file" accept="video/*">
+</div>
+<div id="publish-view" class="hidden">
+  <div id="upload-state"></div>
+  <div class="form-item">
+    <div class="form-label"><span>作品标题</span></div>
+    <div class="form-field"><input type="text" placeholder="填写作品标题，为作品获得更多流量"></div>
+  </div>
+  <div class="zone-container" contenteditable="true"></div>
+  <div class="semi-select" id="location"><span>输入地理位置</span></div>
+  <div id="location-options"></div>
+  <div class="info-sync"><div class="first-part-sync"><div>同步到今日头条
+    <div class="semi-switch"><input class="semi-switch-native-control" type="checkbox"></div>
+  </div></div></div>
+  <div>
+    <label class="radio-now"><input type="radio" name="timing" checked>立即发布</label>
+    <label class="radio-timing"><input type="radio" name="timing">定时发布</label>
+    <input class="semi-input hidden" placeholder="日期和时间">
+  </div>
+  <button type="button" id="publish">发布</button>
+</div>
+"""
+
+DOUYIN_UPLOAD_JS = """
+function startUpload() {
+  simulateUpload(
+    () => { $('#upload-state').innerHTML = '<div class="progress-div"><div>上传中 0%</div></div>'; },
+    () => { $('#upload-state').innerHTML = '<div class="long-card-done"><div>重新上传</div></div>'; },
+    () => {
+      $('#upload-state').innerHTML = '<div class="progress-div"><div>上传失败</div>' +
+        '<input type="file" class="upload-btn-input"></div>';
+      $('#upload-state .upload-btn-input').addEventListener('change', startUpload);
+    });
+}
+$('#upload-view input').addEventListener('change', () => {
+  history.pushState({}, '', MOCK.base + '/creator-micro/content/publish?enter_from=publish_page');
+  $('#upload-view').remove();
+  $('#publish-view').classList.remove('hidden');
+  startUpload();
+});
+$('#location').addEventListener('click', () => {
+  const input = document.createElement('input');
+  input.className = 'location-input';
+  $('#location').appendChild(input);
+  input.focus();
+  input.addEventListener('input', () => {
+    $('#location-options').innerHTML = '<div role="listbox"><div role="option"></div></div>';
+    $('#location-options [role="option"]').textContent = input.value;
+  });
+}, {once: true});
+$('#location-options').addEventListener('click', () => { $('#location-options').innerHTML = ''; });
+$('.semi-switch').addEventListener('click', () => { $('.semi-switch').classList.toggle('semi-switch-checked'); });
+$('.radio-timing').addEventListener('click', () => { $('.semi-input').classList.remove('hidden'); });
+$('#publish').addEventListener('click', () => tryPublish(() => {
+  location.href = MOCK.base + '/creator-micro/content/manage?enter_from=publish';
+}));
+"""
+
+# ---------------------------------------------------------------- 快手
+
+KUAISHOU_UPLOAD_BODY = """
+<div id="upload-view">
+  <button type="button" class="_upload-btn_mock">上传视频</button>
+  <input type="file" accept="video/*" class="hidden">
+</div>
+<div id="publish-view" class="hidden">
+  <div id="upload-state"></div>
+  <div class="desc-row"><span>描述</span><div class="desc-editor" contenteditable="true"></div></div>
+  <div class="timing-row">
+    <label>发布时间</label>
+    <div>
+      <span><input type="radio" class="ant-radio-input" name="timing" checked>立即</span>
+      <span><input type="radio" class="ant-radio-input" name="timing">定时</span>
+    </div>
+  </div>
+  <div class="ant-picker-input hidden"><input placeholder="选择日期时间"></div>
+  <div class="publish-btn clickable">发布</div>
+  <div id="confirm"></div>
+</div>
+"""
+
+KUAISHOU_UPLOAD_JS = """
+$('._upload-btn_mock').addEventListener('click', () => $('#upload-view input').click());
+$('#upload-view input').addEventListener('change', () => {
+  $('#upload-view').classList.add('hidden');
+  $('#publish-view').classList.remove('hidden');
+  simulateUploadWithAutoRetry(
+    () => { $('#upload-state').textContent = '上传中 0%'; },
+    () => { $('#upload-state').textContent = '视频上传完成'; },
+    () => { $('#upload-state').textContent = '上传失败'; });
+});
+document.querySelectorAll('.ant-radio-input')[1].addEventListener('click', () => {
+  $('.ant-picker-input').classList.remove('hidden');
+});
+$('.publish-btn').addEventListener('click', () => {
+  $('#confirm').innerHTML = '<button type="button">确认发布</button>';
+  $('#confirm button').addEventListener('click', () => tryPublish(() => {
+    location.href = MOCK.base + '/article/manage/video?status=2&from=publish';
+  }));
+});
+"""
+
+# ---------------------------------------------------------------- 视频号
+
+TENCENT_CREATE_BODY = """
+<input type="file" accept="video/*">
+<div id="upload-state" class="media-status-content"></div>
+<div id="delete-dialog" class="hidden"><p>确定删除该视频？</p><button type="button">删除</button></div>
+<div class="input-editor" contenteditable="true"></div>
+<div class="form-item">
+  <div class="label-box"><span>短标题</span></div>
+  <div class="input-box"><span><input type="text" placeholder="概括视频主要内容，字数建议6-16个字符"></span></div>
+</div>
+<div class="timing-row">
+  <label><input type="radio" name="timing" checked>不定时</label>
+  <label class="timing-label"><input type="radio" name="timing">定时</label>
+  <div id="picker" class="hidden">
+    <input placeholder="请选择发表时间">
+    <div id="picker-panel" class="hidden">
+      <span class="weui-desktop-picker__panel__label" id="picker-year"></span>
+      <span class="weui-desktop-picker__panel__label" id="picker-month"></span>
+      <button type="button" class="weui-desktop-btn__icon__right">&gt;</button>
+      <table class="weui-desktop-picker__table"><tbody id="picker-days"></tbody></table>
+      <input placeholder="请选择时间">
+    </div>
+  </div>
+</div>
+<div class="form-btns">
+  <button type="button" class="weui-desktop-btn weui-desktop-btn_primary weui-desktop-btn_disabled">发表</button>
+</div>
+"""
+
+TENCENT_CREATE_JS = """
+const publishButton = $('div.form-btns button');
+function startUpload() {
+  publishButton.classList.add('weui-desktop-btn_disabled');
+  simulateUpload(
+    () => { $('#upload-state').innerHTML = '<div class="status-msg">上传中</div>'; },
+    () => {
+      $('#upload-state').innerHTML = '<div class="status-msg">上传完成</div><div class="tag-inner">删除</div>';
+      publishButton.classList.remove('weui-desktop-btn_disabled');
+    },
+    () => { $('#upload-state').innerHTML = '<div class="status-msg error">上传失败</div><div class="tag-inner">删除</div>'; });
+}
+$('input[type="file"]').addEventListener('change', startUpload);
+$('#upload-state').addEventListener('click', (event) => {
+  if (event.target.classList.contains('tag-inner')) { $('#delete-dialog').classList.remove('hidden'); }
+});
+$('#delete-dialog button').addEventListener('click', () => {
+  $('#delete-dialog').classList.add('hidden');
+  $('#upload-state').innerHTML = '';
+  $('input[type="file"]').value = '';
+});
+let pickerDate = new Date();
+function renderPicker() {
+  $('#picker-year').textContent = pickerDate.getFullYear() + '年';
+  $('#picker-month').textContent = String(pickerDate.getMonth() + 1).padStart(2, '0') + '月';
+  let cells = '';
+  for (let day = 1; day <= 31; day++) {
+    cells += '<td><a>' + day + '</a></td>';
+    if (day % 7 === 0) { cells += '</tr><tr>'; }
+  }
+  $('#picker-days').innerHTML = '<tr>' + cells + '</tr>';
+}
+$('.timing-label').addEventListener('click', () => { $('#picker').classList.remove('hidden'); });
+$('input[placeholder="请选择发表时间"]').addEventListener('click', () => {
+  renderPicker();
+  $('#picker-panel').classList.remove('hidden');
+});
+$('.weui-desktop-btn__icon__right').addEventListener('click', () => {
+  pickerDate = new Date(pickerDate.getFullYear(), pickerDate.getMonth() + 1, 1);
+  renderPicker();
+});
+publishButton.addEventListener('click', () => {
+  if (publishButton.classList.contains('weui-desktop-btn_disabled')) { return; }
+  tryPublish(() => { location.href = MOCK.base + '/platform/post/list'; });
+});
+"""
+
+# ---------------------------------------------------------------- 小红书
+
+XIAOHONGSHU_PUBLISH_BODY = """
+<div class="upload-content">
+  <input class="upload-input" type="file" accept="video/*">
+</div>
+<div class="input titleInput"><input class="d-text" placeholder="填写标题会有更多赞哦～"></div>
+<div class="ql-editor" contenteditable="true"></div>
+<div class="d-text d-select-placeholder d-text-ellipsis d-text-nowrap" id="location">添加地点</div>
+<div id="location-dropdown"></div>
+<div>
+  <label class="timing-now"><input type="radio" name="timing" checked>立即发布</label>
+  <label class="timing"><input type="radio" name="timing">定时发布</label>
+  <input class="el-input__inner hidden" placeholder="选择日期和时间">
+</div>
+<button type="button" id="publish">发布</button>
+"""
+
+XIAOHONGSHU_PUBLISH_JS = """
+$('input.upload-input').addEventListener('change', () => {
+  if (!$('div.preview-new')) {
+    $('input.upload-input').insertAdjacentHTML('afterend', '<div class="preview-new"><div class="stage"></div></div>');
+  }
+  simulateUploadWithAutoRetry(
+    () => { $('div.stage').textContent = '上传中'; },
+    () => { $('div.stage').textContent = '上传成功'; },
+    () => { $('div.stage').textContent = '上传失败'; });
+});
+$('#location').addEventListener('click', () => {
+  const input = document.createElement('input');
+  input.className = 'location-input';
+  $('#location').after(input);
+  input.focus();
+  input.addEventListener('input', () => {
+    $('#location-dropdown').innerHTML =
+      '<div class="d-popover d-popover-default d-dropdown --size-min-width-large"><div class="d-options-wrapper">' +
+      '<div class="d-grid d-options"><div><div class="name"></div></div></div></div></div>';
+    $('#location-dropdown div.name').textContent = input.value;
+  });
+}, {once: true});
+$('#location-dropdown').addEventListener('click', () => { $('#location-dropdown').innerHTML = ''; });
+$('label.timing').addEventListener('click', () => {
+  $('.el-input__inner').classList.remove('hidden');
+  $('#publish').textContent = '定时发布';
+});
+$('#publish').addEventListener('click', () => tryPublish(() => {
+  location.href = MOCK.base + '/publish/success?source=mock';
+}));
+"""
+
+# ---------------------------------------------------------------- B站
+
+BILIBILI_UPLOAD_BODY = """
+<div id="video-up-app">
+  <input type="file" accept=".mp4,.flv,.avi,.wmv,.mov,.webm,.mpeg4,.ts,.mpg,.rm,.rmvb,.mkv,.m4v">
+  <div id="upload-state"></div>
+  <div class="title-input"><input placeholder="请输入稿件标题"></div>
+  <div class="select-box-v2-container clickable">生活</div>
+  <div class="desc-v2-container"><textarea placeholder="填写更全面的相关信息，让更多的人能找到你的视频吧～"></textarea></div>
+  <div class="tag-input-container"><input placeholder="按回车键Enter创建标签"></div>
+  <div class="copyright-v2-container"><label>自制</label><label>转载</label></div>
+  <div class="timing-row">
+    <span class="clickable" id="timing">定时发布</span>
+    <input class="el-input__inner hidden" placeholder="选择日期时间">
+  </div>
+  <div class="submit-container"><span class="submit-add" data-reporter-id="28">立即投稿</span></div>
+</div>
+"""
+
+BILIBILI_UPLOAD_JS = """
+function startUpload() {
+  simulateUpload(
+    () => { $('#upload-state').textContent = '上传中'; },
+    () => { $('#upload-state').textContent = '上传完成'; },
+    () => {
+      $('#upload-state').innerHTML = '<span>上传失败</span><button type="button">重新上传</button>';
+      $('#upload-state button').addEventListener('click', () => { $('#upload-state').textContent = ''; });
+    });
+}
+$('#video-up-app input[type="file"]').addEventListener('change', startUpload);
+$('#timing').addEventListener('click', () => { $('.el-input__inner').classList.remove('hidden'); });
+$('span.submit-add').addEventListener('click', () => tryPublish(() => {
+  $('#video-up-app').innerHTML = '<div class="success-info">稿件提交成功</div>';
+  history.pushState({}, '', MOCK.base + '/platform/upload/video/frame');
+}));
+"""
+
+BILIBILI_SPACE_BODY = '<div class="h-inner"><span class="h-name">mock用户</span></div>'
+
+# ---------------------------------------------------------------- 今日头条
+
+TOUTIAO_HOME_BODY = '<div class="home"><span>创作者中心</span></div>'
+
+TOUTIAO_PUBLISH_BODY = """
+<textarea placeholder="请输入文章标题（2～30个字）"></textarea>
+<div class="ProseMirror" contenteditable="true"></div>
+<div class="article-cover">
+  <span>展示封面</span>
+  <input type="file" accept="image/*">
+  <div id="cover-state"></div>
+</div>
+<div class="publish-footer">
+  <button type="button" id="timing">定时发布</button>
+  <input type="datetime-local" class="hidden">
+  <button type="button" id="preview">预览并发布</button>
+  <div id="confirm"></div>
+</div>
+"""
+
+TOUTIAO_PUBLISH_JS = """
+$('.article-cover input').addEventListener('change', () => {
+  $('#cover-state').innerHTML = '<span>封面上传成功</span><button type="button">确定</button>';
+  $('#cover-state button').addEventListener('click', () => { $('#cover-state').textContent = '已设置封面'; });
+});
+$('#timing').addEventListener('click', () => { $('input[type="datetime-local"]').classList.remove('hidden'); });
+$('#preview').addEventListener('click', () => {
+  $('#confirm').innerHTML = '<button type="button">确认发布</button>';
+  $('#confirm button').addEventListener('click', () => tryPublish(() => {
+    $('#confirm').innerHTML = '<div class="publish-result">发布成功</div>';
+  }));
+});
+"""
+
+# ---------------------------------------------------------------- 百家号
+
+BAIJIAHAO_HOME_BODY = '<div class="home"><span>百家号创作者中心</span></div>'
+
+BAIJIAHAO_EDIT_BODY = """
+<div class="video-main-container">
+  <input type="file" accept="video/*">
+</div>
+<div id="formMain" class="hidden">
+  <input placeholder="添加标题获得更多推荐">
+  <div class="cover"><div class="cover-overlay"></div><div class="cheetah-spin-container"></div></div>
+  <div class="op-btn-outter-content"><span>定时发布</span><button type="button">设置</button></div>
+  <div id="schedule" class="hidden">
+    <div class="select-wrap clickable">选择日期</div>
+    <div class="select-wrap clickable">选择小时</div>
+    <div id="schedule-options"></div>
+    <button type="button" id="schedule-confirm">定时发布</button>
+  </div>
+  <button type="button" id="publish">发布</button>
+  <div id="publish-result"></div>
+</div>
+"""
+
+BAIJIAHAO_EDIT_JS = """
+$('.video-main-container input').addEventListener('change', () => {
+  $('#formMain').classList.remove('hidden');
+  simulateUploadWithAutoRetry(
+    () => { $('.cover-overlay').textContent = '上传中'; },
+    () => {
+      $('.cover-overlay').textContent = '';
+      $('.cheetah-spin-container').innerHTML = '<img alt="封面" src="data:image/gif;base64,R0lGODlhAQABAAAAACw=">';
+    },
+    () => { $('.cover-overlay').textContent = '上传失败'; });
+});
+function renderOptions(labels) {
+  $('#schedule-options').innerHTML = '<div class="rc-virtual-list"><div class="rc-virtual-list-holder-inner">' +
+    labels.map((label) => '<div class="cheetah-select-item cheetah-select-item-option">' + label + '</div>').join('') +
+    '</div></div>';
+}
+const selects = document.querySelectorAll('div.select-wrap');
+selects[0].addEventListener('click', () => {
+  const days = [];
+  for (let offset = 0; offset < 7; offset++) {
+    const date = new Date(Date.now() + offset * 86400000);
+    days.push((date.getMonth() + 1) + '月' + String(date.getDate()).padStart(2, '0') + '日');
+  }
+  renderOptions(days);
+});
+selects[1].addEventListener('click', () => renderOptions(Array.from({length: 24}, (_, hour) => hour + '点')));
+$('#schedule-options').addEventListener('click', () => { $('#schedule-options').innerHTML = ''; });
+$('.op-btn-outter-content button').addEventListener('click', () => { $('#schedule').classList.remove('hidden'); });
+function published() {
+  $('#publish-result').innerHTML = '<div class="publish-success">发布成功</div>';
+}
+$('#publish').addEventListener('click', () => tryPublish(published));
+$('#schedule-confirm').addEventListener('click', () => tryPublish(published));
+"""
+
+# 结果页（发布后跳转的作品管理/列表页）
+RESULT_BODY = '<div class="result"><span>作品管理</span></div>'
+
+# (平台, 路径) -> (页面标题, 内容, 脚本, 是否为发布结果页)
+PAGES = {
+    ('douyin', ''): ('抖音创作者中心', '<div>抖音创作者中心</div>', '', False),
+    ('douyin', 'creator-micro/content/upload'): ('发布视频', DOUYIN_UPLOAD_BODY, DOUYIN_UPLOAD_JS, False),
+    ('douyin', 'creator-micro/content/publish'): ('发布视频', DOUYIN_UPLOAD_BODY, DOUYIN_UPLOAD_JS, False),
+    ('douyin', 'creator-micro/content/manage'): ('作品管理', RESULT_BODY, '', True),
+    ('kuaishou', ''): ('快手创作者服务平台', '<div>快手创作者服务平台</div>', '', False),
+    ('kuaishou', 'article/publish/video'): ('发布作品', KUAISHOU_UPLOAD_BODY, KUAISHOU_UPLOAD_JS, False),
+    ('kuaishou', 'article/manage/video'): ('作品管理', RESULT_BODY, '', True),
+    ('tencent', ''): ('视频号助手', '<div>视频号助手</div>', '', False),
+    ('tencent', 'platform/post/create'): ('发表动态', TENCENT_CREATE_BODY, TENCENT_CREATE_JS, False),
+    ('tencent', 'platform/post/list'): ('内容管理', RESULT_BODY, '', True),
+    ('xiaohongshu', ''): ('小红书创作服务平台', '<div>小红书创作服务平台</div>', '', False),
+    ('xiaohongshu', 'creator-micro/content/upload'): ('小红书创作服务平台', '<div>小红书创作服务平台</div>', '', False),
+    ('xiaohongshu', 'publish/publish'): ('发布笔记', XIAOHONGSHU_PUBLISH_BODY, XIAOHONGSHU_PUBLISH_JS, False),
+    ('xiaohongshu', 'publish/success'): ('发布成功', RESULT_BODY, '', True),
+    ('bilibili', 'platform/upload/video'): ('投稿', BILIBILI_UPLOAD_BODY, BILIBILI_UPLOAD_JS, False),
+    ('bilibili', 'platform/upload/video/frame'): ('投稿', RESULT_BODY, '', False),
+    ('bilibili_space', ''): ('个人空间', BILIBILI_SPACE_BODY, '', False),
+    ('toutiao', ''): ('头条号', TOUTIAO_HOME_BODY, '', False),
+    ('toutiao', 'profile_v4/graphic/publish'): ('发布文章', TOUTIAO_PUBLISH_BODY, TOUTIAO_PUBLISH_JS, False),
+    ('baijiahao', 'builder/rc/home'): ('百家号', BAIJIAHAO_HOME_BODY, '', False),
+    ('baijiahao', 'builder/rc/edit'): ('发布视频', BAIJIAHAO_EDIT_BODY, BAIJIAHAO_EDIT_JS, False),
+    ('baijiahao', 'builder/rc/clue'): ('内容管理', RESULT_BODY, '', True),
+}
+
+
+@app.route('/__mock__/config', methods=['GET', 'POST'])
+def mock_config():
+    if request.method == 'POST':
+        try:
+            return jsonify(update_config(**(request.get_json(silent=True) or {})))
+        except ValueError as e:
+            return jsonify({"code": 400, "msg": str(e)}), 400
+    with _lock:
+        return jsonify(dict(_config))
+
+
+@app.route('/__mock__/stats', methods=['GET'])
+def mock_stats():
+    return jsonify(get_stats())
+
+
+@app.route('/__mock__/reset', methods=['POST'])
+def mock_reset():
+    reset_stats()
+    return jsonify({"code": 200, "msg": "统计已清空"})
+
+
+@app.route('/__mock__/event', methods=['POST'])
+def mock_event():
+    data = request.get_json(silent=True) or {}
+    if data.get('platform') and data.get('event'):
+        _count(data['platform'], data['event'])
+    return '', 204
+
+
+@app.route('/__mock__/login', methods=['GET'])
+def mock_login():
+    """手动调试用：写入登录态后跳转"""
+    response = make_response('', 302)
+    response.headers['Location'] = request.args.get('next', '/')
+    response.set_cookie(SESSION_COOKIE, 'mock')
+    return response
+
+
+@app.route('/<platform>/', defaults={'path': ''}, methods=['GET'])
+@app.route('/<platform>/<path:path>', methods=['GET'])
+def platform_page(platform, path):
+    page = PAGES.get((platform, path.strip('/')))
+    if page is None:
+        return f'mock 页面不存在: /{platform}/{path}', 404
+
+    page_latency = _config['page_latency']
+    if page_latency > 0:
+        time.sleep(page_latency)
+
+    _count(platform, 'page_views')
+    if not request.cookies.get(SESSION_COOKIE):
+        _count(platform, 'login_required')
+        return render_login(platform)
+
+    title, body, script, is_result = page
+    if is_result:
+        _count(platform, 'result_views')
+    return render_page(platform, title, body, script)
+
+
+def write_cookie_file(path, base_url, platform=None):
+    """生成可登录 mock 服务的 storage_state 文件"""
+    host = urlparse(base_url).hostname or '127.0.0.1'
+    cookies = [{
+        "name": SESSION_COOKIE,
+        "value": "mock",
+        "domain": host,
+        "path": "/",
+        "expires": -1,
+        "httpOnly": False,
+        "secure": False,
+        "sameSite": "Lax",
+    }]
+    if platform in PLATFORM_DOMAINS:
+        cookies.append({
+            "name": "sau_mock_platform",
+            "value": platform,
+            "domain": PLATFORM_DOMAINS[platform],
+            "path": "/",
+            "expires": -1,
+            "httpOnly": False,
+            "secure": True,
+            "sameSite": "Lax",
+        })
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"cookies": cookies, "origins": []}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def start_server(host='127.0.0.1', port=0, seed=None, **config):
+    """
+    在后台线程中启动 mock 服务，port=0 时自动选择空闲端口
+
+    Returns:
+        (server, base_url): server.shutdown() 停止服务
+    """
+    update_config(**config)
+    if seed is not None:
+        _random.seed(seed)
+    server = make_server(host, port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='mock-creator-center', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟创作者中心')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口 (默认: 8765)')
+    parser.add_argument('--upload-latency', type=float, default=float(os.environ.get('SAU_MOCK_UPLOAD_LATENCY', DEFAULT_CONFIG['upload_latency'])),
+                        help='视频上传耗时，秒 (默认: 3)')
+    parser.add_argument('--upload-jitter', type=float, default=DEFAULT_CONFIG['upload_jitter'], help='上传耗时随机浮动比例 (默认: 0.2)')
+    parser.add_argument('--page-latency', type=float, default=DEFAULT_CONFIG['page_latency'], help='页面响应延迟，秒 (默认: 0)')
+    parser.add_argument('--upload-failure-rate', type=float, default=DEFAULT_CONFIG['upload_failure_rate'], help='首次上传失败概率 (默认: 0)')
+    parser.add_argument('--publish-failure-rate', type=float, default=DEFAULT_CONFIG['publish_failure_rate'], help='首次发布被拒绝概率 (默认: 0)')
+    parser.add_argument('--seed', type=int, help='随机种子，用于复现失败注入')
+    parser.add_argument('--write-cookie', metavar='PATH', help='只生成 cookie 文件后退出')
+    parser.add_argument('--platform', choices=sorted(PLATFORM_DOMAINS), help='配合 --write-cookie 指定平台')
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    if args.write_cookie:
+        path = write_cookie_file(args.write_cookie, base_url, args.platform)
+        print(f"✅ cookie 文件已生成: {path}")
+        return
+
+    _config.update({
+        'upload_latency': args.upload_latency,
+        'upload_jitter': args.upload_jitter,
+        'page_latency': args.page_latency,
+        'upload_failure_rate': args.upload_failure_rate,
+        'publish_failure_rate': args.publish_failure_rate,
+    })
+    if args.seed is not None:
+        _random.seed(args.seed)
+
+    print(f"🧪 mock 创作者中心已启动: {base_url}")
+    print(f"   上传器指向 mock 服务: SAU_MOCK_BASE_URL={base_url} SAU_HEADLESS=1")
+    print(f"   配置: {json.dumps(_config, ensure_ascii=False)}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,14 @@
 import argparse
 import asyncio
+import sys
 from datetime import datetime
 from os.path import exists
 from pathlib import Path
 
 from conf import BASE_DIR
-from uploader.douyin_uploader.main import douyin_setup, DouYinVideo
-from uploader.ks_uploader.main import ks_setup, KSVideo
-from uploader.tencent_uploader.main import weixin_setup, TencentVideo
-from uploader.tk_uploader.main_chrome import tiktok_setup, TiktokVideo
-from utils.base_social_media import get_supported_social_media, get_cli_action, SOCIAL_MEDIA_DOUYIN, \
-    SOCIAL_MEDIA_TENCENT, SOCIAL_MEDIA_TIKTOK, SOCIAL_MEDIA_KUAISHOU
+from uploader.base_uploader import UploadJob
+from uploader.registry import create_uploader, get_supported_platforms
+from utils.base_social_media import get_cli_action
 from utils.constant import TencentZoneTypes
 from utils.files_times import get_title_and_hashtags
 
@@ -26,7 +24,8 @@ def parse_schedule(schedule_raw):
 async def main():
     # 主解析器
     parser = argparse.ArgumentParser(description="Upload video to multiple social-media.")
-    parser.add_argument("platform", metavar='platform', choices=get_supported_social_media(), help="Choose social-media platform: douyin tencent tiktok kuaishou")
+    supported_platforms = get_supported_platforms()
+    parser.add_argument("platform", metavar='platform', choices=supported_platforms, help=f"Choose social-media platform: {' '.join(supported_platforms)}")
 
     parser.add_argument("account_name", type=str, help="Account name for the platform: xiaoA")
     subparsers = parser.add_subparsers(dest="action", metavar='action', help="Choose action", required=True)
@@ -48,27 +47,20 @@ async def main():
     # 参数校验
     if args.action == 'upload':
         if not exists(args.video_file):
-            raise FileNotFoundError(f'Could not find the video file at {args["video_file"]}')
+            raise FileNotFoundError(f'Could not find the video file at {args.video_file}')
         if args.publish_type == 1 and not args.schedule:
             parser.error("The schedule must must be specified for scheduled publishing.")
 
     account_file = Path(BASE_DIR / "cookies" / f"{args.platform}_{args.account_name}.json")
     account_file.parent.mkdir(exist_ok=True)
+    uploader = create_uploader(args.platform, str(account_file))
 
     # 根据 action 处理不同的逻辑
     if args.action == 'login':
         print(f"Logging in with account {args.account_name} on platform {args.platform}")
-        if args.platform == SOCIAL_MEDIA_DOUYIN:
-            await douyin_setup(str(account_file), handle=True)
-        elif args.platform == SOCIAL_MEDIA_TIKTOK:
-            await tiktok_setup(str(account_file), handle=True)
-        elif args.platform == SOCIAL_MEDIA_TENCENT:
-            await weixin_setup(str(account_file), handle=True)
-        elif args.platform == SOCIAL_MEDIA_KUAISHOU:
-            await ks_setup(str(account_file), handle=True)
+        return 0 if await uploader.validate(handle=True) else 1
     elif args.action == 'upload':
         title, tags = get_title_and_hashtags(args.video_file)
-        video_file = args.video_file
 
         if args.publish_type == 0:
             print("Uploading immediately...")
@@ -77,25 +69,14 @@ async def main():
             print("Scheduling videos...")
             publish_date = parse_schedule(args.schedule)
 
-        if args.platform == SOCIAL_MEDIA_DOUYIN:
-            await douyin_setup(account_file, handle=False)
-            app = DouYinVideo(title, video_file, tags, publish_date, account_file)
-        elif args.platform == SOCIAL_MEDIA_TIKTOK:
-            await tiktok_setup(account_file, handle=True)
-            app = TiktokVideo(title, video_file, tags, publish_date, account_file)
-        elif args.platform == SOCIAL_MEDIA_TENCENT:
-            await weixin_setup(account_file, handle=True)
-            category = TencentZoneTypes.LIFESTYLE.value  # 标记原创需要否则不需要传
-            app = TencentVideo(title, video_file, tags, publish_date, account_file, category)
-        elif args.platform == SOCIAL_MEDIA_KUAISHOU:
-            await ks_setup(account_file, handle=True)
-            app = KSVideo(title, video_file, tags, publish_date, account_file)
-        else:
-            print("Wrong platform, please check your input")
-            exit()
-
-        await app.main()
+        await uploader.validate(handle=uploader.relogin_on_upload)
+        # 视频号标记原创需要 category，其他平台不传
+        category = TencentZoneTypes.LIFESTYLE.value if args.platform == 'tencent' else None
+        job = UploadJob(args.video_file, title, tags, publish_date, category=category)
+        result = await uploader.run(job)
+        print(result)
+        return 0 if result['success'] else 1
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -30,7 +30,86 @@ cursor.execute('''CREATE TABLE IF NOT EXISTS file_records (
     filename TEXT NOT NULL,               -- 文件名
     filesize REAL,                     -- 文件大小（单位：MB）
     upload_time DATETIME DEFAULT CURRENT_TIMESTAMP, -- 上传时间，默认当前时间
-    file_path TEXT                        -- 文件路径
+    file_path TEXT,                       -- 文件路径
+    poster_path TEXT,                     -- 封面帧路径（相对videoFile）
+    preview_path TEXT,                    -- 低码率预览视频路径（相对videoFile）
+    preview_status TEXT DEFAULT 'pending' -- 预览生成状态
+)
+''')
+
+# 创建素材元数据索引表
+cursor.execute('''CREATE TABLE IF NOT EXISTS media_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_record_id INTEGER,               -- 对应 file_records.id
+    file_path TEXT NOT NULL UNIQUE,       -- 文件绝对路径
+    format_name TEXT,                     -- 容器格式（ffprobe format_name）
+    duration REAL,                        -- 时长（秒）
+    width INTEGER,                        -- 显示宽度（已考虑旋转）
+    height INTEGER,                       -- 显示高度（已考虑旋转）
+    video_codec TEXT,                     -- 视频编码
+    audio_codec TEXT,                     -- 音频编码
+    bitrate INTEGER,                      -- 总码率（bps）
+    fps REAL,                             -- 帧率
+    rotation INTEGER DEFAULT 0,           -- 旋转角度
+    has_audio INTEGER DEFAULT 0,          -- 是否有音轨
+    content_hash TEXT,                    -- 内容SHA-256
+    probed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+''')
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_record ON media_metadata (file_record_id)")
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_hash ON media_metadata (content_hash)")
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_duration ON media_metadata (duration)")
+
+# 创建上传 trace 索引表（失败或超时上传保存的 Playwright trace / HAR）
+cursor.execute('''CREATE TABLE IF NOT EXISTS upload_traces (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,                 -- 上传任务ID（UploadJob.job_id）
+    run_id TEXT,                          -- 计时记录ID（logs/timings.jsonl 中的 run_id）
+    platform TEXT,
+    account TEXT,
+    reason TEXT,                          -- failed / slow
+    duration REAL,                        -- 上传耗时（秒）
+    trace_dir TEXT,                       -- trace.zip / network.har 所在目录
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+''')
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_traces_job ON upload_traces (job_id)")
+
+# 创建选择器命中统计表（多候选选择器中成功过的候选，下次优先尝试）
+cursor.execute('''CREATE TABLE IF NOT EXISTS selector_stats (
+    platform TEXT NOT NULL,
+    page TEXT NOT NULL,                   -- 页面路径
+    page_version TEXT NOT NULL,           -- 页面脚本包指纹
+    name TEXT NOT NULL,                   -- 步骤名
+    selector TEXT NOT NULL,               -- 成功的候选选择器
+    hits INTEGER DEFAULT 0,
+    last_hit_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (platform, page, page_version, name, selector)
+)
+''')
+
+# 创建文章页面 HTTP 缓存索引表（正文保存在 cache/http/ 目录）
+cursor.execute('''CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    body_file TEXT NOT NULL,              -- cache/http/ 下的正文文件名
+    size INTEGER NOT NULL,                -- 正文字节数
+    charset TEXT,                         -- 响应声明的编码
+    etag TEXT,
+    last_modified TEXT,
+    validated_at REAL NOT NULL,           -- 最近一次从服务器确认的时间（时间戳）
+    accessed_at REAL NOT NULL             -- 最近一次使用的时间，用于淘汰
+)
+''')
+
+# 创建AI生成结果缓存表（按模型、提示词模板版本、请求内容摘要缓存）
+cursor.execute('''CREATE TABLE IF NOT EXISTS ai_completion_cache (
+    model TEXT NOT NULL,
+    template_version TEXT NOT NULL,       -- 提示词模板版本，如 enhance-v1
+    content_hash TEXT NOT NULL,           -- 消息和生成参数的 sha256
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (model, template_version, content_hash)
 )
 ''')
 
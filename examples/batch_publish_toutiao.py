@@ -4,20 +4,33 @@
 """
 今日头条批量文章发布脚本
 支持指定目录，批量发布该目录下所有的md文件
+
+多账号并发发布：传入多个 --account 时，文章按顺序分给空闲的账号，各账号同时发布
+- 所有账号共用一个浏览器进程，每个账号一个浏览器上下文，该账号的文章都在这个上下文中发布
+- 同一账号相邻两篇文章的开始时间至少间隔 --delay 秒，不同账号之间互不等待
+- 结束后逐篇列出发布结果，--report 把结果另存为 JSON
+
+使用方法：
+python examples/batch_publish_toutiao.py articles/2025-06-16
+python examples/batch_publish_toutiao.py articles/2025-06-16 --account cookies/toutiao_uploader/a.json --account cookies/toutiao_uploader/b.json
+python examples/batch_publish_toutiao.py articles/2025-06-16 --delay 120 --report publish_report.json
 """
 
 import asyncio
+import json
+import math
 import os
 import sys
 import glob
 import time
 from datetime import datetime
-from playwright.async_api import async_playwright
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from conf import LOCAL_CHROME_PATH
 from uploader.toutiao_uploader.main import TouTiaoArticle, toutiao_setup
+from utils.browser_pool import BrowserPool, launch_chromium
 
 def parse_markdown_file(file_path):
     """解析markdown文件，提取标题、内容和标签"""
@@ -122,130 +135,244 @@ def get_markdown_files(directory):
     
     return md_files
 
-async def publish_single_article(file_path, account_file, delay_seconds=0):
-    """发布单个文章"""
-    print(f"\n{'='*60}")
-    print(f"📄 正在处理文件: {os.path.basename(file_path)}")
-    print(f"{'='*60}")
-    
-    # 解析markdown文件
-    title, content, tags = parse_markdown_file(file_path)
-    
-    if not title or not content:
-        print(f"❌ 文件解析失败，跳过: {file_path}")
-        return False
-    
-    print(f"📝 标题: {title}")
-    print(f"🏷️  标签: {tags}")
-    print(f"📊 内容长度: {len(content)} 字符")
-    print(f"⏰ 延迟: {delay_seconds} 秒")
-    
-    # 如果有延迟，先等待
-    if delay_seconds > 0:
-        print(f"⏳ 等待 {delay_seconds} 秒后开始发布...")
-        await asyncio.sleep(delay_seconds)
-    
-    try:
-        # 创建文章发布对象
+class PublishResult(object):
+    """单篇文章的发布结果"""
+
+    def __init__(self, file_path, account_file=None):
+        self.file_path = file_path
+        self.account_file = account_file
+        self.title = None
+        self.success = False
+        self.error = None
+        self.started_at = None
+        self.elapsed = 0.0
+
+    @property
+    def account(self):
+        return os.path.splitext(os.path.basename(self.account_file))[0] if self.account_file else ''
+
+    def to_dict(self):
+        return {
+            'file': self.file_path,
+            'title': self.title,
+            'account': self.account,
+            'success': self.success,
+            'error': self.error,
+            'started_at': self.started_at,
+            'elapsed': round(self.elapsed, 1),
+        }
+
+
+class AccountPublisher(object):
+    """
+    单个账号的发布者：用一个浏览器上下文依次发布分到的文章
+    相邻两篇文章的开始时间至少间隔 delay_between_posts 秒
+    """
+
+    def __init__(self, account_file, browser, delay_between_posts=60):
+        self.account_file = account_file
+        self.name = os.path.splitext(os.path.basename(account_file))[0]
+        self.browser = browser
+        self.delay_between_posts = delay_between_posts
+        self.context = None
+        self._last_start = None
+
+    async def wait_turn(self):
+        """等到距离本账号上一篇文章开始发布满 delay_between_posts 秒"""
+        if self._last_start is not None:
+            remaining = self._last_start + self.delay_between_posts - time.monotonic()
+            if remaining > 0:
+                print(f"⏳ [{self.name}] 等待 {remaining:.0f} 秒后发布下一篇...")
+                await asyncio.sleep(remaining)
+        self._last_start = time.monotonic()
+
+    async def publish(self, file_path):
+        """发布单篇文章，不抛异常，结果记录在 PublishResult 中"""
+        result = PublishResult(file_path, self.account_file)
+        result.started_at = datetime.now().isoformat(timespec='seconds')
+        start = time.monotonic()
+
+        # 解析markdown文件
+        title, content, tags = parse_markdown_file(file_path)
+        if not title or not content:
+            result.error = '文件解析失败'
+            print(f"❌ [{self.name}] 文件解析失败，跳过: {file_path}")
+            return result
+        result.title = title
+        print(f"📄 [{self.name}] 开始发布: {title}（{len(content)} 字符，标签: {tags}）")
+
         article = TouTiaoArticle(
             title=title,
             content=content,
             tags=tags,
             publish_date=0,  # 立即发布
-            account_file=account_file,
+            account_file=self.account_file,
             cover_path=None  # 自动生成封面
         )
-        
-        print("🎯 开始发布文章...")
-        
-        # 发布文章
-        async with async_playwright() as playwright:
-            await article.upload(playwright)
-        
-        print(f"✅ 文章发布完成: {title}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ 文章发布失败: {e}")
-        return False
+        try:
+            # 账号的第一篇文章创建上下文，之后的文章复用
+            if self.context is None:
+                self.context = await article.new_context(self.browser)
+            with article.timer:
+                async with article.capture:
+                    result.success = await article.publish_in_context(self.context, close_page=True)
+            if not result.success:
+                result.error = '发布失败' + (f"，截图: {article.screenshot_dir}" if article.screenshot_dir else '')
+        except Exception as e:
+            result.error = str(e) or e.__class__.__name__
+            # 上下文可能已经不可用，下一篇文章重新创建
+            await self.close()
+        result.elapsed = time.monotonic() - start
+
+        if result.success:
+            print(f"✅ [{self.name}] 发布完成: {title}（{result.elapsed:.0f} 秒）")
+        else:
+            print(f"❌ [{self.name}] 发布失败: {title}: {result.error}")
+        return result
+
+    async def run(self, queue, results):
+        """从共享队列中取文章发布，直到队列为空；结果按文章序号写入 results"""
+        try:
+            while not queue.empty():
+                await self.wait_turn()
+                try:
+                    index, file_path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                results[index] = await self.publish(file_path)
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+            self.context = None
+
+
+async def publish_with_accounts(md_files, account_files, delay_between_posts=60):
+    """多个账号并发发布一批文章，返回与 md_files 顺序一致的 [PublishResult]"""
+    queue = asyncio.Queue()
+    for item in enumerate(md_files):
+        queue.put_nowait(item)
+    results = [None] * len(md_files)
+
+    async with BrowserPool() as pool:
+        options = {'headless': False}
+        if LOCAL_CHROME_PATH:
+            options['executable_path'] = LOCAL_CHROME_PATH
+        browser = await launch_chromium(pool.playwright, pool, **options)
+        try:
+            publishers = [AccountPublisher(account_file, browser, delay_between_posts) for account_file in account_files]
+            await asyncio.gather(*(publisher.run(queue, results) for publisher in publishers))
+        finally:
+            await browser.close()
+    return results
+
+
+def print_results(results):
+    """逐篇列出发布结果"""
+    print(f"\n{'='*60}")
+    print("📋 发布结果:")
+    for i, result in enumerate(results, 1):
+        status = '✅' if result.success else '❌'
+        name = result.title or os.path.basename(result.file_path)
+        line = f"  {i}. {status} [{result.account}] {name}（{result.elapsed:.0f} 秒）"
+        if result.error:
+            line += f" - {result.error}"
+        print(line)
+
 
-async def batch_publish_articles(directory, account_file, delay_between_posts=60):
-    """批量发布文章"""
+async def batch_publish_articles(directory, account_files, delay_between_posts=60, report_file=None):
+    """批量发布文章，account_files 可以是单个账号文件或账号文件列表，返回 [PublishResult]"""
     print("🚀 今日头条批量文章发布工具")
     print("=" * 60)
-    
-    # 检查登录状态
+
+    if isinstance(account_files, str):
+        account_files = [account_files]
+
+    # 检查登录状态（各账号在同一个共享浏览器中同时检查，每个账号一个上下文）
     print("🔐 检查登录状态...")
-    if not await toutiao_setup(account_file):
+    async with BrowserPool() as pool:
+        checks = await asyncio.gather(*(toutiao_setup(account_file, browser_pool=pool) for account_file in account_files))
+    valid_accounts = []
+    for account_file, ok in zip(account_files, checks):
+        if ok:
+            valid_accounts.append(account_file)
+        else:
+            print(f"❌ 登录状态失效: {account_file}")
+    if not valid_accounts:
         print("❌ 登录状态检查失败，请先登录")
         print("运行以下命令重新登录:")
         print("python examples/login_toutiao.py")
-        return
-    
-    print("✅ 登录状态正常")
-    
+        return []
+
+    print(f"✅ 登录状态正常: {len(valid_accounts)} 个账号")
+
     # 获取所有markdown文件
     md_files = get_markdown_files(directory)
-    
+
     if not md_files:
         print(f"❌ 在目录 {directory} 中未找到任何markdown文件")
-        return
-    
+        return []
+
     print(f"\n📁 找到 {len(md_files)} 个markdown文件:")
     for i, file_path in enumerate(md_files, 1):
         print(f"  {i}. {os.path.basename(file_path)}")
-    
-    # 确认发布
-    print(f"\n⚠️  即将批量发布 {len(md_files)} 篇文章")
-    print(f"📅 发布间隔: {delay_between_posts} 秒")
-    print(f"⏱️  预计总时间: {len(md_files) * delay_between_posts // 60} 分钟")
-    
+
+    # 确认发布（每个账号每轮发布一篇，轮与轮之间间隔 delay_between_posts 秒）
+    rounds = math.ceil(len(md_files) / len(valid_accounts))
+    print(f"\n⚠️  即将用 {len(valid_accounts)} 个账号批量发布 {len(md_files)} 篇文章")
+    print(f"📅 同一账号发布间隔: {delay_between_posts} 秒")
+    print(f"⏱️  预计等待时间: {(rounds - 1) * delay_between_posts // 60} 分钟（不含发布本身的耗时）")
+
     confirm = input("\n确认开始批量发布吗？(y/N): ").strip().lower()
     if confirm not in ['y', 'yes']:
         print("❌ 用户取消发布")
-        return
-    
+        return []
+
     # 开始批量发布
     print(f"\n🎯 开始批量发布 {len(md_files)} 篇文章...")
-    
-    success_count = 0
-    failed_count = 0
-    
-    for i, file_path in enumerate(md_files):
-        print(f"\n📊 进度: {i+1}/{len(md_files)}")
-        
-        # 第一篇文章不延迟，后续文章有延迟
-        delay = 0 if i == 0 else delay_between_posts
-        
-        success = await publish_single_article(file_path, account_file, delay)
-        
-        if success:
-            success_count += 1
-        else:
-            failed_count += 1
-        
-        # 显示当前统计
-        print(f"📈 当前统计: 成功 {success_count}, 失败 {failed_count}")
-    
+    start = time.monotonic()
+    results = await publish_with_accounts(md_files, valid_accounts, delay_between_posts)
+    elapsed = time.monotonic() - start
+
+    print_results(results)
+
     # 最终统计
+    success_count = sum(1 for result in results if result.success)
+    failed_count = len(results) - success_count
     print(f"\n{'='*60}")
     print("📊 批量发布完成统计:")
     print(f"✅ 成功发布: {success_count} 篇")
     print(f"❌ 发布失败: {failed_count} 篇")
     print(f"📁 总文件数: {len(md_files)} 篇")
     print(f"📈 成功率: {success_count/len(md_files)*100:.1f}%")
+    print(f"⏱️  总耗时: {elapsed / 60:.1f} 分钟")
     print(f"{'='*60}")
 
+    if report_file:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump([result.to_dict() for result in results], f, ensure_ascii=False, indent=2)
+        print(f"📄 发布结果已保存: {report_file}")
+
+    return results
+
 def main():
     """主函数"""
     import argparse
     
     parser = argparse.ArgumentParser(description='今日头条批量文章发布工具')
     parser.add_argument('directory', help='包含markdown文件的目录路径')
-    parser.add_argument('--delay', type=int, default=60, help='文章发布间隔时间（秒），默认60秒')
-    parser.add_argument('--account', default='cookies/toutiao_uploader/account.json', help='账号cookie文件路径')
+    parser.add_argument('--delay', type=int, default=60, help='同一账号相邻两篇文章的发布间隔（秒），默认60秒')
+    parser.add_argument('--account', action='append', dest='accounts',
+                        help='账号cookie文件路径，可重复指定多个账号并发发布，默认 cookies/toutiao_uploader/account.json')
+    parser.add_argument('--report', help='把每篇文章的发布结果保存为JSON文件')
     
     args = parser.parse_args()
+    accounts = list(dict.fromkeys(args.accounts or ['cookies/toutiao_uploader/account.json']))
     
     # 检查目录
     if not os.path.exists(args.directory):
@@ -253,17 +380,19 @@ def main():
         return
     
     # 检查账号文件
-    if not os.path.exists(args.account):
-        print(f"❌ 账号文件不存在: {args.account}")
+    missing = [account for account in accounts if not os.path.exists(account)]
+    if missing:
+        for account in missing:
+            print(f"❌ 账号文件不存在: {account}")
         print("请先运行登录脚本: python examples/login_toutiao.py")
         return
     
     print(f"📁 目标目录: {os.path.abspath(args.directory)}")
-    print(f"⏰ 发布间隔: {args.delay} 秒")
-    print(f"🔑 账号文件: {args.account}")
+    print(f"⏰ 发布间隔: {args.delay} 秒（每个账号）")
+    print(f"🔑 账号文件: {', '.join(accounts)}")
     
     # 运行批量发布
-    asyncio.run(batch_publish_articles(args.directory, args.account, args.delay))
+    asyncio.run(batch_publish_articles(args.directory, accounts, args.delay, report_file=args.report))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,9 +5,13 @@
 文章链接转发到今日头条工具 v2.0
 支持从各种网站抓取文章内容并转发到今日头条
 优化排版，提升阅读体验
+
+批量转发：传入多个链接或 --url-file 链接列表，页面并发下载（按站点限流），正文在进程池中并行提取
+    python examples/forward_article_to_toutiao.py --url-file urls.txt --preview
 """
 
 import asyncio
+import math
 import os
 import sys
 import re
@@ -16,20 +20,162 @@ import hashlib
 import textwrap
 from datetime import datetime
 from urllib.parse import urlparse
-from playwright.async_api import async_playwright
-import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 import markdown
-import openai
 from typing import Optional, Dict, List
 import json
 import argparse
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from uploader.toutiao_uploader.main_final import TouTiaoArticle, toutiao_setup
+from uploader.toutiao_uploader.main import TouTiaoArticle, toutiao_setup
+from utils.ai_completion import (AI_CONCURRENCY, AI_TIMEOUT, AsyncCompletionService, default_backend,
+                                 default_completion_cache)
+from utils.article_fetcher import ArticleFetcher, fetch_page
+from utils.http_cache import default_cache
+
+# 页面解析器：优先使用 lxml（C 实现，比 html.parser 快数倍），未安装时退回标准库
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 正文提取前移除的标签和 class / id
+UNWANTED_TAGS = frozenset([
+    'script', 'style', 'nav', 'header', 'footer', 'aside',
+    'advertisement', 'ad', 'sidebar', 'menu', 'breadcrumb',
+    'iframe', 'embed', 'object'
+])
+UNWANTED_ATTR_RE = re.compile('|'.join([
+    r'ad[_-]', r'advertisement', r'sponsor', r'promo',
+    r'sidebar', r'related', r'comment', r'footer',
+    r'header', r'nav', r'breadcrumb', r'pagination',
+    r'share', r'social', r'tracking', r'analytics'
+]), re.I)
+
+# 智能提取时跳过的区域，以及参与正文评分的容器标签
+SMART_SKIP_PATTERNS = ('nav', 'menu', 'sidebar', 'footer', 'header', 'ad', 'comment')
+SMART_CANDIDATE_TAGS = frozenset(['div', 'article', 'section', 'main'])
+
+# 转换为文本时整段跳过的标签
+TEXT_SKIP_TAGS = frozenset(['script', 'style', 'meta', 'link', 'noscript', 'nav', 'header', 'footer'])
+
+# 文本格式化用到的正则，模块加载时编译一次；规则列表按顺序依次替换
+CODE_FENCE_RE = re.compile(r'```(\w*)\n(.*?)\n```', re.DOTALL)
+MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
+SPACES_RE = re.compile(r'[ \t]+')
+TRAILING_SPACES_RE = re.compile(r'[ \t]+\n')
+CODE_LANGUAGE_RE = re.compile(r'language-(\w+)')
+LIST_ITEM_GAP_RE = re.compile(r'\n+(•|✅|❌|⚠️|🔑|\d+\.)\s+')
+
+SIMPLE_MD_HEADING_RULES = [
+    (re.compile(r'^#{1}\s+(.+)$', re.M), r'\n# \1\n'),
+    (re.compile(r'^#{2}\s+(.+)$', re.M), r'\n## \1\n'),
+    (re.compile(r'^#{3}\s+(.+)$', re.M), r'\n### \1\n'),
+    (re.compile(r'^#{4}\s+(.+)$', re.M), r'\n#### \1\n'),
+    (re.compile(r'^#{5,6}\s+(.+)$', re.M), r'\n##### \1\n'),
+]
+# 内联代码、粗体、斜体原样保留，不需要替换
+SIMPLE_MD_INLINE_RULES = [
+    (re.compile(r'^>\s*(.+)$', re.M), r'> \1'),
+    (re.compile(r'^[-*+]\s+(.+)$', re.M), r'- \1'),
+    (re.compile(r'^\d+\.\s+(.+)$', re.M), r'1. \1'),
+    (re.compile(r'\[([^\]]+)\]\(([^)]+)\)'), r'\1'),
+    (re.compile(r'^---+$', re.M), '---'),
+]
+POSTPROCESS_RULES = [
+    # 清理多余的空行
+    (MULTI_NEWLINE_RE, '\n\n'),
+    # 确保代码块前后有空行
+    (re.compile(r'([^\n])\n```'), r'\1\n\n```'),
+    (re.compile(r'```\n([^\n])'), r'```\n\n\1'),
+    # 确保标题前后有空行
+    (re.compile(r'([^\n])\n(#{1,6} )'), r'\1\n\n\2'),
+    (re.compile(r'(#{1,6} .*)\n([^\n])'), r'\1\n\n\2'),
+    # 确保引用块前后有空行
+    (re.compile(r'([^\n])\n>'), r'\1\n\n>'),
+    (re.compile(r'>\s*\n([^\n>])'), r'>\n\n\1'),
+    # 确保列表项之间没有空行，但列表前后有空行
+    (re.compile(r'\n\n([-*+]|\d+\.)\s'), r'\n\1 '),
+    (re.compile(r'([^\n])\n([-*+]|\d+\.)\s'), r'\1\n\n\2 '),
+    (re.compile(r'([-*+]|\d+\.)\s.*\n([^\n-*+\d])'), r'\1\n\n\2'),
+]
+CLEAN_TEXT_RULES = [
+    (re.compile(r'\n\s*\n\s*\n+'), '\n\n'),               # 多个换行变为两个
+    (SPACES_RE, ' '),                                        # 多个空格变为一个
+    (re.compile(r'^\s+|\s+$', re.M), ''),                    # 去除行首行尾空格
+    (re.compile(r'[\u200b\u200c\u200d\ufeff]'), ''),          # 零宽字符
+]
+PLAIN_TEXT_RULES = [
+    (re.compile(r'^#{1}\s+(.+)$', re.M), r'\n\n=== \1 ===\n\n'),
+    (re.compile(r'^#{2}\s+(.+)$', re.M), r'\n\n--- \1 ---\n\n'),
+    (re.compile(r'^#{3,6}\s+(.+)$', re.M), r'\n\n▶ \1\n\n'),
+    (re.compile(r'\*\*(.+?)\*\*'), r'【\1】'),
+    (re.compile(r'\*(.+?)\*'), r'《\1》'),
+    (re.compile(r'`(.+?)`'), r'「\1」'),
+    (re.compile(r'```[\w]*\n(.*?)\n```', re.DOTALL), r'\n\n┌─ 代码示例 ─┐\n\1\n└─────────┘\n\n'),
+    (re.compile(r'^>\s*(.+)$', re.M), r'┃ \1'),
+    (re.compile(r'^[-*+]\s+(.+)$', re.M), r'- \1'),
+    (re.compile(r'^\d+\.\s+(.+)$', re.M), r'• \1'),
+    (re.compile(r'\[([^\]]+)\]\(([^)]+)\)'), r'\1（\2）'),
+    (re.compile(r'^---+$', re.M), '─' * 50),
+    (MULTI_NEWLINE_RE, '\n\n'),
+]
+PLAIN_TEXT_V2_RULES = [
+    (re.compile(r'^#{1}\s+(.+)$', re.M),
+     r'\n\n════════════════════════════════════════\n\1\n════════════════════════════════════════\n\n'),
+    (re.compile(r'^#{2}\s+(.+)$', re.M), r'\n\n▶ \1\n────────────────────────────────\n\n'),
+    (re.compile(r'^#{3,6}\s+(.+)$', re.M), r'\n\n● \1\n\n'),
+    (CODE_FENCE_RE, r'\n\n💻 **代码示例：**\n┌─────────────────────────────────┐\n\2\n└─────────────────────────────────┘\n\n'),
+    (re.compile(r'`([^`]+)`'), r' `\1` '),
+    (re.compile(r'^>\s*(.+)$', re.M), r'┃ \1'),
+    (re.compile(r'^[-*+]\s+(.+)$', re.M), r'• \1'),
+    (re.compile(r'^\d+\.\s+(.+)$', re.M), r'• \1'),
+    (re.compile(r'^---+$', re.M), '─' * 50),
+]
+
+# 段落整理（保存的 Markdown 和发布的富文本共用）
+LIST_PARAGRAPH_RE = re.compile(r'^[-*+]\s|^\d+\.\s')
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+LATIN_CJK_RE = re.compile(r'([a-zA-Z])([\u4e00-\u9fff])')
+CJK_LATIN_RE = re.compile(r'([\u4e00-\u9fff])([a-zA-Z])')
+CJK_PUNCT_SPACE_RE = re.compile(r'([，。！？；：、])\s+')
+
+# Markdown 转出的 HTML 标签 -> 带内联样式的开始标签，一次替换完成
+HTML_TAG_STYLES = {
+    '<p>': '<p style="margin: 16px 0; line-height: 1.6;">',
+    '<h1>': '<h1 style="font-size: 24px; font-weight: bold; margin: 24px 0 16px 0; color: #333;">',
+    '<h2>': '<h2 style="font-size: 22px; font-weight: bold; margin: 20px 0 14px 0; color: #333; border-bottom: 2px solid #eee; padding-bottom: 8px;">',
+    '<h3>': '<h3 style="font-size: 20px; font-weight: bold; margin: 18px 0 12px 0; color: #333;">',
+    '<h4>': '<h4 style="font-size: 18px; font-weight: bold; margin: 16px 0 10px 0; color: #333;">',
+    '<h5>': '<h5 style="font-size: 16px; font-weight: bold; margin: 14px 0 8px 0; color: #333;">',
+    '<h6>': '<h6 style="font-size: 14px; font-weight: bold; margin: 12px 0 6px 0; color: #333;">',
+    '<a ': '<a style="color: #1890ff; text-decoration: none;" ',
+    '<strong>': '<strong style="font-weight: bold; color: #333;">',
+    '<em>': '<em style="font-style: italic; color: #666;">',
+    '<code>': '<code style="background-color: #f6f8fa; color: #d73a49; padding: 2px 4px; border-radius: 3px; font-family: monospace; font-size: 0.9em;">',
+    '<pre>': '<pre style="background-color: #f6f8fa; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; overflow-x: auto; margin: 16px 0; font-family: monospace; font-size: 14px; line-height: 1.45;">',
+    '<blockquote>': '<blockquote style="border-left: 4px solid #dfe2e5; margin: 16px 0; padding: 0 16px; color: #6a737d; background-color: #f8f9fa; border-radius: 0 6px 6px 0;">',
+    '<ul>': '<ul style="margin: 16px 0; padding-left: 24px;">',
+    '<ol>': '<ol style="margin: 16px 0; padding-left: 24px;">',
+    '<li>': '<li style="margin: 4px 0; line-height: 1.6;">',
+    '<table>': '<table style="border-collapse: collapse; width: 100%; border: 1px solid #e1e4e8; margin: 16px 0;">',
+    '<th>': '<th style="background-color: #f6f8fa; border: 1px solid #e1e4e8; padding: 8px 12px; text-align: left; font-weight: bold;">',
+    '<td>': '<td style="border: 1px solid #e1e4e8; padding: 8px 12px;">',
+}
+HTML_TAG_STYLE_RE = re.compile('|'.join(re.escape(tag) for tag in HTML_TAG_STYLES))
+
+
+def _apply_rules(text, rules):
+    """按顺序应用 (正则, 替换) 规则"""
+    for pattern, replacement in rules:
+        text = pattern.sub(replacement, text)
+    return text
+
 
 class WechatSyncStyleFormatter:
     """优化版格式化器 - 解决空行过多、代码块显示和markdown渲染问题"""
@@ -52,11 +198,7 @@ class WechatSyncStyleFormatter:
             return ""
         
         # 处理标题
-        text = re.sub(r'^#{1}\s+(.+)$', r'\n# \1\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{2}\s+(.+)$', r'\n## \1\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{3}\s+(.+)$', r'\n### \1\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{4}\s+(.+)$', r'\n#### \1\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{5,6}\s+(.+)$', r'\n##### \1\n', text, flags=re.MULTILINE)
+        text = _apply_rules(text, SIMPLE_MD_HEADING_RULES)
         
         # 处理代码块
         def replace_code_block(match):
@@ -64,87 +206,31 @@ class WechatSyncStyleFormatter:
             code = match.group(2)
             return self._format_code_block(code, language)
         
-        text = re.sub(r'```(\w*)\n(.*?)\n```', replace_code_block, text, flags=re.DOTALL)
-        
-        # 处理内联代码
-        text = re.sub(r'`([^`]+)`', r'`\1`', text)
+        text = CODE_FENCE_RE.sub(replace_code_block, text)
         
-        # 处理粗体和斜体
-        text = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', text)
-        text = re.sub(r'\*([^*]+)\*', r'*\1*', text)
-        
-        # 处理引用
-        text = re.sub(r'^>\s*(.+)$', r'> \1', text, flags=re.MULTILINE)
-        
-        # 处理列表
-        text = re.sub(r'^[-*+]\s+(.+)$', r'- \1', text, flags=re.MULTILINE)
-        text = re.sub(r'^\d+\.\s+(.+)$', r'1. \1', text, flags=re.MULTILINE)
-        
-        # 处理链接
-        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1', text)
-        
-        # 处理分隔线
-        text = re.sub(r'^---+$', '---', text, flags=re.MULTILINE)
+        # 处理引用、列表、链接和分隔线
+        text = _apply_rules(text, SIMPLE_MD_INLINE_RULES)
         
         # 后处理
         return self._postprocess_text(text)
     
     def html_to_text(self, html_content):
-        """将HTML转换为清晰的文本格式 - 优化版"""
+        """将HTML转换为清晰的文本格式 - 优化版（也可以直接传入已解析的元素，避免序列化后重新解析）"""
         if not html_content:
             return ""
         
-        # 使用BeautifulSoup解析
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 移除不需要的元素
-        for tag in soup(['script', 'style', 'meta', 'link', 'noscript', 'nav', 'header', 'footer']):
-            tag.decompose()
-        
-        # 处理特殊元素
-        self._preprocess_elements(soup)
+        if isinstance(html_content, Tag):
+            soup = html_content
+        else:
+            # 使用BeautifulSoup解析
+            soup = BeautifulSoup(html_content, HTML_PARSER)
         
-        # 转换为文本
+        # 一次遍历完成转换：跳过无关标签，识别代码块、内联代码和链接，不修改传入的元素
         result = self._element_to_text(soup)
         
         # 后处理 - 优化格式
         return self._postprocess_text(result)
     
-    def _preprocess_elements(self, soup):
-        """预处理HTML元素"""
-        # 处理代码块
-        for pre in soup.find_all('pre'):
-            code = pre.find('code')
-            if code:
-                language = self._detect_language(code)
-                code_text = code.get_text()
-                # 创建特殊标记
-                marker = soup.new_tag('div')
-                marker['data-type'] = 'codeblock'
-                marker['data-language'] = language
-                marker.string = code_text
-                pre.replace_with(marker)
-        
-        # 处理内联代码
-        for code in soup.find_all('code'):
-            if code.parent.name != 'pre':
-                code_text = code.get_text()
-                marker = soup.new_tag('span')
-                marker['data-type'] = 'inline-code'
-                marker.string = code_text
-                code.replace_with(marker)
-        
-        # 处理链接
-        for a in soup.find_all('a'):
-            href = a.get('href', '')
-            text = a.get_text().strip()
-            if text and href:
-                marker = soup.new_tag('span')
-                marker['data-type'] = 'link'
-                marker['data-href'] = href
-                marker.string = text
-                a.replace_with(marker)
-    
     def _detect_language(self, code_elem):
         """检测代码语言"""
         classes = code_elem.get('class', [])
@@ -177,19 +263,32 @@ class WechatSyncStyleFormatter:
         
         tag = element.name.lower()
         
-        # 处理特殊数据类型
-        if tag == 'div' and element.get('data-type') == 'codeblock':
-            language = element.get('data-language', '')
-            code_text = element.get_text()
-            return self._format_code_block(code_text, language)
+        # 不需要的元素整段跳过
+        if tag in TEXT_SKIP_TAGS:
+            return ""
+        
+        # 代码块
+        if tag == 'pre':
+            code = element.find('code')
+            if code:
+                return self._format_code_block(code.get_text(), self._detect_language(code))
         
-        elif tag == 'span' and element.get('data-type') == 'inline-code':
+        # 内联代码（代码块中的 code 不会走到这里）
+        elif tag == 'code':
             return f"`{element.get_text()}`"
         
-        elif tag == 'span' and element.get('data-type') == 'link':
-            text = element.get_text()
-            href = element.get('data-href', '')
-            return f"{text}"  # 不显示链接URL，保持文章整洁
+        # 链接：不显示链接URL，保持文章整洁
+        elif tag == 'a':
+            text = element.get_text().strip()
+            if text and element.get('href', ''):
+                return text
+        
+        # 列表和表格直接按子元素格式化
+        elif tag in ['ul', 'ol']:
+            return self._format_list(element, tag)
+        
+        elif tag == 'table':
+            return self._format_table(element)
         
         # 处理子元素
         children_text = []
@@ -198,7 +297,7 @@ class WechatSyncStyleFormatter:
             if child_text:
                 children_text.append(child_text)
         
-        text = ' '.join(children_text) if children_text else element.get_text().strip()
+        text = ' '.join(children_text) if children_text else self._visible_text(element).strip()
         
         # 根据标签格式化 - 优化版
         if tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
@@ -214,9 +313,6 @@ class WechatSyncStyleFormatter:
         elif tag in ['em', 'i']:
             return f"*{text}*" if text else ""
         
-        elif tag in ['ul', 'ol']:
-            return self._format_list(element, tag)
-        
         elif tag == 'li':
             return text
         
@@ -232,12 +328,20 @@ class WechatSyncStyleFormatter:
         elif tag in ['div', 'section', 'article']:
             return text + "\n\n" if text else ""
         
-        elif tag == 'table':
-            return self._format_table(element)
-        
         else:
             return text
     
+    def _visible_text(self, element):
+        """元素的文本，不含跳过的标签（相当于跳过这些标签后的 get_text）"""
+        parts = []
+        for child in element.children:
+            if isinstance(child, Tag):
+                if child.name.lower() not in TEXT_SKIP_TAGS:
+                    parts.append(self._visible_text(child))
+            elif type(child) in (NavigableString, CData):
+                parts.append(str(child))
+        return ''.join(parts)
+    
     def _format_heading(self, text, level):
         """格式化标题 - 优化版"""
         if not text:
@@ -316,25 +420,8 @@ class WechatSyncStyleFormatter:
         if not text:
             return ""
         
-        # 清理多余的空行
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        # 确保代码块前后有空行
-        text = re.sub(r'([^\n])\n```', r'\1\n\n```', text)
-        text = re.sub(r'```\n([^\n])', r'```\n\n\1', text)
-        
-        # 确保标题前后有空行
-        text = re.sub(r'([^\n])\n(#{1,6} )', r'\1\n\n\2', text)
-        text = re.sub(r'(#{1,6} .*)\n([^\n])', r'\1\n\n\2', text)
-        
-        # 确保引用块前后有空行
-        text = re.sub(r'([^\n])\n>', r'\1\n\n>', text)
-        text = re.sub(r'>\s*\n([^\n>])', r'>\n\n\1', text)
-        
-        # 确保列表项之间没有空行，但列表前后有空行
-        text = re.sub(r'\n\n([-*+]|\d+\.)\s', r'\n\1 ', text)
-        text = re.sub(r'([^\n])\n([-*+]|\d+\.)\s', r'\1\n\n\2 ', text)
-        text = re.sub(r'([-*+]|\d+\.)\s.*\n([^\n-*+\d])', r'\1\n\n\2', text)
+        # 清理多余的空行，确保代码块、标题、引用块和列表前后有空行
+        text = _apply_rules(text, POSTPROCESS_RULES)
         
         return text.strip()
     
@@ -344,7 +431,8 @@ class WechatSyncStyleFormatter:
             return ""
         
         try:
-            # 将Markdown转换为HTML
+            # 将Markdown转换为HTML（转换器复用，每次转换前重置状态）
+            self.markdown_converter.reset()
             html_content = self.markdown_converter.convert(markdown_content)
             
             # 将HTML转换为优化的文本格式
@@ -373,6 +461,9 @@ class EnhancedArticleForwarder:
         # 初始化格式化器
         self.formatter = WechatSyncStyleFormatter()
         
+        # 页面缓存：预览后再发布同一链接时不重复下载（SAU_HTTP_CACHE=0 关闭）
+        self.http_cache = default_cache()
+        
         # 内容美化配置
         self.content_enhancers = {
             'emoji_mapping': {
@@ -395,10 +486,10 @@ class EnhancedArticleForwarder:
         
         try:
             # 重置转换器状态
-            self.markdown_converter.reset()
+            self.formatter.markdown_converter.reset()
             
             # 转换Markdown为HTML
-            html_content = self.markdown_converter.convert(markdown_content)
+            html_content = self.formatter.markdown_converter.convert(markdown_content)
             
             # 优化HTML格式
             html_content = self._optimize_html_format(html_content)
@@ -414,56 +505,8 @@ class EnhancedArticleForwarder:
         if not html_content:
             return ""
         
-        # 为段落添加间距
-        html_content = re.sub(r'<p>', '<p style="margin: 16px 0; line-height: 1.6;">', html_content)
-        
-        # 为标题添加样式
-        html_content = re.sub(r'<h1>', '<h1 style="font-size: 24px; font-weight: bold; margin: 24px 0 16px 0; color: #333;">', html_content)
-        html_content = re.sub(r'<h2>', '<h2 style="font-size: 22px; font-weight: bold; margin: 20px 0 14px 0; color: #333; border-bottom: 2px solid #eee; padding-bottom: 8px;">', html_content)
-        html_content = re.sub(r'<h3>', '<h3 style="font-size: 20px; font-weight: bold; margin: 18px 0 12px 0; color: #333;">', html_content)
-        html_content = re.sub(r'<h4>', '<h4 style="font-size: 18px; font-weight: bold; margin: 16px 0 10px 0; color: #333;">', html_content)
-        html_content = re.sub(r'<h5>', '<h5 style="font-size: 16px; font-weight: bold; margin: 14px 0 8px 0; color: #333;">', html_content)
-        html_content = re.sub(r'<h6>', '<h6 style="font-size: 14px; font-weight: bold; margin: 12px 0 6px 0; color: #333;">', html_content)
-        
-        # 为链接添加样式
-        html_content = re.sub(r'<a ', '<a style="color: #1890ff; text-decoration: none;" ', html_content)
-        
-        # 为强调文本添加样式
-        html_content = re.sub(r'<strong>', '<strong style="font-weight: bold; color: #333;">', html_content)
-        html_content = re.sub(r'<em>', '<em style="font-style: italic; color: #666;">', html_content)
-        
-        # 为代码添加样式
-        html_content = re.sub(
-            r'<code>',
-            '<code style="background-color: #f6f8fa; color: #d73a49; padding: 2px 4px; border-radius: 3px; font-family: monospace; font-size: 0.9em;">',
-            html_content
-        )
-        
-        # 为代码块添加样式
-        html_content = re.sub(
-            r'<pre>',
-            '<pre style="background-color: #f6f8fa; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; overflow-x: auto; margin: 16px 0; font-family: monospace; font-size: 14px; line-height: 1.45;">',
-            html_content
-        )
-        
-        # 为引用块添加样式
-        html_content = re.sub(
-            r'<blockquote>',
-            '<blockquote style="border-left: 4px solid #dfe2e5; margin: 16px 0; padding: 0 16px; color: #6a737d; background-color: #f8f9fa; border-radius: 0 6px 6px 0;">',
-            html_content
-        )
-        
-        # 为列表添加样式
-        html_content = re.sub(r'<ul>', '<ul style="margin: 16px 0; padding-left: 24px;">', html_content)
-        html_content = re.sub(r'<ol>', '<ol style="margin: 16px 0; padding-left: 24px;">', html_content)
-        html_content = re.sub(r'<li>', '<li style="margin: 4px 0; line-height: 1.6;">', html_content)
-        
-        # 为表格添加样式
-        html_content = re.sub(r'<table>', '<table style="border-collapse: collapse; width: 100%; border: 1px solid #e1e4e8; margin: 16px 0;">', html_content)
-        html_content = re.sub(r'<th>', '<th style="background-color: #f6f8fa; border: 1px solid #e1e4e8; padding: 8px 12px; text-align: left; font-weight: bold;">', html_content)
-        html_content = re.sub(r'<td>', '<td style="border: 1px solid #e1e4e8; padding: 8px 12px;">', html_content)
-        
-        return html_content
+        # 为段落、标题、链接、强调文本、代码、引用块、列表和表格添加样式（一次替换）
+        return HTML_TAG_STYLE_RE.sub(lambda match: HTML_TAG_STYLES[match.group(0)], html_content)
     
     def _markdown_to_rich_text(self, markdown_content):
         """将Markdown内容转换为富文本格式（不是HTML代码）"""
@@ -472,7 +515,8 @@ class EnhancedArticleForwarder:
         
         try:
             # 先转换为HTML
-            html_content = self.markdown_converter.convert(markdown_content)
+            self.formatter.markdown_converter.reset()
+            html_content = self.formatter.markdown_converter.convert(markdown_content)
             
             # 将HTML转换为纯文本，但保留格式效果
             rich_text = self._html_to_formatted_text(html_content)
@@ -575,8 +619,8 @@ class EnhancedArticleForwarder:
         
         # 清理多余的空行和空格
         if result:
-            result = re.sub(r'\n{3,}', '\n\n', result)  # 将3个以上的换行替换为2个
-            result = re.sub(r'[ \t]+', ' ', result)  # 将多个空格替换为1个
+            result = MULTI_NEWLINE_RE.sub('\n\n', result)  # 将3个以上的换行替换为2个
+            result = SPACES_RE.sub(' ', result)  # 将多个空格替换为1个
             result = result.strip()
         
         return result
@@ -586,37 +630,8 @@ class EnhancedArticleForwarder:
         if not markdown_content:
             return ""
         
-        # 简单的Markdown到文本转换
-        text = markdown_content
-        
-        # 处理标题
-        text = re.sub(r'^#{1}\s+(.+)$', r'\n\n=== \1 ===\n\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{2}\s+(.+)$', r'\n\n--- \1 ---\n\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{3,6}\s+(.+)$', r'\n\n▶ \1\n\n', text, flags=re.MULTILINE)
-        
-        # 处理粗体和斜体
-        text = re.sub(r'\*\*(.+?)\*\*', r'【\1】', text)
-        text = re.sub(r'\*(.+?)\*', r'《\1》', text)
-        
-        # 处理代码
-        text = re.sub(r'`(.+?)`', r'「\1」', text)
-        text = re.sub(r'```[\w]*\n(.*?)\n```', r'\n\n┌─ 代码示例 ─┐\n\1\n└─────────┘\n\n', text, flags=re.DOTALL)
-        
-        # 处理引用
-        text = re.sub(r'^>\s*(.+)$', r'┃ \1', text, flags=re.MULTILINE)
-        
-        # 处理列表
-        text = re.sub(r'^[-*+]\s+(.+)$', r'- \1', text, flags=re.MULTILINE)
-        text = re.sub(r'^\d+\.\s+(.+)$', r'• \1', text, flags=re.MULTILINE)
-        
-        # 处理链接
-        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\1（\2）', text)
-        
-        # 处理分隔线
-        text = re.sub(r'^---+$', '─' * 50, text, flags=re.MULTILINE)
-        
-        # 清理多余空行
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        # 简单的Markdown到文本转换：标题、粗体斜体、代码、引用、列表、链接、分隔线，最后清理多余空行
+        text = _apply_rules(markdown_content, PLAIN_TEXT_RULES)
         
         return text.strip()
     
@@ -625,42 +640,26 @@ class EnhancedArticleForwarder:
         if not text:
             return ""
         
-        # 移除多余的空白字符
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # 多个换行变为两个
-        text = re.sub(r'[ \t]+', ' ', text)  # 多个空格变为一个
-        text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)  # 去除行首行尾空格
-        
-        # 清理特殊字符
-        text = re.sub(r'[\u200b\u200c\u200d\ufeff]', '', text)  # 零宽字符
+        # 移除多余的空白字符和零宽字符
+        text = _apply_rules(text, CLEAN_TEXT_RULES)
         text = text.strip()
         
         return text
     
     def _remove_unwanted_elements(self, soup):
         """移除不需要的HTML元素"""
-        # 移除script、style、nav等不需要的标签
-        unwanted_tags = [
-            'script', 'style', 'nav', 'header', 'footer', 'aside',
-            'advertisement', 'ad', 'sidebar', 'menu', 'breadcrumb',
-            'iframe', 'embed', 'object'
-        ]
-        
-        for tag_name in unwanted_tags:
-            for tag in soup.find_all(tag_name):
-                tag.decompose()
-        
-        # 移除常见的广告和无关内容的class/id
-        unwanted_patterns = [
-            r'ad[_-]', r'advertisement', r'sponsor', r'promo', 
-            r'sidebar', r'related', r'comment', r'footer', 
-            r'header', r'nav', r'breadcrumb', r'pagination', 
-            r'share', r'social', r'tracking', r'analytics'
-        ]
-        
-        for pattern in unwanted_patterns:
-            for tag in soup.find_all(class_=re.compile(pattern, re.I)):
+        # 一次遍历移除script、style、nav等标签，以及class/id像广告、评论、导航的元素
+        for tag in soup.find_all(True):
+            if tag.decomposed:
+                # 祖先元素已被移除
+                continue
+            if tag.name in UNWANTED_TAGS:
                 tag.decompose()
-            for tag in soup.find_all(id=re.compile(pattern, re.I)):
+                continue
+            classes = tag.get('class')
+            if isinstance(classes, list):
+                classes = ' '.join(classes)
+            if (classes and UNWANTED_ATTR_RE.search(classes)) or UNWANTED_ATTR_RE.search(tag.get('id') or ''):
                 tag.decompose()
         
         return soup
@@ -683,7 +682,7 @@ class EnhancedArticleForwarder:
         class_attr = code_elem.get('class', [])
         if class_attr:
             for cls in class_attr:
-                for lang_key, lang_name in self.content_enhancers['code_languages'].items():
+                for lang_key, lang_name in self.formatter.code_languages.items():
                     if lang_key in cls.lower():
                         return lang_key
         
@@ -712,7 +711,7 @@ class EnhancedArticleForwarder:
         
         # 检测语言
         language = self._detect_code_language(code_elem)
-        lang_display = self.content_enhancers['code_languages'].get(language, language)
+        lang_display = self.formatter.code_languages.get(language, language)
         
         # 清理代码文本
         code_text = code_text.strip()
@@ -786,14 +785,14 @@ class EnhancedArticleForwarder:
             if main_content:
                 content_elem = main_content
         
-        content = ""
-        if content_elem:
-            # 使用新的格式化器转换HTML为文本
-            content = self.formatter.html_to_text(str(content_elem))
-        
         # 提取标签
         tags = self._extract_tags_juejin(soup)
         
+        content = ""
+        if content_elem:
+            # 使用新的格式化器转换HTML为文本，直接复用已解析的元素
+            content = self.formatter.html_to_text(content_elem)
+        
         return title, content, tags
     
     def _extract_cnblogs(self, soup, url):
@@ -924,10 +923,12 @@ class EnhancedArticleForwarder:
             if tag_name in ['script', 'style', 'meta', 'link', 'head']:
                 return ""
             
-            # 获取子元素内容
+            # 获取子元素内容（保留每个子元素的结果，列表项不再重复转换）
             children_content = []
+            child_results = {}
             for child in elem.children:
                 child_result = process_element(child, depth + 1)
+                child_results[id(child)] = child_result
                 if child_result:
                     children_content.append(child_result)
             
@@ -969,7 +970,7 @@ class EnhancedArticleForwarder:
                 # 处理列表
                 list_items = []
                 for i, li in enumerate(elem.find_all('li', recursive=False), 1):
-                    li_content = process_element(li, depth + 1)
+                    li_content = child_results.get(id(li))
                     if li_content:
                         formatted_item = self._format_list_item(li, tag_name, i)
                         list_items.append(formatted_item)
@@ -1026,9 +1027,9 @@ class EnhancedArticleForwarder:
         if result:
             result = self._clean_text(result)
             # 确保段落之间有适当的分隔
-            result = re.sub(r'\n{3,}', '\n\n', result)
+            result = MULTI_NEWLINE_RE.sub('\n\n', result)
             # 清理列表格式
-            result = re.sub(r'\n+(•|✅|❌|⚠️|🔑|\d+\.)\s+', r'\n\1 ', result)
+            result = LIST_ITEM_GAP_RE.sub(r'\n\1 ', result)
             
         return result
     
@@ -1068,61 +1069,89 @@ class EnhancedArticleForwarder:
         tags = ['文章转发', '技术分享']
         return title, content, tags
     
+    def _text_stats(self, root):
+        """
+        自底向上统计每个元素的 [文本长度, 链接文本长度, 标签数]，整棵树只遍历一次
+        
+        按文档逆序处理节点时，子孙节点总在祖先之前，处理到某个元素时它的统计已经累加完成
+        """
+        stats = {}
+        for node in reversed(list(root.descendants)):
+            parent = node.parent
+            if parent is None:
+                continue
+            if isinstance(node, Tag):
+                own = stats.setdefault(id(node), [0, 0, 0])
+                if node.name == 'a':
+                    own[1] = own[0]
+                total = stats.setdefault(id(parent), [0, 0, 0])
+                total[0] += own[0]
+                total[1] += own[1]
+                total[2] += own[2] + 1
+            elif type(node) is NavigableString:
+                stats.setdefault(id(parent), [0, 0, 0])[0] += len(node.strip())
+        return stats
+    
     def _smart_content_extraction(self, soup):
-        """智能内容提取算法"""
-        # 找到所有可能包含内容的div
-        content_divs = soup.find_all('div')
-        
-        best_content = ""
-        max_text_length = 0
+        """智能内容提取：按文本密度给容器评分，只转换得分最高的一个"""
+        stats = self._text_stats(soup)
         
-        for div in content_divs:
+        best_elem = None
+        best_score = 0
+        for elem in soup.find_all(SMART_CANDIDATE_TAGS):
             # 跳过明显的导航、广告等区域
-            div_class = ' '.join(div.get('class', [])).lower()
-            div_id = (div.get('id') or '').lower()
-            
-            skip_patterns = ['nav', 'menu', 'sidebar', 'footer', 'header', 'ad', 'comment']
-            if any(pattern in div_class or pattern in div_id for pattern in skip_patterns):
+            elem_class = ' '.join(elem.get('class', [])).lower()
+            elem_id = (elem.get('id') or '').lower()
+            if any(pattern in elem_class or pattern in elem_id for pattern in SMART_SKIP_PATTERNS):
                 continue
             
-            div_text = div.get_text().strip()
-            
-            # 选择文本最长的div作为主要内容
-            if len(div_text) > max_text_length:
-                max_text_length = len(div_text)
-                best_content = self._html_to_markdown_enhanced(div)
+            text_length, link_length, tag_count = stats.get(id(elem), (0, 0, 0))
+            plain_length = text_length - link_length
+            if plain_length <= 0:
+                continue
+            # 非链接文本越多、每个标签承载的文本越多，越像正文；
+            # 包住正文和大量链接列表、小卡片的外层容器密度低，不会胜过正文本身
+            score = plain_length * math.log1p(plain_length / (tag_count + 1))
+            if score > best_score:
+                best_score = score
+                best_elem = elem
+        
+        return self._html_to_markdown_enhanced(best_elem) if best_elem is not None else ""
+    
+    def extract_article(self, html, url):
+        """从页面HTML中提取文章，返回 (标题, 内容, 标签)"""
+        # 解析HTML（整个提取过程共用这一棵树）
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        # 根据网站类型选择提取器
+        domain = urlparse(url).netloc.lower()
+        extractor = None
+        
+        for site, extract_func in self.site_configs.items():
+            if site in domain:
+                extractor = extract_func
+                break
+        
+        if not extractor:
+            extractor = self._extract_generic
         
-        return best_content
+        return extractor(soup, url)
     
     async def fetch_article(self, url):
         """获取文章内容"""
         print(f"🌐 正在获取文章: {url}")
         
         try:
-            # 发送HTTP请求
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.encoding = 'utf-8'
+            # 发送HTTP请求（不阻塞事件循环）
+            page = await fetch_page(url, headers=self.headers, cache=self.http_cache)
             
-            if response.status_code != 200:
-                print(f"❌ 请求失败，状态码: {response.status_code}")
+            if not page.ok:
+                print(f"❌ 请求失败: {page.error}")
                 return None, None, None
+            if page.from_cache:
+                print("📦 使用缓存的页面内容")
             
-            # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 根据网站类型选择提取器
-            domain = urlparse(url).netloc.lower()
-            extractor = None
-            
-            for site, extract_func in self.site_configs.items():
-                if site in domain:
-                    extractor = extract_func
-                    break
-            
-            if not extractor:
-                extractor = self._extract_generic
-            
-            title, content, tags = extractor(soup, url)
+            title, content, tags = self.extract_article(page.text, url)
             
             print(f"✅ 文章获取成功:")
             print(f"📝 标题: {title}")
@@ -1135,11 +1164,89 @@ class EnhancedArticleForwarder:
             print(f"❌ 获取文章失败: {e}")
             return None, None, None
     
+    async def fetch_articles(self, urls, workers=None):
+        """
+        批量获取文章：并发下载所有页面，再在进程池中并行提取正文
+        
+        :param workers: 提取进程数，默认 min(页面数, CPU核数)，0 表示在当前进程中提取
+        :return: 与 urls 顺序一致的 [{'url', 'title', 'content', 'tags', 'error'}]
+        """
+        print(f"🌐 正在并发获取 {len(urls)} 篇文章...")
+        start = time.time()
+        async with ArticleFetcher(headers=self.headers, cache=self.http_cache) as fetcher:
+            pages = await fetcher.fetch_many(urls)
+        fetched = [page for page in pages if page.ok]
+        cached = sum(1 for page in fetched if page.from_cache)
+        print(f"📥 下载完成: 成功 {len(fetched)}/{len(urls)}（缓存 {cached}），耗时 {time.time() - start:.1f} 秒")
+        
+        if workers is None:
+            workers = min(len(fetched), os.cpu_count() or 1)
+        start = time.time()
+        extracted = await self._extract_pages(fetched, workers)
+        print(f"🧩 正文提取完成，耗时 {time.time() - start:.1f} 秒")
+        
+        results = []
+        for page in pages:
+            article = {'url': page.url, 'title': None, 'content': None, 'tags': None, 'error': page.error}
+            if page.ok:
+                outcome = extracted[page.url]
+                if isinstance(outcome, Exception):
+                    article['error'] = f"提取失败: {outcome}"
+                else:
+                    article['title'], article['content'], article['tags'] = outcome
+            results.append(article)
+        return results
+    
+    async def _extract_pages(self, pages, workers):
+        """返回 {url: (标题, 内容, 标签) 或 Exception}"""
+        if workers > 1 and len(pages) > 1:
+            loop = asyncio.get_running_loop()
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outcomes = await asyncio.gather(
+                        *(loop.run_in_executor(pool, _extract_in_worker, page.text, page.url) for page in pages),
+                        return_exceptions=True
+                    )
+                return {page.url: outcome for page, outcome in zip(pages, outcomes)}
+            except Exception as e:
+                print(f"⚠️ 进程池不可用，改为在当前进程中提取: {e}")
+        
+        outcomes = {}
+        for page in pages:
+            try:
+                outcomes[page.url] = self.extract_article(page.text, page.url)
+            except Exception as e:
+                outcomes[page.url] = e
+        return outcomes
+    
+    def format_article(self, title, content, url):
+        """
+        同时生成保存用的 Markdown 和发布用的富文本，返回 (markdown_text, rich_text)
+        段落整理只做一次，富文本由整理后的 Markdown 解析一次、遍历一次得到
+        """
+        markdown_text = self._format_markdown(title, content, url)
+        return markdown_text, self.formatter.markdown_to_text(markdown_text)
+    
     def _enhance_content_format(self, title, content, url, use_rich_text=True):
         """增强内容格式化 - V3版本"""
         if not content:
             return ""
         
+        content = self._format_markdown(title, content, url)
+        
+        if use_rich_text:
+            print("🎨 正在使用wechatSync简洁风格格式化器处理内容...")
+            content = self.formatter.markdown_to_text(content)
+            print(f"✅ 内容格式化完成，最终长度: {len(content)} 字符")
+            print("📝 格式化特性: 简洁标题、清晰代码块、适当段落间距")
+        
+        return content
+    
+    def _format_markdown(self, title, content, url):
+        """整理标题、段落、引用和列表，加上来源信息，返回 Markdown"""
+        if not content:
+            return ""
+        
         # 添加文章来源信息
         source_info = f"""
 > **原文链接**: {url}
@@ -1189,7 +1296,7 @@ class EnhancedArticleForwarder:
                 continue
             
             # 处理列表
-            if re.match(r'^[-*+]\s|^\d+\.\s', para):
+            if LIST_PARAGRAPH_RE.match(para):
                 lines = para.split('\n')
                 # 保持列表项的原始缩进
                 formatted_paragraphs.append('\n'.join(lines))
@@ -1197,12 +1304,12 @@ class EnhancedArticleForwarder:
             
             # 处理普通段落
             # 将段落内的多个空格合并为一个
-            para = re.sub(r'\s+', ' ', para)
+            para = WHITESPACE_RUN_RE.sub(' ', para)
             # 确保中文和英文之间有空格
-            para = re.sub(r'([a-zA-Z])([\u4e00-\u9fff])', r'\1 \2', para)
-            para = re.sub(r'([\u4e00-\u9fff])([a-zA-Z])', r'\1 \2', para)
+            para = LATIN_CJK_RE.sub(r'\1 \2', para)
+            para = CJK_LATIN_RE.sub(r'\1 \2', para)
             # 修复中文标点后面的空格
-            para = re.sub(r'([，。！？；：、])\s+', r'\1', para)
+            para = CJK_PUNCT_SPACE_RE.sub(r'\1', para)
             
             formatted_paragraphs.append(para)
         
@@ -1213,17 +1320,9 @@ class EnhancedArticleForwarder:
         content = source_info + content
         
         # 5. 最终的格式清理
-        content = re.sub(r'\n{3,}', '\n\n', content)  # 删除多余的空行
-        content = re.sub(r'[ \t]+\n', '\n', content)  # 删除行尾空格
-        content = content.strip()
-        
-        if use_rich_text:
-            print("🎨 正在使用wechatSync简洁风格格式化器处理内容...")
-            content = self.formatter.markdown_to_text(content)
-            print(f"✅ 内容格式化完成，最终长度: {len(content)} 字符")
-            print("📝 格式化特性: 简洁标题、清晰代码块、适当段落间距")
-        
-        return content
+        content = MULTI_NEWLINE_RE.sub('\n\n', content)  # 删除多余的空行
+        content = TRAILING_SPACES_RE.sub('\n', content)  # 删除行尾空格
+        return content.strip()
     
     def _optimize_content_spacing(self, content):
         """优化内容间距 - V2版本"""
@@ -1454,7 +1553,8 @@ class EnhancedArticleForwarder:
         
         try:
             # 先转换为HTML
-            html_content = self.markdown_converter.convert(markdown_content)
+            self.formatter.markdown_converter.reset()
+            html_content = self.formatter.markdown_converter.convert(markdown_content)
             
             # 使用改进的HTML到文本转换
             rich_text = self._html_to_formatted_text_v2(html_content)
@@ -1520,7 +1620,7 @@ class EnhancedArticleForwarder:
                     language = ""
                     if code_elem and code_elem.get('class'):
                         classes = ' '.join(code_elem.get('class', []))
-                        lang_match = re.search(r'language-(\w+)', classes)
+                        lang_match = CODE_LANGUAGE_RE.search(classes)
                         if lang_match:
                             language = lang_match.group(1)
                     
@@ -1582,9 +1682,9 @@ class EnhancedArticleForwarder:
         # 后处理：清理格式
         if result:
             # 清理多余的空行
-            result = re.sub(r'\n{3,}', '\n\n', result)
+            result = MULTI_NEWLINE_RE.sub('\n\n', result)
             # 清理多余的空格
-            result = re.sub(r'[ \t]+', ' ', result)
+            result = SPACES_RE.sub(' ', result)
             # 确保段落间有空行
             result = re.sub(r'([^\n])\n([^\n])', r'\1\n\n\2', result)
             result = result.strip()
@@ -1596,38 +1696,11 @@ class EnhancedArticleForwarder:
         if not markdown_content:
             return ""
         
-        text = markdown_content
-        
-        # 处理标题（保持层级但美化格式）
-        text = re.sub(r'^#{1}\s+(.+)$', r'\n\n════════════════════════════════════════\n\1\n════════════════════════════════════════\n\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{2}\s+(.+)$', r'\n\n▶ \1\n────────────────────────────────\n\n', text, flags=re.MULTILINE)
-        text = re.sub(r'^#{3,6}\s+(.+)$', r'\n\n● \1\n\n', text, flags=re.MULTILINE)
-        
-        # 处理代码块
-        text = re.sub(r'```(\w*)\n(.*?)\n```', r'\n\n💻 **代码示例：**\n┌─────────────────────────────────┐\n\2\n└─────────────────────────────────┘\n\n', text, flags=re.DOTALL)
-        
-        # 处理内联代码
-        text = re.sub(r'`([^`]+)`', r' `\1` ', text)
-        
-        # 处理粗体和斜体
-        text = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', text)
-        text = re.sub(r'\*([^*]+)\*', r'*\1*', text)
-        
-        # 处理引用
-        text = re.sub(r'^>\s*(.+)$', r'┃ \1', text, flags=re.MULTILINE)
-        
-        # 处理列表
-        text = re.sub(r'^[-*+]\s+(.+)$', r'• \1', text, flags=re.MULTILINE)
-        text = re.sub(r'^\d+\.\s+(.+)$', r'• \1', text, flags=re.MULTILINE)
-        
-        # 处理链接
-        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'[\1](\2)', text)
-        
-        # 处理分隔线
-        text = re.sub(r'^---+$', '─' * 50, text, flags=re.MULTILINE)
+        # 标题（保持层级但美化格式）、代码块、内联代码、引用、列表、分隔线；粗体斜体和链接保持原样
+        text = _apply_rules(markdown_content, PLAIN_TEXT_V2_RULES)
         
         # 最终清理
-        return self._postprocess_text_v2(text)
+        return self.formatter._postprocess_text(text)
     
     def save_article_file(self, title, content, tags, url):
         """保存文章到文件"""
@@ -1673,9 +1746,10 @@ class EnhancedArticleForwarder:
                 cover_path=None  # 自动生成封面
             )
             
-            # 发布文章
-            async with async_playwright() as playwright:
-                await article.upload(playwright)
+            # 发布文章（main 负责阶段计时和失败截图）
+            if not await article.main():
+                print(f"❌ 文章发布失败: {title}")
+                return False
             
             print(f"✅ 文章发布成功: {title}")
             return True
@@ -1687,21 +1761,38 @@ class EnhancedArticleForwarder:
 class AIContentEnhancer:
     """AI内容增强器 - 使用OpenAI优化文章排版和内容"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """初始化AI内容增强器"""
+    # 提示词模板版本，修改提示词时提升版本号，缓存的旧结果随之失效
+    ENHANCE_PROMPT_VERSION = 'enhance-v1'
+    TAGS_PROMPT_VERSION = 'seo-tags-v1'
+    
+    def __init__(self, api_key: Optional[str] = None, backend=None, cache=None, concurrency=None, timeout=None):
+        """
+        初始化AI内容增强器
+        
+        :param backend: 生成后端（OpenAIBackend / StubBackend），默认按 SAU_AI_BACKEND 选择
+        :param cache: CompletionCache，默认按 SAU_AI_CACHE 配置
+        :param concurrency: 同时进行的生成请求数，默认 SAU_AI_CONCURRENCY，批量转发时所有文章共用
+        :param timeout: 单个生成请求的等待上限（秒），默认 SAU_AI_TIMEOUT，超时后使用原文
+        """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if self.api_key:
-            openai.api_key = self.api_key
+        self.backend = backend if backend is not None else default_backend(self.api_key)
+        self.cache = cache if cache is not None else default_completion_cache()
         self.model = "gpt-3.5-turbo-16k"
+        self.tags_model = "gpt-3.5-turbo"
+        self.service = AsyncCompletionService(
+            self.backend, self.cache,
+            concurrency=concurrency or AI_CONCURRENCY,
+            timeout=timeout or AI_TIMEOUT
+        )
     
-    def enhance_content(self, title: str, content: str, tags: List[str]) -> Dict[str, str]:
+    async def enhance_content(self, title: str, content: str, tags: List[str]) -> Dict[str, str]:
         """使用AI增强内容质量"""
-        if not self.api_key:
+        if self.backend is None:
             print("⚠️ 未配置OpenAI API Key，跳过AI增强")
             return {"title": title, "content": content}
             
         try:
-            print("🤖 正在使用AI优化内容...")
+            print(f"🤖 正在使用AI优化内容: {title}")
             
             # 构建提示词
             prompt = f"""作为一个专业的技术文章编辑，请帮我优化以下文章的排版和内容，要求：
@@ -1723,19 +1814,17 @@ class AIContentEnhancer:
             {content}
             """
             
-            # 调用OpenAI API
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
+            # 调用OpenAI API（相同文章和提示词直接使用缓存结果，相同的请求正在进行时等待同一个结果）
+            enhanced_content = (await self.service.complete(
+                self.ENHANCE_PROMPT_VERSION,
+                self.model,
+                [
                     {"role": "system", "content": "你是一个专业的技术文章编辑，精通技术写作和排版优化。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
                 max_tokens=4000
-            )
-            
-            # 解析响应
-            enhanced_content = response.choices[0].message.content.strip()
+            )).strip()
             
             # 提取优化后的标题（如果AI生成了新标题）
             if enhanced_content.startswith('# '):
@@ -1744,23 +1833,26 @@ class AIContentEnhancer:
             else:
                 new_title = title
             
-            print("✨ AI内容优化完成")
+            print(f"✨ AI内容优化完成: {new_title}")
             return {
                 "title": new_title,
                 "content": enhanced_content
             }
             
+        except asyncio.TimeoutError:
+            print(f"⏱️ AI内容优化超时（{self.service.timeout:.0f}秒），使用原文: {title}")
+            return {"title": title, "content": content}
         except Exception as e:
             print(f"⚠️ AI增强过程出现错误: {str(e)}")
             return {"title": title, "content": content}
     
-    def generate_seo_tags(self, title: str, content: str) -> List[str]:
+    async def generate_seo_tags(self, title: str, content: str) -> List[str]:
         """使用AI生成SEO优化的标签"""
-        if not self.api_key:
+        if self.backend is None:
             return []
             
         try:
-            print("🏷️ 正在使用AI生成优化标签...")
+            print(f"🏷️ 正在使用AI生成优化标签: {title}")
             
             # 构建提示词
             prompt = f"""作为SEO专家，请为以下技术文章生成3-5个最相关的标签，要求：
@@ -1776,10 +1868,11 @@ class AIContentEnhancer:
             {content[:1000]}  # 只使用前1000个字符
             """
             
-            # 调用OpenAI API
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            # 调用OpenAI API（相同文章和提示词直接使用缓存结果，相同的请求正在进行时等待同一个结果）
+            response_text = await self.service.complete(
+                self.TAGS_PROMPT_VERSION,
+                self.tags_model,
+                [
                     {"role": "system", "content": "你是一个SEO专家，精通技术文章标签优化。"},
                     {"role": "user", "content": prompt}
                 ],
@@ -1788,15 +1881,46 @@ class AIContentEnhancer:
             )
             
             # 解析响应
-            tags = [tag.strip() for tag in response.choices[0].message.content.strip().split('\n')]
+            tags = [tag.strip() for tag in response_text.strip().split('\n') if tag.strip()]
             print(f"✨ AI标签生成完成: {tags}")
             return tags
             
+        except asyncio.TimeoutError:
+            print(f"⏱️ AI标签生成超时（{self.service.timeout:.0f}秒），不添加标签: {title}")
+            return []
         except Exception as e:
             print(f"⚠️ AI标签生成出现错误: {str(e)}")
             return []
+    
+    async def enhance_article(self, title: str, content: str, tags: List[str]) -> Dict:
+        """
+        同时优化内容和生成标签，返回 {"title", "content", "tags"}
+        两个请求并发进行，标签按原文生成；任一请求超时或失败时该部分保持原样
+        """
+        enhanced, ai_tags = await asyncio.gather(
+            self.enhance_content(title, content, tags),
+            self.generate_seo_tags(title, content)
+        )
+        merged_tags = list(tags)
+        merged_tags.extend(tag for tag in ai_tags if tag not in merged_tags)
+        return {
+            "title": enhanced["title"],
+            "content": enhanced["content"],
+            "tags": merged_tags
+        }
+
+# 进程池中的提取器（每个工作进程创建一次）
+_worker_forwarder = None
+
+
+def _extract_in_worker(html, url):
+    global _worker_forwarder
+    if _worker_forwarder is None:
+        _worker_forwarder = EnhancedArticleForwarder()
+    return _worker_forwarder.extract_article(html, url)
 
-async def forward_article_from_url(url, account_file="cookies/toutiao_uploader/account.json", save_file=True):
+
+async def forward_article_from_url(url, account_file="cookies/toutiao_uploader/account.json", save_file=True, refresh=False):
     """从URL转发文章到今日头条"""
     try:
         # 检查登录状态
@@ -1809,6 +1933,8 @@ async def forward_article_from_url(url, account_file="cookies/toutiao_uploader/a
         
         # 创建转发器
         forwarder = EnhancedArticleForwarder()
+        if refresh and forwarder.http_cache:
+            forwarder.http_cache.fresh_seconds = 0  # 缓存需向服务器重新验证
         
         # 获取文章内容
         print(f"🌐 正在获取文章: {url}")
@@ -1823,9 +1949,9 @@ async def forward_article_from_url(url, account_file="cookies/toutiao_uploader/a
         print(f"📊 内容长度: {len(content)} 字符")
         print(f"🏷️ 标签: {tags}")
         
-        # 保存文章（可选）
+        # 保存文章（可选，排版和写文件放到线程中执行，不阻塞事件循环）
         if save_file:
-            file_path = forwarder.save_article_file(title, content, tags, url)
+            file_path = await asyncio.to_thread(forwarder.save_article_file, title, content, tags, url)
             if file_path:
                 print(f"💾 文章已保存: {file_path}")
         
@@ -1839,6 +1965,40 @@ async def forward_article_from_url(url, account_file="cookies/toutiao_uploader/a
         print(f"❌ 获取文章失败: {str(e)}")
         return None
 
+async def forward_articles_from_urls(urls, account_file="cookies/toutiao_uploader/account.json", save_file=True, workers=None,
+                                     refresh=False):
+    """批量获取多篇文章：并发下载、并行提取，返回获取成功的文章列表"""
+    try:
+        # 检查登录状态
+        print("🔐 检查登录状态...")
+        if not await toutiao_setup(account_file):
+            print("❌ 登录状态失效，请重新登录")
+            print("提示: 运行 python examples/login_toutiao.py 重新登录")
+            return []
+        print("✅ 登录状态正常")
+        
+        forwarder = EnhancedArticleForwarder()
+        if refresh and forwarder.http_cache:
+            forwarder.http_cache.fresh_seconds = 0  # 缓存需向服务器重新验证
+        results = await forwarder.fetch_articles(urls, workers=workers)
+        
+        articles = []
+        for result in results:
+            if result['error'] or not result['title'] or not result['content']:
+                print(f"❌ {result['url']}: {result['error'] or '未提取到正文'}")
+                continue
+            print(f"✅ {result['title']}（{len(result['content'])} 字符）")
+            if save_file:
+                forwarder.save_article_file(result['title'], result['content'], result['tags'], result['url'])
+            articles.append(result)
+        
+        print(f"📊 获取成功 {len(articles)}/{len(urls)} 篇")
+        return articles
+        
+    except Exception as e:
+        print(f"❌ 批量获取文章失败: {str(e)}")
+        return []
+
 async def publish_article_to_toutiao(title, content, tags, url, account_file="cookies/toutiao_uploader/account.json"):
     """发布文章到今日头条"""
     print(f"\n⚠️ 即将转发文章到今日头条:")
@@ -1876,10 +2036,82 @@ async def publish_article_to_toutiao(title, content, tags, url, account_file="co
     
     return success
 
+def load_urls(args):
+    """合并命令行和 --url-file 中的链接，去重并保持顺序"""
+    urls = list(args.urls)
+    if args.url_file:
+        with open(args.url_file, 'r', encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.strip().startswith('#'))
+    return list(dict.fromkeys(urls))
+
+async def enhance_articles(articles):
+    """
+    对一批文章执行 AI 增强，返回增强后的文章列表（顺序不变）
+    所有文章的请求并发进行，同时进行的请求数由 SAU_AI_CONCURRENCY 限制；单篇失败或超时时保留原文
+    """
+    try:
+        try:
+            from conf import OPENAI_API_KEY
+        except ImportError:
+            # 未配置时也可以用 SAU_AI_BACKEND=stub 或环境变量 OPENAI_API_KEY
+            OPENAI_API_KEY = None
+        ai_enhancer = AIContentEnhancer(api_key=OPENAI_API_KEY)
+    except ImportError:
+        print("⚠️ 未安装openai，跳过AI增强")
+        return articles
+    
+    results = await asyncio.gather(*(
+        ai_enhancer.enhance_article(
+            title=article.get('title', ''),
+            content=article.get('content', ''),
+            tags=article.get('tags', [])
+        )
+        for article in articles
+    ), return_exceptions=True)
+    
+    enhanced_articles = []
+    for article, result in zip(articles, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ AI增强过程出现错误: {str(result)}")
+            enhanced_articles.append(article)
+        else:
+            enhanced_articles.append(dict(article, **result))
+    return enhanced_articles
+
+async def process_article(article, args):
+    """预览或发布单篇文章（AI 增强在 enhance_articles 中批量完成）"""
+    article_title = article.get('title', '')
+    article_content = article.get('content', '')
+    article_tags = article.get('tags', [])
+
+    if args.preview:
+        print("\n📝 预览文章内容:")
+        print("=" * 60)
+        print(f"标题: {article_title}")
+        print(f"标签: {article_tags}")
+        print("-" * 60)
+        print(article_content)
+        print("=" * 60)
+        return
+
+    # 发布文章
+    await publish_article_to_toutiao(
+        title=article_title,
+        content=article_content,
+        tags=article_tags,
+        url=article['url']
+    )
+
 async def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='从URL转发文章到今日头条')
-    parser.add_argument('url', help='要转发的文章URL')
+    parser.add_argument('urls', nargs='*', metavar='url', help='要转发的文章URL（可以传多个）')
+    parser.add_argument('--url-file',
+                      help='批量模式：从文件读取文章URL，每行一个，# 开头为注释')
+    parser.add_argument('--workers', type=int, default=None,
+                      help='批量模式下提取正文的进程数，默认为CPU核数，0 表示不使用进程池')
+    parser.add_argument('--refresh', action='store_true',
+                      help='不直接使用缓存的页面，向站点重新验证（页面未变化时仍使用缓存）')
     parser.add_argument('--no-save', action='store_false', dest='save_file',
                       help='不保存文章到本地')
     parser.add_argument('--preview', action='store_true',
@@ -1887,9 +2119,15 @@ async def main():
     parser.add_argument('--no-ai', action='store_false', dest='use_ai',
                       help='不使用AI增强功能')
     args = parser.parse_args()
+    urls = load_urls(args)
+    if not urls:
+        parser.error('请提供文章URL或 --url-file')
 
     # 显示参数信息
-    print(f"🔗 目标链接: {args.url}")
+    if len(urls) == 1:
+        print(f"🔗 目标链接: {urls[0]}")
+    else:
+        print(f"🔗 目标链接: {len(urls)} 个（批量模式）")
     print(f"🔑 账号文件: cookies/toutiao_uploader/account.json")
     print(f"💾 保存文件: {'是' if args.save_file else '否'}")
     print(f"👀 预览模式: {'是' if args.preview else '否'}")
@@ -1900,61 +2138,34 @@ async def main():
 
     try:
         # 获取文章内容
-        article = await forward_article_from_url(
-            args.url,
-            save_file=args.save_file
-        )
-        
-        if not article:
-            print("❌ 文章获取失败")
-            return
+        if len(urls) == 1:
+            article = await forward_article_from_url(
+                urls[0],
+                save_file=args.save_file,
+                refresh=args.refresh
+            )
+            
+            if not article:
+                print("❌ 文章获取失败")
+                return
+            articles = [dict(article, url=urls[0])]
+        else:
+            articles = await forward_articles_from_urls(
+                urls,
+                save_file=args.save_file,
+                workers=args.workers,
+                refresh=args.refresh
+            )
+            if not articles:
+                print("❌ 没有获取到任何文章")
+                return
 
-        article_title = article.get('title', '')
-        article_content = article.get('content', '')
-        article_tags = article.get('tags', [])
-        
-        # 使用AI增强内容
+        # 使用AI增强内容（整批并发，不再逐篇串行等待）
         if args.use_ai:
-            try:
-                from conf import OPENAI_API_KEY
-                ai_enhancer = AIContentEnhancer(api_key=OPENAI_API_KEY)
-                
-                # AI增强内容
-                enhanced = ai_enhancer.enhance_content(
-                    title=article_title,
-                    content=article_content,
-                    tags=article_tags
-                )
-                article_title = enhanced["title"]
-                article_content = enhanced["content"]
-                
-                # 生成优化的标签
-                ai_tags = ai_enhancer.generate_seo_tags(article_title, article_content)
-                if ai_tags:
-                    article_tags.extend(ai_tags)
-                    article_tags = list(set(article_tags))  # 去重
-            except ImportError:
-                print("⚠️ 未找到OpenAI API配置，跳过AI增强")
-            except Exception as e:
-                print(f"⚠️ AI增强过程出现错误: {str(e)}")
-
-        if args.preview:
-            print("\n📝 预览文章内容:")
-            print("=" * 60)
-            print(f"标题: {article_title}")
-            print(f"标签: {article_tags}")
-            print("-" * 60)
-            print(article_content)
-            print("=" * 60)
-            return
+            articles = await enhance_articles(articles)
 
-        # 发布文章
-        await publish_article_to_toutiao(
-            title=article_title,
-            content=article_content,
-            tags=article_tags,
-            url=args.url
-        )
+        for article in articles:
+            await process_article(article, args)
 
     except Exception as e:
         print(f"❌ 发生错误: {str(e)}")
@@ -1,15 +1,16 @@
 import asyncio
 import configparser
 import os
+import sqlite3
+import time
 
 from playwright.async_api import async_playwright
-from xhs import XhsClient
 
 from conf import BASE_DIR
-from utils.base_social_media import set_init_script
+from utils.base_social_media import set_init_script, get_base_url
 from utils.log import tencent_logger, kuaishou_logger
+from utils.metrics import cookie_check_duration, TimedConnection
 from pathlib import Path
-from uploader.xhs_uploader.main import sign_local
 
 async def cookie_auth_douyin(account_file):
     async with async_playwright() as playwright:
@@ -19,9 +20,9 @@ async def cookie_auth_douyin(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://creator.douyin.com/creator-micro/content/upload")
+        await page.goto(f"{get_base_url('douyin')}/creator-micro/content/upload")
         try:
-            await page.wait_for_url("https://creator.douyin.com/creator-micro/content/upload", timeout=5000)
+            await page.wait_for_url(f"{get_base_url('douyin')}/creator-micro/content/upload", timeout=5000)
         except:
             print("[+] 等待5秒 cookie 失效")
             await context.close()
@@ -43,7 +44,7 @@ async def cookie_auth_tencent(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://channels.weixin.qq.com/platform/post/create")
+        await page.goto(f"{get_base_url('tencent')}/platform/post/create")
         try:
             await page.wait_for_selector('div.title-name:has-text("微信小店")', timeout=5000)  # 等待5秒
             tencent_logger.error("[+] 等待5秒 cookie 失效")
@@ -60,7 +61,7 @@ async def cookie_auth_ks(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://cp.kuaishou.com/article/publish/video")
+        await page.goto(f"{get_base_url('kuaishou')}/article/publish/video")
         try:
             await page.wait_for_selector("div.names div.container div.name:text('机构服务')", timeout=5000)  # 等待5秒
 
@@ -79,9 +80,9 @@ async def cookie_auth_xhs(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://creator.xiaohongshu.com/creator-micro/content/upload")
+        await page.goto(f"{get_base_url('xiaohongshu')}/creator-micro/content/upload")
         try:
-            await page.wait_for_url("https://creator.xiaohongshu.com/creator-micro/content/upload", timeout=5000)
+            await page.wait_for_url(f"{get_base_url('xiaohongshu')}/creator-micro/content/upload", timeout=5000)
         except:
             print("[+] 等待5秒 cookie 失效")
             await context.close()
@@ -96,7 +97,20 @@ async def cookie_auth_xhs(account_file):
             return True
 
 
+# user_info.type -> 平台标识（指标标签）
+COOKIE_PLATFORMS = {1: 'xiaohongshu', 2: 'tencent', 3: 'douyin', 4: 'kuaishou'}
+
+
 async def check_cookie(type,file_path):
+    start_time = time.perf_counter()
+    valid = await _check_cookie(type, file_path)
+    cookie_check_duration.observe(time.perf_counter() - start_time,
+                                  platform=COOKIE_PLATFORMS.get(type, 'unknown'),
+                                  result='valid' if valid else 'invalid')
+    return valid
+
+
+async def _check_cookie(type,file_path):
     match type:
         # 小红书
         case 1:
@@ -113,5 +127,17 @@ async def check_cookie(type,file_path):
         case _:
             return False
 
+def mark_account_invalid(account_file):
+    """上传时发现 cookie 失效，把账号标记为失效（user_info.status = 0），前端提示重新登录"""
+    with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE user_info
+        SET status = ?
+        WHERE filePath = ?
+        ''', (0, Path(account_file).name))
+        conn.commit()
+        return cursor.rowcount > 0
+
 # a = asyncio.run(check_cookie(1,"3a6cfdc0-3d51-11f0-8507-44e51723d63c.json"))
 # print(a)
\ No newline at end of file
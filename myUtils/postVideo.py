@@ -2,89 +2,116 @@ import asyncio
 from pathlib import Path
 
 from conf import BASE_DIR
-from uploader.douyin_uploader.main import DouYinVideo
-from uploader.ks_uploader.main import KSVideo
-from uploader.tencent_uploader.main import TencentVideo
-from uploader.xiaohongshu_uploader.main import XiaoHongShuVideo
+from uploader.base_uploader import UploadJob
+from uploader.registry import create_uploader, get_platform_by_type
+from utils import metrics
+from utils.browser_pool import BrowserPool
 from utils.constant import TencentZoneTypes
 from utils.files_times import generate_schedule_time_next_day
+from utils.media_probe import load_media_metadata
 
+# 同时进行的上传任务上限（每个任务占用一个浏览器上下文）
+MAX_CONCURRENT_UPLOADS = 3
 
-def post_video_tencent(title,files,tags,account_file,category=TencentZoneTypes.LIFESTYLE.value,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
+
+async def post_video_fanout(platform, jobs, account_files, max_concurrency=MAX_CONCURRENT_UPLOADS, use_browser_pool=True):
+    """
+    将 任务 × 账号 矩阵中的每一对并发发布
+
+    同一账号（cookie文件）同一时间只执行一个任务，全局并发数不超过 max_concurrency，
+    所有任务共用一个 Playwright 驱动和浏览器进程。任务携带已索引的元数据时按时长从长到短排队，
+    长视频先占并发名额，减少最后只剩一个长任务在跑的情况
+
+    Args:
+        platform: 注册表中的平台标识
+        jobs: UploadJob 列表（每个文件一个）
+        account_files: cookie文件路径列表
+        max_concurrency: 全局并发上限
+        use_browser_pool: 是否共用浏览器池，False 时每个任务独立启动 Playwright 和浏览器（用于压测对照）
+
+    Returns:
+        list[dict]: 每个 (文件, 账号) 的结果，顺序与矩阵遍历顺序一致
+    """
+    account_locks = {str(account_file): asyncio.Lock() for account_file in account_files}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_pair(job, account_file, browser_pool):
+        # 先拿账号锁再占全局名额，避免等待账号时白占并发名额
+        metrics.upload_queue_depth.inc(platform=platform)
+        dequeued = False
+        try:
+            async with account_locks[str(account_file)]:
+                async with semaphore:
+                    metrics.upload_queue_depth.dec(platform=platform)
+                    dequeued = True
+                    uploader = create_uploader(platform, account_file, browser_pool=browser_pool)
+                    return await uploader.run(UploadJob(**{**vars(job), "job_id": None}))
+        finally:
+            if not dequeued:
+                metrics.upload_queue_depth.dec(platform=platform)
+
+    pairs = [(job, account_file) for job in jobs for account_file in account_files]
+    # 协程按创建顺序抢锁和并发名额，按时长排序后创建，结果再按矩阵顺序返回
+    order = sorted(range(len(pairs)), key=lambda index: -_job_duration(pairs[index][0]))
+
+    async def run_all(browser_pool):
+        tasks = {index: asyncio.ensure_future(run_pair(*pairs[index], browser_pool)) for index in order}
+        await asyncio.gather(*tasks.values())
+        return [tasks[index].result() for index in range(len(pairs))]
+
+    if not use_browser_pool:
+        return await run_all(None)
+
+    async with BrowserPool() as browser_pool:
+        return await run_all(browser_pool)
+
+
+def _job_duration(job):
+    """任务视频时长（秒），未索引时为 0"""
+    metadata = getattr(job, 'metadata', None)
+    return (metadata or {}).get('duration') or 0
+
+
+def post_video(platform,title,files,tags,account_file,category=None,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
     # 生成文件的完整路径
     account_file = [Path(BASE_DIR / "cookiesFile" / file) for file in account_file]
     files = [Path(BASE_DIR / "videoFile" / file) for file in files]
     if enableTimer:
-        publish_datetimes = generate_schedule_time_next_day(len(files), videos_per_day, daily_times,start_days)
+        publish_datetimes = generate_schedule_time_next_day(len(files), videos_per_day, daily_times, start_days=start_days)
     else:
         publish_datetimes = [0 for i in range(len(files))]
-    for index, file in enumerate(files):
-        for cookie in account_file:
-            print(f"文件路径{str(file)}")
-            # 打印视频文件名、标题和 hashtag
-            print(f"视频文件名：{file}")
-            print(f"标题：{title}")
-            print(f"Hashtag：{tags}")
-            app = TencentVideo(title, str(file), tags, publish_datetimes[index], cookie, category)
-            asyncio.run(app.main(), debug=False)
+    print(f"标题：{title}")
+    print(f"Hashtag：{tags}")
+    # 每个文件只查一次入库时索引的元数据，供调度排序和转码判断使用
+    metadata = load_media_metadata(files)
+    jobs = [
+        UploadJob(file, title, tags, publish_datetimes[index], category=category, metadata=metadata[file])
+        for index, file in enumerate(files)
+    ]
+    return asyncio.run(post_video_fanout(platform, jobs, account_file), debug=False)
+
+
+def post_video_by_type(type,title,files,tags,account_file,category=None,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
+    # 1 小红书 2 视频号 3 抖音 4 快手
+    return post_video(get_platform_by_type(type), title, files, tags, account_file, category, enableTimer,
+                      videos_per_day, daily_times, start_days)
+
+
+def post_video_tencent(title,files,tags,account_file,category=TencentZoneTypes.LIFESTYLE.value,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
+    return post_video('tencent', title, files, tags, account_file, category, enableTimer, videos_per_day, daily_times, start_days)
 
 
 def post_video_DouYin(title,files,tags,account_file,category=TencentZoneTypes.LIFESTYLE.value,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
-    # 生成文件的完整路径
-    account_file = [Path(BASE_DIR / "cookiesFile" / file) for file in account_file]
-    files = [Path(BASE_DIR / "videoFile" / file) for file in files]
-    if enableTimer:
-        publish_datetimes = generate_schedule_time_next_day(len(files), videos_per_day, daily_times,start_days)
-    else:
-        publish_datetimes = [0 for i in range(len(files))]
-    for index, file in enumerate(files):
-        for cookie in account_file:
-            print(f"文件路径{str(file)}")
-            # 打印视频文件名、标题和 hashtag
-            print(f"视频文件名：{file}")
-            print(f"标题：{title}")
-            print(f"Hashtag：{tags}")
-            app = DouYinVideo(title, str(file), tags, publish_datetimes[index], cookie, category)
-            asyncio.run(app.main(), debug=False)
+    return post_video('douyin', title, files, tags, account_file, category, enableTimer, videos_per_day, daily_times, start_days)
 
 
 def post_video_ks(title,files,tags,account_file,category=TencentZoneTypes.LIFESTYLE.value,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
-    # 生成文件的完整路径
-    account_file = [Path(BASE_DIR / "cookiesFile" / file) for file in account_file]
-    files = [Path(BASE_DIR / "videoFile" / file) for file in files]
-    if enableTimer:
-        publish_datetimes = generate_schedule_time_next_day(len(files), videos_per_day, daily_times,start_days)
-    else:
-        publish_datetimes = [0 for i in range(len(files))]
-    for index, file in enumerate(files):
-        for cookie in account_file:
-            print(f"文件路径{str(file)}")
-            # 打印视频文件名、标题和 hashtag
-            print(f"视频文件名：{file}")
-            print(f"标题：{title}")
-            print(f"Hashtag：{tags}")
-            app = KSVideo(title, str(file), tags, publish_datetimes[index], cookie)
-            asyncio.run(app.main(), debug=False)
+    return post_video('kuaishou', title, files, tags, account_file, category, enableTimer, videos_per_day, daily_times, start_days)
 
 def post_video_xhs(title,files,tags,account_file,category=TencentZoneTypes.LIFESTYLE.value,enableTimer=False,videos_per_day = 1, daily_times=None,start_days = 0):
-    # 生成文件的完整路径
-    account_file = [Path(BASE_DIR / "cookiesFile" / file) for file in account_file]
-    files = [Path(BASE_DIR / "videoFile" / file) for file in files]
-    file_num = len(files)
-    if enableTimer:
-        publish_datetimes = generate_schedule_time_next_day(file_num, videos_per_day, daily_times,start_days)
-    else:
-        publish_datetimes = 0
-    for index, file in enumerate(files):
-        for cookie in account_file:
-            # 打印视频文件名、标题和 hashtag
-            print(f"视频文件名：{file}")
-            print(f"标题：{title}")
-            print(f"Hashtag：{tags}")
-            app = XiaoHongShuVideo(title, file, tags, publish_datetimes, cookie)
-            asyncio.run(app.main(), debug=False)
+    return post_video('xiaohongshu', title, files, tags, account_file, category, enableTimer, videos_per_day, daily_times, start_days)
 
 
 
 # post_video("333",["demo.mp4"],"d","d")
-# post_video_DouYin("333",["demo.mp4"],"d","d")
\ No newline at end of file
+# post_video_DouYin("333",["demo.mp4"],"d","d")
@@ -7,11 +7,12 @@ import uuid
 from pathlib import Path
 from queue import Queue
 from flask_cors import CORS
-from myUtils.auth import check_cookie
 from flask import Flask, request, jsonify, Response, render_template, send_from_directory
 from conf import BASE_DIR
-from myUtils.login import get_tencent_cookie, douyin_cookie_gen, get_ks_cookie, xiaohongshu_cookie_gen
-from myUtils.postVideo import post_video_tencent, post_video_DouYin, post_video_ks, post_video_xhs
+from utils.media_preview import media_ingest_pool, ensure_preview_columns, PREVIEW_READY
+from utils.media_probe import ensure_media_metadata_table
+from utils.metrics import TimedConnection, render_metrics
+from utils.tracing import find_traces
 
 active_queues = {}
 app = Flask(__name__)
@@ -40,6 +41,12 @@ def favicon(filename):
 def hello_world():  # put application's code here
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics():
+    # Prometheus 抓取接口
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     if 'file' not in request.files:
@@ -84,6 +91,39 @@ def get_file():
     return send_from_directory(file_path,filename)
 
 
+@app.route('/getPreview', methods=['GET'])
+def get_preview():
+    # 获取素材的预览文件：kind=poster 返回封面帧，kind=video 返回低码率预览视频
+    filename = request.args.get('filename')
+    kind = request.args.get('kind', 'video')
+
+    if not filename:
+        return {"error": "filename is required"}, 400
+
+    # 防止路径穿越攻击
+    if '..' in filename or filename.startswith('/'):
+        return {"error": "Invalid filename"}, 400
+
+    with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
+        conn.row_factory = sqlite3.Row
+        ensure_preview_columns(conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT poster_path, preview_path, preview_status FROM file_records WHERE file_path = ?", (filename,))
+        record = cursor.fetchone()
+
+    file_path = str(Path(BASE_DIR / "videoFile"))
+    if record and record['preview_status'] == PREVIEW_READY:
+        preview_file = record['poster_path'] if kind == 'poster' else record['preview_path']
+        if preview_file:
+            return send_from_directory(file_path, preview_file)
+    if kind == 'poster':
+        # 封面尚未生成
+        return {"error": "poster not ready"}, 404
+
+    # 预览尚未生成时退回原文件
+    return send_from_directory(file_path, filename)
+
+
 @app.route('/uploadSave', methods=['POST'])
 def upload_save():
     if 'file' not in request.files:
@@ -120,15 +160,19 @@ def upload_save():
         # 保存文件
         file.save(filepath)
 
-        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                                 INSERT INTO file_records (filename, filesize, file_path)
             VALUES (?, ?, ?)
                                 ''', (filename, round(float(os.path.getsize(filepath)) / (1024 * 1024),2), final_filename))
             conn.commit()
+            record_id = cursor.lastrowid
             print("✅ 上传文件已记录")
 
+        # 后台异步生成封面和预览视频
+        media_ingest_pool.submit(record_id, filepath)
+
         return jsonify({
             "code": 200,
             "msg": "File uploaded and saved successfully",
@@ -149,16 +193,22 @@ def upload_save():
 def get_all_files():
     try:
         # 使用 with 自动管理数据库连接
-        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
             conn.row_factory = sqlite3.Row  # 允许通过列名访问结果
             cursor = conn.cursor()
 
-            # 查询所有记录
-            cursor.execute("SELECT * FROM file_records")
+            ensure_media_metadata_table(conn)
+
+            # 查询所有记录，附带入库时索引的媒体元数据
+            cursor.execute('''
+                SELECT f.*, m.duration, m.width, m.height, m.video_codec, m.fps, m.has_audio
+                FROM file_records f
+                LEFT JOIN media_metadata m ON m.file_record_id = f.id
+            ''')
             rows = cursor.fetchall()
 
-            # 将结果转为字典列表
-            data = [dict(row) for row in rows]
+            # 将结果转为字典列表，附带是否有排队中的预览任务（前端据此区分"生成中"和"无封面"）
+            data = [dict(row, preview_queued=media_ingest_pool.is_queued(row['id'])) for row in rows]
 
         return jsonify({
             "code": 200,
@@ -173,9 +223,47 @@ def get_all_files():
         }), 500
 
 
+@app.route('/backfillPreviews', methods=['POST'])
+def backfill_previews():
+    """为没有封面的旧素材补提交预览生成任务"""
+    try:
+        submitted = media_ingest_pool.backfill()
+        return jsonify({
+            "code": 200,
+            "msg": "success",
+            "data": {"submitted": submitted}
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "msg": str("backfill previews failed!"),
+            "data": None
+        }), 500
+
+
+@app.route('/getTraces', methods=['GET'])
+def get_traces():
+    """查询失败或超时上传保存的 trace，可按 jobId / platform 过滤"""
+    try:
+        data = find_traces(request.args.get('jobId'), request.args.get('platform'),
+                           int(request.args.get('limit', 50)))
+        return jsonify({
+            "code": 200,
+            "msg": "success",
+            "data": data
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "code": 500,
+            "msg": str("get traces failed!"),
+            "data": None
+        }), 500
+
+
 @app.route("/getValidAccounts",methods=['GET'])
 async def getValidAccounts():
-    with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+    from myUtils.auth import check_cookie
+    with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
         cursor = conn.cursor()
         cursor.execute('''
         SELECT * FROM user_info''')
@@ -217,7 +305,7 @@ def delete_file():
 
     try:
         # 获取数据库连接
-        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -236,8 +324,14 @@ def delete_file():
 
             # 删除数据库记录
             cursor.execute("DELETE FROM file_records WHERE id = ?", (file_id,))
+            ensure_media_metadata_table(conn)
+            cursor.execute("DELETE FROM media_metadata WHERE file_record_id = ?", (file_id,))
             conn.commit()
 
+        # 清理生成的预览文件
+        if record.get('file_path'):
+            media_ingest_pool.generator.remove_previews(record['file_path'])
+
         return jsonify({
             "code": 200,
             "msg": "File deleted successfully",
@@ -260,7 +354,7 @@ def delete_account():
 
     try:
         # 获取数据库连接
-        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -322,6 +416,8 @@ def login():
 
 @app.route('/postVideo', methods=['POST'])
 def postVideo():
+    from myUtils.postVideo import post_video
+    from uploader.registry import get_platform_by_type
     # 获取JSON数据
     data = request.get_json()
 
@@ -342,25 +438,33 @@ def postVideo():
     # 打印获取到的数据（仅作为示例）
     print("File List:", file_list)
     print("Account List:", account_list)
-    match type:
-        case 1:
-            post_video_xhs(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                               start_days)
-        case 2:
-            post_video_tencent(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                               start_days)
-        case 3:
-            post_video_DouYin(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                      start_days)
-        case 4:
-            post_video_ks(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                      start_days)
+    # 平台类型（1 小红书 2 视频号 3 抖音 4 快手）无效、文件或账号不是列表时是请求参数错误
+    if not isinstance(file_list, list) or not isinstance(account_list, list):
+        return jsonify({"code": 400, "msg": "fileList 和 accountList 必须是数组", "data": None}), 400
+    try:
+        platform = get_platform_by_type(type)
+    except (TypeError, ValueError) as e:
+        return jsonify({"code": 400, "msg": str(e), "data": None}), 400
+    # 发布过程中的错误返回 500，返回每个 (文件, 账号) 的发布结果
+    try:
+        results = post_video(platform, title, file_list, tags, account_list, category, enableTimer, videos_per_day,
+                             daily_times, start_days)
+    except Exception as e:
+        return jsonify({"code": 500, "msg": str(e), "data": None}), 500
+    failed = [result for result in results if not result['success']]
+    if failed:
+        return jsonify(
+            {
+                "code": 500,
+                "msg": f"{len(failed)}/{len(results)} 个发布任务失败",
+                "data": results
+            }), 500
     # 返回响应给客户端
     return jsonify(
         {
             "code": 200,
             "msg": None,
-            "data": None
+            "data": results
         }), 200
 
 
@@ -375,7 +479,7 @@ def updateUserinfo():
     userName = data.get('userName')
     try:
         # 获取数据库连接
-        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db")) as conn:
+        with sqlite3.connect(Path(BASE_DIR / "db" / "database.db"), factory=TimedConnection) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -403,6 +507,7 @@ def updateUserinfo():
 
 @app.route('/postVideoBatch', methods=['POST'])
 def postVideoBatch():
+    from myUtils.postVideo import post_video_by_type
     data_list = request.get_json()
 
     if not isinstance(data_list, list):
@@ -425,18 +530,8 @@ def postVideoBatch():
         # 打印获取到的数据（仅作为示例）
         print("File List:", file_list)
         print("Account List:", account_list)
-        match type:
-            case 1:
-                return
-            case 2:
-                post_video_tencent(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                                   start_days)
-            case 3:
-                post_video_DouYin(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                          start_days)
-            case 4:
-                post_video_ks(title, file_list, tags, account_list, category, enableTimer, videos_per_day, daily_times,
-                          start_days)
+        post_video_by_type(type, title, file_list, tags, account_list, category, enableTimer, videos_per_day,
+                           daily_times, start_days)
     # 返回响应给客户端
     return jsonify(
         {
@@ -447,6 +542,8 @@ def postVideoBatch():
 
 # 包装函数：在线程中运行异步函数
 def run_async_function(type,id,status_queue):
+    # 登录模块依赖 Playwright，按需导入以加快后端启动
+    from myUtils.login import get_tencent_cookie, douyin_cookie_gen, get_ks_cookie, xiaohongshu_cookie_gen
     match type:
         case '1':
             loop = asyncio.new_event_loop()
@@ -480,4 +577,9 @@ def sse_stream(status_queue):
             time.sleep(0.1)
 
 if __name__ == '__main__':
+    # 启动时为旧素材补生成封面和预览
+    try:
+        media_ingest_pool.backfill()
+    except Exception as e:
+        print(f"⚠️ 旧素材预览补生成失败: {e}")
     app.run(host='0.0.0.0' ,port=5409)
@@ -23,8 +23,13 @@ export const materialApi = {
     return `${import.meta.env.VITE_API_BASE_URL || 'http://localhost:5409'}/download/${filePath}`
   },
   
-  // 获取素材预览URL
+  // 获取素材预览URL（优先返回低码率预览视频，未生成时后端退回原文件）
   getMaterialPreviewUrl: (filename) => {
-    return `${import.meta.env.VITE_API_BASE_URL || 'http://localhost:5409'}/getFile?filename=${filename}`
+    return `${import.meta.env.VITE_API_BASE_URL || 'http://localhost:5409'}/getPreview?filename=${filename}&kind=video`
+  },
+
+  // 获取素材封面URL
+  getMaterialPosterUrl: (filename) => {
+    return `${import.meta.env.VITE_API_BASE_URL || 'http://localhost:5409'}/getPreview?filename=${filename}&kind=poster`
   }
 }
\ No newline at end of file
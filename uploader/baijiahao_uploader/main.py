@@ -8,10 +8,14 @@ import time
 import asyncio
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
 from utils.log import baijiahao_logger
 from utils.network import async_retry
+from utils.resource_filter import block_resources
+from utils.timing import UploadTimer
 from utils.video_converter import VideoConverter
+from utils.waits import wait_until, wait_quietly
 
 
 async def baijiahao_cookie_gen(account_file):
@@ -29,7 +33,7 @@ async def baijiahao_cookie_gen(account_file):
         context = await set_init_script(context)
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://baijiahao.baidu.com/builder/theme/bjh/login")
+        await page.goto(f"{get_base_url('baijiahao')}/builder/theme/bjh/login")
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -44,8 +48,9 @@ async def cookie_auth(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://baijiahao.baidu.com/builder/rc/home")
-        await page.wait_for_timeout(timeout=5000)
+        await page.goto(f"{get_base_url('baijiahao')}/builder/rc/home")
+        # 登录入口由页面脚本渲染，等网络空闲（最长5秒）后再判断
+        await wait_quietly(page.wait_for_load_state('networkidle', timeout=5000))
 
         if await page.get_by_text('注册/登录百家号').count():
             baijiahao_logger.error("等待5秒 cookie 失效")
@@ -73,6 +78,9 @@ class BaiJiaHaoVideo(object):
         self.date_format = '%Y年%m月%d日 %H:%M'
         self.local_executable_path = LOCAL_CHROME_PATH
         self.proxy_setting = proxy_setting
+        self.base_url = get_base_url('baijiahao')  # 可指向本地 mock 服务
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.timer = UploadTimer('baijiahao', account_file, file_path)
 
     async def set_schedule_time(self, page, publish_date):
         """
@@ -90,9 +98,9 @@ class BaiJiaHaoVideo(object):
             except:
                 await page.locator('div.select-wrap').nth(0).click()
         # page.locator(f'div.rc-virtual-list-holder-inner >> text={publish_date_day}').click()
-        await page.wait_for_timeout(2000)
         await page.locator(f'div.rc-virtual-list  div.cheetah-select-item >> text={publish_date_day}').click()
-        await page.wait_for_timeout(2000)
+        # 等待日期下拉框收起
+        await wait_quietly(page.locator('div.rc-virtual-list:visible').first.wait_for(state='hidden', timeout=2000))
 
         # 改为随机点击一个 hour
         for _ in range(3):
@@ -102,14 +110,15 @@ class BaiJiaHaoVideo(object):
                 break
             except:
                 await page.locator('div.select-wrap').nth(1).click()
-        await page.wait_for_timeout(2000)
-        current_choice_hour = await page.locator('div.rc-virtual-list:visible div.cheetah-select-item-option').count()
-        await page.wait_for_timeout(2000)
+        hour_options = page.locator('div.rc-virtual-list:visible div.cheetah-select-item-option')
+        await hour_options.first.wait_for(state='visible', timeout=5000)
+        current_choice_hour = await hour_options.count()
         await page.locator('div.rc-virtual-list:visible div.cheetah-select-item-option').nth(
             random.randint(1, current_choice_hour-3)).click()
         # 2024.08.05 current_choice_hour的获取可能有问题，页面有7，这里获取了10，暂时硬编码至6
 
-        await page.wait_for_timeout(2000)
+        # 等待小时下拉框收起
+        await wait_quietly(page.locator('div.rc-virtual-list:visible').first.wait_for(state='hidden', timeout=2000))
         await page.locator("button >> text=定时发布").click()
 
 
@@ -120,6 +129,7 @@ class BaiJiaHaoVideo(object):
 
     async def upload(self, playwright: Playwright) -> None:
         # 检查视频格式兼容性并转换
+        self.timer.stage('convert')
         converter = VideoConverter()
         original_file_path = self.file_path
         
@@ -133,6 +143,7 @@ class BaiJiaHaoVideo(object):
         
         try:
             # 使用 Chromium 浏览器启动一个浏览器实例
+            self.timer.stage('launch')
             browser_options = {
                 'headless': False,
                 'args': [
@@ -151,7 +162,7 @@ class BaiJiaHaoVideo(object):
             if self.proxy_setting:
                 browser_options['proxy'] = self.proxy_setting
             
-            browser = await playwright.chromium.launch(**browser_options)
+            browser = await launch_chromium(playwright, self.browser_pool, **browser_options)
             
             # 创建一个浏览器上下文，使用指定的 cookie 文件
             context = await browser.new_context(
@@ -159,19 +170,23 @@ class BaiJiaHaoVideo(object):
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.4324.150 Safari/537.36'
             )
             # context = await set_init_script(context)
+            await block_resources(context, 'baijiahao')
             await context.grant_permissions(['geolocation'])
 
             # 创建一个新的页面
             page = await context.new_page()
             # 访问指定的 URL
-            await page.goto("https://baijiahao.baidu.com/builder/rc/edit?type=videoV2", timeout=60000)
+            self.timer.stage('goto')
+            await page.goto(f"{self.base_url}/builder/rc/edit?type=videoV2", timeout=60000)
             baijiahao_logger.info(f"正在上传-------{os.path.basename(self.file_path)}")
             # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
             baijiahao_logger.info('正在打开主页...')
-            await page.wait_for_url("https://baijiahao.baidu.com/builder/rc/edit?type=videoV2", timeout=60000)
+            await page.wait_for_url(f"{self.base_url}/builder/rc/edit?type=videoV2", timeout=60000)
 
             # 点击 "上传视频" 按钮
+            self.timer.stage('set_input_files')
             await page.locator("div[class^='video-main-container'] input").set_input_files(self.file_path)
+            self.timer.stage('wait_publish_page')
 
             # 等待页面跳转到指定的 URL
             while True:
@@ -179,82 +194,62 @@ class BaiJiaHaoVideo(object):
                 try:
                     await page.wait_for_selector("div#formMain:visible")
                     break
-                except:
-                    baijiahao_logger.info("正在等待进入视频发布页面...")
+                except Exception:
+                    baijiahao_logger.bind(poll=True).info("正在等待进入视频发布页面...")
                     await asyncio.sleep(0.1)
 
             # 填充标题和话题
             # 这里为了避免页面变化，故使用相对位置定位：作品标题父级右侧第一个元素的input子元素
-            await asyncio.sleep(1)
+            self.timer.stage('fill_title_tags')
             baijiahao_logger.info("正在填充标题和话题...")
             await self.add_title_tags(page)
 
+            self.timer.stage('wait_transcode')
             upload_status = await self.uploading_video(page)
             if not upload_status:
                 baijiahao_logger.error(f"发现上传出错了... 文件:{self.file_path}")
                 raise Exception("视频上传失败")
 
             # 判断视频封面图是否生成成功
+            self.timer.stage('wait_cover')
+            baijiahao_logger.info("正在确认封面完成, 准备去点击定时/发布...")
+            cover_image = page.locator("div.cheetah-spin-container img").first
             while True:
-                baijiahao_logger.info("正在确认封面完成, 准备去点击定时/发布...")
-                if await page.locator("div.cheetah-spin-container img").count():
+                try:
+                    # 封面图出现后立即继续
+                    await cover_image.wait_for(state='attached', timeout=3000)
                     baijiahao_logger.info("封面已完成，点击定时/发布...")
                     break
-                else:
-                    baijiahao_logger.info("等待封面生成...")
-                    await asyncio.sleep(3)
+                except Exception:
+                    baijiahao_logger.bind(poll=True).info("等待封面生成...")
 
+            self.timer.stage('publish')
             await self.publish_video(page, self.publish_date)
-            await page.wait_for_timeout(5000)  # 等待5秒
+
+            # 等待发布结果或安全验证弹窗出现（最长5秒），出现即继续
+            verify_dialog = page.locator('div.passMod_dialog-container >> text=百度安全验证:visible')
+
+            async def settled():
+                return await verify_dialog.count() or await self.check_published(page)
+            await wait_quietly(wait_until(settled, timeout=5, interval=0.5))
             
-            if await page.locator('div.passMod_dialog-container >> text=百度安全验证:visible').count():
+            if await verify_dialog.count():
                 baijiahao_logger.error("出现验证，退出")
                 raise Exception("出现验证，退出")
             
-            # 检查发布状态
-            success = False
-            max_retries = 6  # 最多等待30秒（6次 * 5秒）
-            
-            for i in range(max_retries):
-                baijiahao_logger.info(f"正在检查发布状态... 第{i+1}次")
-                
-                # 检查各种可能的成功提示
-                success_selectors = [
-                    "text=发布成功",
-                    "text=视频发布成功",
-                    "text=已发布",
-                    ".success-icon",
-                    ".publish-success"
-                ]
-                
-                for selector in success_selectors:
-                    try:
-                        if await page.locator(selector).count() > 0:
-                            success = True
-                            baijiahao_logger.success(f"检测到发布成功提示: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if success:
-                    break
-                    
-                # 检查是否已经跳转到列表页面
-                current_url = page.url
-                if "builder/rc/clue" in current_url:
-                    success = True
-                    baijiahao_logger.success("检测到已跳转到列表页面")
-                    break
-                
-                await page.wait_for_timeout(5000)  # 等待5秒后重试
-            
-            if not success:
+            # 检查发布状态，最多等待30秒
+            self.timer.stage('confirm_published')
+            baijiahao_logger.info("正在检查发布状态...")
+            signal = await wait_quietly(wait_until(lambda: self.check_published(page), timeout=30, interval=1))
+            if not signal:
                 raise Exception("未能确认发布状态，可能发布失败")
             
+            baijiahao_logger.success(f"检测到发布成功: {signal}")
             baijiahao_logger.success("视频发布成功")
+            self.timer.stage('save_cookie')
             await context.storage_state(path=self.account_file)  # 保存cookie
             baijiahao_logger.info('cookie更新完毕！')
-            await asyncio.sleep(3)  # 等待3秒
+            self.timer.end_stage()
             # 关闭浏览器上下文和浏览器实例
             await context.close()
             await browser.close()
@@ -269,7 +264,27 @@ class BaiJiaHaoVideo(object):
                 baijiahao_logger.info(f"已清理临时文件: {self.file_path}")
 
 
-    @async_retry(timeout=300)  # 例如，最多重试3次，超时时间为180秒
+    async def check_published(self, page):
+        """检查发布成功提示或是否已跳转到列表页面，返回检测到的标志，未发布返回 None"""
+        if "builder/rc/clue" in page.url:
+            return "已跳转到列表页面"
+        # 检查各种可能的成功提示
+        success_selectors = [
+            "text=发布成功",
+            "text=视频发布成功",
+            "text=已发布",
+            ".success-icon",
+            ".publish-success"
+        ]
+        for selector in success_selectors:
+            try:
+                if await page.locator(selector).count() > 0:
+                    return selector
+            except Exception:
+                continue
+        return None
+
+    @async_retry(timeout=300, platform='baijiahao')  # 按百家号重试策略退避，最长 300 秒
     async def uploading_video(self, page):
         while True:
             upload_failed = await page.locator('div .cover-overlay:has-text("上传失败")').count()
@@ -280,8 +295,10 @@ class BaiJiaHaoVideo(object):
 
             uploading = await page.locator('div .cover-overlay:has-text("上传中")').count()
             if uploading:
-                baijiahao_logger.info("正在上传视频中...")
-                await asyncio.sleep(2)  # 等待2秒再次检查
+                baijiahao_logger.bind(poll=True).info("正在上传视频中...")
+                # '上传中' 消失后立即再次检查，最长等待2秒
+                await wait_quietly(page.locator('div .cover-overlay:has-text("上传中")').first.wait_for(
+                    state='hidden', timeout=2000))
                 continue
 
             # 检查上传是否成功
@@ -296,7 +313,6 @@ class BaiJiaHaoVideo(object):
             try:
                 await schedule_element.click()
                 await page.wait_for_selector('div.select-wrap:visible', timeout=3000)
-                await page.wait_for_timeout(timeout=2000)
                 baijiahao_logger.info("开始点击发布定时...")
                 await self.set_schedule_time(page, publish_date)
                 break
@@ -304,7 +320,7 @@ class BaiJiaHaoVideo(object):
                 baijiahao_logger.error(f"定时发布失败: {e}")
                 raise  # 重新抛出异常，让重试装饰器捕获
 
-    @async_retry(timeout=300)  # 例如，最多重试3次，超时时间为180秒
+    @async_retry(timeout=300, platform='baijiahao')  # 按百家号重试策略退避，最长 300 秒
     async def publish_video(self, page: Page, publish_date):
         if publish_date != 0:
             # 定时发布
@@ -360,8 +376,9 @@ class BaiJiaHaoVideo(object):
         await title_container.fill(self.title[:30])
 
     async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+        with self.timer:
+            async with async_playwright() as playwright:
+                await self.upload(playwright)
 
 
 
@@ -388,7 +405,6 @@ class BaiJiaHaoVideo(object):
 
         # 点击"全网"标签
         await page.locator('div.rounded-lg.border:has-text("全网")').click()
-        await asyncio.sleep(1)  # 这里延迟是为了方便眼睛直观的观看
 
         # 点击 "上传视频" 按钮
         # await page.locator("div[class^='video-main-container'] input").set_input_files(self.file_path)
@@ -604,13 +620,14 @@ class BaiJiaHaoVideo(object):
 
         print(f"[循环完成] 准备关闭浏览器")
 
-        # 暂停 1000s
-        await asyncio.sleep(1000)  # 这里延迟是为了方便眼睛直观的观看
-
         # 退出前保存 storage 信息
         await context.storage_state(path=self.account_file)  # 保存cookie
         baijiahao_logger.info('cookie更新完毕！')
-        await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
+
+        # 留在页面上方便直观查看结果，用户关闭页面后再结束（不再固定等待 1000 秒）
+        print("👀 请在浏览器中查看结果，关闭页面后结束")
+        await page.wait_for_event('close', timeout=0)
+
         # 关闭浏览器上下文和浏览器实例
         await context.close()
         await browser.close()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.baijiahao_uploader.main import BaiJiaHaoVideo, baijiahao_setup
+
+
+class BaiJiaHaoUploader(BaseUploader):
+    platform = 'baijiahao'
+    name = '百家号'
+
+    async def validate(self, handle=False):
+        return await baijiahao_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        return BaiJiaHaoVideo(job.title, job.file_path, job.tags, job.publish_date, self.account_file)
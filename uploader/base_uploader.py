@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+上传器统一接口
+各平台插件继承 BaseUploader，对外提供一致的异步流程：
+validate（校验cookie） -> prepare_media（准备素材） -> upload（上传） -> persist_cookies（保存cookie），
+过程中通过 report_progress 上报阶段进度
+"""
+
+import os
+import time
+import uuid
+from pathlib import Path
+
+from utils import metrics
+from utils.log import log_context
+from utils.network import CookieExpiredError
+from utils.watchdog import StageTimeoutError, UploadWatchdog
+
+
+class UploadJob(object):
+    """一次上传任务（单个文件 + 单个账号）的统一描述"""
+
+    def __init__(self, file_path, title, tags=None, publish_date=0, desc=None, category=None,
+                 thumbnail_path=None, location=None, job_id=None, metadata=None):
+        self.file_path = file_path
+        self.title = title
+        self.tags = tags or []
+        self.publish_date = publish_date  # 0 表示立即发布
+        self.desc = desc
+        self.category = category
+        self.thumbnail_path = thumbnail_path
+        self.location = location
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.metadata = metadata  # 入库时索引的媒体元数据（media_metadata 行），未索引时为 None
+
+
+class BaseUploader(object):
+    """平台上传插件基类"""
+
+    platform = None        # 注册表中的平台标识
+    name = ''              # 平台中文名
+    upload_interval = 5    # 同一账号连续上传的间隔（秒）
+    relogin_on_upload = True  # 命令行上传前 cookie 失效时是否打开浏览器重新登录
+
+    def __init__(self, account_file, browser_pool=None, progress_callback=None):
+        self.account_file = account_file
+        self.browser_pool = browser_pool
+        self.progress_callback = progress_callback
+        self.timer = None  # 最近一次上传的阶段计时器
+
+    async def validate(self, handle=False):
+        """校验cookie是否有效，handle=True 时失效会打开浏览器重新登录，子类实现"""
+        raise NotImplementedError
+
+    def create_app(self, job):
+        """创建平台原有的上传器实例，子类实现"""
+        raise NotImplementedError
+
+    async def prepare_media(self, job):
+        """上传前准备素材，默认只检查文件是否存在"""
+        if not os.path.exists(job.file_path):
+            raise FileNotFoundError(f"视频文件不存在: {job.file_path}")
+        return job
+
+    async def upload(self, job):
+        """执行上传，返回是否成功"""
+        app = self.create_app(job)
+        app.browser_pool = self.browser_pool
+        app.media_metadata = job.metadata
+        self.timer = getattr(app, 'timer', None)
+        # 看门狗：阶段或任务超时时取消上传，并回收占用的浏览器上下文
+        async with UploadWatchdog(self.platform, timer=self.timer):
+            outcome = await app.main()
+        return outcome is not False
+
+    async def persist_cookies(self, context):
+        """保存浏览器上下文中的最新cookie（平台上传器在发布完成后也会自行保存）"""
+        await context.storage_state(path=str(self.account_file))
+
+    def mark_account_invalid(self):
+        """在账号表中把当前账号标记为失效，账号不在库中（命令行直接指定 cookie 文件）时忽略"""
+        from myUtils.auth import mark_account_invalid
+        try:
+            mark_account_invalid(self.account_file)
+        except Exception as e:
+            print(f"⚠️  标记账号失效失败: {e}")
+
+    def report_progress(self, job, stage, **info):
+        """上报任务阶段进度"""
+        if self.progress_callback:
+            self.progress_callback(job, stage, info)
+        else:
+            print(f"[{self.platform}] {Path(job.file_path).name} -> {stage} {info if info else ''}")
+
+    async def run(self, job, validate=False):
+        """
+        执行完整上传流程
+
+        Returns:
+            dict: 结构化结果 {job_id, platform, file, account, success, error, duration, stages}，
+                  超时被取消时附带 timed_out_stage，cookie 失效时附带 cookie_expired
+        """
+        start_time = time.time()
+        result = {
+            "job_id": job.job_id,
+            "platform": self.platform,
+            "file": Path(job.file_path).name,
+            "account": Path(self.account_file).name,
+            "success": False,
+            "error": None,
+            "duration": 0,
+        }
+        metrics.uploads_started.inc(platform=self.platform)
+        metrics.uploads_in_progress.inc(platform=self.platform)
+        try:
+            with log_context(platform=self.platform, account=Path(self.account_file).stem, job_id=job.job_id):
+                if validate:
+                    self.report_progress(job, "validate")
+                    if not await self.validate():
+                        raise CookieExpiredError(f"{self.name} cookie无效或不存在")
+                self.report_progress(job, "prepare")
+                job = await self.prepare_media(job)
+                self.report_progress(job, "upload")
+                result["success"] = await self.upload(job)
+                self.report_progress(job, "done" if result["success"] else "failed")
+        except CookieExpiredError as e:
+            # cookie 失效重试无意义，直接失败并标记账号失效
+            result["error"] = str(e)
+            result["cookie_expired"] = True
+            self.report_progress(job, "failed", error=str(e))
+            self.mark_account_invalid()
+        except StageTimeoutError as e:
+            result["error"] = str(e)
+            result["timed_out_stage"] = e.stage
+            self.report_progress(job, "timeout", error=str(e))
+        except Exception as e:
+            result["error"] = str(e)
+            self.report_progress(job, "failed", error=str(e))
+        finally:
+            metrics.uploads_in_progress.dec(platform=self.platform)
+        result["duration"] = round(time.time() - start_time, 2)
+        metrics.upload_duration.observe(time.time() - start_time, platform=self.platform)
+        if result["success"]:
+            metrics.uploads_succeeded.inc(platform=self.platform)
+            if os.path.exists(job.file_path):
+                metrics.upload_bytes.inc(os.path.getsize(job.file_path), platform=self.platform)
+        else:
+            metrics.uploads_failed.inc(platform=self.platform)
+        # 各阶段耗时（秒），详细记录见 logs/timings.jsonl
+        result["stages"] = {
+            span["stage"]: span["duration"] for span in (self.timer.spans if self.timer else [])
+            if span["stage"] != 'total'
+        }
+        return result
@@ -9,9 +9,24 @@ import time # Added for time.time()
 from playwright.async_api import Playwright, async_playwright, Page
 
 from conf import LOCAL_CHROME_PATH, BASE_DIR
-from utils.base_social_media import set_init_script
+from uploader.page_map import get_page_map
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
+from utils.capture import ScreenshotCapture
 from utils.log import bilibili_logger
+from utils.network import RetryState, UploadError
+from utils.resource_filter import block_resources
+from utils.selector_cache import SelectorResolver
+from utils.timing import UploadTimer
 from utils.video_converter import convert_video_if_needed, cleanup_converted_files
+from utils.waits import wait_for_value, wait_quietly, wait_until
+
+# 页面是否已滚动到底部
+SCROLLED_TO_BOTTOM_JS = "() => window.innerHeight + window.scrollY >= document.body.scrollHeight - 2"
+
+# 页面中是否出现提交成功的提示
+SUBMIT_SUCCESS_JS = """() => ['提交成功', '已提交', '上传成功', '投稿成功', '稿件提交成功']
+    .some(text => document.body.innerText.includes(text))"""
 
 
 async def cookie_auth(account_file):
@@ -40,7 +55,7 @@ async def cookie_auth(account_file):
             
             # 访问B站个人空间页面
             bilibili_logger.info("访问B站个人空间页面检查登录状态...")
-            await page.goto("https://space.bilibili.com/")
+            await page.goto(f"{get_base_url('bilibili_space')}/")
             
             # 等待页面加载
             await page.wait_for_load_state("networkidle")
@@ -70,7 +85,7 @@ async def cookie_auth(account_file):
             
             # 如果无法通过UI元素判断，尝试访问创作中心
             bilibili_logger.info("尝试访问创作中心验证登录状态...")
-            await page.goto("https://member.bilibili.com/platform/upload/video")
+            await page.goto(f"{get_base_url('bilibili')}/platform/upload/video")
             await page.wait_for_load_state("networkidle")
             
             # 检查URL是否被重定向到登录页面
@@ -138,39 +153,46 @@ class BilibiliVideo(object):
         self.local_executable_path = LOCAL_CHROME_PATH  # 本地Chrome路径
         self.copyright = 1  # 版权声明：1-原创，2-转载
         self.source = ""  # 转载来源，copyright=2时需要填写
+        self.base_url = get_base_url('bilibili')  # 可指向本地 mock 服务
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.media_metadata = None  # 入库时索引的媒体元数据，用于判断是否需要转码
+        self.timer = UploadTimer('bilibili', account_file, file_path)
+        self.upload_retry = RetryState('bilibili', 'reupload')  # 平台提示上传失败时重新上传，按退避限次
+        self.capture = ScreenshotCapture('bilibili', timer=self.timer)  # 调试截图，失败时才落盘
+        self.selectors = SelectorResolver('bilibili')  # 多候选选择器，优先使用上次成功的
+        self.upload_page = get_page_map('bilibili').page('upload')  # 页面结构见 uploader/page_maps/bilibili.json
 
     async def set_schedule_time(self, page, publish_date):
         """设置定时发布时间"""
         bilibili_logger.info("  [-] 正在设置定时发布时间...")
         
         # 点击定时发布按钮
-        await page.locator("span:has-text('定时发布')").click()
-        await asyncio.sleep(1)
+        await self.upload_page.locator(page, 'schedule_switch').click()
         
         # 格式化日期时间
         publish_date_str = publish_date.strftime("%Y-%m-%d %H:%M")
         bilibili_logger.info(f"  [-] 设置发布时间: {publish_date_str}")
         
-        # 点击日期选择器
-        date_selector = page.locator("input.el-input__inner[placeholder='选择日期时间']")
+        # 点击日期选择器（切换定时发布后才出现，click 会等到它可见）
+        date_selector = self.upload_page.locator(page, 'schedule_input')
         await date_selector.click()
         
         # 清除默认值并输入新日期
         await page.keyboard.press("Control+KeyA")
         await page.keyboard.type(publish_date_str)
         await page.keyboard.press("Enter")
-        await asyncio.sleep(1)
+        await wait_quietly(wait_for_value(date_selector, publish_date_str))
 
     async def handle_upload_error(self, page):
         """处理上传错误"""
         bilibili_logger.info('  [-] 视频上传出错，尝试重新上传...')
+        await self.upload_retry.wait(UploadError('视频上传失败'))
         # 点击重新上传按钮
-        retry_button = page.locator("button:has-text('重新上传')")
+        retry_button = self.upload_page.locator(page, 'reupload_button')
         if await retry_button.count() > 0:
             await retry_button.click()
-            await asyncio.sleep(1)
             # 重新选择文件上传
-            file_input = page.locator("input[type='file']")
+            file_input = self.upload_page.locator(page, 'reupload_input')
             await file_input.set_input_files(self.file_path)
         else:
             bilibili_logger.error('  [-] 未找到重新上传按钮，请手动处理')
@@ -189,20 +211,14 @@ class BilibiliVideo(object):
         # 方法1: 尝试直接定位span.submit-add元素
         try:
             bilibili_logger.info("[-] 方法1: 尝试直接定位span.submit-add元素")
-            span_selectors = [
-                "span.submit-add[data-reporter-id='28']",
-                "span.submit-add",
-                "span[data-reporter-id='28']"
-            ]
-            
-            for selector in span_selectors:
+            for selector in self.upload_page.selectors('submit_span'):
                 try:
                     submit_span = page.locator(selector)
                     if await submit_span.count() > 0:
                         # 使用force=True强制点击
                         await submit_span.click(force=True)
                         bilibili_logger.info(f"[-] 成功点击span元素: {selector}")
-                        await asyncio.sleep(5)
+                        await self.wait_submit_result(page, start_url)
                         success = await self.check_submit_success(page, start_url)
                         if success:
                             return True
@@ -263,7 +279,7 @@ class BilibiliVideo(object):
                 element_type = clicked.get('element', 'button')
                 button_text = clicked.get('text', '')
                 bilibili_logger.info(f"[-] JavaScript成功点击{element_type}元素: {button_text}")
-                await asyncio.sleep(5)  # 等待点击后的反应
+                await self.wait_submit_result(page, start_url)
                 success = await self.check_submit_success(page, start_url)
                 if success:
                     return True
@@ -275,20 +291,14 @@ class BilibiliVideo(object):
             try:
                 bilibili_logger.info("[-] 方法3: 使用Playwright强制点击")
                 # 尝试多个选择器
-                for selector in [
-                    "button:has-text('立即投稿')",
-                    "button:has-text('投稿')",
-                    "button:has-text('发布')",
-                    ".submit-btn",
-                    "button.primary-btn"
-                ]:
+                for selector in self.upload_page.selectors('submit_force'):
                     try:
                         button = page.locator(selector).first
                         if await button.count() > 0:
                             # 使用force=True强制点击
                             await button.click(force=True)
                             bilibili_logger.info(f"[-] 强制点击按钮: {selector}")
-                            await asyncio.sleep(5)
+                            await self.wait_submit_result(page, start_url)
                             success = await self.check_submit_success(page, start_url)
                             if success:
                                 return True
@@ -303,17 +313,17 @@ class BilibiliVideo(object):
                 bilibili_logger.info("[-] 方法4: 使用键盘Tab和Enter")
                 # 先点击页面底部，然后使用Tab键导航到提交按钮
                 await page.keyboard.press('End')  # 移动到页面底部
-                await asyncio.sleep(1)
+                await wait_quietly(wait_until(lambda: page.evaluate(SCROLLED_TO_BOTTOM_JS), timeout=2))
                 
                 # 按几次Tab键尝试聚焦到提交按钮
                 for _ in range(10):
                     await page.keyboard.press('Tab')
-                    await asyncio.sleep(0.5)
+                    await asyncio.sleep(0.5)  # sleep-ok: 模拟人工按键节奏，焦点切换没有可等待的页面变化
                 
                 # 按Enter键尝试点击
                 await page.keyboard.press('Enter')
                 bilibili_logger.info("[-] 使用键盘Enter尝试点击")
-                await asyncio.sleep(5)
+                await self.wait_submit_result(page, start_url)
                 success = await self.check_submit_success(page, start_url)
                 if success:
                     return True
@@ -323,18 +333,28 @@ class BilibiliVideo(object):
         # 最后一次检查是否提交成功
         return await self.check_submit_success(page, start_url)
 
+    async def wait_submit_result(self, page, start_url=None, timeout=5.0):
+        """提交后等待成功提示出现或页面跳转，最多 timeout 秒，条件满足立即返回（结果由 check_submit_success 判断）"""
+        async def settled():
+            url = page.url
+            if start_url and url != start_url:
+                return True
+            if "platform/upload/video/frame" in url or "platform/upload/video/manage" in url:
+                return True
+            return await page.evaluate(SUBMIT_SUCCESS_JS)
+        await wait_quietly(wait_until(settled, timeout))
+
     async def check_submit_success(self, page, start_url):
         """检查是否提交成功"""
         try:
             bilibili_logger.info("[-] 检查是否提交成功...")
              
             # 检查1: 检查是否有成功提示文本
-            success_texts = ["提交成功", "已提交", "上传成功", "投稿成功", "稿件提交成功"]
-            for text in success_texts:
+            for selector in self.upload_page.selectors('submit_success_text'):
                 try:
-                    success_elem = page.locator(f"text={text}")
+                    success_elem = page.locator(selector)
                     if await success_elem.count() > 0:
-                        bilibili_logger.success(f"[+] 检测到成功提示: '{text}'")
+                        bilibili_logger.success(f"[+] 检测到成功提示: '{selector}'")
                         return True
                 except:
                     pass
@@ -355,22 +375,14 @@ class BilibiliVideo(object):
                     return True
             
             # 检查3: 检查是否返回到视频管理页面
-            if "member.bilibili.com/platform/upload/video/manage" in current_url:
+            if f"{self.base_url}/platform/upload/video/manage" in current_url:
                 bilibili_logger.success("[+] 已返回到视频管理页面，提交成功!")
                 return True
             
             # 检查4: 检查是否有成功状态元素
             try:
                 # 尝试查找可能表示成功的元素
-                success_selectors = [
-                    ".success-info", 
-                    ".success-message", 
-                    ".success-icon",
-                    ".upload-success",
-                    ".result-success"
-                ]
-                
-                for selector in success_selectors:
+                for selector in self.upload_page.selectors('submit_success_flag'):
                     elem = page.locator(selector)
                     if await elem.count() > 0:
                         bilibili_logger.success(f"[+] 检测到成功元素: {selector}")
@@ -409,22 +421,12 @@ class BilibiliVideo(object):
             # 检查6: 检查是否有需要额外确认的对话框
             try:
                 # 检查是否有确认对话框
-                confirm_buttons = [
-                    "button:has-text('确认')",
-                    "button:has-text('确定')",
-                    "button:has-text('是')",
-                    "button:has-text('提交')",
-                    "button:has-text('投稿')",
-                    "span.submit-add",
-                    "span[data-reporter-id='28']"
-                ]
-                
-                for selector in confirm_buttons:
+                for selector in self.upload_page.selectors('submit_confirm'):
                     button = page.locator(selector)
                     if await button.count() > 0 and await button.is_visible():
                         bilibili_logger.info(f"[-] 检测到确认按钮: {selector}，尝试点击")
                         await button.click()
-                        await asyncio.sleep(3)
+                        await self.wait_submit_result(page, start_url, timeout=3)
                         # 再次检查是否成功
                         return await self.check_submit_success(page, start_url)
             except Exception as e:
@@ -441,23 +443,13 @@ class BilibiliVideo(object):
         bilibili_logger.info("[-] 确保视频真正提交成功...")
         
         # 检查是否有任何确认对话框或按钮需要点击
-        confirm_selectors = [
-            "button:has-text('确认')",
-            "button:has-text('确定')",
-            "button:has-text('是')",
-            "button:has-text('提交')",
-            "button:has-text('投稿')",
-            "span.submit-add",
-            "span[data-reporter-id='28']"
-        ]
-        
-        for selector in confirm_selectors:
+        for selector in self.upload_page.selectors('submit_confirm'):
             try:
                 button = page.locator(selector)
                 if await button.count() > 0 and await button.is_visible():
                     bilibili_logger.info(f"[-] 发现需要点击的按钮: {selector}")
                     await button.click(force=True)
-                    await asyncio.sleep(3)
+                    await self.wait_submit_result(page, timeout=3)
             except Exception as e:
                 bilibili_logger.info(f"[-] 点击按钮 {selector} 失败: {str(e)}")
         
@@ -505,16 +497,16 @@ class BilibiliVideo(object):
                         visibleButtons[0].click();
                     }
                 }""")
-                await asyncio.sleep(3)
+                await self.wait_submit_result(page, timeout=3)
         except Exception as e:
             bilibili_logger.error(f"[-] 检查并点击按钮失败: {str(e)}")
         
-        # 等待较长时间，确保提交完成
-        bilibili_logger.info("[-] 等待10秒，确保提交完成...")
-        await asyncio.sleep(10)
+        # 等待提交完成（出现成功提示或跳转后立即继续）
+        bilibili_logger.info("[-] 等待提交完成（最多10秒）...")
+        await self.wait_submit_result(page, timeout=10)
         
-        # 最后一次保存页面截图
-        await page.screenshot(path=f"bilibili_final_state_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+        # 最后一次保存页面截图（按截图策略采集，失败时落盘）
+        self.capture.capture('final_state', page)
         
         # 检查当前URL是否是frame页面
         current_url = page.url
@@ -534,37 +526,39 @@ class BilibiliVideo(object):
         bilibili_logger.info("  [-] 正在设置自定义封面...")
         try:
             # 点击自定义封面按钮
-            custom_cover_button = page.locator("span:has-text('自定义封面')")
+            custom_cover_button = page.locator(self.upload_page.selector('cover_button'))
             await custom_cover_button.click()
-            await asyncio.sleep(1)
             
-            # 上传封面文件
-            cover_input = page.locator("input[type='file'][accept='image/jpeg,image/png,image/gif,image/webp']")
-            await cover_input.set_input_files(self.thumbnail_path)
+            # 上传封面文件（弹窗中的 input 出现后再选择文件）
+            await self.upload_page.wait(page, 'cover_image_input')
+            await self.upload_page.locator(page, 'cover_image_input').set_input_files(self.thumbnail_path)
             
             # 等待上传完成
-            await page.wait_for_selector("text=上传成功", timeout=10000)
+            await self.upload_page.wait(page, 'cover_uploaded')
             bilibili_logger.info("  [-] 封面设置成功")
             
             # 点击确认按钮
-            confirm_button = page.locator("button:has-text('确定')")
+            confirm_button = page.locator(self.upload_page.selector('cover_confirm'))
             await confirm_button.click()
-            await asyncio.sleep(1)
+            await wait_quietly(confirm_button.first.wait_for(state='hidden', timeout=5000))
         except Exception as e:
             bilibili_logger.error(f"  [-] 设置封面失败: {str(e)}")
 
     async def upload(self, playwright: Playwright) -> bool:
         """上传视频到B站"""
         # 检查并转换视频格式（如果需要）
+        self.timer.stage('convert')
         bilibili_logger.info(f"🔍 检查视频格式兼容性...")
-        converted_file_path = convert_video_if_needed(self.file_path, platform="bilibili")
+        converted_file_path = convert_video_if_needed(self.file_path, platform="bilibili", metadata=self.media_metadata)
         if converted_file_path != self.file_path:
             bilibili_logger.info(f"✅ 使用转换后的视频文件: {os.path.basename(converted_file_path)}")
             # 临时更新文件路径
             self.file_path = converted_file_path
         
+        browser = context = None
         try:
             # 启动浏览器
+            self.timer.stage('launch')
             browser_options = {
                 'headless': False,
                 'slow_mo': 100  # 减慢操作速度，增加稳定性
@@ -573,7 +567,7 @@ class BilibiliVideo(object):
             if self.local_executable_path:
                 browser_options['executable_path'] = self.local_executable_path
                 
-            browser = await playwright.chromium.launch(**browser_options)
+            browser = await launch_chromium(playwright, self.browser_pool, **browser_options)
                 
             # 创建浏览器上下文
             context = await browser.new_context(
@@ -581,20 +575,22 @@ class BilibiliVideo(object):
                 storage_state=self.account_file
             )
             context = await set_init_script(context)
+            await block_resources(context, 'bilibili')
             
             # 创建新页面
-            page = await context.new_page()
+            page = self.capture.attach(await context.new_page())
             
             # 设置页面默认超时时间
             page.set_default_timeout(60000)  # 60秒
             
             # 访问B站创作中心
+            self.timer.stage('goto')
             bilibili_logger.info(f'[+] 正在上传视频: {os.path.basename(self.file_path)}')
             bilibili_logger.info(f'[-] 正在打开B站创作中心...')
             
             try:
                 # 访问B站创作中心
-                await page.goto("https://member.bilibili.com/platform/upload/video", timeout=60000)
+                await page.goto(self.upload_page.url, timeout=60000)
                 
                 # 等待页面加载完成
                 bilibili_logger.info(f'[-] 等待页面加载完成...')
@@ -604,7 +600,6 @@ class BilibiliVideo(object):
                 current_url = page.url
                 if "passport.bilibili.com/login" in current_url:
                     bilibili_logger.error("[-] 被重定向到登录页面，cookie可能已失效")
-                    await browser.close()
                     return False
                 
                 # 保存页面截图，用于调试
@@ -613,32 +608,8 @@ class BilibiliVideo(object):
                 # 等待页面元素加载完成
                 bilibili_logger.info("[-] 等待页面元素加载...")
                 
-                # 尝试多种可能的文件输入选择器
-                file_input_selectors = [
-                    "#video-up-app input[type='file'][accept*='.mp4']",
-                    "#b-uploader-input-container_BUploader_0 input[type='file']",
-                    "input[type='file'][accept*='.mp4']:first-child",
-                    "input[type='file'][multiple='multiple']"
-                ]
-                
-                file_input = None
-                for selector in file_input_selectors:
-                    try:
-                        bilibili_logger.info(f"[-] 尝试查找上传按钮: {selector}")
-                        temp_input = page.locator(selector)
-                        count = await temp_input.count()
-                        if count > 0:
-                            bilibili_logger.info(f"[-] 找到上传按钮: {selector}，匹配数量: {count}")
-                            if count == 1:
-                                file_input = temp_input
-                                break
-                            else:
-                                # 如果有多个匹配，选择第一个
-                                bilibili_logger.info(f"[-] 多个匹配，选择第一个元素")
-                                file_input = temp_input.first
-                                break
-                    except Exception as e:
-                        bilibili_logger.info(f"[-] 未找到选择器 {selector}: {str(e)}")
+                # 尝试多种可能的文件输入选择器，先试上次成功的，其余候选并发探测，多个匹配时取第一个元素
+                file_input = await self.upload_page.resolve(page, 'file_input', self.selectors)
                 
                 if not file_input:
                     # 尝试使用JavaScript获取上传按钮
@@ -686,32 +657,27 @@ class BilibiliVideo(object):
                 
                 if not file_input:
                     bilibili_logger.error("[-] 无法找到文件上传按钮")
-                    await page.screenshot(path=f"bilibili_error_no_upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                    await browser.close()
+                    await self.capture.failure('no_upload_button', page)
                     return False
                 
             except Exception as e:
                 bilibili_logger.error(f"[-] 页面加载失败: {str(e)}")
-                # 尝试截图保存错误状态
-                try:
-                    await page.screenshot(path=f"bilibili_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                    bilibili_logger.info("[-] 已保存错误截图")
-                except:
-                    pass
-                await browser.close()
+                # 保存错误现场截图
+                await self.capture.failure('page_load_error', page)
                 return False
             
             # 上传视频文件
+            self.timer.stage('set_input_files')
             bilibili_logger.info(f'[-] 正在上传视频文件...')
             try:
                 await file_input.set_input_files(self.file_path)
                 bilibili_logger.info(f'[-] 文件已选择，等待上传...')
             except Exception as e:
                 bilibili_logger.error(f"[-] 文件上传失败: {str(e)}")
-                await browser.close()
                 return False
             
             # 等待视频上传完成
+            self.timer.stage('wait_transcode')
             bilibili_logger.info(f'[-] 等待视频上传完成...')
             upload_success = False
             upload_timeout = 600  # 10分钟上传超时
@@ -720,58 +686,43 @@ class BilibiliVideo(object):
             while time.time() - start_time < upload_timeout:
                 try:
                     # 检查是否出现上传完成的提示
-                    success_text = page.locator("text=上传完成")
+                    success_text = self.upload_page.locator(page, 'upload_done')
                     if await success_text.count() > 0:
                         bilibili_logger.info("[-] 视频上传完成!")
                         upload_success = True
                         break
                     
                     # 检查是否出现上传失败的提示
-                    failed_text = page.locator("text=上传失败")
+                    failed_text = self.upload_page.locator(page, 'upload_failed')
                     if await failed_text.count() > 0:
                         await self.handle_upload_error(page)
                         await asyncio.sleep(2)
                         continue
                     
                     # 继续等待
-                    bilibili_logger.info("[-] 视频正在上传中...")
+                    bilibili_logger.bind(poll=True).info("[-] 视频正在上传中...")
                     await asyncio.sleep(5)
                     
+                except UploadError:
+                    # 重新上传次数用尽，不再等待
+                    raise
                 except Exception as e:
                     bilibili_logger.error(f"[-] 上传过程出错: {str(e)}")
                     await asyncio.sleep(2)
             
             if not upload_success:
                 bilibili_logger.error("[-] 视频上传超时")
-                await browser.close()
                 return False
             
-            # 等待一段时间，让页面完成处理
-            bilibili_logger.info("[-] 等待页面处理上传的视频...")
-            await asyncio.sleep(5)
-            
             # 填写视频信息
+            self.timer.stage('fill_title_tags')
             bilibili_logger.info(f'[-] 正在填写视频信息...')
             
             try:    
                 # 填写标题
                 bilibili_logger.info("[-] 填写视频标题...")
-                title_selectors = [
-                    "input[placeholder='请输入稿件标题']",
-                    ".title-input input",
-                    "#video-title-input"
-                ]
-                
-                title_input = None
-                for selector in title_selectors:
-                    try:
-                        temp_input = page.locator(selector)
-                        if await temp_input.count() > 0:
-                            title_input = temp_input
-                            bilibili_logger.info(f"[-] 找到标题输入框: {selector}")
-                            break
-                    except:
-                        pass
+                # 上传完成后页面还要处理一段时间，标题输入框出现即可填写
+                title_input = await self.upload_page.resolve(page, 'title_input', self.selectors, timeout=10000)
                 
                 if title_input:
                     await title_input.fill(self.title)
@@ -793,21 +744,16 @@ class BilibiliVideo(object):
                 # 尝试多种方式选择分区
                 try:
                     # 方法1: 点击分区选择器
-                    category_selectors = [
-                        "div.select-box-v2-container",
-                        ".category-v2-container",
-                        ".category-container"
-                    ]
-                    
                     category_clicked = False
-                    for selector in category_selectors:
+                    for selector in self.upload_page.selectors('category'):
                         try:
                             category = page.locator(selector).first
                             if await category.count() > 0:
                                 bilibili_logger.info(f"[-] 找到分区选择器: {selector}")
                                 await category.click()
                                 category_clicked = True
-                                await asyncio.sleep(2)
+                                # 等分区下拉列表展开
+                                await wait_quietly(self.upload_page.wait(page, 'category_open'))
                                 break
                         except:
                             pass
@@ -834,14 +780,8 @@ class BilibiliVideo(object):
                 
                 # 填写视频简介
                 bilibili_logger.info("[-] 填写视频简介...")
-                desc_selectors = [
-                    "textarea[placeholder='填写更全面的相关信息，让更多的人能找到你的视频吧～']",
-                    ".desc-v2-container textarea",
-                    "#video-desc-editor"
-                ]
-                
                 desc_input = None
-                for selector in desc_selectors:
+                for selector in self.upload_page.selectors('desc_input'):
                     try:
                         temp_input = page.locator(selector)
                         if await temp_input.count() > 0:
@@ -867,14 +807,8 @@ class BilibiliVideo(object):
                 # 添加标签
                 if self.tags and len(self.tags) > 0:
                     bilibili_logger.info(f'[-] 添加标签: {", ".join(self.tags)}')
-                    tag_selectors = [
-                        "input[placeholder='按回车键Enter创建标签']",
-                        ".tag-input-container input",
-                        "#video-tag-input"
-                    ]
-                    
                     tag_input = None
-                    for selector in tag_selectors:
+                    for selector in self.upload_page.selectors('tag_input'):
                         try:
                             temp_input = page.locator(selector)
                             if await temp_input.count() > 0:
@@ -888,23 +822,19 @@ class BilibiliVideo(object):
                         for tag in self.tags:
                             await tag_input.fill(tag)
                             await page.keyboard.press("Enter")
-                            await asyncio.sleep(0.5)
+                            # 标签创建后输入框被清空
+                            await wait_quietly(wait_for_value(tag_input.first, '', timeout=2))
                     else:
                         bilibili_logger.warning("[-] 未找到标签输入框")
                 
                 # 设置封面
+                self.timer.stage('set_thumbnail')
                 if self.thumbnail_path:
                     bilibili_logger.info("[-] 设置自定义封面...")
                     try:
                         # 尝试多种可能的封面上传按钮选择器
-                        cover_selectors = [
-                            "span:has-text('自定义封面')",
-                            ".cover-v2-container button",
-                            ".cover-upload-btn"
-                        ]
-                        
                         cover_button = None
-                        for selector in cover_selectors:
+                        for selector in self.upload_page.selectors('cover_button'):
                             try:
                                 temp_button = page.locator(selector)
                                 if await temp_button.count() > 0:
@@ -916,17 +846,12 @@ class BilibiliVideo(object):
                         
                         if cover_button:
                             await cover_button.click()
-                            await asyncio.sleep(1)
+                            # 等封面弹窗里的文件输入出现
+                            await wait_quietly(self.upload_page.wait(page, 'cover_input'))
                             
                             # 尝试多种可能的文件输入选择器
-                            cover_input_selectors = [
-                                "input[type='file'][accept*='image']",
-                                "input[type='file'][accept*='jpeg']",
-                                ".cover-upload-container input[type='file']"
-                            ]
-                            
                             cover_input = None
-                            for selector in cover_input_selectors:
+                            for selector in self.upload_page.selectors('cover_input'):
                                 try:
                                     temp_input = page.locator(selector)
                                     if await temp_input.count() > 0:
@@ -941,22 +866,17 @@ class BilibiliVideo(object):
                                 
                                 # 等待上传完成
                                 try:
-                                    await page.wait_for_selector("text=上传成功", timeout=10000)
+                                    await self.upload_page.wait(page, 'cover_uploaded')
                                     bilibili_logger.info("[-] 封面设置成功")
                                     
                                     # 点击确认按钮
-                                    confirm_selectors = [
-                                        "button:has-text('确定')",
-                                        ".cover-modal-footer button:last-child",
-                                        ".modal-footer button:last-child"
-                                    ]
-                                    
-                                    for selector in confirm_selectors:
+                                    for selector in self.upload_page.selectors('cover_confirm'):
                                         try:
                                             confirm_button = page.locator(selector)
                                             if await confirm_button.count() > 0:
                                                 await confirm_button.click()
-                                                await asyncio.sleep(1)
+                                                # 等封面弹窗关闭
+                                                await wait_quietly(confirm_button.first.wait_for(state='hidden', timeout=3000))
                                                 break
                                         except:
                                             pass
@@ -972,19 +892,19 @@ class BilibiliVideo(object):
                     bilibili_logger.info("[-] 未指定封面，使用系统自动生成的封面")
                 
                 # 设置版权信息
+                self.timer.stage('set_copyright')
                 bilibili_logger.info("[-] 设置版权信息...")
                 if self.copyright == 2 and self.source:
                     # 选择转载
-                    copyright_selectors = ["label:has-text('转载')", ".copyright-v2-container label:nth-child(2)"]
-                    for selector in copyright_selectors:
+                    for selector in self.upload_page.selectors('copyright_repost'):
                         try:
                             copyright_btn = page.locator(selector)
                             if await copyright_btn.count() > 0:
                                 await copyright_btn.click()
-                                await asyncio.sleep(1)
                                 
-                                # 填写转载来源
-                                source_input = page.locator("input[placeholder='填写转载来源']")
+                                # 填写转载来源（选择转载后出现）
+                                source_input = self.upload_page.locator(page, 'copyright_source')
+                                await wait_quietly(self.upload_page.wait(page, 'copyright_source'))
                                 if await source_input.count() > 0:
                                     await source_input.fill(self.source)
                                 break
@@ -992,22 +912,22 @@ class BilibiliVideo(object):
                             pass
                 else:
                     # 选择自制
-                    copyright_selectors = ["label:has-text('自制')", ".copyright-v2-container label:nth-child(1)"]
-                    for selector in copyright_selectors:
+                    for selector in self.upload_page.selectors('copyright_original'):
                         try:
                             copyright_btn = page.locator(selector)
                             if await copyright_btn.count() > 0:
                                 await copyright_btn.click()
-                                await asyncio.sleep(1)
                                 break
                         except:
                             pass
                 
                 # 设置定时发布
                 if self.publish_date:
+                    self.timer.stage('set_schedule')
                     await self.set_schedule_time(page, self.publish_date)
                 
                 # 提交视频
+                self.timer.stage('publish')
                 bilibili_logger.info(f'[-] 提交视频...')
                 
                 # 使用专门的方法处理提交按钮点击
@@ -1016,10 +936,6 @@ class BilibiliVideo(object):
                 
                 if submit_success:
                     bilibili_logger.success("[+] 使用专用方法成功点击提交按钮!")
-                    # 等待较长时间，确保提交完成
-                    bilibili_logger.info("[-] 等待5秒，确保提交进行中...")
-                    await asyncio.sleep(5)
-                    
                     # 确保视频真正提交成功
                     success = await self.ensure_video_submitted(page, browser, context)
                     if success:
@@ -1032,39 +948,11 @@ class BilibiliVideo(object):
                     
                     # 查找提交按钮
                     submit_button = None
-                    submit_selectors = []
+                    # 定时发布和立即发布的按钮不同
+                    submit_selectors = self.upload_page.selectors('submit_schedule' if self.publish_date else 'submit_now')
                     
-                    if self.publish_date:
-                        # 定时发布
-                        submit_selectors = [
-                            "button:has-text('立即定时')",
-                            ".submit-container button:last-child",
-                            ".submit-btn",
-                            "button.submit-btn",
-                            "button[class*='submit']"
-                        ]
-                    else:
-                        # 立即发布 - 增加更多可能的选择器
-                        submit_selectors = [
-                            "span.submit-add[data-reporter-id='28']",  # 精确匹配用户提供的HTML结构
-                            "span.submit-add",  # 匹配class
-                            "span[data-reporter-id='28']",  # 匹配data-reporter-id
-                            "button:has-text('立即投稿')",
-                            "button:text('立即投稿')",
-                            "button:text-is('立即投稿')",
-                            "button.submit-btn:has-text('立即投稿')",
-                            "button[type='submit']:has-text('立即投稿')",
-                            "button.primary-btn:has-text('立即投稿')",
-                            ".submit-container button:has-text('立即投稿')",
-                            ".submit-container button:last-child",
-                            ".submit-btn",
-                            "button.submit-btn",
-                            "button[class*='submit']",
-                            "button.primary-btn"
-                        ]
-                    
-                    # 等待更长时间确保按钮已加载
-                    await asyncio.sleep(3)
+                    # 等待提交按钮出现
+                    await wait_quietly(page.locator(', '.join(submit_selectors)).first.wait_for(state='visible', timeout=3000))
                     
                     for selector in submit_selectors:
                         try:
@@ -1307,23 +1195,12 @@ class BilibiliVideo(object):
                                 # 如果点击的是"同意"按钮，可能需要额外的操作
                                 if '同意' in button_text:
                                     bilibili_logger.info("[-] 检测到点击了'同意'按钮，等待弹窗后点击'立即投稿'按钮...")
-                                    await asyncio.sleep(3)  # 等待弹窗或其他UI元素出现
+                                    await wait_quietly(self.upload_page.wait(page, 'submit_agree_dialog'))
                                     
                                     # 尝试查找并点击真正的提交按钮
                                     try:
                                         # 方法1: 使用更精确的选择器
-                                        submit_button_selectors = [
-                                            "span.submit-add[data-reporter-id='28']",  # 精确匹配用户提供的HTML结构
-                                            "span.submit-add",  # 匹配class
-                                            "span[data-reporter-id='28']",  # 匹配data-reporter-id
-                                            "button:has-text('立即投稿')",
-                                            "button.submit-btn:has-text('立即投稿')",
-                                            "button.primary-btn:has-text('立即投稿')",
-                                            "button:has-text('投稿')",
-                                            ".submit-container button:last-child"
-                                        ]
-                                        
-                                        for selector in submit_button_selectors:
+                                        for selector in self.upload_page.selectors('submit_after_agree'):
                                             try:
                                                 button = page.locator(selector)
                                                 if await button.count() > 0:
@@ -1384,7 +1261,7 @@ class BilibiliVideo(object):
                                 bilibili_logger.info("[-] 等待提交完成...")
                                 try:
                                     # 等待成功提示，增加超时时间
-                                    await page.wait_for_selector("text=提交成功", timeout=60000)
+                                    await self.upload_page.wait(page, 'submitted')
                                     bilibili_logger.success("[+] 视频提交成功!")
                                     success = True
                                 except Exception as e:
@@ -1416,18 +1293,15 @@ class BilibiliVideo(object):
                                             }""")
                                         except Exception as e:
                                             bilibili_logger.error(f"[-] 再次点击提交按钮失败: {str(e)}")
-                                            await page.screenshot(path=f"bilibili_no_submit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                                            await browser.close()
+                                            await self.capture.failure('no_submit_button', page)
                                             return False
                             else:
                                 bilibili_logger.error("[-] JavaScript未找到可点击的提交按钮")
-                                await page.screenshot(path=f"bilibili_no_submit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                                await browser.close()
+                                await self.capture.failure('no_submit_button', page)
                                 return False
                         except Exception as e:
                             bilibili_logger.error(f"[-] JavaScript点击提交按钮失败: {str(e)}")
-                            await page.screenshot(path=f"bilibili_no_submit_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                            await browser.close()
+                            await self.capture.failure('no_submit_button', page)
                             return False
                     
                     # 如果找到了提交按钮，尝试点击
@@ -1438,7 +1312,7 @@ class BilibiliVideo(object):
                             bilibili_logger.info("[-] 成功点击提交按钮")
                         except Exception as e:
                             bilibili_logger.error(f"[-] 点击提交按钮失败: {str(e)}")
-                            await page.screenshot(path=f"bilibili_submit_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+                            self.capture.capture('submit_error', page)
                             
                             # 尝试使用JavaScript点击
                             bilibili_logger.info("[-] 尝试使用JavaScript点击...")
@@ -1469,20 +1343,19 @@ class BilibiliVideo(object):
                                 }""")
                             except Exception as e:
                                 bilibili_logger.error(f"[-] JavaScript点击失败: {str(e)}")
-                                await browser.close()
                                 return False
                 
                 # 等待提交结果
                 if not success:  # 如果前面的步骤没有设置success=True
                     try:
                         # 等待成功提示
-                        await page.wait_for_selector("text=提交成功", timeout=30000)
+                        await self.upload_page.wait(page, 'submitted', timeout=30000)
                         bilibili_logger.success("[+] 视频提交成功!")
                         success = True
                     except Exception:
                         bilibili_logger.error("[-] 视频提交失败或超时")
                         # 尝试使用其他方式检查是否成功
-                        success = await self.check_submit_success(page, "member.bilibili.com/platform/upload/video")
+                        success = await self.check_submit_success(page, self.upload_page.url)
                         if success:
                             bilibili_logger.success("[+] 检测到其他成功指标，视频可能已提交成功!")
                         else:
@@ -1492,6 +1365,7 @@ class BilibiliVideo(object):
                                 bilibili_logger.success("[+] 视频已真正提交成功!")
                 
                 # 保存cookie
+                self.timer.stage('save_cookie')
                 try:
                     await context.storage_state(path=self.account_file)
                     bilibili_logger.success('[-] cookie更新完毕！')
@@ -1499,22 +1373,15 @@ class BilibiliVideo(object):
                     bilibili_logger.error(f'[-] 保存cookie失败: {str(e)}')
                 
                 # 关闭浏览器前，确保视频真正提交成功
+                self.timer.stage('confirm_submitted')
                 if not success:
                     # 最后一次尝试确保视频真正提交成功
                     success = await self.ensure_video_submitted(page, browser, context)
                     if success:
                         bilibili_logger.success("[+] 最终确认：视频已真正提交成功!")
                 
-                # 关闭浏览器
-                try:
-                    await asyncio.sleep(2)
-                    await context.close()
-                    await browser.close()
-                except Exception as e:
-                    bilibili_logger.error(f'[-] 关闭浏览器失败: {str(e)}')
-                
                 # 如果页面URL变化了，即使没有明确的成功提示，也可能是成功了
-                if not success and "member.bilibili.com/platform/upload/video" not in page.url:
+                if not success and self.upload_page.url not in page.url:
                     bilibili_logger.info(f"[-] 页面URL已变化，视频可能已成功提交")
                     # 特别检查是否是frame页面，这是B站上传成功后的常见跳转
                     if "platform/upload/video/frame" in page.url:
@@ -1526,18 +1393,22 @@ class BilibiliVideo(object):
                 
             except Exception as e:
                 bilibili_logger.error(f"[-] 填写视频信息失败: {str(e)}")
-                # 尝试截图
-                try:
-                    await page.screenshot(path=f"bilibili_error_info_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                except:
-                    pass
-                await browser.close()
+                # 保存错误现场截图
+                await self.capture.failure('fill_info_error', page)
                 return False
                 
         except Exception as e:
             bilibili_logger.error(f"[-] 上传过程发生异常: {str(e)}")
             return False
         finally:
+            # 每个返回路径都关闭上下文，共享浏览器池里的上下文不会泄漏
+            try:
+                if context is not None:
+                    await context.close()
+                if browser is not None:
+                    await browser.close()
+            except Exception as e:
+                bilibili_logger.error(f'[-] 关闭浏览器失败: {str(e)}')
             # 清理转换生成的临时文件
             try:
                 cleanup_converted_files()
@@ -1546,5 +1417,10 @@ class BilibiliVideo(object):
 
     async def main(self):
         """主函数，执行上传流程"""
-        async with async_playwright() as playwright:
-            return await self.upload(playwright)
+        with self.timer:
+            async with async_playwright() as playwright:
+                async with self.capture:
+                    success = await self.upload(playwright)
+                    if not success:
+                        self.timer.mark_failed()
+            return success
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.bilibili_uploader.main import BilibiliVideo, bilibili_setup, random_emoji
+from utils.constant import VideoZoneTypes
+
+
+class BilibiliUploader(BaseUploader):
+    platform = 'bilibili'
+    name = 'B站'
+    upload_interval = 60  # B站需要较长间隔
+
+    async def validate(self, handle=False):
+        return await bilibili_setup(self.account_file, handle=handle)
+
+    async def prepare_media(self, job):
+        job = await super().prepare_media(job)
+        # 清理标题中的特殊字符，避免B站审核问题；B站不允许相同标题
+        job.title = job.title.replace(" - ", " ").replace("(", "").replace(")", "") + random_emoji()
+        return job
+
+    def create_app(self, job):
+        # category 为整数时作为分区ID，默认音乐综合
+        tid = job.category if isinstance(job.category, int) else VideoZoneTypes.MUSIC_OTHER.value
+        return BilibiliVideo(
+            title=job.title,
+            file_path=job.file_path,
+            desc=job.desc or job.title,
+            tid=tid,
+            tags=job.tags,
+            publish_date=job.publish_date,
+            account_file=self.account_file,
+            thumbnail_path=job.thumbnail_path
+        )
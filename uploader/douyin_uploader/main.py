@@ -4,10 +4,26 @@ from datetime import datetime
 from playwright.async_api import Playwright, async_playwright, Page
 import os
 import asyncio
+import time
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from uploader.page_map import get_page_map
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
+from utils.capture import ScreenshotCapture
 from utils.log import douyin_logger
+from utils.network import RetryState, UploadError
+from utils.resource_filter import block_resources
+from utils.selector_cache import SelectorResolver
+from utils.timing import UploadTimer
+from utils.tracing import TraceRecorder
+from utils.waits import wait_for_class, wait_for_value, wait_quietly, wait_until
+
+# 各轮询等待的最长时间（秒，与 utils/watchdog.py 的阶段时限一致），超时抛出 TimeoutError，
+# 不经过看门狗直接调用 DouYinVideo.main() 时也不会一直卡住
+PUBLISH_PAGE_TIMEOUT = 180  # 选择文件后进入发布页面
+TRANSCODE_TIMEOUT = 30 * 60  # 视频上传、转码完成
+PUBLISH_TIMEOUT = 300  # 点击发布后跳转到作品管理页
 
 
 async def cookie_auth(account_file):
@@ -18,9 +34,9 @@ async def cookie_auth(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://creator.douyin.com/creator-micro/content/upload")
+        await page.goto(f"{get_base_url('douyin')}/creator-micro/content/upload")
         try:
-            await page.wait_for_url("https://creator.douyin.com/creator-micro/content/upload", timeout=5000)
+            await page.wait_for_url(f"{get_base_url('douyin')}/creator-micro/content/upload", timeout=5000)
         except:
             print("[+] 等待5秒 cookie 失效")
             await context.close()
@@ -57,7 +73,7 @@ async def douyin_cookie_gen(account_file):
         context = await set_init_script(context)
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://creator.douyin.com/")
+        await page.goto(f"{get_base_url('douyin')}/")
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -74,154 +90,177 @@ class DouYinVideo(object):
         self.local_executable_path = LOCAL_CHROME_PATH
         self.thumbnail_path = thumbnail_path
         self.default_location = "北京市"  # 默认地理位置
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.base_url = get_base_url('douyin')  # 可指向本地 mock 服务
+        self.timer = UploadTimer('douyin', account_file, file_path)
+        self.capture = ScreenshotCapture('douyin', timer=self.timer)  # 调试截图，失败时才落盘
+        self.upload_retry = RetryState('douyin', 'reupload')  # 平台提示上传失败时重新上传，按退避限次
+        self.selectors = SelectorResolver('douyin')  # 多候选选择器，优先使用上次成功的
+        page_map = get_page_map('douyin')  # 页面结构见 uploader/page_maps/douyin.json
+        self.upload_page = page_map.page('upload')
+        self.publish_page = page_map.page('publish')
+        self.tracer = TraceRecorder('douyin', timer=self.timer)  # 可选的 trace/HAR 录制，失败或超出耗时预算时才保存
 
     async def set_schedule_time_douyin(self, page, publish_date):
         # 选择包含特定文本内容的 label 元素
-        label_element = page.locator("[class^='radio']:has-text('定时发布')")
+        label_element = self.publish_page.locator(page, 'schedule_radio')
         # 在选中的 label 元素下点击 checkbox
         await label_element.click()
-        await asyncio.sleep(1)
         publish_date_hour = publish_date.strftime("%Y-%m-%d %H:%M")
 
-        await asyncio.sleep(1)
-        await page.locator('.semi-input[placeholder="日期和时间"]').click()
+        # 选中定时发布后才会出现日期输入框
+        await self.publish_page.wait(page, 'schedule_input')
+        schedule_input = self.publish_page.locator(page, 'schedule_input')
+        await schedule_input.click()
         await page.keyboard.press("Control+KeyA")
         await page.keyboard.type(str(publish_date_hour))
         await page.keyboard.press("Enter")
 
-        await asyncio.sleep(1)
+        # 日期组件回填输入框后再继续
+        await wait_quietly(wait_for_value(schedule_input, publish_date_hour, timeout=3))
 
     async def handle_upload_error(self, page):
         douyin_logger.info('视频出错了，重新上传中')
-        await page.locator('div.progress-div [class^="upload-btn-input"]').set_input_files(self.file_path)
+        await self.upload_retry.wait(UploadError('视频上传失败'))
+        await self.publish_page.locator(page, 'reupload_input').set_input_files(self.file_path)
 
     async def upload(self, playwright: Playwright) -> None:
         # 使用 Chromium 浏览器启动一个浏览器实例
+        self.timer.stage('launch')
         if self.local_executable_path:
-            browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
+            browser = await launch_chromium(playwright, self.browser_pool, headless=False, executable_path=self.local_executable_path)
         else:
-            browser = await playwright.chromium.launch(headless=False)
+            browser = await launch_chromium(playwright, self.browser_pool, headless=False)
         # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
+        context = await self.tracer.new_context(browser, storage_state=f"{self.account_file}")
         context = await set_init_script(context)
+        await block_resources(context, 'douyin')
 
         # 创建一个新的页面
-        page = await context.new_page()
+        page = self.capture.attach(await context.new_page())
         # 访问指定的 URL
-        await page.goto("https://creator.douyin.com/creator-micro/content/upload")
+        self.timer.stage('goto')
+        await page.goto(self.upload_page.url)
         douyin_logger.info(f'[+]正在上传-------{os.path.basename(self.file_path)}')
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
         douyin_logger.info(f'[-] 正在打开主页...')
-        await page.wait_for_url("https://creator.douyin.com/creator-micro/content/upload")
+        await self.upload_page.wait(page, 'ready')
         # 点击 "上传视频" 按钮
-        await page.locator("div[class^='container'] input").set_input_files(self.file_path)
+        self.timer.stage('set_input_files')
+        await self.upload_page.locator(page, 'file_input').set_input_files(self.file_path)
+        self.timer.stage('wait_publish_page')
 
         # 等待页面跳转到指定的 URL 2025.01.08修改在原有基础上兼容两种页面
-        while True:
+        async def on_publish_page():
             try:
-                # 尝试等待第一个 URL
-                await page.wait_for_url(
-                    "https://creator.douyin.com/creator-micro/content/publish?enter_from=publish_page", timeout=3000)
-                douyin_logger.info("[+] 成功进入version_1发布页面!")
-                break  # 成功进入页面后跳出循环
+                # 两个版本的发布页面地址同时匹配
+                await self.upload_page.wait(page, 'publish_page')
+                return True
             except Exception:
-                try:
-                    # 如果第一个 URL 超时，再尝试等待第二个 URL
-                    await page.wait_for_url(
-                        "https://creator.douyin.com/creator-micro/content/post/video?enter_from=publish_page",
-                        timeout=3000)
-                    douyin_logger.info("[+] 成功进入version_2发布页面!")
-
-                    break  # 成功进入页面后跳出循环
-                except:
-                    print("  [-] 超时未进入视频发布页面，重新尝试...")
-                    await asyncio.sleep(0.5)  # 等待 0.5 秒后重新尝试
+                print("  [-] 超时未进入视频发布页面，重新尝试...")
+                return False
+        await wait_until(on_publish_page, timeout=PUBLISH_PAGE_TIMEOUT,
+                         message=f"{PUBLISH_PAGE_TIMEOUT} 秒内未进入视频发布页面")
+        douyin_logger.info(f"[+] 成功进入发布页面: {page.url}")
         # 填充标题和话题
         # 检查是否存在包含输入框的元素
         # 这里为了避免页面变化，故使用相对位置定位：作品标题父级右侧第一个元素的input子元素
-        await asyncio.sleep(1)
+        self.timer.stage('fill_title_tags')
+        # 发布页面的标题输入框渲染出来后再填写
+        await wait_quietly(self.publish_page.wait(page, 'title_ready'))
         douyin_logger.info(f'  [-] 正在填充标题和话题...')
-        title_container = page.get_by_text('作品标题').locator("..").locator("xpath=following-sibling::div[1]").locator("input")
+        title_container = self.publish_page.locator(page, 'title_input')
         if await title_container.count():
             await title_container.fill(self.title[:30])
         else:
-            titlecontainer = page.locator(".notranslate")
+            titlecontainer = self.publish_page.locator(page, 'title_editor')
             await titlecontainer.click()
             await page.keyboard.press("Backspace")
             await page.keyboard.press("Control+KeyA")
             await page.keyboard.press("Delete")
             await page.keyboard.type(self.title)
             await page.keyboard.press("Enter")
-        css_selector = ".zone-container"
+        css_selector = self.publish_page.selector('tag_zone')
         for index, tag in enumerate(self.tags, start=1):
             await page.type(css_selector, "#" + tag)
             await page.press(css_selector, "Space")
         douyin_logger.info(f'总共添加{len(self.tags)}个话题')
+        self.timer.stage('wait_transcode')
 
+        reupload = self.publish_page.locator(page, 'reupload')
+        # 这里不用 wait_until：它会吞掉重新上传次数用尽时抛出的 UploadError
+        deadline = time.monotonic() + TRANSCODE_TIMEOUT
         while True:
-            # 判断重新上传按钮是否存在，如果不存在，代表视频正在上传，则等待
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{TRANSCODE_TIMEOUT} 秒内视频未上传完毕")
+            # 等待重新上传按钮出现（代表视频上传完毕），出现后立即继续，每 2 秒检查一次是否上传失败
             try:
-                #  新版：定位重新上传
-                number = await page.locator('[class^="long-card"] div:has-text("重新上传")').count()
-                if number > 0:
-                    douyin_logger.success("  [-]视频上传完毕")
-                    break
-                else:
-                    douyin_logger.info("  [-] 正在上传视频中...")
-                    await asyncio.sleep(2)
-
-                    if await page.locator('div.progress-div > div:has-text("上传失败")').count():
-                        douyin_logger.error("  [-] 发现上传出错了... 准备重试")
-                        await self.handle_upload_error(page)
-            except:
-                douyin_logger.info("  [-] 正在上传视频中...")
+                await reupload.first.wait_for(state='attached', timeout=2000)
+                douyin_logger.success("  [-]视频上传完毕")
+                break
+            except Exception:
+                douyin_logger.bind(poll=True).info("  [-] 正在上传视频中...")
+            try:
+                if await self.publish_page.locator(page, 'upload_failed').count():
+                    douyin_logger.error("  [-] 发现上传出错了... 准备重试")
+                    await self.handle_upload_error(page)
+            except UploadError:
+                # 重新上传次数用尽，不再等待
+                raise
+            except Exception:
                 await asyncio.sleep(2)
         
         #上传视频封面
+        self.timer.stage('set_thumbnail')
         await self.set_thumbnail(page, self.thumbnail_path)
 
         # 更换可见元素
+        self.timer.stage('set_location')
         await self.set_location(page, self.default_location)
 
         # 頭條/西瓜 - 自动同步到头条
+        self.timer.stage('set_toutiao_sync')
         await self.set_toutiao_sync(page)
 
         if self.publish_date != 0:
+            self.timer.stage('set_schedule')
             await self.set_schedule_time_douyin(page, self.publish_date)
 
         # 判断视频是否发布成功
-        while True:
-            # 判断视频是否发布成功
+        self.timer.stage('publish')
+        async def published():
             try:
-                publish_button = page.get_by_role('button', name="发布", exact=True)
+                publish_button = self.publish_page.locator(page, 'publish_button')
                 if await publish_button.count():
                     await publish_button.click()
-                await page.wait_for_url("https://creator.douyin.com/creator-micro/content/manage**",
-                                        timeout=3000)  # 如果自动跳转到作品页面，则代表发布成功
-                douyin_logger.success("  [-]视频发布成功")
-                break
-            except:
-                douyin_logger.info("  [-] 视频正在发布中...")
-                await page.screenshot(full_page=True)
-                await asyncio.sleep(0.5)
+                await self.publish_page.wait(page, 'success')  # 如果自动跳转到作品页面，则代表发布成功
+                return True
+            except Exception:
+                douyin_logger.bind(poll=True).info("  [-] 视频正在发布中...")
+                self.capture.capture('publish')
+                return False
+        await wait_until(published, timeout=PUBLISH_TIMEOUT, message=f"{PUBLISH_TIMEOUT} 秒内视频未发布成功")
+        douyin_logger.success("  [-]视频发布成功")
 
+        self.timer.stage('save_cookie')
         await context.storage_state(path=self.account_file)  # 保存cookie
         douyin_logger.success('  [-]cookie更新完毕！')
-        await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
+        self.timer.end_stage()
         # 关闭浏览器上下文和浏览器实例
-        await context.close()
+        await self.tracer.close_context(context)
         await browser.close()
     
     async def set_thumbnail(self, page: Page, thumbnail_path: str):
         if thumbnail_path:
-            await page.click('text="选择封面"')
-            await page.wait_for_selector("div.semi-modal-content:visible")
-            await page.click('text="设置竖封面"')
-            await page.wait_for_timeout(2000)  # 等待2秒
-            # 定位到上传区域并点击
-            await page.locator("div[class^='semi-upload upload'] >> input.semi-upload-hidden-input").set_input_files(thumbnail_path)
-            await page.wait_for_timeout(2000)  # 等待2秒
-            await page.locator("div[class^='extractFooter'] button:visible:has-text('完成')").click()
+            await self.publish_page.locator(page, 'cover_button').click()
+            await self.publish_page.wait(page, 'cover_modal')
+            await self.publish_page.locator(page, 'vertical_cover').click()
+            # 竖封面上传区域出现后再选择文件
+            await self.publish_page.wait(page, 'cover_input_ready')
+            await self.publish_page.locator(page, 'cover_input').set_input_files(thumbnail_path)
+            # click 会等到“完成”按钮可见且可用（封面处理完成），点击后等待弹窗关闭
+            await self.publish_page.locator(page, 'cover_done').click()
+            await wait_quietly(self.publish_page.wait(page, 'cover_closed'))
             # finish_confirm_element = page.locator("div[class^='confirmBtn'] >> div:has-text('完成')")
             # if await finish_confirm_element.count():
             #     await finish_confirm_element.click()
@@ -233,25 +272,23 @@ class DouYinVideo(object):
             douyin_logger.info(f"  [-] 正在设置地理位置: {location}")
             
             # 检查地理位置选择器是否存在
-            location_selector = 'div.semi-select span:has-text("输入地理位置")'
-            location_element = page.locator(location_selector)
+            location_element = self.publish_page.locator(page, 'location_select')
             
             # 等待元素出现，设置较短的超时时间
-            await location_element.wait_for(timeout=10000)
+            await self.publish_page.wait(page, 'location_select')
             
             # 点击地理位置输入框
             await location_element.click()
             await page.keyboard.press("Backspace")
-            await page.wait_for_timeout(2000)
             
-            # 输入地理位置
+            # 输入地理位置（输入后等待下拉选项出现）
             await page.keyboard.type(location)
             
             # 等待下拉选项出现
-            await page.wait_for_selector('div[role="listbox"] [role="option"]', timeout=5000)
+            await self.publish_page.wait(page, 'location_options')
             
             # 选择第一个选项
-            await page.locator('div[role="listbox"] [role="option"]').first.click()
+            await self.publish_page.locator(page, 'location_option').first.click()
             
             douyin_logger.success(f"  [-] 地理位置设置成功: {location}")
             
@@ -264,97 +301,41 @@ class DouYinVideo(object):
         """设置自动同步到头条，尝试多种选择器"""
         douyin_logger.info('  [-] 正在设置自动同步到头条...')
         
-        # 多种可能的选择器
-        selectors = [
-            # 原始选择器
-            '[class^="info"] > [class^="first-part"] div div.semi-switch',
-            # 更通用的选择器
-            'div.semi-switch',
-            # 通过文本查找
-            'span:has-text("头条") + div .semi-switch',
-            'span:has-text("今日头条") + div .semi-switch', 
-            'span:has-text("西瓜视频") + div .semi-switch',
-            # 通过类名查找
-            'div[class*="third-part"] .semi-switch',
-            'div[class*="platform"] .semi-switch',
-            # xpath方式
-            '//span[contains(text(), "头条") or contains(text(), "西瓜")]/following-sibling::div//div[contains(@class, "semi-switch")]',
-            '//div[contains(@class, "semi-switch") and ./ancestor::*[contains(., "头条") or contains(., "西瓜")]]'
-        ]
-        
         try:
-            # 等待页面加载完成
-            await asyncio.sleep(2)
-            
-            # 截图用于调试
-            douyin_logger.info('  [-] 截图保存当前页面状态...')
-            await page.screenshot(path="douyin_toutiao_sync_debug.png", full_page=True)
+            # 截图用于调试（按截图策略采集，失败时才落盘）
+            self.capture.capture('toutiao_sync', page)
             
             switch_found = False
-            
-            # 尝试每个选择器
-            for i, selector in enumerate(selectors):
+            switch = None
+
+            # 此时视频已上传完毕、页面已渲染，先不等待地探测一次：候选都不存在时不再白等解析超时，
+            # 直接走下面的文本查找；候选选择器见 uploader/page_maps/douyin.json
+            if await self.publish_page.locator(page, 'toutiao_sync_switch').count():
+                # 按学习到的顺序解析选择器：先试上次成功的，其余候选并发探测
+                switch = await self.publish_page.resolve(page, 'toutiao_sync_switch', self.selectors, timeout=3000)
+            if switch is not None:
                 try:
-                    douyin_logger.info(f'  [-] 尝试选择器 {i+1}: {selector}')
-                    
-                    if selector.startswith('//'):
-                        # xpath选择器
-                        elements = await page.locator(f'xpath={selector}').all()
+                    # 获取开关状态
+                    switch_class = await switch.get_attribute('class')
+                    is_checked = 'semi-switch-checked' in (switch_class or '')
+                    if is_checked:
+                        douyin_logger.info('  [-] 头条同步已经开启')
+                        switch_found = True
                     else:
-                        # css选择器
-                        elements = await page.locator(selector).all()
-                    
-                    if elements:
-                        douyin_logger.info(f'  [-] 找到 {len(elements)} 个匹配的开关元素')
-                        
-                        for j, element in enumerate(elements):
-                            try:
-                                # 检查是否可见
-                                is_visible = await element.is_visible()
-                                if not is_visible:
-                                    douyin_logger.info(f'  [-] 开关 {j+1} 不可见，跳过')
-                                    continue
-                                
-                                # 获取开关状态
-                                switch_class = await element.get_attribute('class')
-                                is_checked = 'semi-switch-checked' in (switch_class or '')
-                                
-                                douyin_logger.info(f'  [-] 开关 {j+1} 状态: {"已开启" if is_checked else "未开启"}')
-                                
-                                # 如果未开启，则点击开启
-                                if not is_checked:
-                                    # 尝试点击开关本身
-                                    try:
-                                        await element.click()
-                                        douyin_logger.success('  [-] 成功点击开关开启头条同步')
-                                        switch_found = True
-                                        break
-                                    except:
-                                        # 尝试点击内部的input元素
-                                        try:
-                                            input_element = element.locator('input.semi-switch-native-control')
-                                            if await input_element.count():
-                                                await input_element.click()
-                                                douyin_logger.success('  [-] 成功通过input开启头条同步')
-                                                switch_found = True
-                                                break
-                                        except:
-                                            pass
-                                else:
-                                    douyin_logger.info('  [-] 头条同步已经开启')
-                                    switch_found = True
-                                    break
-                                    
-                            except Exception as e:
-                                douyin_logger.warning(f'  [-] 处理开关 {j+1} 时出错: {e}')
-                                continue
-                        
-                        if switch_found:
-                            break
-                            
+                        # 尝试点击开关本身
+                        try:
+                            await switch.click()
+                            douyin_logger.success('  [-] 成功点击开关开启头条同步')
+                            switch_found = True
+                        except Exception:
+                            # 尝试点击内部的input元素
+                            input_element = switch.locator('input.semi-switch-native-control')
+                            if await input_element.count():
+                                await input_element.click()
+                                douyin_logger.success('  [-] 成功通过input开启头条同步')
+                                switch_found = True
                 except Exception as e:
-                    douyin_logger.warning(f'  [-] 选择器 {i+1} 失败: {e}')
-                    continue
+                    douyin_logger.warning(f'  [-] 处理头条同步开关时出错: {e}')
             
             if not switch_found:
                 # 尝试通过文本内容查找
@@ -399,8 +380,8 @@ class DouYinVideo(object):
                 douyin_logger.warning('  [-] 未找到头条同步选项，可能页面结构已变化或账号不支持此功能')
                 douyin_logger.info('  [-] 请手动检查页面是否有头条同步开关')
             else:
-                # 等待一下确保设置生效
-                await asyncio.sleep(1)
+                # 等待开关切换为开启状态
+                await wait_quietly(wait_for_class(switch, 'semi-switch-checked', timeout=3))
                 douyin_logger.success('  [-] 头条同步设置完成')
                 
         except Exception as e:
@@ -408,7 +389,13 @@ class DouYinVideo(object):
             douyin_logger.info('  [-] 继续发布流程...')
 
     async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+        with self.timer:
+            if self.browser_pool is not None:
+                # 复用浏览器池中的 Playwright 驱动和浏览器进程
+                async with self.tracer, self.capture:
+                    return await self.upload(self.browser_pool.playwright)
+            async with async_playwright() as playwright:
+                async with self.tracer, self.capture:
+                    await self.upload(playwright)
 
 
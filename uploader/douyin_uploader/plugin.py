@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.douyin_uploader.main import DouYinVideo, douyin_setup
+
+
+class DouYinUploader(BaseUploader):
+    platform = 'douyin'
+    name = '抖音'
+    relogin_on_upload = False
+
+    async def validate(self, handle=False):
+        return await douyin_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        app = DouYinVideo(job.title, job.file_path, job.tags, job.publish_date, self.account_file, job.thumbnail_path)
+        if job.location:
+            app.default_location = job.location
+        return app
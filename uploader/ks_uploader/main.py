@@ -6,9 +6,16 @@ import os
 import asyncio
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from uploader.page_map import get_page_map
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
+from utils.capture import ScreenshotCapture
 from utils.files_times import get_absolute_path
 from utils.log import kuaishou_logger
+from utils.resource_filter import block_resources
+from utils.timing import UploadTimer
+from utils.tracing import TraceRecorder
+from utils.waits import wait_for_text, wait_for_value, wait_quietly
 
 
 async def cookie_auth(account_file):
@@ -19,7 +26,7 @@ async def cookie_auth(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://cp.kuaishou.com/article/publish/video")
+        await page.goto(f"{get_base_url('kuaishou')}/article/publish/video")
         try:
             await page.wait_for_selector("div.names div.container div.name:text('机构服务')", timeout=5000)  # 等待5秒
 
@@ -55,7 +62,7 @@ async def get_ks_cookie(account_file):
         context = await set_init_script(context)
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://cp.kuaishou.com")
+        await page.goto(f"{get_base_url('kuaishou')}")
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -70,56 +77,68 @@ class KSVideo(object):
         self.account_file = account_file
         self.date_format = '%Y-%m-%d %H:%M'
         self.local_executable_path = LOCAL_CHROME_PATH
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.base_url = get_base_url('kuaishou')  # 可指向本地 mock 服务
+        self.timer = UploadTimer('kuaishou', account_file, file_path)
+        self.capture = ScreenshotCapture('kuaishou', timer=self.timer)  # 调试截图，失败时才落盘
+        self.tracer = TraceRecorder('kuaishou', timer=self.timer)  # 可选的 trace/HAR 录制，失败或超出耗时预算时才保存
+        self.publish_page = get_page_map('kuaishou').page('publish')  # 页面结构见 uploader/page_maps/kuaishou.json
 
     async def handle_upload_error(self, page):
         kuaishou_logger.error("视频出错了，重新上传中")
-        await page.locator('div.progress-div [class^="upload-btn-input"]').set_input_files(self.file_path)
+        await self.publish_page.locator(page, 'reupload_input').set_input_files(self.file_path)
 
     async def upload(self, playwright: Playwright) -> None:
         # 使用 Chromium 浏览器启动一个浏览器实例
+        self.timer.stage('launch')
         print(self.local_executable_path)
         if self.local_executable_path:
-            browser = await playwright.chromium.launch(
+            browser = await launch_chromium(
+                playwright, self.browser_pool,
                 headless=False,
                 executable_path=self.local_executable_path,
             )
         else:
-            browser = await playwright.chromium.launch(
+            browser = await launch_chromium(
+                playwright, self.browser_pool,
                 headless=False
             )  # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
+        context = await self.tracer.new_context(browser, storage_state=f"{self.account_file}")
         context = await set_init_script(context)
+        await block_resources(context, 'kuaishou')
         # 创建一个新的页面
-        page = await context.new_page()
+        page = self.capture.attach(await context.new_page())
         # 访问指定的 URL
-        await page.goto("https://cp.kuaishou.com/article/publish/video")
+        self.timer.stage('goto')
+        await page.goto(self.publish_page.url)
         kuaishou_logger.info('正在上传-------{}'.format(os.path.basename(self.file_path)))
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
         kuaishou_logger.info('正在打开主页...')
-        await page.wait_for_url("https://cp.kuaishou.com/article/publish/video")
+        await self.publish_page.wait(page, 'ready')
         # 点击 "上传视频" 按钮
-        upload_button = page.locator("button[class^='_upload-btn']")
-        await upload_button.wait_for(state='visible')  # 确保按钮可见
+        self.timer.stage('set_input_files')
+        await self.publish_page.wait(page, 'upload_button')  # 确保按钮可见
+        upload_button = self.publish_page.locator(page, 'upload_button')
 
         async with page.expect_file_chooser() as fc_info:
             await upload_button.click()
         file_chooser = await fc_info.value
         await file_chooser.set_files(self.file_path)
 
-        await asyncio.sleep(2)
-
-        # if not await page.get_by_text("封面编辑").count():
-        #     raise Exception("似乎没有跳转到到编辑页面")
-
-        await asyncio.sleep(1)
+        # 选择文件后进入编辑页面，等待描述输入框出现
+        await self.publish_page.wait(page, 'editor_ready')
+        desc_editor = self.publish_page.locator(page, 'desc_editor')
 
-        # 等待按钮可交互
-        new_feature_button = page.locator('button[type="button"] span:text("我知道了")')
-        if await new_feature_button.count() > 0:
-            await new_feature_button.click()
+        # 新功能引导弹窗可能稍后出现，短暂等待，没有则跳过
+        try:
+            await self.publish_page.wait(page, 'new_feature')
+            await self.publish_page.locator(page, 'new_feature_button').first.click()
+        except Exception:
+            pass
 
+        self.timer.stage('fill_title_tags')
         kuaishou_logger.info("正在填充标题和话题...")
-        await page.get_by_text("描述").locator("xpath=following-sibling::div").click()
+        await desc_editor.click()
         kuaishou_logger.info("clear existing title")
         await page.keyboard.press("Backspace")
         await page.keyboard.press("Control+KeyA")
@@ -132,81 +151,77 @@ class KSVideo(object):
         for index, tag in enumerate(self.tags[:3], start=1):
             kuaishou_logger.info("正在添加第%s个话题" % index)
             await page.keyboard.type(f"#{tag} ")
-            await asyncio.sleep(2)
-
-        max_retries = 60  # 设置最大重试次数,最大等待时间为 2 分钟
-        retry_count = 0
+            # 话题写入编辑器后再输入下一个
+            await wait_quietly(wait_for_text(desc_editor, f"#{tag}", timeout=3))
 
-        while retry_count < max_retries:
-            try:
-                # 获取包含 '上传中' 文本的元素数量
-                number = await page.locator("text=上传中").count()
-
-                if number == 0:
-                    kuaishou_logger.success("视频上传完毕")
-                    break
-                else:
-                    if retry_count % 5 == 0:
-                        kuaishou_logger.info("正在上传视频中...")
-                    await asyncio.sleep(2)
-            except Exception as e:
-                kuaishou_logger.error(f"检查上传状态时发生错误: {e}")
-                await asyncio.sleep(2)  # 等待 2 秒后重试
-            retry_count += 1
-
-        if retry_count == max_retries:
-            kuaishou_logger.warning("超过最大重试次数，视频上传可能未完成。")
+        self.timer.stage('wait_transcode')
+        kuaishou_logger.info("正在上传视频中...")
+        try:
+            # '上传中' 提示消失即上传完毕，最长等待 2 分钟
+            await self.publish_page.wait(page, 'uploaded')
+            kuaishou_logger.success("视频上传完毕")
+        except Exception:
+            kuaishou_logger.warning("等待上传超时，视频上传可能未完成。")
 
         # 定时任务
         if self.publish_date != 0:
+            self.timer.stage('set_schedule')
             await self.set_schedule_time(page, self.publish_date)
 
         # 判断视频是否发布成功
+        self.timer.stage('publish')
         while True:
             try:
-                publish_button = page.get_by_text("发布", exact=True)
+                publish_button = self.publish_page.locator(page, 'publish_button')
                 if await publish_button.count() > 0:
                     await publish_button.click()
 
-                await asyncio.sleep(1)
-                confirm_button = page.get_by_text("确认发布")
+                # 等待确认弹窗，没有弹窗时直接等待跳转
+                await wait_quietly(self.publish_page.wait(page, 'confirm_publish'))
+                confirm_button = self.publish_page.locator(page, 'confirm_publish')
                 if await confirm_button.count() > 0:
                     await confirm_button.click()
 
                 # 等待页面跳转，确认发布成功
-                await page.wait_for_url(
-                    "https://cp.kuaishou.com/article/manage/video?status=2&from=publish",
-                    timeout=5000,
-                )
+                await self.publish_page.wait(page, 'success')
                 kuaishou_logger.success("视频发布成功")
                 break
             except Exception as e:
-                kuaishou_logger.info(f"视频正在发布中... 错误: {e}")
-                await page.screenshot(full_page=True)
+                kuaishou_logger.bind(poll=True).info(f"视频正在发布中... 错误: {e}")
+                self.capture.capture('publish')
                 await asyncio.sleep(1)
 
+        self.timer.stage('save_cookie')
         await context.storage_state(path=self.account_file)  # 保存cookie
         kuaishou_logger.info('cookie更新完毕！')
-        await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
+        self.timer.end_stage()
         # 关闭浏览器上下文和浏览器实例
-        await context.close()
+        await self.tracer.close_context(context)
         await browser.close()
 
     async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+        with self.timer:
+            if self.browser_pool is not None:
+                # 复用浏览器池中的 Playwright 驱动和浏览器进程
+                async with self.tracer, self.capture:
+                    return await self.upload(self.browser_pool.playwright)
+            async with async_playwright() as playwright:
+                async with self.tracer, self.capture:
+                    await self.upload(playwright)
 
     async def set_schedule_time(self, page, publish_date):
         kuaishou_logger.info("click schedule")
         publish_date_hour = publish_date.strftime("%Y-%m-%d %H:%M:%S")
-        await page.locator("label:text('发布时间')").locator('xpath=following-sibling::div').locator(
-            '.ant-radio-input').nth(1).click()
-        await asyncio.sleep(1)
+        await self.publish_page.locator(page, 'schedule_radio').click()
 
-        await page.locator('div.ant-picker-input input[placeholder="选择日期时间"]').click()
-        await asyncio.sleep(1)
+        # 选中定时发布后日期输入框才可用，click 会等待其可见可点击
+        date_input = self.publish_page.locator(page, 'schedule_input')
+        await date_input.click()
+        # 日期面板展开后再输入
+        await wait_quietly(self.publish_page.wait(page, 'schedule_dropdown'))
 
         await page.keyboard.press("Control+KeyA")
         await page.keyboard.type(str(publish_date_hour))
         await page.keyboard.press("Enter")
-        await asyncio.sleep(1)
+        # 输入框回填日期后再继续
+        await wait_quietly(wait_for_value(date_input, publish_date_hour, timeout=3))
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.ks_uploader.main import KSVideo, ks_setup
+
+
+class KSUploader(BaseUploader):
+    platform = 'kuaishou'
+    name = '快手'
+
+    async def validate(self, handle=False):
+        return await ks_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        return KSVideo(job.title, str(job.file_path), job.tags, job.publish_date, self.account_file)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+平台页面结构描述（page map）
+各平台创作者中心的页面地址、元素定位、等待条件和发布成功标志写在 uploader/page_maps/<平台>.json 中，
+进程内首次使用时解析并编译成定位表（候选选择器合并为一个 Locator，URL 模式编译为正则），之后直接复用。
+平台改版时更新数据文件即可，不需要改上传代码；等待时间也在数据文件中调整
+
+数据文件格式：
+{
+  "platform": "douyin",
+  "version": "2025.07.1",                      # 数据版本，改动后递增
+  "pages": {
+    "upload": {
+      "url": "/creator-micro/content/upload",  # 相对平台地址（get_base_url）
+      "locators": {
+        "file_input": {"selectors": ["div[class^='container'] input"], "state": "attached"},
+        "title": {"selectors": ["text=作品标题 >> xpath=.. >> ...", ".notranslate"], "optional": true}
+      },
+      "waits": {
+        "publish_page": {"url": ["/creator-micro/content/publish?enter_from=publish_page"], "timeout": 3000},
+        "uploaded": {"locator": "reupload", "state": "attached", "timeout": 600000}
+      },
+      "success": {"url": ["/creator-micro/content/manage**"], "timeout": 3000}
+    }
+  }
+}
+- selectors 为 Playwright 选择器字符串（CSS、text=、role=、xpath=，可用 >> 串联），多个候选表示任一匹配即可，
+  按优先级排列；需要记住成功候选时用 resolve()（见 utils/selector_cache.py）。
+  get_by_role / get_by_label 写成它们生成的选择器，如 internal:role=button[name="发表"i]、internal:label="视频为原创"i
+- state 为 attached / visible，optional 为 true 的元素校验时缺失只提示不报错
+- URL 模式中 ** 匹配任意字符
+
+数据目录可用 SAU_PAGE_MAP_DIR 覆盖（如 Docker 中挂载更新后的数据文件）
+
+校验数据文件和选择器（需要 Playwright 浏览器）：
+python -m uploader.page_map check                                     # 只检查数据文件格式
+python -m uploader.page_map snapshot douyin publish -a cookies/douyin_uploader/account.json
+python -m uploader.page_map validate douyin publish --snapshot logs/page_snapshots/douyin_publish.html
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from utils.base_social_media import get_base_url
+
+PAGE_MAP_DIR = Path(os.environ.get('SAU_PAGE_MAP_DIR') or Path(__file__).parent / 'page_maps')
+SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / 'logs' / 'page_snapshots'
+
+STATES = ('attached', 'visible')
+DEFAULT_WAIT_TIMEOUT = 30000
+
+
+class PageMapError(ValueError):
+    """数据文件格式错误"""
+
+
+def _compile_url(pattern):
+    """URL 模式 -> 正则，** 匹配任意字符，其余按字面匹配"""
+    return re.compile('^' + '.*'.join(re.escape(part) for part in pattern.split('**')) + '$')
+
+
+class LocatorSpec(object):
+    """一个元素的定位描述"""
+
+    def __init__(self, name, selectors, state='attached', optional=False):
+        self.name = name
+        self.selectors = tuple(selectors)
+        self.state = state
+        self.optional = optional
+
+    def locator(self, root):
+        """在 page / frame / locator 上构造 Locator，多个候选合并为一个（任一匹配）"""
+        locator = root.locator(self.selectors[0])
+        for selector in self.selectors[1:]:
+            locator = locator.or_(root.locator(selector))
+        return locator.first if len(self.selectors) > 1 else locator
+
+
+class WaitSpec(object):
+    """等待条件：URL 匹配任一模式，或元素达到指定状态"""
+
+    def __init__(self, name, url_patterns=(), locator=None, state='visible', timeout=DEFAULT_WAIT_TIMEOUT):
+        self.name = name
+        self.url_patterns = tuple(url_patterns)
+        self.locator = locator
+        self.state = state
+        self.timeout = timeout
+        self._compiled = None
+
+    def compile(self, base_url):
+        self._compiled = [_compile_url(base_url + pattern if pattern.startswith('/') else pattern)
+                          for pattern in self.url_patterns]
+        return self
+
+    def match_url(self, url):
+        return any(regex.match(url) for regex in self._compiled or ())
+
+
+class PageSpec(object):
+    """一个页面的定位表"""
+
+    def __init__(self, platform, name, url, locators, waits, base_url):
+        self.platform = platform
+        self.name = name
+        self.path = url
+        self.base_url = base_url
+        self.locators = locators
+        self.waits = waits
+
+    @property
+    def url(self):
+        return self.base_url + self.path if self.path.startswith('/') else self.path
+
+    def spec(self, name):
+        try:
+            return self.locators[name]
+        except KeyError:
+            raise KeyError(f"{self.platform}/{self.name} 页面没有定义元素 {name}") from None
+
+    def selector(self, name):
+        """单个候选时返回选择器字符串（兼容直接传入 page.click 等接口的写法）"""
+        return self.spec(name).selectors[0]
+
+    def selectors(self, name):
+        """全部候选选择器（按优先级），用于需要逐个尝试并记录命中候选的流程"""
+        return list(self.spec(name).selectors)
+
+    def locator(self, root, name):
+        return self.spec(name).locator(root)
+
+    async def resolve(self, page, name, resolver, timeout=None):
+        """按候选优先级解析，记住成功的候选（SelectorResolver）"""
+        spec = self.spec(name)
+        options = {} if timeout is None else {'timeout': timeout}
+        return await resolver.resolve(page, f"{self.name}.{name}", list(spec.selectors), state=spec.state, **options)
+
+    async def wait(self, page, name, timeout=None):
+        """等待条件满足，超时抛出 Playwright 的 TimeoutError"""
+        wait = self.waits[name]
+        timeout = wait.timeout if timeout is None else timeout
+        if wait.url_patterns:
+            await page.wait_for_url(wait.match_url, timeout=timeout)
+        if wait.locator is not None:
+            # 等待第一个匹配元素，匹配多个时不触发严格模式报错
+            await self.locator(page, wait.locator).first.wait_for(state=wait.state, timeout=timeout)
+
+    def matches(self, page, name):
+        """当前地址是否已满足等待条件中的 URL 模式（不等待）"""
+        return self.waits[name].match_url(page.url)
+
+
+class PageMap(object):
+    """单个平台的页面结构"""
+
+    def __init__(self, platform, version, pages, path=None):
+        self.platform = platform
+        self.version = version
+        self.pages = pages
+        self.path = path
+
+    def page(self, name):
+        try:
+            return self.pages[name]
+        except KeyError:
+            raise KeyError(f"{self.platform} 没有定义页面 {name}") from None
+
+
+def _parse_locator(source, page_name, name, data):
+    if isinstance(data, str):
+        data = {'selectors': [data]}
+    selectors = data.get('selectors')
+    if not selectors or not all(isinstance(s, str) and s for s in selectors):
+        raise PageMapError(f"{source}: {page_name}.locators.{name} 缺少 selectors")
+    state = data.get('state', 'attached')
+    if state not in STATES:
+        raise PageMapError(f"{source}: {page_name}.locators.{name} 的 state 只能是 {STATES}")
+    return LocatorSpec(name, selectors, state, bool(data.get('optional')))
+
+
+def _parse_wait(source, page_name, name, data, locators):
+    urls = data.get('url') or []
+    if isinstance(urls, str):
+        urls = [urls]
+    locator = data.get('locator')
+    if not urls and locator is None:
+        raise PageMapError(f"{source}: {page_name}.{name} 需要 url 或 locator")
+    if locator is not None and locator not in locators:
+        raise PageMapError(f"{source}: {page_name}.{name} 引用了未定义的元素 {locator}")
+    state = data.get('state', 'visible')
+    if state not in STATES + ('hidden', 'detached'):
+        raise PageMapError(f"{source}: {page_name}.{name} 的 state 无效: {state}")
+    return WaitSpec(name, urls, locator, state, int(data.get('timeout', DEFAULT_WAIT_TIMEOUT)))
+
+
+def parse_page_map(data, source='<page map>', base_url=None):
+    """解析并编译数据文件内容，格式错误时抛出 PageMapError"""
+    platform = data.get('platform')
+    if not platform or not isinstance(data.get('pages'), dict):
+        raise PageMapError(f"{source}: 缺少 platform 或 pages")
+    if base_url is None:
+        try:
+            base_url = get_base_url(platform)
+        except KeyError:
+            # 没有创作者中心配置的平台（如 TikTok）使用数据文件中的地址
+            base_url = data.get('base_url', '')
+    pages = {}
+    for page_name, page_data in data['pages'].items():
+        locators = {
+            name: _parse_locator(source, page_name, name, spec)
+            for name, spec in (page_data.get('locators') or {}).items()
+        }
+        waits = {
+            name: _parse_wait(source, page_name, f"waits.{name}", spec, locators).compile(base_url)
+            for name, spec in (page_data.get('waits') or {}).items()
+        }
+        if 'success' in page_data:
+            waits['success'] = _parse_wait(source, page_name, 'success', page_data['success'], locators).compile(base_url)
+        pages[page_name] = PageSpec(platform, page_name, page_data.get('url', ''), locators, waits, base_url)
+    return PageMap(platform, str(data.get('version', '')), pages, source)
+
+
+@lru_cache(maxsize=None)
+def get_page_map(platform):
+    """读取并编译平台的数据文件（每个进程只解析一次）"""
+    path = PAGE_MAP_DIR / f"{platform}.json"
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return parse_page_map(data, str(path))
+
+
+def check_all():
+    """检查数据目录下所有文件的格式，返回错误列表"""
+    errors = []
+    for path in sorted(PAGE_MAP_DIR.glob('*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                page_map = parse_page_map(json.load(f), str(path), base_url='')
+            count = sum(len(page.locators) for page in page_map.pages.values())
+            print(f"✅ {path.name}: {page_map.platform} v{page_map.version}，{len(page_map.pages)} 个页面，{count} 个元素")
+        except (OSError, ValueError) as e:
+            errors.append(str(e))
+            print(f"❌ {path.name}: {e}")
+    return errors
+
+
+async def save_snapshot(platform, page_name, account_file, output=None):
+    """用账号 cookie 打开页面，保存 DOM 快照供离线校验"""
+    from playwright.async_api import async_playwright
+
+    page_spec = get_page_map(platform).page(page_name)
+    output = Path(output or SNAPSHOT_DIR / f"{platform}_{page_name}.html")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        context = await browser.new_context(storage_state=account_file)
+        page = await context.new_page()
+        await page.goto(page_spec.url)
+        await page.wait_for_load_state('networkidle')
+        output.write_text(await page.content(), encoding='utf-8')
+        await browser.close()
+    print(f"📸 已保存页面快照: {output}")
+    return output
+
+
+async def validate_snapshot(platform, page_name, snapshot):
+    """在保存的页面快照上逐个检查选择器，返回缺失的必需元素"""
+    from playwright.async_api import async_playwright
+
+    page_spec = get_page_map(platform).page(page_name)
+    html = Path(snapshot).read_text(encoding='utf-8')
+    missing = []
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        # 不执行快照中的脚本，只检查保存下来的 DOM
+        context = await browser.new_context(java_script_enabled=False)
+        page = await context.new_page()
+        await page.set_content(html)
+        for name, spec in page_spec.locators.items():
+            counts = []
+            for selector in spec.selectors:
+                try:
+                    counts.append(await page.locator(selector).count())
+                except Exception as e:
+                    counts.append(f"错误: {e}")
+            found = any(isinstance(count, int) and count > 0 for count in counts)
+            mark = '✅' if found else ('⚠️ ' if spec.optional else '❌')
+            print(f"{mark} {name}")
+            for selector, count in zip(spec.selectors, counts):
+                print(f"     {count!s:>4}  {selector}")
+            if not found and not spec.optional:
+                missing.append(name)
+        await browser.close()
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='平台页面结构数据文件工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('check', help='检查所有数据文件格式')
+    snapshot_parser = subparsers.add_parser('snapshot', help='打开页面并保存 DOM 快照')
+    snapshot_parser.add_argument('platform')
+    snapshot_parser.add_argument('page')
+    snapshot_parser.add_argument('--account', '-a', required=True, help='账号 cookie 文件')
+    snapshot_parser.add_argument('--output', '-o', help='快照保存路径')
+    validate_parser = subparsers.add_parser('validate', help='在页面快照上校验选择器')
+    validate_parser.add_argument('platform')
+    validate_parser.add_argument('page')
+    validate_parser.add_argument('--snapshot', '-s', help='快照文件，默认 logs/page_snapshots/<平台>_<页面>.html')
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        sys.exit(1 if check_all() else 0)
+    if args.command == 'snapshot':
+        asyncio.run(save_snapshot(args.platform, args.page, args.account, args.output))
+        return
+    snapshot = args.snapshot or SNAPSHOT_DIR / f"{args.platform}_{args.page}.html"
+    missing = asyncio.run(validate_snapshot(args.platform, args.page, snapshot))
+    if missing:
+        print(f"\n❌ {len(missing)} 个必需元素在快照中找不到: {', '.join(missing)}")
+        sys.exit(1)
+    print("\n✅ 所有必需元素都能找到")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+平台上传插件注册表
+平台元数据（名称、后端类型编号、cookie域名）直接登记在表中，插件模块在首次使用时才导入
+"""
+
+import importlib
+
+# 平台标识 -> 元数据及插件位置（"模块路径:类名"）
+PLATFORMS = {
+    'xiaohongshu': {
+        'name': '小红书',
+        'type_id': 1,
+        'domains': ['xiaohongshu.com'],
+        'plugin': 'uploader.xiaohongshu_uploader.plugin:XiaoHongShuUploader',
+    },
+    'tencent': {
+        'name': '视频号',
+        'type_id': 2,
+        'domains': ['weixin.qq.com', 'channels.weixin.qq.com'],
+        'plugin': 'uploader.tencent_uploader.plugin:TencentUploader',
+    },
+    'douyin': {
+        'name': '抖音',
+        'type_id': 3,
+        'domains': ['douyin.com', 'creator.douyin.com'],
+        'plugin': 'uploader.douyin_uploader.plugin:DouYinUploader',
+    },
+    'kuaishou': {
+        'name': '快手',
+        'type_id': 4,
+        'domains': ['kuaishou.com'],
+        'plugin': 'uploader.ks_uploader.plugin:KSUploader',
+    },
+    'bilibili': {
+        'name': 'B站',
+        'type_id': None,
+        'domains': ['bilibili.com'],
+        'plugin': 'uploader.bilibili_uploader.plugin:BilibiliUploader',
+    },
+    'baijiahao': {
+        'name': '百家号',
+        'type_id': None,
+        'domains': ['baijiahao.baidu.com', 'baidu.com'],
+        'plugin': 'uploader.baijiahao_uploader.plugin:BaiJiaHaoUploader',
+    },
+    'tiktok': {
+        'name': 'TikTok',
+        'type_id': None,
+        'domains': ['tiktok.com'],
+        'plugin': 'uploader.tk_uploader.plugin:TiktokUploader',
+    },
+}
+
+_loaded_plugins = {}
+
+
+def register_uploader(platform, name, plugin, type_id=None, domains=None):
+    """登记新平台插件（plugin 为 "模块路径:类名" 或插件类）"""
+    PLATFORMS[platform] = {
+        'name': name,
+        'type_id': type_id,
+        'domains': domains or [],
+        'plugin': plugin,
+    }
+    _loaded_plugins.pop(platform, None)
+
+
+def get_supported_platforms():
+    return list(PLATFORMS.keys())
+
+
+def get_platform_info(platform):
+    if platform not in PLATFORMS:
+        raise ValueError(f"不支持的平台: {platform}")
+    return PLATFORMS[platform]
+
+
+def get_platform_by_type(type_id):
+    """后端 user_info.type 编号 -> 平台标识"""
+    for platform, info in PLATFORMS.items():
+        if info['type_id'] is not None and info['type_id'] == int(type_id):
+            return platform
+    raise ValueError(f"不支持的平台类型: {type_id}")
+
+
+def get_uploader_class(platform):
+    """按需导入并返回平台插件类"""
+    if platform not in _loaded_plugins:
+        plugin = get_platform_info(platform)['plugin']
+        if isinstance(plugin, str):
+            module_path, class_name = plugin.split(':')
+            plugin = getattr(importlib.import_module(module_path), class_name)
+        _loaded_plugins[platform] = plugin
+    return _loaded_plugins[platform]
+
+
+def create_uploader(platform, account_file, **kwargs):
+    """创建平台插件实例"""
+    return get_uploader_class(platform)(account_file, **kwargs)
@@ -6,9 +6,16 @@ import os
 import asyncio
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from uploader.page_map import get_page_map
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
 from utils.files_times import get_absolute_path
 from utils.log import tencent_logger
+from utils.network import RetryState, UploadError
+from utils.resource_filter import block_resources
+from utils.timing import UploadTimer
+from utils.tracing import TraceRecorder
+from utils.waits import wait_quietly
 
 
 def format_str_for_short_title(origin_title: str) -> str:
@@ -39,7 +46,7 @@ async def cookie_auth(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://channels.weixin.qq.com/platform/post/create")
+        await page.goto(f"{get_base_url('tencent')}/platform/post/create")
         try:
             await page.wait_for_selector('div.title-name:has-text("微信小店")', timeout=5000)  # 等待5秒
             tencent_logger.error("[+] 等待5秒 cookie 失效")
@@ -64,7 +71,7 @@ async def get_tencent_cookie(account_file):
         # Pause the page, and start recording manually.
         context = await set_init_script(context)
         page = await context.new_page()
-        await page.goto("https://channels.weixin.qq.com")
+        await page.goto(f"{get_base_url('tencent')}")
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -90,24 +97,30 @@ class TencentVideo(object):
         self.account_file = account_file
         self.category = category
         self.local_executable_path = LOCAL_CHROME_PATH
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.base_url = get_base_url('tencent')  # 可指向本地 mock 服务
+        self.timer = UploadTimer('tencent', account_file, file_path)
+        self.upload_retry = RetryState('tencent', 'reupload')  # 平台提示上传失败时重新上传，按退避限次
+        self.tracer = TraceRecorder('tencent', timer=self.timer)  # 可选的 trace/HAR 录制，失败或超出耗时预算时才保存
+        self.create_page = get_page_map('tencent').page('create')  # 页面结构见 uploader/page_maps/tencent.json
 
     async def set_schedule_time_tencent(self, page, publish_date):
-        label_element = page.locator("label").filter(has_text="定时").nth(1)
+        label_element = self.create_page.locator(page, 'schedule_radio')
         await label_element.click()
 
-        await page.click('input[placeholder="请选择发表时间"]')
+        await self.create_page.locator(page, 'schedule_date_input').click()
 
         str_month = str(publish_date.month) if publish_date.month > 9 else "0" + str(publish_date.month)
         current_month = str_month + "月"
         # 获取当前的月份
-        page_month = await page.inner_text('span.weui-desktop-picker__panel__label:has-text("月")')
+        page_month = await self.create_page.locator(page, 'picker_month').inner_text()
 
         # 检查当前月份是否与目标月份相同
         if page_month != current_month:
-            await page.click('button.weui-desktop-btn__icon__right')
+            await self.create_page.locator(page, 'picker_next_month').click()
 
         # 获取页面元素
-        elements = await page.query_selector_all('table.weui-desktop-picker__table a')
+        elements = await self.create_page.locator(page, 'picker_days').all()
 
         # 遍历元素并点击匹配的元素
         for element in elements:
@@ -119,65 +132,76 @@ class TencentVideo(object):
                 break
 
         # 输入小时部分（假设选择11小时）
-        await page.click('input[placeholder="请选择时间"]')
+        await self.create_page.locator(page, 'schedule_time_input').click()
         await page.keyboard.press("Control+KeyA")
         await page.keyboard.type(str(publish_date.hour))
 
         # 选择标题栏（令定时时间生效）
-        await page.locator("div.input-editor").click()
+        await self.create_page.locator(page, 'title_editor').click()
 
     async def handle_upload_error(self, page):
         tencent_logger.info("视频出错了，重新上传中")
-        await page.locator('div.media-status-content div.tag-inner:has-text("删除")').click()
-        await page.get_by_role('button', name="删除", exact=True).click()
-        file_input = page.locator('input[type="file"]')
+        await self.upload_retry.wait(UploadError('视频上传失败'))
+        await self.create_page.locator(page, 'delete_media').click()
+        await self.create_page.locator(page, 'delete_confirm').click()
+        file_input = self.create_page.locator(page, 'file_input')
         await file_input.set_input_files(self.file_path)
 
     async def upload(self, playwright: Playwright) -> None:
         # 使用 Chromium (这里使用系统内浏览器，用chromium 会造成h264错误
-        browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
+        self.timer.stage('launch')
+        browser = await launch_chromium(playwright, self.browser_pool, headless=False, executable_path=self.local_executable_path)
         # 创建一个浏览器上下文，使用指定的 cookie 文件
-        context = await browser.new_context(storage_state=f"{self.account_file}")
+        context = await self.tracer.new_context(browser, storage_state=f"{self.account_file}")
         context = await set_init_script(context)
+        await block_resources(context, 'tencent')
 
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://channels.weixin.qq.com/platform/post/create")
+        self.timer.stage('goto')
+        await page.goto(self.create_page.url)
         tencent_logger.info(f'[+]正在上传-------{os.path.basename(self.file_path)}')
         # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
-        await page.wait_for_url("https://channels.weixin.qq.com/platform/post/create")
+        await self.create_page.wait(page, 'ready')
         # await page.wait_for_selector('input[type="file"]', timeout=10000)
-        file_input = page.locator('input[type="file"]')
+        self.timer.stage('set_input_files')
+        file_input = self.create_page.locator(page, 'file_input')
         await file_input.set_input_files(self.file_path)
         # 填充标题和话题
+        self.timer.stage('fill_title_tags')
         await self.add_title_tags(page)
         # 添加商品
         # await self.add_product(page)
         # 合集功能
+        self.timer.stage('add_collection')
         await self.add_collection(page)
         # 原创选择
+        self.timer.stage('add_original')
         await self.add_original(page)
         # 检测上传状态
+        self.timer.stage('wait_transcode')
         await self.detect_upload_status(page)
         if self.publish_date != 0:
+            self.timer.stage('set_schedule')
             await self.set_schedule_time_tencent(page, self.publish_date)
         # 添加短标题
+        self.timer.stage('add_short_title')
         await self.add_short_title(page)
 
+        self.timer.stage('publish')
         await self.click_publish(page)
 
+        self.timer.stage('save_cookie')
         await context.storage_state(path=f"{self.account_file}")  # 保存cookie
         tencent_logger.success('  [-]cookie更新完毕！')
-        await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
+        self.timer.end_stage()
         # 关闭浏览器上下文和浏览器实例
-        await context.close()
+        await self.tracer.close_context(context)
         await browser.close()
 
     async def add_short_title(self, page):
-        short_title_element = page.get_by_text("短标题", exact=True).locator("..").locator(
-            "xpath=following-sibling::div").locator(
-            'span input[type="text"]')
+        short_title_element = self.create_page.locator(page, 'short_title_input')
         if await short_title_element.count():
             short_title = format_str_for_short_title(self.title)
             await short_title_element.fill(short_title)
@@ -185,20 +209,19 @@ class TencentVideo(object):
     async def click_publish(self, page):
         while True:
             try:
-                publish_buttion = page.locator('div.form-btns button:has-text("发表")')
+                publish_buttion = self.create_page.locator(page, 'publish_button')
                 if await publish_buttion.count():
                     await publish_buttion.click()
-                await page.wait_for_url("https://channels.weixin.qq.com/platform/post/list", timeout=5000)
+                await self.create_page.wait(page, 'success')
                 tencent_logger.success("  [-]视频发布成功")
                 break
             except Exception as e:
-                current_url = page.url
-                if "https://channels.weixin.qq.com/platform/post/list" in current_url:
+                if self.create_page.matches(page, 'success'):
                     tencent_logger.success("  [-]视频发布成功")
                     break
                 else:
                     tencent_logger.exception(f"  [-] Exception: {e}")
-                    tencent_logger.info("  [-] 视频正在发布中...")
+                    tencent_logger.bind(poll=True).info("  [-] 视频正在发布中...")
                     await asyncio.sleep(0.5)
 
     async def detect_upload_status(self, page):
@@ -206,24 +229,27 @@ class TencentVideo(object):
             # 匹配删除按钮，代表视频上传完毕，如果不存在，代表视频正在上传，则等待
             try:
                 # 匹配删除按钮，代表视频上传完毕
-                if "weui-desktop-btn_disabled" not in await page.get_by_role("button", name="发表").get_attribute(
-                        'class'):
+                if "weui-desktop-btn_disabled" not in await self.create_page.locator(
+                        page, 'publish_state_button').get_attribute('class'):
                     tencent_logger.info("  [-]视频上传完毕")
                     break
                 else:
-                    tencent_logger.info("  [-] 正在上传视频中...")
+                    tencent_logger.bind(poll=True).info("  [-] 正在上传视频中...")
                     await asyncio.sleep(2)
                     # 出错了视频出错
-                    if await page.locator('div.status-msg.error').count() and await page.locator(
-                            'div.media-status-content div.tag-inner:has-text("删除")').count():
+                    if await self.create_page.locator(page, 'upload_error').count() and await self.create_page.locator(
+                            page, 'delete_media').count():
                         tencent_logger.error("  [-] 发现上传出错了...准备重试")
                         await self.handle_upload_error(page)
-            except:
-                tencent_logger.info("  [-] 正在上传视频中...")
+            except UploadError:
+                # 重新上传次数用尽，不再等待
+                raise
+            except Exception:
+                tencent_logger.bind(poll=True).info("  [-] 正在上传视频中...")
                 await asyncio.sleep(2)
 
     async def add_title_tags(self, page):
-        await page.locator("div.input-editor").click()
+        await self.create_page.locator(page, 'title_editor').click()
         await page.keyboard.type(self.title)
         await page.keyboard.press("Enter")
         for index, tag in enumerate(self.tags, start=1):
@@ -232,36 +258,41 @@ class TencentVideo(object):
         tencent_logger.info(f"成功添加hashtag: {len(self.tags)}")
 
     async def add_collection(self, page):
-        collection_elements = page.get_by_text("添加到合集").locator("xpath=following-sibling::div").locator(
-            '.option-list-wrap > div')
+        collection_elements = self.create_page.locator(page, 'collection_options')
         if await collection_elements.count() > 1:
-            await page.get_by_text("添加到合集").locator("xpath=following-sibling::div").click()
+            await self.create_page.locator(page, 'collection_dropdown').click()
             await collection_elements.first.click()
 
     async def add_original(self, page):
-        if await page.get_by_label("视频为原创").count():
-            await page.get_by_label("视频为原创").check()
+        create_page = self.create_page
+        if await create_page.locator(page, 'original_checkbox').count():
+            await create_page.locator(page, 'original_checkbox').check()
         # 检查 "我已阅读并同意 《视频号原创声明使用条款》" 元素是否存在
-        label_locator = await page.locator('label:has-text("我已阅读并同意 《视频号原创声明使用条款》")').is_visible()
+        label_locator = await create_page.locator(page, 'original_terms_label').is_visible()
         if label_locator:
-            await page.get_by_label("我已阅读并同意 《视频号原创声明使用条款》").check()
-            await page.get_by_role("button", name="声明原创").click()
+            await create_page.locator(page, 'original_terms_checkbox').check()
+            await create_page.locator(page, 'original_declare_button').click()
         # 2023年11月20日 wechat更新: 可能新账号或者改版账号，出现新的选择页面
-        if await page.locator('div.label span:has-text("声明原创")').count() and self.category:
+        if await create_page.locator(page, 'original_section').count() and self.category:
             # 因处罚无法勾选原创，故先判断是否可用
-            if not await page.locator('div.declare-original-checkbox input.ant-checkbox-input').is_disabled():
-                await page.locator('div.declare-original-checkbox input.ant-checkbox-input').click()
-                if not await page.locator(
-                        'div.declare-original-dialog label.ant-checkbox-wrapper.ant-checkbox-wrapper-checked:visible').count():
-                    await page.locator('div.declare-original-dialog input.ant-checkbox-input:visible').click()
-            if await page.locator('div.original-type-form > div.form-label:has-text("原创类型"):visible').count():
-                await page.locator('div.form-content:visible').click()  # 下拉菜单
-                await page.locator(
-                    f'div.form-content:visible ul.weui-desktop-dropdown__list li.weui-desktop-dropdown__list-ele:has-text("{self.category}")').first.click()
-                await page.wait_for_timeout(1000)
-            if await page.locator('button:has-text("声明原创"):visible').count():
-                await page.locator('button:has-text("声明原创"):visible').click()
+            if not await create_page.locator(page, 'original_declare_checkbox').is_disabled():
+                await create_page.locator(page, 'original_declare_checkbox').click()
+                if not await create_page.locator(page, 'original_dialog_checked').count():
+                    await create_page.locator(page, 'original_dialog_checkbox').click()
+            if await create_page.locator(page, 'original_type_label').count():
+                await create_page.locator(page, 'original_type_dropdown').click()  # 下拉菜单
+                await create_page.locator(page, 'original_type_option').filter(has_text=self.category).first.click()
+                # 等待下拉菜单收起
+                await wait_quietly(create_page.wait(page, 'original_type_closed'))
+            if await create_page.locator(page, 'original_confirm_button').count():
+                await create_page.locator(page, 'original_confirm_button').click()
 
     async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+        with self.timer:
+            if self.browser_pool is not None:
+                # 复用浏览器池中的 Playwright 驱动和浏览器进程
+                async with self.tracer:
+                    return await self.upload(self.browser_pool.playwright)
+            async with async_playwright() as playwright:
+                async with self.tracer:
+                    await self.upload(playwright)
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.tencent_uploader.main import TencentVideo, weixin_setup
+
+
+class TencentUploader(BaseUploader):
+    platform = 'tencent'
+    name = '视频号'
+
+    async def validate(self, handle=False):
+        return await weixin_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        # category 用于声明原创类型，不需要原创时传 None
+        return TencentVideo(job.title, str(job.file_path), job.tags, job.publish_date, self.account_file, job.category)
@@ -5,10 +5,15 @@ from datetime import datetime
 from playwright.async_api import Playwright, async_playwright
 import os
 import asyncio
+from uploader.page_map import get_page_map
 from uploader.tk_uploader.tk_config import Tk_Locator
 from utils.base_social_media import set_init_script
+from utils.capture import ScreenshotCapture
 from utils.files_times import get_absolute_path
 from utils.log import tiktok_logger
+from utils.network import RetryState, UploadError
+from utils.resource_filter import block_resources
+from utils.waits import wait_for_text, wait_quietly
 
 
 async def cookie_auth(account_file):
@@ -76,6 +81,9 @@ class TiktokVideo(object):
         self.publish_date = publish_date
         self.account_file = account_file
         self.locator_base = None
+        self.upload_retry = RetryState('tiktok', 'reupload')  # 平台提示上传失败时重新上传，按退避限次
+        self.capture = ScreenshotCapture('tiktok')  # 调试截图，失败时才落盘
+        self.upload_page = get_page_map('tiktok').page('upload')  # 页面结构见 uploader/page_maps/tiktok.json
 
 
     async def set_schedule_time(self, page, publish_date):
@@ -122,8 +130,8 @@ class TiktokVideo(object):
         # pick hour first
         await self.locator_base.locator(hour_selector).click()
         # click time button again
-        # 等待某个特定的元素出现或状态变化，表明UI已更新
-        await page.wait_for_timeout(1000)  # 等待500毫秒
+        # 等待小时面板收起，表明UI已更新
+        await wait_quietly(self.locator_base.locator(hour_selector).first.wait_for(state='hidden', timeout=2000))
         await scheduled_picker.locator('div.TUXInputBox').nth(0).click()
         # pick minutes after
         await self.locator_base.locator(minute_selector).click()
@@ -133,7 +141,8 @@ class TiktokVideo(object):
 
     async def handle_upload_error(self, page):
         tiktok_logger.info("video upload error retrying.")
-        select_file_button = self.locator_base.locator('button[aria-label="Select file"]')
+        await self.upload_retry.wait(UploadError('视频上传失败'))
+        select_file_button = self.upload_page.locator(self.locator_base, 'select_file_button')
         async with page.expect_file_chooser() as fc_info:
             await select_file_button.click()
         file_chooser = await fc_info.value
@@ -143,23 +152,23 @@ class TiktokVideo(object):
         browser = await playwright.firefox.launch(headless=False)
         context = await browser.new_context(storage_state=f"{self.account_file}")
         context = await set_init_script(context)
-        page = await context.new_page()
+        await block_resources(context, 'tiktok')
+        page = self.capture.attach(await context.new_page())
 
-        await page.goto("https://www.tiktok.com/creator-center/upload")
+        await page.goto(self.upload_page.url)
         tiktok_logger.info(f'[+]Uploading-------{os.path.basename(self.file_path)}')
 
-        await page.wait_for_url("https://www.tiktok.com/tiktokstudio/upload", timeout=10000)
+        await self.upload_page.wait(page, 'ready')
 
         try:
-            await page.wait_for_selector('iframe[data-tt="Upload_index_iframe"], div.upload-container', timeout=10000)
+            await self.upload_page.wait(page, 'upload_shell')
             tiktok_logger.info("Either iframe or div appeared.")
         except Exception as e:
             tiktok_logger.error("Neither iframe nor div appeared within the timeout.")
 
         await self.choose_base_locator(page)
 
-        upload_button = self.locator_base.locator(
-            'button:has-text("Select video"):visible')
+        upload_button = self.upload_page.locator(self.locator_base, 'select_video_button')
         await upload_button.wait_for(state='visible')  # 确保按钮可见
 
         async with page.expect_file_chooser() as fc_info:
@@ -177,14 +186,13 @@ class TiktokVideo(object):
 
         await context.storage_state(path=f"{self.account_file}")  # save cookie
         tiktok_logger.info('  [-] update cookie！')
-        await asyncio.sleep(2)  # close delay for look the video status
         # close all
         await context.close()
         await browser.close()
 
     async def add_title_tags(self, page):
 
-        editor_locator = self.locator_base.locator('div.public-DraftEditor-content')
+        editor_locator = self.upload_page.locator(self.locator_base, 'editor')
         await editor_locator.click()
 
         await page.keyboard.press("End")
@@ -195,10 +203,9 @@ class TiktokVideo(object):
 
         await page.keyboard.press("End")
 
-        await page.wait_for_timeout(1000)  # 等待1秒
-
         await page.keyboard.insert_text(self.title)
-        await page.wait_for_timeout(1000)  # 等待1秒
+        # 标题写入编辑器后再继续
+        await wait_quietly(wait_for_text(editor_locator, self.title[:20], timeout=3))
         await page.keyboard.press("End")
 
         await page.keyboard.press("Enter")
@@ -207,59 +214,63 @@ class TiktokVideo(object):
         for index, tag in enumerate(self.tags, start=1):
             tiktok_logger.info("Setting the %s tag" % index)
             await page.keyboard.press("End")
-            await page.wait_for_timeout(1000)  # 等待1秒
             await page.keyboard.insert_text("#" + tag + " ")
             await page.keyboard.press("Space")
-            await page.wait_for_timeout(1000)  # 等待1秒
+            # 话题写入编辑器后再删除多余的空格
+            await wait_quietly(wait_for_text(editor_locator, "#" + tag, timeout=3))
 
             await page.keyboard.press("Backspace")
             await page.keyboard.press("End")
 
     async def click_publish(self, page):
-        success_flag_div = '#\\:r9\\:'
+        success_flag = self.upload_page.locator(self.locator_base, 'success_flag')
         while True:
             try:
-                publish_button = self.locator_base.locator('div.btn-post')
+                publish_button = self.upload_page.locator(self.locator_base, 'post_button')
                 if await publish_button.count():
                     await publish_button.click()
 
-                await self.locator_base.locator(success_flag_div).wait_for(state="visible", timeout=3000)
+                await success_flag.wait_for(state="visible", timeout=self.upload_page.waits['success'].timeout)
                 tiktok_logger.success("  [-] video published success")
                 break
             except Exception as e:
-                if await self.locator_base.locator(success_flag_div).count():
+                if await success_flag.count():
                     tiktok_logger.success("  [-]video published success")
                     break
                 else:
                     tiktok_logger.exception(f"  [-] Exception: {e}")
-                    tiktok_logger.info("  [-] video publishing")
-                    await page.screenshot(full_page=True)
+                    tiktok_logger.bind(poll=True).info("  [-] video publishing")
+                    self.capture.capture('publish')
                     await asyncio.sleep(0.5)
 
     async def detect_upload_status(self, page):
         while True:
             try:
-                if await self.locator_base.locator('div.btn-post > button').get_attribute("disabled") is None:
+                if await self.upload_page.locator(self.locator_base, 'post_button_inner').get_attribute("disabled") is None:
                     tiktok_logger.info("  [-]video uploaded.")
                     break
                 else:
-                    tiktok_logger.info("  [-] video uploading...")
+                    tiktok_logger.bind(poll=True).info("  [-] video uploading...")
                     await asyncio.sleep(2)
-                    if await self.locator_base.locator('button[aria-label="Select file"]').count():
+                    if await self.upload_page.locator(self.locator_base, 'select_file_button').count():
                         tiktok_logger.info("  [-] found some error while uploading now retry...")
                         await self.handle_upload_error(page)
-            except:
+            except UploadError:
+                # 重新上传次数用尽，不再等待
+                raise
+            except Exception:
                 tiktok_logger.info("  [-] video uploading...")
                 await asyncio.sleep(2)
 
     async def choose_base_locator(self, page):
         # await page.wait_for_selector('div.upload-container')
-        if await page.locator('iframe[data-tt="Upload_index_iframe"]').count():
-            self.locator_base = self.locator_base
+        if await page.locator(Tk_Locator.tk_iframe).count():
+            self.locator_base = page.frame_locator(Tk_Locator.tk_iframe)
         else:
             self.locator_base = page.locator(Tk_Locator.default) 
 
     async def main(self):
         async with async_playwright() as playwright:
-            await self.upload(playwright)
+            async with self.capture:
+                await self.upload(playwright)
 
@@ -11,6 +11,7 @@ from uploader.tk_uploader.tk_config import Tk_Locator
 from utils.base_social_media import set_init_script
 from utils.files_times import get_absolute_path
 from utils.log import tiktok_logger
+from utils.waits import wait_for_text, wait_quietly
 
 
 async def cookie_auth(account_file):
@@ -126,11 +127,10 @@ class TiktokVideo(object):
         hour_selector = f"span.tiktok-timepicker-left:has-text('{hour_str}')"
         minute_selector = f"span.tiktok-timepicker-right:has-text('{minute_str}')"
 
-        # pick hour first
-        await page.wait_for_timeout(1000)  # 等待500毫秒
+        # pick hour first（click 会等到时间面板展开）
         await self.locator_base.locator(hour_selector).click()
-        # click time button again
-        await page.wait_for_timeout(1000)  # 等待500毫秒
+        # 等待小时面板收起，表明UI已更新
+        await wait_quietly(self.locator_base.locator(hour_selector).first.wait_for(state='hidden', timeout=2000))
         # pick minutes after
         await self.locator_base.locator(minute_selector).click()
 
@@ -190,7 +190,6 @@ class TiktokVideo(object):
 
         await context.storage_state(path=f"{self.account_file}")  # save cookie
         tiktok_logger.info('  [-] update cookie！')
-        await asyncio.sleep(2)  # close delay for look the video status
         # close all
         await context.close()
         await browser.close()
@@ -208,10 +207,9 @@ class TiktokVideo(object):
 
         await page.keyboard.press("End")
 
-        await page.wait_for_timeout(1000)  # 等待1秒
-
         await page.keyboard.insert_text(self.title)
-        await page.wait_for_timeout(1000)  # 等待1秒
+        # 标题写入编辑器后再继续
+        await wait_quietly(wait_for_text(editor_locator, self.title[:20], timeout=3))
         await page.keyboard.press("End")
 
         await page.keyboard.press("Enter")
@@ -220,10 +218,10 @@ class TiktokVideo(object):
         for index, tag in enumerate(self.tags, start=1):
             tiktok_logger.info("Setting the %s tag" % index)
             await page.keyboard.press("End")
-            await page.wait_for_timeout(1000)  # 等待1秒
             await page.keyboard.insert_text("#" + tag + " ")
             await page.keyboard.press("Space")
-            await page.wait_for_timeout(1000)  # 等待1秒
+            # 话题写入编辑器后再删除多余的空格
+            await wait_quietly(wait_for_text(editor_locator, "#" + tag, timeout=3))
 
             await page.keyboard.press("Backspace")
             await page.keyboard.press("End")
@@ -235,9 +233,10 @@ class TiktokVideo(object):
             await self.locator_base.locator(".upload-image-upload-area").click()
             file_chooser = await fc_info.value
             await file_chooser.set_files(self.thumbnail_path)
-        await self.locator_base.locator('div.cover-edit-panel:not(.hide-panel)').get_by_role(
-            "button", name="Confirm").click()
-        await page.wait_for_timeout(3000)  # wait 3s, fix it later
+        cover_panel = self.locator_base.locator('div.cover-edit-panel:not(.hide-panel)')
+        await cover_panel.get_by_role("button", name="Confirm").click()
+        # 封面面板收起表示封面已应用
+        await wait_quietly(cover_panel.first.wait_for(state='hidden', timeout=10000))
 
     async def change_language(self, page):
         # set the language to english
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.tk_uploader.main_chrome import TiktokVideo, tiktok_setup
+
+
+class TiktokUploader(BaseUploader):
+    platform = 'tiktok'
+    name = 'TikTok'
+
+    async def validate(self, handle=False):
+        return await tiktok_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        return TiktokVideo(job.title, job.file_path, job.tags, job.publish_date, self.account_file, job.thumbnail_path)
@@ -1,4 +1,9 @@
+from uploader.page_map import get_page_map
+
+# 选择器定义在 uploader/page_maps/tiktok.json
+_upload_page = get_page_map('tiktok').page('upload')
+
 
 class Tk_Locator(object):
-    tk_iframe = '[data-tt="Upload_index_iframe"]'
-    default = 'body'
+    tk_iframe = _upload_page.selector('iframe')
+    default = _upload_page.selector('root')
@@ -3,47 +3,78 @@ from datetime import datetime
 
 from playwright.async_api import Playwright, async_playwright, Page
 import os
-import asyncio
+import sys
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
+from utils.capture import ScreenshotCapture
 from utils.log import douyin_logger
+from utils.resource_filter import block_resources
+from utils.selector_cache import SelectorResolver
+from utils.timing import UploadTimer
+from utils.waits import wait_for_value, wait_quietly, wait_until
 
+# 发布时可能弹出的验证码
+CAPTCHA_INPUT_SELECTORS = [
+    'input[placeholder*="验证码"]',
+    'input[placeholder*="captcha"]',
+    '.captcha-input',
+    '.verification-code',
+    'input[name*="captcha"]',
+    'input[id*="captcha"]',
+]
+CAPTCHA_CONFIRM_SELECTORS = [
+    'button:has-text("确认")',
+    'button:has-text("提交")',
+    'button:has-text("验证")',
+    '.captcha-submit',
+    '.verify-btn',
+]
+CAPTCHA_WAIT_SECONDS = 60
 
-async def cookie_auth(account_file):
-    """验证今日头条cookie是否有效 - V5版本"""
+
+async def cookie_auth(account_file, browser_pool=None):
+    """验证今日头条cookie是否有效 - V5版本，传入 browser_pool 时在共享浏览器中检查"""
+    if browser_pool is not None:
+        return await _check_cookie(await browser_pool.launch('chromium', headless=True), account_file)
     async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=True)
-        context = await browser.new_context(storage_state=account_file)
+        return await _check_cookie(await playwright.chromium.launch(headless=True), account_file)
+
+
+async def _check_cookie(browser, account_file):
+    context = await browser.new_context(storage_state=account_file)
+    try:
         context = await set_init_script(context)
+        # 只判断是否出现登录入口，图片和统计请求会拖慢网络空闲
+        await block_resources(context, 'toutiao')
         page = await context.new_page()
         
-        try:
-            await page.goto("https://mp.toutiao.com/")
-            await asyncio.sleep(2)
-            
-            # 检查是否需要登录
-            login_elements = await page.locator('text="登录"').count()
-            scan_elements = await page.locator('text="扫码登录"').count()
-            
-            if login_elements == 0 and scan_elements == 0:
-                print(f"[+] cookie 有效")
-                await context.close()
-                await browser.close()
-                return True
-                
-        except Exception as e:
-            print(f"Cookie验证失败: {e}")
+        await page.goto(f"{get_base_url('toutiao')}/")
+        # 登录入口由页面脚本渲染，等网络空闲（最长5秒）后再判断
+        await wait_quietly(page.wait_for_load_state('networkidle', timeout=5000))
+        
+        # 检查是否需要登录
+        login_elements = await page.locator('text="登录"').count()
+        scan_elements = await page.locator('text="扫码登录"').count()
         
-        print("[+] cookie 失效")
+        if login_elements == 0 and scan_elements == 0:
+            print(f"[+] cookie 有效")
+            return True
+            
+    except Exception as e:
+        print(f"Cookie验证失败: {e}")
+    finally:
         await context.close()
         await browser.close()
-        return False
+    
+    print("[+] cookie 失效")
+    return False
 
 
-async def toutiao_setup(account_file, handle=False):
-    """设置今日头条账号 - V5版本"""
-    if not os.path.exists(account_file) or not await cookie_auth(account_file):
+async def toutiao_setup(account_file, handle=False, browser_pool=None):
+    """设置今日头条账号 - V5版本，批量检查多个账号时传入共享的 browser_pool"""
+    if not os.path.exists(account_file) or not await cookie_auth(account_file, browser_pool):
         if not handle:
             return False
         douyin_logger.info('[+] cookie文件不存在或已失效，即将自动打开浏览器，请扫码登录，登陆后会自动生成cookie文件')
@@ -63,7 +94,7 @@ async def toutiao_cookie_gen(account_file):
         page = await context.new_page()
         
         # 访问主页
-        await page.goto("https://mp.toutiao.com/")
+        await page.goto(f"{get_base_url('toutiao')}/")
         print("请在浏览器中登录今日头条账号...")
         print("登录完成后，请在调试器中点击 '继续' 按钮")
         await page.pause()
@@ -84,7 +115,14 @@ class TouTiaoArticle(object):
         self.local_executable_path = LOCAL_CHROME_PATH
         self.cover_path = cover_path
         # 使用正确的发布页面URL
-        self.publish_url = "https://mp.toutiao.com/profile_v4/graphic/publish"
+        self.base_url = get_base_url('toutiao')  # 可指向本地 mock 服务
+        self.publish_url = f"{self.base_url}/profile_v4/graphic/publish"
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.timer = UploadTimer('toutiao', account_file)
+        self.capture = ScreenshotCapture('toutiao', timer=self.timer)  # 调试截图，失败时才落盘
+        self.selectors = SelectorResolver('toutiao')  # 多候选选择器，优先使用上次成功的
+        self.timer.file = title  # 文章没有文件，用标题作为标识
+        self.screenshot_dir = None  # 发布失败时截图的落盘目录
 
     async def close_ai_assistant(self, page):
         """关闭AI助手弹窗"""
@@ -108,6 +146,9 @@ class TouTiaoArticle(object):
                 '[class*="close"]'
             ]
             
+            # 关闭后等遮罩层消失即可继续，没有遮罩时立即返回
+            drawer_mask = page.locator(', '.join(ai_mask_selectors[:3])).first
+
             # 尝试点击关闭按钮
             for selector in close_button_selectors:
                 try:
@@ -115,7 +156,7 @@ class TouTiaoArticle(object):
                     if await close_btn.count() > 0:
                         await close_btn.first.click(timeout=2000)
                         douyin_logger.info(f"✅ 成功关闭AI助手弹窗: {selector}")
-                        await asyncio.sleep(1)
+                        await wait_quietly(drawer_mask.wait_for(state='hidden', timeout=2000))
                         return True
                 except:
                     continue
@@ -123,7 +164,7 @@ class TouTiaoArticle(object):
             # 尝试按ESC键关闭
             try:
                 await page.keyboard.press("Escape")
-                await asyncio.sleep(1)
+                await wait_quietly(drawer_mask.wait_for(state='hidden', timeout=2000))
                 douyin_logger.info("✅ 使用ESC键关闭弹窗")
                 return True
             except:
@@ -133,7 +174,7 @@ class TouTiaoArticle(object):
             try:
                 # 点击页面左上角
                 await page.click('body', position={'x': 10, 'y': 10}, timeout=2000)
-                await asyncio.sleep(1)
+                await wait_quietly(drawer_mask.wait_for(state='hidden', timeout=2000))
                 douyin_logger.info("✅ 点击外部区域关闭弹窗")
                 return True
             except:
@@ -153,7 +194,8 @@ class TouTiaoArticle(object):
         try:
             # 直接访问发布页面
             await page.goto(self.publish_url)
-            await asyncio.sleep(5)  # 等待页面完全加载
+            # 等到标题框和编辑器都渲染出来（或被重定向到登录页）
+            await wait_quietly(wait_until(self._publish_page_ready(page), timeout=15))
             
             # 关闭可能的AI助手弹窗
             await self.close_ai_assistant(page)
@@ -188,6 +230,14 @@ class TouTiaoArticle(object):
             douyin_logger.error(f"访问发布页面失败: {e}")
             return False
 
+    def _publish_page_ready(self, page):
+        async def ready():
+            if "login" in page.url or "auth" in page.url:
+                return True
+            return (await page.locator('textarea[placeholder*="请输入文章标题"]').count() > 0
+                    and await page.locator('.ProseMirror').count() > 0)
+        return ready
+
     async def fill_title(self, page):
         """填写标题 - V5版本，解决遮挡问题"""
         douyin_logger.info("正在填写标题...")
@@ -196,15 +246,16 @@ class TouTiaoArticle(object):
             # 先关闭可能的弹窗
             await self.close_ai_assistant(page)
             
-            # 使用分析得到的准确选择器
-            title_textarea = page.locator('textarea[placeholder*="请输入文章标题"]')
+            title_textarea = await self.selectors.resolve(page, 'title_input', [
+                'textarea[placeholder*="请输入文章标题"]',
+                'textarea[placeholder*="标题"]',
+            ], timeout=5000)
             
-            if await title_textarea.count() > 0:
+            if title_textarea is not None:
                 douyin_logger.info("找到标题输入框")
                 
                 # 确保输入框可见和可编辑
                 await title_textarea.scroll_into_view_if_needed()
-                await asyncio.sleep(1)
                 
                 # 再次关闭弹窗
                 await self.close_ai_assistant(page)
@@ -223,13 +274,10 @@ class TouTiaoArticle(object):
                         # 最后尝试focus
                         await title_textarea.focus()
                 
-                await asyncio.sleep(0.5)
-                
                 # 清空并填写标题
                 await title_textarea.fill("")  # 清空
-                await asyncio.sleep(0.5)
                 await title_textarea.fill(self.title)
-                await asyncio.sleep(1)
+                await wait_quietly(wait_for_value(title_textarea, self.title, timeout=2))
                 
                 # 验证标题是否填写成功
                 filled_value = await title_textarea.input_value()
@@ -240,7 +288,7 @@ class TouTiaoArticle(object):
                     douyin_logger.warning(f"标题填写不完整: 期望='{self.title}', 实际='{filled_value}'")
                     # 尝试重新填写
                     await title_textarea.fill(self.title)
-                    await asyncio.sleep(1)
+                    await wait_quietly(wait_for_value(title_textarea, self.title, timeout=2))
                     filled_value = await title_textarea.input_value()
                     if filled_value == self.title:
                         douyin_logger.info("✅ 标题重新填写成功")
@@ -262,15 +310,16 @@ class TouTiaoArticle(object):
             # 先关闭可能的弹窗
             await self.close_ai_assistant(page)
             
-            # 使用分析得到的准确选择器
-            content_editor = page.locator('.ProseMirror')
+            content_editor = await self.selectors.resolve(page, 'content_editor', [
+                '.ProseMirror',
+                'div[contenteditable="true"]',
+            ], timeout=5000)
             
-            if await content_editor.count() > 0:
+            if content_editor is not None:
                 douyin_logger.info("找到内容编辑器")
                 
                 # 确保编辑器可见
                 await content_editor.scroll_into_view_if_needed()
-                await asyncio.sleep(1)
                 
                 # 再次关闭弹窗
                 await self.close_ai_assistant(page)
@@ -289,16 +338,12 @@ class TouTiaoArticle(object):
                         # 最后尝试focus
                         await content_editor.focus()
                 
-                await asyncio.sleep(1)
-                
                 # 清空现有内容
                 await page.keyboard.press("Control+KeyA")
                 await page.keyboard.press("Delete")
-                await asyncio.sleep(0.5)
                 
-                # 输入新内容
+                # 输入新内容（keyboard.type 返回时已逐字输入完成）
                 await page.keyboard.type(self.content)
-                await asyncio.sleep(2)
                 
                 # 验证内容是否填写成功
                 try:
@@ -338,7 +383,6 @@ class TouTiaoArticle(object):
             content_editor = page.locator('.ProseMirror')
             if await content_editor.count() > 0:
                 await content_editor.click(force=True)
-                await asyncio.sleep(0.5)
                 
                 # 移动到内容末尾
                 await page.keyboard.press("Control+End")
@@ -500,20 +544,11 @@ class TouTiaoArticle(object):
             '[data-testid*="upload"]'
         ]
         
-        for selector in cover_selectors:
-            try:
-                elements = await page.locator(selector).all()
-                for element in elements:
-                    try:
-                        # 检查元素是否可见
-                        is_visible = await element.is_visible()
-                        if is_visible:
-                            douyin_logger.info(f"找到可见的上传元素: {selector}")
-                            return element
-                    except:
-                        continue
-            except:
-                continue
+        # 只探测一次已出现的可见元素，先试上次成功的选择器
+        element = await self.selectors.resolve(page, 'cover_upload', cover_selectors, state='visible', timeout=0)
+        if element is not None:
+            douyin_logger.info("找到可见的上传元素")
+            return element
         
         # 如果没找到明显的上传区域，尝试查找可能触发上传的按钮
         trigger_selectors = [
@@ -523,21 +558,20 @@ class TouTiaoArticle(object):
             'div[role="button"]:has-text("图片")',
         ]
         
-        for selector in trigger_selectors:
+        element = await self.selectors.resolve(page, 'cover_trigger', trigger_selectors, state='visible', timeout=0)
+        if element is not None:
             try:
-                element = page.locator(selector).first
-                if await element.count() > 0 and await element.is_visible():
-                    douyin_logger.info(f"找到可能的封面触发按钮: {selector}")
-                    # 点击按钮可能会显示上传选项
-                    await element.click()
-                    await asyncio.sleep(2)
-                    
-                    # 再次查找文件输入框
-                    file_input = page.locator('input[type="file"]').first
-                    if await file_input.count() > 0:
-                        return file_input
-            except:
-                continue
+                douyin_logger.info("找到可能的封面触发按钮")
+                # 点击按钮可能会显示上传选项
+                await element.click()
+                
+                # 再次查找文件输入框
+                file_input = page.locator('input[type="file"]').first
+                await wait_quietly(file_input.wait_for(state='attached', timeout=2000))
+                if await file_input.count() > 0:
+                    return file_input
+            except Exception:
+                pass
         
         return None
 
@@ -570,7 +604,6 @@ class TouTiaoArticle(object):
                     if tag_name == 'input':
                         await upload_element.set_input_files(self.cover_path)
                         douyin_logger.info("✅ 通过文件输入框上传封面成功")
-                        await asyncio.sleep(3)  # 等待上传完成
                         
                         # 查找并点击保存按钮
                         if await self.handle_cover_save_button(page):
@@ -579,14 +612,13 @@ class TouTiaoArticle(object):
                     else:
                         # 如果是其他元素，点击后查找文件输入框
                         await upload_element.click()
-                        await asyncio.sleep(2)
                         
                         # 查找出现的文件输入框
                         file_input = page.locator('input[type="file"]').first
+                        await wait_quietly(file_input.wait_for(state='attached', timeout=2000))
                         if await file_input.count() > 0:
                             await file_input.set_input_files(self.cover_path)
                             douyin_logger.info("✅ 通过点击触发上传封面成功")
-                            await asyncio.sleep(3)
                             
                             # 查找并点击保存按钮
                             if await self.handle_cover_save_button(page):
@@ -610,7 +642,6 @@ class TouTiaoArticle(object):
                         if accept_attr and 'image' in accept_attr:
                             douyin_logger.info(f"使用图片专用输入框 {i+1}")
                             await file_input.set_input_files(self.cover_path)
-                            await asyncio.sleep(3)
                             douyin_logger.info("✅ 封面上传成功")
                             
                             # 查找并点击保存按钮
@@ -624,7 +655,6 @@ class TouTiaoArticle(object):
                 # 如果没有专用的图片输入框，尝试第一个
                 try:
                     await file_inputs[0].set_input_files(self.cover_path)
-                    await asyncio.sleep(3)
                     douyin_logger.info("✅ 使用第一个文件输入框上传封面成功")
                     
                     # 查找并点击保存按钮
@@ -664,7 +694,6 @@ class TouTiaoArticle(object):
                         }
                     ''', list(file_content))
                     
-                    await asyncio.sleep(3)
                     douyin_logger.info("✅ 模拟拖拽上传完成")
                     
                     # 查找并点击保存按钮
@@ -686,9 +715,6 @@ class TouTiaoArticle(object):
         """处理封面上传后的保存按钮"""
         douyin_logger.info("查找封面保存按钮...")
         
-        # 等待页面更新
-        await asyncio.sleep(2)
-        
         # 可能的保存按钮选择器
         save_button_selectors = [
             # 明确的保存按钮
@@ -728,6 +754,9 @@ class TouTiaoArticle(object):
             '[data-testid*="confirm"]'
         ]
         
+        # 封面上传处理完成后才会出现保存按钮，最多等5秒
+        await wait_quietly(page.locator(', '.join(save_button_selectors[:5])).first.wait_for(state='visible', timeout=5000))
+        
         for selector in save_button_selectors:
             try:
                 button = page.locator(selector).first
@@ -743,7 +772,7 @@ class TouTiaoArticle(object):
                         
                         # 点击保存按钮
                         await button.click(force=True)
-                        await asyncio.sleep(2)
+                        await wait_quietly(button.wait_for(state='hidden', timeout=3000))
                         
                         douyin_logger.info("✅ 封面保存按钮已点击")
                         return True
@@ -767,7 +796,7 @@ class TouTiaoArticle(object):
                     if await close_btn.count() > 0 and await close_btn.is_visible():
                         douyin_logger.info(f"点击弹窗关闭按钮: {selector}")
                         await close_btn.click()
-                        await asyncio.sleep(1)
+                        await wait_quietly(close_btn.wait_for(state='hidden', timeout=2000))
                         return True
                 except:
                     continue
@@ -778,7 +807,6 @@ class TouTiaoArticle(object):
         # 尝试按ESC键关闭可能的弹窗
         try:
             await page.keyboard.press('Escape')
-            await asyncio.sleep(1)
             douyin_logger.info("使用ESC键关闭可能的弹窗")
         except:
             pass
@@ -803,10 +831,11 @@ class TouTiaoArticle(object):
             
             if await schedule_button.count() > 0:
                 await schedule_button.click(force=True)
-                await asyncio.sleep(2)
                 
-                # 查找时间输入框
-                time_inputs = await page.locator('input[type="datetime-local"], input[placeholder*="时间"]').all()
+                # 查找时间输入框（点击定时发布后出现）
+                time_input_locator = page.locator('input[type="datetime-local"], input[placeholder*="时间"]')
+                await wait_quietly(time_input_locator.first.wait_for(state='visible', timeout=3000))
+                time_inputs = await time_input_locator.all()
                 
                 for time_input in time_inputs:
                     try:
@@ -828,6 +857,60 @@ class TouTiaoArticle(object):
         
         return True  # 定时发布设置失败不影响整体发布
 
+    async def check_and_handle_captcha(self, page):
+        """检查并处理发布时弹出的验证码，返回是否可以继续发布"""
+        # 只探测一次，记住命中的候选
+        captcha_input = await self.selectors.resolve(page, 'captcha_input', CAPTCHA_INPUT_SELECTORS,
+                                                     state='visible', timeout=0)
+        if captcha_input is None:
+            return True  # 没有验证码，继续执行
+        
+        douyin_logger.warning("🔍 检测到验证码输入框")
+        # 验证码现场按截图策略采集，发布失败时随其他截图一起落盘
+        self.capture.capture('captcha')
+        
+        douyin_logger.warning("⚠️ 需要输入验证码才能继续发布")
+        douyin_logger.info("💡 浏览器将保持打开状态，请手动输入验证码并点击确认")
+        douyin_logger.info(f"⏰ 最多等待{CAPTCHA_WAIT_SECONDS}秒让用户手动处理验证码...")
+        
+        # 验证码输入框消失即表示已处理
+        try:
+            await captcha_input.wait_for(state='hidden', timeout=CAPTCHA_WAIT_SECONDS * 1000)
+            douyin_logger.info("✅ 验证码已处理，继续发布流程")
+            return True
+        except Exception:
+            pass
+        
+        # 无人值守运行时没有人能输入验证码
+        if not sys.stdin.isatty():
+            douyin_logger.error("❌ 验证码未处理")
+            return False
+        
+        try:
+            douyin_logger.warning(f"⚠️ {CAPTCHA_WAIT_SECONDS}秒内未检测到验证码处理，尝试交互式输入")
+            captcha_code = input("🔢 请输入验证码（直接回车跳过）: ").strip()
+        except (KeyboardInterrupt, EOFError):
+            douyin_logger.warning("❌ 用户取消验证码输入")
+            return False
+        if not captcha_code:
+            douyin_logger.warning("⚠️ 跳过验证码输入，请手动在浏览器中处理")
+            return True  # 让流程继续，用户可以手动处理
+        
+        await captcha_input.fill(captcha_code)
+        douyin_logger.info(f"✅ 验证码已输入: {captcha_code}")
+        confirm_button = await self.selectors.resolve(page, 'captcha_confirm', CAPTCHA_CONFIRM_SELECTORS,
+                                                      state='visible', timeout=2000)
+        if confirm_button is None:
+            douyin_logger.warning("⚠️ 未找到验证码确认按钮，请手动在浏览器中处理")
+            return True
+        try:
+            await confirm_button.click(timeout=2000)
+            douyin_logger.info("✅ 验证码确认按钮已点击")
+            await wait_quietly(captcha_input.wait_for(state='hidden', timeout=5000))
+        except Exception as e:
+            douyin_logger.warning(f"⚠️ 验证码确认失败: {e}，请手动在浏览器中处理")
+        return True
+
     async def publish_article(self, page):
         """发布文章"""
         douyin_logger.info("准备发布文章...")
@@ -835,12 +918,10 @@ class TouTiaoArticle(object):
         # 先关闭可能的弹窗
         await self.close_ai_assistant(page)
         
-        # 等待页面稳定
-        await asyncio.sleep(2)
-        
         try:
             # 使用分析得到的准确按钮选择器
             publish_button = page.locator('button:has-text("预览并发布")')
+            await wait_quietly(publish_button.first.wait_for(state='visible', timeout=5000))
             
             if await publish_button.count() > 0:
                 douyin_logger.info("找到发布按钮: 预览并发布")
@@ -858,12 +939,6 @@ class TouTiaoArticle(object):
                     # 使用force点击避免遮挡
                     await publish_button.click(force=True)
                     
-                    # 等待发布完成或跳转
-                    await asyncio.sleep(5)
-                    
-                    # 检查发布结果
-                    current_url = page.url
-                    
                     # 检查成功指示器
                     success_indicators = [
                         'text="发布成功"',
@@ -873,6 +948,24 @@ class TouTiaoArticle(object):
                         '.success'
                     ]
                     
+                    # 等待发布完成、跳转、进入预览页或弹出验证码，最多5秒
+                    async def published():
+                        if page.url != self.publish_url:
+                            return True
+                        for indicator in success_indicators + ['button:has-text("确认发布")'] + CAPTCHA_INPUT_SELECTORS:
+                            if await page.locator(indicator).count() > 0:
+                                return True
+                        return False
+                    await wait_quietly(wait_until(published, timeout=5))
+                    
+                    # 检查是否有验证码
+                    if not await self.check_and_handle_captcha(page):
+                        douyin_logger.error("❌ 验证码处理失败")
+                        return False
+                    
+                    # 检查发布结果
+                    current_url = page.url
+                    
                     for indicator in success_indicators:
                         if await page.locator(indicator).count() > 0:
                             douyin_logger.success("🎉 文章发布成功！")
@@ -890,7 +983,12 @@ class TouTiaoArticle(object):
                         confirm_button = page.locator('button:has-text("确认发布")')
                         if await confirm_button.count() > 0:
                             await confirm_button.click(force=True)
-                            await asyncio.sleep(3)
+                            await wait_quietly(confirm_button.first.wait_for(state='hidden', timeout=3000))
+                            
+                            # 确认发布时可能再次弹出验证码
+                            if not await self.check_and_handle_captcha(page):
+                                douyin_logger.error("❌ 确认发布时验证码处理失败")
+                                return False
                             douyin_logger.success("🎉 文章发布成功！")
                             return True
                     
@@ -907,83 +1005,127 @@ class TouTiaoArticle(object):
             douyin_logger.error(f"❌ 发布失败: {e}")
             return False
 
-    async def upload(self, playwright: Playwright) -> None:
-        """上传文章到今日头条 - V5版本（解决遮挡问题）"""
-        # 启动浏览器
-        if self.local_executable_path:
-            browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
-        else:
-            browser = await playwright.chromium.launch(headless=False)
-        
+    async def new_context(self, browser):
+        """创建发布用的浏览器上下文：加载账号 cookie、注入脚本、拦截无关资源"""
         context = await browser.new_context(storage_state=f"{self.account_file}")
         context = await set_init_script(context)
-        page = await context.new_page()
-        
+        await block_resources(context, 'toutiao')
+        return context
+
+    async def publish_in_context(self, context, close_page=False):
+        """
+        在已打开的上下文中发布文章，返回是否成功
+        批量发布时同一账号的多篇文章共用一个上下文，每篇文章结束后关闭自己的页面（close_page=True）
+        """
+        page = self.capture.attach(await context.new_page())
         try:
-            douyin_logger.info(f'🚀 开始发布文章: {self.title}')
-            
-            # 1. 导航到发布页面
-            if not await self.navigate_to_publish_page(page):
-                douyin_logger.error("❌ 无法到达发布页面")
-                return
-            
-            # 2. 填写标题
-            if not await self.fill_title(page):
-                douyin_logger.error("❌ 标题填写失败，停止发布")
-                return
-            
-            # 3. 填写内容
-            if not await self.fill_content(page):
-                douyin_logger.error("❌ 内容填写失败，停止发布")
-                return
-            
-            # 4. 添加标签
-            await self.add_tags(page)
-            
-            # 5. 上传封面（必填项）
-            if not await self.upload_cover(page):
-                douyin_logger.error("❌ 封面上传失败，这是必填项，停止发布")
-                return
-            
-            # 6. 设置发布时间
-            await self.set_publish_time(page)
-            
-            # 7. 发布文章
-            if await self.publish_article(page):
-                douyin_logger.success("✅ 文章发布流程完成")
-            else:
-                douyin_logger.error("❌ 文章发布失败")
-            
-            # 保存截图用于调试
-            screenshot_path = f"toutiao_publish_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            await page.screenshot(path=screenshot_path, full_page=True)
-            douyin_logger.info(f"📸 截图已保存: {screenshot_path}")
-            
+            await self._publish_steps(page)
         except Exception as e:
             douyin_logger.error(f"❌ 发布过程中出错: {e}")
-            # 保存错误截图
-            error_screenshot = f"toutiao_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            await page.screenshot(path=error_screenshot, full_page=True)
-            douyin_logger.info(f"📸 错误截图已保存: {error_screenshot}")
-        
+            self.timer.mark_failed()
+            # 保存错误现场截图
+            await self.capture.failure('error')
         finally:
-            # 保存cookie
-            await context.storage_state(path=self.account_file)
-            douyin_logger.info("Cookie已更新")
+            try:
+                # 保存cookie
+                self.timer.stage('save_cookie')
+                await context.storage_state(path=self.account_file)
+                douyin_logger.info("Cookie已更新")
+            except Exception:
+                self.timer.mark_failed()
+                raise
+            finally:
+                # 保存cookie失败也要结束计时和截图；人工确认的等待时间不计入上传耗时
+                self.timer.finish()
+                self.screenshot_dir = await self.capture.finish()
+                if close_page:
+                    await page.close()
+        return not self.timer.failed
+
+    async def _publish_steps(self, page):
+        """发布流程：打开发布页、填写标题和内容、标签、封面、发布时间，最后发布"""
+        douyin_logger.info(f'🚀 开始发布文章: {self.title}')
+        
+        # 1. 导航到发布页面
+        self.timer.stage('goto')
+        if not await self.navigate_to_publish_page(page):
+            douyin_logger.error("❌ 无法到达发布页面")
+            self.timer.mark_failed()
+            return
+        
+        # 2. 填写标题
+        self.timer.stage('fill_title')
+        if not await self.fill_title(page):
+            douyin_logger.error("❌ 标题填写失败，停止发布")
+            self.timer.mark_failed()
+            return
+        
+        # 3. 填写内容
+        self.timer.stage('fill_content')
+        if not await self.fill_content(page):
+            douyin_logger.error("❌ 内容填写失败，停止发布")
+            self.timer.mark_failed()
+            return
+        
+        # 4. 添加标签
+        self.timer.stage('add_tags')
+        await self.add_tags(page)
+        
+        # 5. 上传封面（必填项）
+        self.timer.stage('upload_cover')
+        if not await self.upload_cover(page):
+            douyin_logger.error("❌ 封面上传失败，这是必填项，停止发布")
+            self.timer.mark_failed()
+            return
+        
+        # 6. 设置发布时间
+        self.timer.stage('set_schedule')
+        await self.set_publish_time(page)
+        
+        # 7. 发布文章
+        self.timer.stage('publish')
+        if await self.publish_article(page):
+            douyin_logger.success("✅ 文章发布流程完成")
+        else:
+            douyin_logger.error("❌ 文章发布失败")
+            self.timer.mark_failed()
+        self.timer.end_stage()
+        
+        # 发布结果截图（按截图策略采集，发布失败时落盘）
+        self.capture.capture('publish_result')
+
+    async def upload(self, playwright: Playwright) -> bool:
+        """上传文章到今日头条 - V5版本（解决遮挡问题），返回是否发布成功"""
+        # 启动浏览器
+        self.timer.stage('launch')
+        if self.local_executable_path:
+            browser = await launch_chromium(playwright, self.browser_pool, headless=False, executable_path=self.local_executable_path)
+        else:
+            browser = await launch_chromium(playwright, self.browser_pool, headless=False)
+        
+        context = await self.new_context(browser)
+        try:
+            success = await self.publish_in_context(context)
             
             # 等待用户确认
             print("\n" + "="*50)
             print("📋 请检查发布结果:")
             print("1. 查看浏览器中的发布状态")
             print("2. 登录头条创作者中心确认文章是否发布成功")
-            print("3. 检查截图文件了解详细情况")
+            if self.screenshot_dir:
+                print(f"3. 检查截图了解详细情况: {self.screenshot_dir}")
             print("="*50)
-            input("按回车键关闭浏览器...")
-            
+            # 无人值守运行（mock 服务、压测、定时任务）时不等待输入
+            if sys.stdin.isatty():
+                input("按回车键关闭浏览器...")
+            return success
+        finally:
             await context.close()
             await browser.close()
 
     async def main(self):
-        """主函数"""
-        async with async_playwright() as playwright:
-            await self.upload(playwright) 
\ No newline at end of file
+        """主函数：记录阶段耗时和失败截图，返回是否发布成功"""
+        with self.timer:
+            async with async_playwright() as playwright:
+                async with self.capture:
+                    return await self.upload(playwright) 
\ No newline at end of file
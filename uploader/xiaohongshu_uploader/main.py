@@ -6,9 +6,16 @@ import os
 import asyncio
 
 from conf import LOCAL_CHROME_PATH
-from utils.base_social_media import set_init_script
+from uploader.page_map import get_page_map
+from utils.base_social_media import set_init_script, get_base_url
+from utils.browser_pool import launch_chromium
+from utils.capture import ScreenshotCapture
 from utils.log import xiaohongshu_logger
-from utils.video_converter import convert_video_if_needed, cleanup_converted_files
+from utils.resource_filter import block_resources
+from utils.timing import UploadTimer
+from utils.tracing import TraceRecorder
+from utils.video_converter import convert_video_if_needed, cleanup_converted_file
+from utils.waits import wait_for_value, wait_quietly
 
 
 async def cookie_auth(account_file):
@@ -19,9 +26,9 @@ async def cookie_auth(account_file):
         # 创建一个新的页面
         page = await context.new_page()
         # 访问指定的 URL
-        await page.goto("https://creator.xiaohongshu.com/creator-micro/content/upload")
+        await page.goto(f"{get_base_url('xiaohongshu')}/creator-micro/content/upload")
         try:
-            await page.wait_for_url("https://creator.xiaohongshu.com/creator-micro/content/upload", timeout=5000)
+            await page.wait_for_url(f"{get_base_url('xiaohongshu')}/creator-micro/content/upload", timeout=5000)
         except:
             print("[+] 等待5秒 cookie 失效")
             await context.close()
@@ -58,7 +65,7 @@ async def xiaohongshu_cookie_gen(account_file):
         context = await set_init_script(context)
         # Pause the page, and start recording manually.
         page = await context.new_page()
-        await page.goto("https://creator.xiaohongshu.com/")
+        await page.goto(f"{get_base_url('xiaohongshu')}/")
         await page.pause()
         # 点击调试器的继续，保存cookie
         await context.storage_state(path=account_file)
@@ -75,6 +82,13 @@ class XiaoHongShuVideo(object):
         self.local_executable_path = LOCAL_CHROME_PATH
         self.thumbnail_path = thumbnail_path
         self.location = location  # 地理位置
+        self.browser_pool = None  # 可选的共享浏览器池
+        self.media_metadata = None  # 入库时索引的媒体元数据，用于判断是否需要转码
+        self.base_url = get_base_url('xiaohongshu')  # 可指向本地 mock 服务
+        self.timer = UploadTimer('xiaohongshu', account_file, file_path)
+        self.capture = ScreenshotCapture('xiaohongshu', timer=self.timer)  # 调试截图，失败时才落盘
+        self.tracer = TraceRecorder('xiaohongshu', timer=self.timer)  # 可选的 trace/HAR 录制，失败或超出耗时预算时才保存
+        self.publish_page = get_page_map('xiaohongshu').page('publish')  # 页面结构见 uploader/page_maps/xiaohongshu.json
 
     async def set_schedule_time_xiaohongshu(self, page, publish_date):
         print("  [-] 正在设置定时发布时间...")
@@ -88,29 +102,29 @@ class XiaoHongShuVideo(object):
         # await element.click()
 
         # # 选择包含特定文本内容的 label 元素
-        label_element = page.locator("label:has-text('定时发布')")
+        label_element = self.publish_page.locator(page, 'schedule_radio')
         # # 在选中的 label 元素下点击 checkbox
         await label_element.click()
-        await asyncio.sleep(1)
         publish_date_hour = publish_date.strftime("%Y-%m-%d %H:%M")
         print(f"publish_date_hour: {publish_date_hour}")
 
-        await asyncio.sleep(1)
-        await page.locator('.el-input__inner[placeholder="选择日期和时间"]').click()
+        # 勾选定时发布后日期输入框才出现，click 会等到它可见
+        date_input = self.publish_page.locator(page, 'schedule_input')
+        await date_input.click()
         await page.keyboard.press("Control+KeyA")
         await page.keyboard.type(str(publish_date_hour))
         await page.keyboard.press("Enter")
-
-        await asyncio.sleep(1)
+        await wait_quietly(wait_for_value(date_input, publish_date_hour))
 
     async def handle_upload_error(self, page):
         xiaohongshu_logger.info('视频出错了，重新上传中')
-        await page.locator('div.progress-div [class^="upload-btn-input"]').set_input_files(self.file_path)
+        await self.publish_page.locator(page, 'reupload_input').set_input_files(self.file_path)
 
     async def upload(self, playwright: Playwright) -> None:
         # 检查并转换视频格式（如果需要）
+        self.timer.stage('convert')
         xiaohongshu_logger.info(f"🔍 检查视频格式兼容性...")
-        converted_file_path = convert_video_if_needed(self.file_path, platform="xiaohongshu")
+        converted_file_path = convert_video_if_needed(self.file_path, platform="xiaohongshu", metadata=self.media_metadata)
         if converted_file_path != self.file_path:
             xiaohongshu_logger.info(f"✅ 使用转换后的视频文件: {os.path.basename(converted_file_path)}")
             # 临时更新文件路径
@@ -118,39 +132,44 @@ class XiaoHongShuVideo(object):
         
         try:
             # 使用 Chromium 浏览器启动一个浏览器实例
+            self.timer.stage('launch')
             if self.local_executable_path:
-                browser = await playwright.chromium.launch(headless=False, executable_path=self.local_executable_path)
+                browser = await launch_chromium(playwright, self.browser_pool, headless=False, executable_path=self.local_executable_path)
             else:
-                browser = await playwright.chromium.launch(headless=False)
+                browser = await launch_chromium(playwright, self.browser_pool, headless=False)
             # 创建一个浏览器上下文，使用指定的 cookie 文件
-            context = await browser.new_context(
+            context = await self.tracer.new_context(
+                browser,
                 viewport={"width": 1600, "height": 900},
                 storage_state=f"{self.account_file}"
             )
             context = await set_init_script(context)
+            await block_resources(context, 'xiaohongshu')
 
             # 创建一个新的页面
-            page = await context.new_page()
+            page = self.capture.attach(await context.new_page())
             # 访问指定的 URL
-            await page.goto("https://creator.xiaohongshu.com/publish/publish?from=homepage&target=video")
+            self.timer.stage('goto')
+            await page.goto(self.publish_page.url)
             xiaohongshu_logger.info(f'[+]正在上传-------{os.path.basename(self.file_path)}')
             # 等待页面跳转到指定的 URL，没进入，则自动等待到超时
             xiaohongshu_logger.info(f'[-] 正在打开主页...')
-            await page.wait_for_url("https://creator.xiaohongshu.com/publish/publish?from=homepage&target=video")
+            await self.publish_page.wait(page, 'ready')
             # 点击 "上传视频" 按钮
-            await page.locator("div[class^='upload-content'] input[class='upload-input']").set_input_files(self.file_path)
+            self.timer.stage('set_input_files')
+            await self.publish_page.locator(page, 'file_input').set_input_files(self.file_path)
+            self.timer.stage('wait_transcode')
 
             # 等待页面跳转到指定的 URL 2025.01.08修改在原有基础上兼容两种页面
             while True:
                 try:
                     # 等待upload-input元素出现
-                    upload_input = await page.wait_for_selector('input.upload-input', timeout=3000)
+                    upload_input = await page.wait_for_selector(self.publish_page.selector('upload_input'), timeout=3000)
                     # 获取下一个兄弟元素
-                    preview_new = await upload_input.query_selector(
-                        'xpath=following-sibling::div[contains(@class, "preview-new")]')
+                    preview_new = await upload_input.query_selector(self.publish_page.selector('upload_preview'))
                     if preview_new:
                         # 在preview-new元素中查找包含"上传成功"的stage元素
-                        stage_elements = await preview_new.query_selector_all('div.stage')
+                        stage_elements = await preview_new.query_selector_all(self.publish_page.selector('upload_stage'))
                         upload_success = False
                         for stage in stage_elements:
                             text_content = await page.evaluate('(element) => element.textContent', stage)
@@ -172,7 +191,8 @@ class XiaoHongShuVideo(object):
             # 填充标题和话题
             # 检查是否存在包含输入框的元素
             # 这里为了避免页面变化，故使用相对位置定位：作品标题父级右侧第一个元素的input子元素
-            await asyncio.sleep(1)
+            self.timer.stage('fill_title_tags')
+            await wait_quietly(self.publish_page.wait(page, 'title_ready'))
             xiaohongshu_logger.info(f'  [-] 正在填充标题和话题...')
             
             # 小红书标题长度限制为20个字符，超出则自动截取
@@ -180,18 +200,18 @@ class XiaoHongShuVideo(object):
             if len(self.title) > 20:
                 xiaohongshu_logger.info(f'  [-] 标题长度超过20字符，已自动截取: {self.title} -> {truncated_title}')
             
-            title_container = page.locator('div.input.titleInput').locator('input.d-text')
+            title_container = self.publish_page.locator(page, 'title_input')
             if await title_container.count():
                 await title_container.fill(truncated_title)
             else:
-                titlecontainer = page.locator(".notranslate")
+                titlecontainer = self.publish_page.locator(page, 'title_editor')
                 await titlecontainer.click()
                 await page.keyboard.press("Backspace")
                 await page.keyboard.press("Control+KeyA")
                 await page.keyboard.press("Delete")
                 await page.keyboard.type(truncated_title)
                 await page.keyboard.press("Enter")
-            css_selector = ".ql-editor" # 不能加上 .ql-blank 属性，这样只能获取第一次非空状态
+            css_selector = self.publish_page.selector('tag_editor')  # 不能加上 .ql-blank 属性，这样只能获取第一次非空状态
             for index, tag in enumerate(self.tags, start=1):
                 await page.type(css_selector, "#" + tag)
                 await page.press(css_selector, "Space")
@@ -220,6 +240,7 @@ class XiaoHongShuVideo(object):
             # await self.set_thumbnail(page, self.thumbnail_path)
 
             # 设置地理位置为固定值
+            self.timer.stage('set_location')
             await self.set_location(page, self.location)
 
             # # 頭條/西瓜
@@ -231,51 +252,52 @@ class XiaoHongShuVideo(object):
             #         await page.locator(third_part_element).locator('input.semi-switch-native-control').click()
 
             if self.publish_date != 0:
+                self.timer.stage('set_schedule')
                 await self.set_schedule_time_xiaohongshu(page, self.publish_date)
 
             # 判断视频是否发布成功
+            self.timer.stage('publish')
             while True:
                 try:
                     # 等待包含"定时发布"文本的button元素出现并点击
                     if self.publish_date != 0:
-                        await page.locator('button:has-text("定时发布")').click()
+                        await self.publish_page.locator(page, 'schedule_publish_button').click()
                     else:
-                        await page.locator('button:has-text("发布")').click()
-                    await page.wait_for_url(
-                        "https://creator.xiaohongshu.com/publish/success?**",
-                        timeout=3000
-                    )  # 如果自动跳转到作品页面，则代表发布成功
+                        await self.publish_page.locator(page, 'publish_button').click()
+                    await self.publish_page.wait(page, 'success')  # 如果自动跳转到作品页面，则代表发布成功
                     xiaohongshu_logger.success("  [-]视频发布成功")
                     break
-                except:
-                    xiaohongshu_logger.info("  [-] 视频正在发布中...")
-                    await page.screenshot(full_page=True)
+                except Exception:
+                    xiaohongshu_logger.bind(poll=True).info("  [-] 视频正在发布中...")
+                    self.capture.capture('publish')
                     await asyncio.sleep(0.5)
 
+            self.timer.stage('save_cookie')
             await context.storage_state(path=self.account_file)  # 保存cookie
             xiaohongshu_logger.success('  [-]cookie更新完毕！')
-            await asyncio.sleep(2)  # 这里延迟是为了方便眼睛直观的观看
+            self.timer.end_stage()
             # 关闭浏览器上下文和浏览器实例
-            await context.close()
+            await self.tracer.close_context(context)
             await browser.close()
         
         finally:
             # 清理转换生成的临时文件
             try:
-                cleanup_converted_files()
+                cleanup_converted_file(converted_file_path)
             except Exception as e:
                 xiaohongshu_logger.warning(f"⚠️  清理临时文件时出错: {e}")
     
     async def set_thumbnail(self, page: Page, thumbnail_path: str):
         if thumbnail_path:
-            await page.click('text="选择封面"')
-            await page.wait_for_selector("div.semi-modal-content:visible")
-            await page.click('text="设置竖封面"')
-            await page.wait_for_timeout(2000)  # 等待2秒
-            # 定位到上传区域并点击
-            await page.locator("div[class^='semi-upload upload'] >> input.semi-upload-hidden-input").set_input_files(thumbnail_path)
-            await page.wait_for_timeout(2000)  # 等待2秒
-            await page.locator("div[class^='extractFooter'] button:visible:has-text('完成')").click()
+            await self.publish_page.locator(page, 'cover_button').click()
+            await self.publish_page.wait(page, 'cover_modal')
+            await self.publish_page.locator(page, 'vertical_cover').click()
+            # 竖封面上传区域出现后再选择文件
+            await self.publish_page.wait(page, 'cover_input_ready')
+            await self.publish_page.locator(page, 'cover_input').set_input_files(thumbnail_path)
+            # click 会等到“完成”按钮可见且可用（封面处理完成），点击后等待弹窗关闭
+            await self.publish_page.locator(page, 'cover_done').click()
+            await wait_quietly(self.publish_page.wait(page, 'cover_closed'))
             # finish_confirm_element = page.locator("div[class^='confirmBtn'] >> div:has-text('完成')")
             # if await finish_confirm_element.count():
             #     await finish_confirm_element.click()
@@ -286,31 +308,24 @@ class XiaoHongShuVideo(object):
         
         # 点击地点输入框
         print("等待地点输入框加载...")
-        loc_ele = await page.wait_for_selector('div.d-text.d-select-placeholder.d-text-ellipsis.d-text-nowrap')
+        loc_ele = await page.wait_for_selector(self.publish_page.selector('location_select'))
         print(f"已定位到地点输入框: {loc_ele}")
         await loc_ele.click()
         print("点击地点输入框完成")
         
         # 输入位置名称
-        print(f"等待1秒后输入位置名称: {location}")
-        await page.wait_for_timeout(1000)
+        print(f"输入位置名称: {location}")
         await page.keyboard.type(location)
         print(f"位置名称输入完成: {location}")
         
         # 等待下拉列表加载
         print("等待下拉列表加载...")
-        dropdown_selector = 'div.d-popover.d-popover-default.d-dropdown.--size-min-width-large'
-        await page.wait_for_timeout(3000)
         try:
-            await page.wait_for_selector(dropdown_selector, timeout=3000)
+            await self.publish_page.wait(page, 'location_dropdown')
             print("下拉列表已加载")
         except:
             print("下拉列表未按预期显示，可能结构已变化")
         
-        # 增加等待时间以确保内容加载完成
-        print("额外等待1秒确保内容渲染完成...")
-        await page.wait_for_timeout(1000)
-        
         # 尝试更灵活的XPath选择器
         print("尝试使用更灵活的XPath选择器...")
         flexible_xpath = (
@@ -319,15 +334,15 @@ class XiaoHongShuVideo(object):
             f'//div[contains(@class, "d-grid") and contains(@class, "d-options")]'
             f'//div[contains(@class, "name") and text()="{location}"]'
         )
-        await page.wait_for_timeout(3000)
         
         # 尝试定位元素
         print(f"尝试定位包含'{location}'的选项...")
         try:
             # 先尝试使用更灵活的选择器
+            # 搜索结果是异步加载的，直接等待目标选项出现
             location_option = await page.wait_for_selector(
                 flexible_xpath,
-                timeout=3000
+                timeout=8000
             )
             
             if location_option:
@@ -385,7 +400,13 @@ class XiaoHongShuVideo(object):
             return False
 
     async def main(self):
-        async with async_playwright() as playwright:
-            await self.upload(playwright)
+        with self.timer:
+            if self.browser_pool is not None:
+                # 复用浏览器池中的 Playwright 驱动和浏览器进程
+                async with self.tracer, self.capture:
+                    return await self.upload(self.browser_pool.playwright)
+            async with async_playwright() as playwright:
+                async with self.tracer, self.capture:
+                    await self.upload(playwright)
 
 
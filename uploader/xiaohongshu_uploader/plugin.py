@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from uploader.base_uploader import BaseUploader
+from uploader.xiaohongshu_uploader.main import XiaoHongShuVideo, xiaohongshu_setup
+
+
+class XiaoHongShuUploader(BaseUploader):
+    platform = 'xiaohongshu'
+    name = '小红书'
+
+    async def validate(self, handle=False):
+        return await xiaohongshu_setup(self.account_file, handle=handle)
+
+    def create_app(self, job):
+        return XiaoHongShuVideo(job.title, job.file_path, job.tags, job.publish_date, self.account_file,
+                                job.thumbnail_path, location=job.location or "北京市")
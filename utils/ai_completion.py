@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AI 文本生成后端与结果缓存
+同一篇文章先预览再发布、或者重复转发时，AI 增强每次都会重新调用接口，既慢又花钱。
+CompletionCache 按 (模型, 提示词模板版本, 请求内容摘要) 保存生成结果，调用接口前先查缓存：
+- 内容摘要包含完整的消息和生成参数，文章或提示词有任何变化都会重新生成
+- 修改提示词模板时提升模板版本号，旧结果自然失效
+- 超过有效期的结果不再使用，条数超过上限时按最近使用时间淘汰
+
+后端：
+OpenAIBackend   调用 OpenAI ChatCompletion 接口
+StubBackend     本地生成确定性的结果，不访问网络（测试、离线调试）
+
+配置（环境变量）：
+SAU_AI_BACKEND=stub             使用本地 stub 后端，默认 openai
+SAU_AI_CACHE=0                  关闭结果缓存，默认开启
+SAU_AI_CACHE_TTL_DAYS=30        结果有效期（天）
+SAU_AI_CACHE_MAX_ENTRIES=2000   最多保存的结果条数
+SAU_AI_CONCURRENCY=4            异步服务同时进行的生成请求数
+SAU_AI_TIMEOUT=60               异步服务单个请求的等待上限（秒），超时后调用方走不增强的流程
+
+使用方法：
+    cache = default_completion_cache()
+    text = cache.get(model, 'enhance-v1', messages, temperature=0.7)
+    if text is None:
+        text = backend.complete(model, messages, temperature=0.7)
+        cache.put(model, 'enhance-v1', messages, text, temperature=0.7)
+
+异步使用（批量转发时多篇文章、多个提示词并发生成）：
+    service = AsyncCompletionService(backend, cache)
+    text = await service.complete('enhance-v1', model, messages, temperature=0.7)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.metrics import TimedConnection, ai_requests, record_cache
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+
+AI_BACKEND = os.environ.get('SAU_AI_BACKEND', 'openai').lower()
+AI_CACHE_ENABLED = os.environ.get('SAU_AI_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
+AI_CACHE_TTL = float(os.environ.get('SAU_AI_CACHE_TTL_DAYS', '30')) * 86400
+AI_CACHE_MAX_ENTRIES = int(os.environ.get('SAU_AI_CACHE_MAX_ENTRIES', '2000'))
+AI_CONCURRENCY = int(os.environ.get('SAU_AI_CONCURRENCY', '4'))
+AI_TIMEOUT = float(os.environ.get('SAU_AI_TIMEOUT', '60'))
+
+
+def ensure_ai_cache_table(conn):
+    """创建 AI 生成结果缓存表（已存在时跳过）"""
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS ai_completion_cache (
+        model TEXT NOT NULL,
+        template_version TEXT NOT NULL,       -- 提示词模板版本，如 enhance-v1
+        content_hash TEXT NOT NULL,           -- 消息和生成参数的 sha256
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (model, template_version, content_hash)
+    )''')
+    conn.commit()
+
+
+def content_hash(messages, **params):
+    """消息列表和生成参数的摘要"""
+    payload = json.dumps({'messages': messages, 'params': params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache(object):
+    """AI 生成结果缓存（同步接口，异步代码中用 asyncio.to_thread 调用）"""
+
+    def __init__(self, db_file=DB_FILE, ttl=AI_CACHE_TTL, max_entries=AI_CACHE_MAX_ENTRIES):
+        self.db_file = Path(db_file)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._table_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, factory=TimedConnection)
+        if not self._table_ready:
+            ensure_ai_cache_table(conn)
+            self._table_ready = True
+        return conn
+
+    def get(self, model, template_version, messages, **params):
+        """返回缓存的生成结果，没有或已过期时返回 None"""
+        key = (model, template_version, content_hash(messages, **params))
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM ai_completion_cache "
+                    "WHERE model = ? AND template_version = ? AND content_hash = ?",
+                    key
+                ).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    conn.execute(
+                        "UPDATE ai_completion_cache SET accessed_at = ? "
+                        "WHERE model = ? AND template_version = ? AND content_hash = ?",
+                        (now,) + key
+                    )
+                    conn.commit()
+                else:
+                    row = None
+        except sqlite3.Error as e:
+            print(f"⚠️  读取AI结果缓存失败: {e}")
+            row = None
+        record_cache('ai', row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, model, template_version, messages, response, **params):
+        """保存生成结果，并清理过期和超出条数上限的结果"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ai_completion_cache "
+                    "(model, template_version, content_hash, response, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (model, template_version, content_hash(messages, **params), response, now, now)
+                )
+                conn.execute("DELETE FROM ai_completion_cache WHERE created_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM ai_completion_cache WHERE rowid NOT IN "
+                    "(SELECT rowid FROM ai_completion_cache ORDER BY accessed_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  保存AI结果缓存失败: {e}")
+
+
+class OpenAIBackend(object):
+    """OpenAI ChatCompletion 接口"""
+    name = 'openai'
+
+    def __init__(self, api_key):
+        import openai
+        self._openai = openai
+        openai.api_key = api_key
+
+    def complete(self, model, messages, temperature=0.7, max_tokens=None):
+        response = self._openai.ChatCompletion.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+
+class StubBackend(object):
+    """
+    本地 stub 后端，不访问网络，相同请求总是返回相同结果
+
+    :param responder: 可选，responder(model, messages) 返回生成的文本；默认返回 "stub-<请求摘要>"
+    """
+    name = 'stub'
+
+    def __init__(self, responder=None):
+        self.responder = responder
+        self.calls = 0
+
+    def complete(self, model, messages, temperature=0.7, max_tokens=None):
+        self.calls += 1
+        if self.responder is not None:
+            return self.responder(model, messages)
+        return f"stub-{content_hash(messages)[:8]}"
+
+
+class AsyncCompletionService(object):
+    """
+    异步生成服务：后端和缓存的同步调用放到线程中执行，不阻塞事件循环
+    - 同时进行的后端请求不超过 concurrency 个，整批文章共用这个上限
+    - 相同的请求（模型、模板版本、内容摘要都相同）正在进行时，后来的调用直接等待同一个结果
+    - 等待超过 timeout 秒抛出 asyncio.TimeoutError，由调用方走不增强的流程；
+      已发出的请求继续在后台完成并写入缓存，下次可以直接使用
+    """
+
+    def __init__(self, backend, cache=None, concurrency=AI_CONCURRENCY, timeout=AI_TIMEOUT):
+        self.backend = backend
+        self.cache = cache
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._inflight = {}
+
+    async def complete(self, template_version, model, messages, **params):
+        """返回生成的文本，超时抛出 asyncio.TimeoutError，后端错误原样抛出"""
+        key = (model, template_version, content_hash(messages, **params))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._complete(template_version, model, messages, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            ai_requests.inc(result='coalesced')
+        try:
+            # shield: 一个调用方超时不会取消其他调用方也在等待的请求
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            ai_requests.inc(result='timeout')
+            raise
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        # 所有调用方都已超时时没有人读取异常，这里读取一次避免 "exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            ai_requests.inc(result='error')
+
+    async def _complete(self, template_version, model, messages, params):
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, model, template_version, messages, **params)
+            if cached is not None:
+                ai_requests.inc(result='cached')
+                return cached
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            result = await asyncio.to_thread(self.backend.complete, model, messages, **params)
+        ai_requests.inc(result='completed')
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, model, template_version, messages, result, **params)
+        return result
+
+
+def default_backend(api_key=None):
+    """按 SAU_AI_BACKEND 选择后端；openai 后端没有 API Key 时返回 None（跳过 AI 增强）"""
+    if AI_BACKEND == 'stub':
+        return StubBackend()
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    return OpenAIBackend(api_key) if api_key else None
+
+
+def default_completion_cache():
+    """按环境变量配置的默认缓存，关闭时返回 None"""
+    return CompletionCache() if AI_CACHE_ENABLED else None
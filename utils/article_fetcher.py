@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章页面批量下载
+转发工具原来在 async 函数里用 requests.get 逐个下载文章页面，既阻塞事件循环，每次请求也重新建立连接。
+ArticleFetcher 用 aiohttp 并发下载一批链接：
+- 整个批次共用一个会话和连接池，同一站点的连接 keep-alive 复用
+- 每个站点限制并发连接数，并保证相邻两次请求的最小间隔，避免触发站点限流
+- 单个页面失败不影响其他页面，结果按输入顺序返回
+- 传入 HttpCache 时先查缓存，过期的缓存用条件请求重新验证（见 utils/http_cache.py）
+
+配置（环境变量）：
+SAU_FETCH_CONCURRENCY=20        总并发连接数
+SAU_FETCH_PER_HOST=4            每个站点的并发连接数
+SAU_FETCH_HOST_INTERVAL=0.2     同一站点相邻两次请求的最小间隔（秒）
+SAU_FETCH_TIMEOUT=30            单个页面的超时（秒）
+
+使用方法：
+    async with ArticleFetcher(headers=headers) as fetcher:
+        pages = await fetcher.fetch_many(urls)
+    for page in pages:
+        if page.ok:
+            soup = BeautifulSoup(page.text, 'html.parser')
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+from utils.metrics import article_fetch_duration, record_cache
+
+FETCH_CONCURRENCY = int(os.environ.get('SAU_FETCH_CONCURRENCY', '20'))
+FETCH_PER_HOST = int(os.environ.get('SAU_FETCH_PER_HOST', '4'))
+FETCH_HOST_INTERVAL = float(os.environ.get('SAU_FETCH_HOST_INTERVAL', '0.2'))
+FETCH_TIMEOUT = float(os.environ.get('SAU_FETCH_TIMEOUT', '30'))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+class FetchResult(object):
+    """单个页面的下载结果"""
+
+    def __init__(self, url, status=None, text=None, error=None, elapsed=0.0, from_cache=False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.error = error
+        self.elapsed = elapsed
+        self.from_cache = from_cache  # 正文来自本地缓存（新鲜期内或服务器返回 304）
+
+    @property
+    def ok(self):
+        return self.status == 200 and self.text is not None
+
+    def __repr__(self):
+        return (f"FetchResult({self.url!r}, status={self.status}, error={self.error!r}, "
+                f"elapsed={self.elapsed:.2f}, from_cache={self.from_cache})")
+
+
+class ArticleFetcher(object):
+    """并发下载文章页面，按站点限流，连接池在整个批次内复用"""
+
+    def __init__(self, headers=None, concurrency=FETCH_CONCURRENCY, per_host=FETCH_PER_HOST,
+                 host_interval=FETCH_HOST_INTERVAL, timeout=FETCH_TIMEOUT, cache=None):
+        """
+        :param cache: HttpCache，None 表示不使用缓存
+        """
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self._session = None
+        self._host_locks = {}
+        self._last_request = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                             ttl_dns_cache=300, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _wait_turn(self, host):
+        """同一站点的请求之间至少间隔 host_interval 秒"""
+        if self.host_interval <= 0:
+            return
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._last_request.get(host, 0) + self.host_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request[host] = time.monotonic()
+
+    @staticmethod
+    def _decode(body, charset):
+        # 页面未声明编码时按 utf-8 解码（与原来的 response.encoding = 'utf-8' 一致）
+        return body.decode(charset or 'utf-8', errors='replace')
+
+    async def fetch(self, url, headers=None):
+        """下载单个页面，不抛异常，失败信息记录在结果的 error 中"""
+        start = time.monotonic()
+        result = FetchResult(url)
+        request_headers = dict(headers or {})
+
+        entry = cached_body = None
+        if self.cache is not None:
+            try:
+                entry, cached_body = await asyncio.to_thread(self.cache.get, url)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  读取页面缓存失败: {e}")
+            if entry is not None:
+                if entry.is_fresh(self.cache.fresh_seconds):
+                    await self._cache_call(self.cache.touch, url)
+                    record_cache('http', True)
+                    result.status, result.from_cache = 200, True
+                    result.text = self._decode(cached_body, entry.charset)
+                    result.elapsed = time.monotonic() - start
+                    return result
+                request_headers.update(entry.conditional_headers())
+
+        session = await self.open()
+        await self._wait_turn(urlparse(url).netloc.lower())
+        try:
+            async with session.get(url, headers=request_headers) as response:
+                result.status = response.status
+                body = await response.read()
+                if response.status == 304 and entry is not None:
+                    # 服务器确认页面未变化，使用缓存的正文
+                    result.status, result.from_cache = 200, True
+                    result.text = self._decode(cached_body, entry.charset)
+                    await self._cache_call(self.cache.touch, url, validated=True)
+                elif response.status == 200:
+                    result.text = self._decode(body, response.charset)
+                    if self.cache is not None and 'no-store' not in response.headers.get('Cache-Control', ''):
+                        await self._cache_call(self.cache.put, url, body, charset=response.charset,
+                                               etag=response.headers.get('ETag'),
+                                               last_modified=response.headers.get('Last-Modified'))
+                else:
+                    result.error = f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError, LookupError) as e:
+            result.error = str(e) or e.__class__.__name__
+        if self.cache is not None:
+            record_cache('http', result.from_cache)
+        result.elapsed = time.monotonic() - start
+        article_fetch_duration.observe(result.elapsed, result='ok' if result.ok else 'error')
+        return result
+
+    @staticmethod
+    async def _cache_call(func, *args, **kwargs):
+        """缓存读写失败只影响缓存，不影响本次下载结果"""
+        try:
+            await asyncio.to_thread(func, *args, **kwargs)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  写入页面缓存失败: {e}")
+
+    async def fetch_many(self, urls):
+        """并发下载一批页面，按输入顺序返回 [FetchResult]"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+
+async def fetch_page(url, headers=None, cache=None):
+    """下载单个页面（临时会话），返回 FetchResult"""
+    async with ArticleFetcher(headers=headers, cache=cache) as fetcher:
+        return await fetcher.fetch(url)
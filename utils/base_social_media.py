@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import List
 
@@ -9,6 +10,18 @@ SOCIAL_MEDIA_TIKTOK = "tiktok"
 SOCIAL_MEDIA_BILIBILI = "bilibili"
 SOCIAL_MEDIA_KUAISHOU = "kuaishou"
 
+# 各平台创作者中心地址（上传器中的 goto / wait_for_url 都以此为前缀）
+PLATFORM_BASE_URLS = {
+    "douyin": "https://creator.douyin.com",
+    "kuaishou": "https://cp.kuaishou.com",
+    "tencent": "https://channels.weixin.qq.com",
+    "xiaohongshu": "https://creator.xiaohongshu.com",
+    "bilibili": "https://member.bilibili.com",
+    "bilibili_space": "https://space.bilibili.com",
+    "toutiao": "https://mp.toutiao.com",
+    "baijiahao": "https://baijiahao.baidu.com",
+}
+
 
 def get_supported_social_media() -> List[str]:
     return [SOCIAL_MEDIA_DOUYIN, SOCIAL_MEDIA_TENCENT, SOCIAL_MEDIA_TIKTOK, SOCIAL_MEDIA_KUAISHOU]
@@ -18,6 +31,22 @@ def get_cli_action() -> List[str]:
     return ["upload", "login", "watch"]
 
 
+def get_base_url(platform: str) -> str:
+    """
+    获取平台创作者中心地址，按以下顺序覆盖：
+    1. SAU_<PLATFORM>_BASE_URL，如 SAU_DOUYIN_BASE_URL=http://127.0.0.1:8765/douyin
+    2. SAU_MOCK_BASE_URL，指向本地 mock 服务（bench/mock_creator_center.py），自动追加 /<platform>
+    3. 线上默认地址
+    """
+    override = os.environ.get(f"SAU_{platform.upper()}_BASE_URL")
+    if override:
+        return override.rstrip('/')
+    mock_url = os.environ.get("SAU_MOCK_BASE_URL")
+    if mock_url:
+        return f"{mock_url.rstrip('/')}/{platform}"
+    return PLATFORM_BASE_URLS[platform]
+
+
 async def set_init_script(context):
     stealth_js_path = Path(BASE_DIR / "utils/stealth.min.js")
     await context.add_init_script(path=stealth_js_path)
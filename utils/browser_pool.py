@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享浏览器池
+同一事件循环内的多个上传任务共用一个 Playwright 驱动和按启动参数复用的浏览器进程，
+每个任务仍使用独立的浏览器上下文（cookie 互不影响）
+"""
+
+import asyncio
+import os
+
+from playwright.async_api import async_playwright
+
+from utils import metrics
+from utils.job_resources import current_job_resources
+
+
+class PooledBrowser:
+    """共享浏览器的代理对象，上传代码中的 browser.close() 只释放占用，不关闭真实浏览器"""
+
+    def __init__(self, pool, browser):
+        self._pool = pool
+        self._browser = browser
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+    async def new_context(self, **kwargs):
+        context = await self._browser.new_context(**kwargs)
+        self._pool.active_contexts += 1
+        metrics.browser_active_contexts.inc()
+        context.on("close", lambda _: self._pool.context_closed())
+        resources = current_job_resources()
+        if resources is not None:
+            resources.contexts.append(context)
+            context.on("close", lambda _: resources.contexts.remove(context) if context in resources.contexts else None)
+        return context
+
+    async def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release()
+
+
+class BrowserPool:
+    """按启动参数（headless、executable_path）复用浏览器进程"""
+
+    def __init__(self):
+        self.playwright = None
+        self._playwright_manager = None
+        self._browsers = {}
+        self._launch_lock = asyncio.Lock()
+        self.active_contexts = 0
+        self.in_use = 0
+
+    async def start(self):
+        if self.playwright is None:
+            self._playwright_manager = async_playwright()
+            self.playwright = await self._playwright_manager.start()
+        return self
+
+    async def launch(self, browser_type='chromium', **options):
+        """获取（必要时启动）与参数匹配的共享浏览器"""
+        await self.start()
+        key = (browser_type, tuple(sorted((k, repr(v)) for k, v in options.items())))
+        async with self._launch_lock:
+            browser = self._browsers.get(key)
+            if browser is None or not browser.is_connected():
+                browser = await getattr(self.playwright, browser_type).launch(**options)
+                self._browsers[key] = browser
+        self.in_use += 1
+        pooled = PooledBrowser(self, browser)
+        resources = current_job_resources()
+        if resources is not None:
+            resources.browsers.append(pooled)
+        return pooled
+
+    def release(self):
+        self.in_use = max(0, self.in_use - 1)
+
+    def context_closed(self):
+        if self.active_contexts > 0:
+            self.active_contexts -= 1
+            metrics.browser_active_contexts.dec()
+
+    async def close(self):
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        if self._playwright_manager is not None:
+            await self._playwright_manager.__aexit__(None, None, None)
+            self._playwright_manager = None
+            self.playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def launch_chromium(playwright, browser_pool=None, **options):
+    """
+    上传器统一的浏览器启动入口：有浏览器池时复用共享浏览器，否则独立启动
+    设置环境变量 SAU_HEADLESS=1 时强制无头模式（对接 mock 服务、压测、服务器上无人值守运行）
+    """
+    if os.environ.get('SAU_HEADLESS') == '1':
+        options['headless'] = True
+    if browser_pool is not None:
+        return await browser_pool.launch('chromium', **options)
+    return await playwright.chromium.launch(**options)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+调试截图采集
+上传过程中的截图先放入每个任务独立的内存环形缓冲区（按总字节数限制），只有上传失败时才写入磁盘，
+成功的任务不产生任何截图文件
+
+截图策略（环境变量 SAU_SCREENSHOT_MODE）：
+off          不截图
+on-failure   默认值，流程中的截图调用不生效，只在失败时截一张整页图
+sampled      流程中的截图按 SAU_SCREENSHOT_SAMPLE_INTERVAL 秒采样一次，失败时连同失败截图一起落盘
+always       流程中的每次截图调用都生效，任务结束时无论成败都落盘（排查问题用）
+
+其他配置：
+SAU_SCREENSHOT_SAMPLE_INTERVAL=5    sampled 模式下两次截图的最小间隔（秒）
+SAU_SCREENSHOT_BUFFER_MB=8          每个任务的截图缓冲区上限，超出后淘汰最早的截图
+SAU_SCREENSHOT_DIR                  落盘目录，默认 logs/screenshots
+
+使用方法：
+    capture = ScreenshotCapture('douyin', timer=self.timer)
+    async with capture:
+        capture.attach(page)
+        capture.capture('publish')              # 不等待截图完成，立即返回
+        await capture.failure('no_upload_button')  # 失败现场，整页截图
+"""
+
+import asyncio
+import os
+import re
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from conf import BASE_DIR
+
+MODE_OFF = 'off'
+MODE_ON_FAILURE = 'on-failure'
+MODE_SAMPLED = 'sampled'
+MODE_ALWAYS = 'always'
+CAPTURE_MODES = (MODE_OFF, MODE_ON_FAILURE, MODE_SAMPLED, MODE_ALWAYS)
+
+SCREENSHOT_MODE = os.environ.get('SAU_SCREENSHOT_MODE', MODE_ON_FAILURE).lower()
+if SCREENSHOT_MODE not in CAPTURE_MODES:
+    print(f"⚠️  未知的截图策略 {SCREENSHOT_MODE}，使用 {MODE_ON_FAILURE}（可选: {', '.join(CAPTURE_MODES)}）")
+    SCREENSHOT_MODE = MODE_ON_FAILURE
+SCREENSHOT_SAMPLE_INTERVAL = float(os.environ.get('SAU_SCREENSHOT_SAMPLE_INTERVAL', 5))
+SCREENSHOT_BUFFER_BYTES = int(float(os.environ.get('SAU_SCREENSHOT_BUFFER_MB', 8)) * 1024 * 1024)
+SCREENSHOT_DIR = Path(os.environ.get('SAU_SCREENSHOT_DIR') or BASE_DIR / 'logs' / 'screenshots')
+
+# 过程截图只截可视区域并用 JPEG 压缩，浏览器端编码开销远小于整页 PNG
+FRAME_QUALITY = 60
+SCREENSHOT_TIMEOUT = 5000
+
+
+class ScreenshotCapture(object):
+    """单次上传任务的截图采集器"""
+
+    def __init__(self, platform, run_id=None, timer=None, mode=None,
+                 max_bytes=SCREENSHOT_BUFFER_BYTES, sample_interval=SCREENSHOT_SAMPLE_INTERVAL,
+                 output_dir=SCREENSHOT_DIR):
+        self.platform = platform
+        self.timer = timer
+        self.run_id = run_id or (timer.run_id if timer is not None else uuid.uuid4().hex[:12])
+        self.mode = mode or SCREENSHOT_MODE
+        self.max_bytes = max_bytes
+        self.sample_interval = sample_interval
+        self.output_dir = Path(output_dir)
+        self.page = None
+        self.frames = deque()  # (序号, 标签, 时间, 图片字节, 扩展名)
+        self.buffered_bytes = 0
+        self.dropped = 0
+        self._seq = 0
+        self._pending = None
+        self._last_sample = 0.0
+        self._failed = False
+        self._finished = False
+
+    @property
+    def failed(self):
+        return self._failed or bool(self.timer is not None and self.timer.failed)
+
+    def attach(self, page):
+        """绑定当前上传页面，之后的截图调用可省略 page 参数"""
+        self.page = page
+        return page
+
+    def _should_sample(self):
+        if self.mode == MODE_ALWAYS:
+            return True
+        if self.mode != MODE_SAMPLED:
+            return False
+        now = time.monotonic()
+        if now - self._last_sample < self.sample_interval:
+            return False
+        self._last_sample = now
+        return True
+
+    def capture(self, label, page=None):
+        """
+        过程截图：按策略决定是否截图，截图在后台任务中完成，调用方不等待
+        上一张截图还没完成时直接跳过，轮询循环里不会堆积截图任务
+        """
+        page = page or self.page
+        if page is None or self._finished or not self._should_sample():
+            return
+        if self._pending is not None and not self._pending.done():
+            return
+        self._pending = asyncio.ensure_future(self._grab(page, label, full_page=False))
+
+    async def failure(self, label, page=None):
+        """记录失败现场：标记任务失败并立即截一张整页图（页面随后可能被关闭）"""
+        self._failed = True
+        page = page or self.page
+        if self.mode == MODE_OFF or page is None or self._finished:
+            return
+        await self.flush()
+        await self._grab(page, label, full_page=True)
+
+    def mark_failed(self):
+        """上传以返回值表示失败时调用"""
+        self._failed = True
+
+    async def flush(self):
+        """等待进行中的过程截图完成"""
+        if self._pending is not None:
+            await asyncio.gather(self._pending, return_exceptions=True)
+            self._pending = None
+
+    async def _grab(self, page, label, full_page):
+        try:
+            if page.is_closed():
+                return
+            if full_page:
+                data = await page.screenshot(full_page=True, timeout=SCREENSHOT_TIMEOUT)
+            else:
+                data = await page.screenshot(type='jpeg', quality=FRAME_QUALITY, timeout=SCREENSHOT_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️  截图失败 [{label}]: {str(e).splitlines()[0] if str(e) else e}")
+            return
+        self._push(label, data, 'png' if full_page else 'jpg')
+
+    def _push(self, label, data, ext):
+        self._seq += 1
+        self.frames.append((self._seq, label, datetime.now(), data, ext))
+        self.buffered_bytes += len(data)
+        # 环形缓冲：超出上限时淘汰最早的截图，至少保留最新一张
+        while self.buffered_bytes > self.max_bytes and len(self.frames) > 1:
+            dropped = self.frames.popleft()
+            self.buffered_bytes -= len(dropped[3])
+            self.dropped += 1
+
+    def _write_frames(self, frames, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        for seq, label, captured_at, data, ext in frames:
+            safe_label = re.sub(r'[^\w\-]+', '_', label)
+            name = f"{seq:03d}_{captured_at:%H%M%S_%f}_{safe_label}.{ext}"[:120]
+            (directory / name).write_bytes(data)
+        return directory
+
+    async def persist(self):
+        """把缓冲区中的截图写入磁盘（在线程池中写文件，不阻塞事件循环），返回目录"""
+        await self.flush()
+        if not self.frames:
+            return None
+        frames = list(self.frames)
+        self.frames.clear()
+        self.buffered_bytes = 0
+        directory = self.output_dir / f"{self.platform}_{datetime.now():%Y%m%d_%H%M%S}_{self.run_id}"
+        try:
+            await asyncio.to_thread(self._write_frames, frames, directory)
+        except OSError as e:
+            print(f"⚠️  保存截图失败: {e}")
+            return None
+        extra = f"，缓冲区已淘汰 {self.dropped} 张" if self.dropped else ''
+        print(f"📸 已保存 {len(frames)} 张截图{extra}: {directory}")
+        return directory
+
+    async def finish(self, failed=False):
+        """
+        任务结束：失败（或 always 模式）时落盘，否则丢弃缓冲区，重复调用不会重复落盘
+        失败但还没有失败截图时，页面仍打开则补截一张
+        """
+        if self._finished:
+            return None
+        if failed:
+            self._failed = True
+        failed = self.failed
+        if failed and self.mode != MODE_OFF and self.page is not None:
+            await self.flush()
+            if not any(frame[4] == 'png' for frame in self.frames):
+                await self._grab(self.page, 'final', full_page=True)
+        self._finished = True
+        directory = None
+        if failed or self.mode == MODE_ALWAYS:
+            directory = await self.persist()
+        else:
+            await self.flush()
+        self.frames.clear()
+        self.buffered_bytes = 0
+        self.page = None
+        return directory
+
+    async def __aenter__(self):
+        self.frames.clear()
+        self.buffered_bytes = 0
+        self.dropped = 0
+        self._failed = False
+        self._finished = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.finish(failed=exc_type is not None)
+        return False
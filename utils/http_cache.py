@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章页面 HTTP 缓存
+同一链接先 --preview 预览再发布、反复调整排版时，每次都会重新下载完整页面。
+HttpCache 把页面正文按 URL 存到磁盘，同时记录服务器返回的 ETag / Last-Modified：
+1. 缓存在新鲜期内直接使用，不发请求（预览后马上发布的场景）
+2. 过了新鲜期带 If-None-Match / If-Modified-Since 发条件请求，服务器返回 304 时继续用缓存，只更新时间
+3. 返回 200 时覆盖缓存；响应带 Cache-Control: no-store 的页面不缓存
+
+索引保存在 http_cache 表，正文保存在 cache/http/ 目录（按 URL 的 sha1 命名），
+总大小超过上限时按最近访问时间淘汰
+
+配置（环境变量）：
+SAU_HTTP_CACHE=0                关闭缓存，默认开启
+SAU_HTTP_CACHE_FRESH=600        新鲜期（秒），期内不发请求；0 表示每次都条件请求
+SAU_HTTP_CACHE_MAX_MB=200       缓存正文总大小上限（MB）
+
+使用方法：
+    async with ArticleFetcher(cache=HttpCache()) as fetcher:
+        page = await fetcher.fetch(url)    # page.from_cache 表示正文来自缓存
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.metrics import TimedConnection
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+CACHE_DIR = Path(BASE_DIR / "cache" / "http")
+
+CACHE_ENABLED = os.environ.get('SAU_HTTP_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
+CACHE_FRESH_SECONDS = float(os.environ.get('SAU_HTTP_CACHE_FRESH', '600'))
+CACHE_MAX_BYTES = int(float(os.environ.get('SAU_HTTP_CACHE_MAX_MB', '200')) * 1024 * 1024)
+
+
+def ensure_http_cache_table(conn):
+    """创建 HTTP 缓存索引表（已存在时跳过）"""
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS http_cache (
+        url TEXT PRIMARY KEY,
+        body_file TEXT NOT NULL,              -- cache/http/ 下的正文文件名
+        size INTEGER NOT NULL,                -- 正文字节数
+        charset TEXT,                         -- 响应声明的编码
+        etag TEXT,
+        last_modified TEXT,
+        validated_at REAL NOT NULL,           -- 最近一次从服务器确认的时间（时间戳）
+        accessed_at REAL NOT NULL             -- 最近一次使用的时间，用于淘汰
+    )''')
+    conn.commit()
+
+
+class CacheEntry(object):
+    def __init__(self, url, body_file, size, charset, etag, last_modified, validated_at):
+        self.url = url
+        self.body_file = body_file
+        self.size = size
+        self.charset = charset
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = validated_at
+
+    def is_fresh(self, fresh_seconds):
+        return time.time() - self.validated_at < fresh_seconds
+
+    def conditional_headers(self):
+        """重新验证用的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache(object):
+    """按 URL 缓存页面正文，支持条件请求重新验证和按大小淘汰（同步接口，异步代码中用 asyncio.to_thread 调用）"""
+
+    def __init__(self, cache_dir=CACHE_DIR, db_file=DB_FILE, fresh_seconds=CACHE_FRESH_SECONDS,
+                 max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.db_file = Path(db_file)
+        self.fresh_seconds = fresh_seconds
+        self.max_bytes = max_bytes
+        self._table_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, factory=TimedConnection)
+        if not self._table_ready:
+            ensure_http_cache_table(conn)
+            self._table_ready = True
+        return conn
+
+    @staticmethod
+    def _body_file(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+
+    def get(self, url):
+        """返回 (CacheEntry, 正文bytes)，没有缓存或正文文件丢失时返回 (None, None)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT url, body_file, size, charset, etag, last_modified, validated_at FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        entry = CacheEntry(*row)
+        try:
+            body = (self.cache_dir / entry.body_file).read_bytes()
+        except OSError:
+            self.delete(url)
+            return None, None
+        return entry, body
+
+    def put(self, url, body, charset=None, etag=None, last_modified=None):
+        """保存（覆盖）页面正文，并在超过大小上限时淘汰最久未使用的页面"""
+        if len(body) > self.max_bytes:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_file = self._body_file(url)
+        # 先写临时文件再替换，避免并发读到写了一半的正文
+        tmp_path = self.cache_dir / f"{body_file}.{os.getpid()}.tmp"
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, self.cache_dir / body_file)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(url, body_file, size, charset, etag, last_modified, validated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body_file, len(body), charset, etag, last_modified, now, now)
+            )
+            conn.commit()
+        self.evict()
+
+    def touch(self, url, validated=False):
+        """记录使用时间；validated=True 表示服务器刚确认过（304）"""
+        now = time.time()
+        with self._connect() as conn:
+            if validated:
+                conn.execute("UPDATE http_cache SET validated_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            else:
+                conn.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (now, url))
+            conn.commit()
+
+    def delete(self, url):
+        with self._connect() as conn:
+            row = conn.execute("SELECT body_file FROM http_cache WHERE url = ?", (url,)).fetchone()
+            conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            conn.commit()
+        if row:
+            (self.cache_dir / row[0]).unlink(missing_ok=True)
+
+    def evict(self):
+        """总大小超过上限时，按最近访问时间从旧到新删除"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            removed = []
+            for url, body_file, size in conn.execute(
+                    "SELECT url, body_file, size FROM http_cache ORDER BY accessed_at ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                removed.append((url, body_file))
+                total -= size
+            conn.executemany("DELETE FROM http_cache WHERE url = ?", [(url,) for url, _ in removed])
+            conn.commit()
+        for _, body_file in removed:
+            (self.cache_dir / body_file).unlink(missing_ok=True)
+        return len(removed)
+
+
+def default_cache():
+    """按环境变量配置的默认缓存，关闭时返回 None"""
+    return HttpCache() if CACHE_ENABLED else None
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+上传任务占用的浏览器池资源记录
+看门狗（utils/watchdog.py）在任务开始时开始记录，浏览器池（utils/browser_pool.py）把任务打开的浏览器和上下文登记进来，
+任务异常结束（如看门狗超时取消）时统一回收。
+本模块不导入 playwright，入口脚本导入看门狗时不会加载浏览器驱动
+"""
+
+import contextvars
+
+# 当前上传任务从浏览器池占用的浏览器和打开的上下文
+_job_resources = contextvars.ContextVar('sau_job_resources', default=None)
+
+
+class JobResources(object):
+    """单个上传任务占用的浏览器池资源"""
+
+    def __init__(self):
+        self.browsers = []
+        self.contexts = []
+
+    async def release(self):
+        """关闭任务遗留的上下文并归还浏览器，返回关闭的上下文数"""
+        contexts, self.contexts = self.contexts, []
+        browsers, self.browsers = self.browsers, []
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        for browser in browsers:
+            await browser.close()
+        return len(contexts)
+
+
+def current_job_resources():
+    """当前任务的资源记录，没有开始记录时返回 None"""
+    return _job_resources.get()
+
+
+def track_job_resources():
+    """在当前任务中开始记录浏览器池资源，返回 (JobResources, token)，结束时用 token 还原"""
+    resources = JobResources()
+    return resources, _job_resources.set(resources)
+
+
+def untrack_job_resources(token):
+    _job_resources.reset(token)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+固定等待检查
+找出上传代码中固定时长的等待：asyncio.sleep(常数)、time.sleep(常数)、page.wait_for_timeout(常数)，
+这类等待在页面快时白白浪费时间，页面慢时又等不够，应改为条件等待（见 utils/waits.py）
+
+不计入的情况：
+- 位于 while 循环内（轮询间隔）
+- 所在行带有 "# sleep-ok: 原因" 注释（确实需要固定等待，如模拟人工输入节奏）
+
+已有的固定等待记录在 utils/sleep_baseline.json（按文件计数），只有数量超过基线时检查才失败，
+去掉固定等待后用 --update-baseline 更新基线，让数量只减不增
+
+使用方法：
+python -m utils.lint_sleeps                      # 检查 uploader/ 目录
+python -m utils.lint_sleeps --list               # 列出所有固定等待
+python -m utils.lint_sleeps --update-baseline    # 更新基线
+"""
+
+import argparse
+import ast
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = ('uploader',)
+BASELINE_FILE = Path(__file__).resolve().parent / 'sleep_baseline.json'
+ALLOW_MARK = '# sleep-ok'
+
+
+def _is_fixed_sleep(node):
+    """asyncio.sleep(1) / time.sleep(1) / xxx.wait_for_timeout(1000)，参数为数字常量（含 timeout=1000 关键字写法）"""
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+        return False
+    func = node.func
+    if func.attr == 'sleep':
+        if not (isinstance(func.value, ast.Name) and func.value.id in ('asyncio', 'time')):
+            return False
+    elif func.attr != 'wait_for_timeout':
+        return False
+    if node.args:
+        arg = node.args[0]
+    else:
+        arg = next((kw.value for kw in node.keywords if kw.arg in ('delay', 'secs', 'timeout')), None)
+    return isinstance(arg, ast.Constant) and isinstance(arg.value, (int, float))
+
+
+class _SleepFinder(ast.NodeVisitor):
+    def __init__(self, lines):
+        self.lines = lines
+        self.loop_depth = 0
+        self.found = []
+
+    def visit_While(self, node):
+        self.loop_depth += 1
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    def visit_FunctionDef(self, node):
+        # 函数体不继承外层循环
+        depth, self.loop_depth = self.loop_depth, 0
+        self.generic_visit(node)
+        self.loop_depth = depth
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node):
+        if _is_fixed_sleep(node) and not self.loop_depth and ALLOW_MARK not in self.lines[node.lineno - 1]:
+            self.found.append((node.lineno, self.lines[node.lineno - 1].strip()))
+        self.generic_visit(node)
+
+
+def find_fixed_sleeps(path):
+    """返回文件中 [(行号, 代码)]"""
+    source = Path(path).read_text(encoding='utf-8')
+    finder = _SleepFinder(source.splitlines())
+    finder.visit(ast.parse(source, filename=str(path)))
+    return finder.found
+
+
+def scan(paths=DEFAULT_PATHS):
+    """返回 {相对路径: [(行号, 代码)]}"""
+    results = {}
+    for base in paths:
+        base = ROOT / base
+        files = [base] if base.is_file() else sorted(base.rglob('*.py'))
+        for file in files:
+            found = find_fixed_sleeps(file)
+            if found:
+                results[file.relative_to(ROOT).as_posix()] = found
+    return results
+
+
+def load_baseline():
+    if not BASELINE_FILE.exists():
+        return {}
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查上传代码中新增的固定等待')
+    parser.add_argument('paths', nargs='*', default=list(DEFAULT_PATHS), help='检查的目录或文件（相对项目根目录）')
+    parser.add_argument('--list', action='store_true', help='列出所有固定等待')
+    parser.add_argument('--update-baseline', action='store_true', help='用当前结果更新基线')
+    args = parser.parse_args()
+
+    results = scan(args.paths)
+    if args.update_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({path: len(found) for path, found in sorted(results.items())}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"📝 已更新基线: {sum(len(found) for found in results.values())} 处固定等待")
+        return
+
+    baseline = load_baseline()
+    failed = False
+    for path, found in sorted(results.items()):
+        allowed = baseline.get(path, 0)
+        over = len(found) > allowed
+        if over or args.list:
+            mark = '❌' if over else '  '
+            print(f"{mark} {path}: {len(found)} 处固定等待（基线 {allowed}）")
+            for lineno, code in found:
+                print(f"     {lineno:>5}: {code}")
+        failed = failed or over
+    if failed:
+        print("\n新增的固定等待请改为条件等待（utils/waits.py），确需固定等待时在行尾加 '# sleep-ok: 原因'")
+        sys.exit(1)
+    print(f"✅ 固定等待共 {sum(len(found) for found in results.values())} 处，未超过基线")
+
+
+if __name__ == '__main__':
+    main()
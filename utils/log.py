@@ -1,3 +1,13 @@
+import atexit
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 from sys import stdout
 from loguru import logger
@@ -5,6 +15,36 @@ from loguru import logger
 from conf import BASE_DIR
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+# 日志配置（环境变量）：
+# SAU_ENV=production          生产模式，默认开启异步写盘、JSON 结构化日志，关闭 diagnose（不在日志中展开变量值）
+# SAU_LOG_ASYNC=1             文件日志经有界队列由后台线程写盘，队列满时丢弃并计数，不阻塞上传流程
+# SAU_LOG_JSON=1              文件日志每行一条 JSON（含 platform / account / job_id / stage）
+# SAU_LOG_DIAGNOSE=0          异常时不输出变量值
+# SAU_LOG_REPEAT_WINDOW=30    轮询日志（bind(poll=True)）中相同的 INFO 及以下日志在窗口期（秒）内只输出一次，0 为不限制
+# SAU_LOG_QUEUE_SIZE=10000    异步写盘队列长度
+IS_PRODUCTION = os.environ.get('SAU_ENV', '').lower() == 'production'
+LOG_ASYNC = _env_flag('SAU_LOG_ASYNC', IS_PRODUCTION)
+LOG_JSON = _env_flag('SAU_LOG_JSON', IS_PRODUCTION)
+LOG_DIAGNOSE = _env_flag('SAU_LOG_DIAGNOSE', not IS_PRODUCTION)
+LOG_REPEAT_WINDOW = float(os.environ.get('SAU_LOG_REPEAT_WINDOW', 30))
+LOG_QUEUE_SIZE = int(os.environ.get('SAU_LOG_QUEUE_SIZE', 10000))
+
+WARNING_LEVEL_NO = 30
+LOG_ROTATION_BYTES = 10 * 1024 * 1024
+LOG_RETENTION_DAYS = 10
+
+# 结构化字段，随任务上下文传递（asyncio 任务之间互不影响）
+CONTEXT_FIELDS = ('platform', 'account', 'job_id', 'stage')
+_log_fields = contextvars.ContextVar('sau_log_fields', default={})
+
+
 def log_formatter(record: dict) -> str:
     """
     Formatter for log records.
@@ -23,6 +63,197 @@ def log_formatter(record: dict) -> str:
     return f"<fg #70acde>{{time:YYYY-MM-DD HH:mm:ss}}</fg #70acde> | <fg {color}>{{level}}</fg {color}>: <light-white>{{message}}</light-white>\n"
 
 
+def json_formatter(record: dict) -> str:
+    """JSON 日志格式，内容在 _patch_record 中生成"""
+    return "{extra[_json]}\n"
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    在当前任务内为日志附加结构化字段，如：
+    with log_context(platform='douyin', account='user1', job_id=job.job_id):
+        ...
+    """
+    token = _log_fields.set({**_log_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_fields.reset(token)
+
+
+def bind_log_fields(**fields):
+    """更新当前任务的结构化字段（如上传阶段切换），作用到 log_context 结束为止"""
+    _log_fields.set({**_log_fields.get(), **fields})
+
+
+def current_log_fields():
+    """当前任务的结构化字段（platform / account / job_id / stage）"""
+    return dict(_log_fields.get())
+
+
+class RepeatSuppressor(object):
+    """
+    轮询类日志（"正在上传视频中..."）去重：同一业务、同一任务的相同 INFO 及以下日志在窗口期内只输出第一条，
+    窗口期后再次出现时附上被省略的次数
+    只处理轮询循环里显式标记的日志（logger.bind(poll=True).info(...)），其他日志即使重复也照常输出
+    """
+
+    def __init__(self, window, max_keys=2000):
+        self.window = window
+        self.max_keys = max_keys
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        extra = record["extra"]
+        if self.window <= 0 or not extra.get("poll") or record["level"].no >= WARNING_LEVEL_NO:
+            return
+        key = (extra.get("business_name"), extra.get("job_id"), record["level"].no, record["message"])
+        now = record["time"].timestamp()
+        with self._lock:
+            state = self._seen.pop(key, None)
+            if state and now - state[0] < self.window:
+                state[1] += 1
+                extra["_suppressed"] = True
+            else:
+                if state and state[1]:
+                    record["message"] += f"（{self.window:g} 秒内重复 {state[1]} 次已省略）"
+                state = [now, 0]
+            # 重新插入保持最近使用的在末尾，超出上限时淘汰最久未出现的
+            self._seen[key] = state
+            if len(self._seen) > self.max_keys:
+                self._seen.pop(next(iter(self._seen)))
+
+
+_repeat_suppressor = RepeatSuppressor(LOG_REPEAT_WINDOW)
+
+
+def _serialize(record):
+    extra = record["extra"]
+    data = {
+        "time": record["time"].isoformat(timespec='milliseconds'),
+        "level": record["level"].name,
+        "logger": extra.get("business_name", ""),
+        "message": record["message"],
+        "location": f"{record['name']}:{record['function']}:{record['line']}",
+    }
+    for field in CONTEXT_FIELDS:
+        if extra.get(field) is not None:
+            data[field] = extra[field]
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_tb = record["exception"]
+        data["exception"] = ''.join(traceback.format_exception(exc_type, exc_value, exc_tb))
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _patch_record(record):
+    """每条日志只执行一次：补充上下文字段、重复日志去重、生成 JSON"""
+    for field, value in _log_fields.get().items():
+        record["extra"].setdefault(field, value)
+    _repeat_suppressor(record)
+    if LOG_JSON:
+        record["extra"]["_json"] = _serialize(record)
+
+
+def _not_suppressed(record):
+    return not record["extra"].get("_suppressed")
+
+
+class RotatingFileWriter(object):
+    """按大小轮转、按天数清理的日志文件，轮转文件名与 loguru 一致：<名称>.<时间>.log"""
+
+    def __init__(self, path, rotation_bytes=LOG_ROTATION_BYTES, retention_days=LOG_RETENTION_DAYS):
+        self.path = Path(path)
+        self.rotation_bytes = rotation_bytes
+        self.retention_days = retention_days
+        self._file = None
+
+    def write(self, message):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(message)
+        if self._file.tell() >= self.rotation_bytes:
+            self._rotate()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        rotated = self.path.with_name(f"{self.path.stem}.{datetime.now():%Y-%m-%d_%H-%M-%S_%f}{self.path.suffix}")
+        self.path.rename(rotated)
+        cutoff = time.time() - self.retention_days * 86400
+        for old_file in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            try:
+                if old_file.stat().st_mtime < cutoff:
+                    old_file.unlink()
+            except OSError:
+                continue
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BoundedQueueSink(object):
+    """
+    异步日志输出：日志放入有界队列，由后台线程写入 writer
+    队列满时丢弃新日志并计数，下一次写入时补一行丢弃提示，磁盘慢时不会拖慢上传流程
+    owns_writer=True 表示 writer 由本 sink 创建，退出时关闭；stdout 等共用的 writer 只刷新不关闭
+    """
+
+    def __init__(self, writer, maxsize=LOG_QUEUE_SIZE, name='log-writer', owns_writer=False):
+        self.writer = writer
+        self.owns_writer = owns_writer
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def __call__(self, message):
+        try:
+            self._queue.put_nowait(str(message))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _worker(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            try:
+                if dropped:
+                    self.writer.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} | WARNING | 日志队列已满，丢弃 {dropped} 条日志\n")
+                self.writer.write(message)
+                if self._queue.empty():
+                    self.writer.flush()
+            except Exception as e:
+                print(f"⚠️  写入日志失败: {e}")
+
+    def stop(self):
+        """写完队列中剩余的日志后退出"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        if self.owns_writer:
+            self.writer.close()
+        else:
+            try:
+                self.writer.flush()
+            except (OSError, ValueError):
+                pass
+
+
 def create_logger(log_name: str, file_path: str):
     """
     Create custom logger for different business modules.
@@ -31,23 +262,57 @@ def create_logger(log_name: str, file_path: str):
     :returns: Configured logger
     """
     def filter_record(record):
-        return record["extra"].get("business_name") == log_name
+        return record["extra"].get("business_name") == log_name and _not_suppressed(record)
 
-    Path(BASE_DIR / file_path).parent.mkdir(exist_ok=True)
-    logger.add(Path(BASE_DIR / file_path), filter=filter_record, level="INFO", rotation="10 MB", retention="10 days", backtrace=True, diagnose=True)
+    log_file = Path(BASE_DIR / file_path)
+    log_file.parent.mkdir(exist_ok=True)
+    options = {
+        'filter': filter_record,
+        'level': "INFO",
+        'backtrace': LOG_DIAGNOSE,
+        'diagnose': LOG_DIAGNOSE,
+    }
+    if LOG_JSON:
+        options['format'] = json_formatter
+    if LOG_ASYNC:
+        sink = BoundedQueueSink(RotatingFileWriter(log_file), name=f"log-writer-{log_name}", owns_writer=True)
+        logger.add(sink, **options)
+    else:
+        logger.add(log_file, rotation="10 MB", retention="10 days", **options)
     return logger.bind(business_name=log_name)
 
 
 # Remove all existing handlers
 logger.remove()
+logger.configure(patcher=_patch_record)
 # Add a standard console handler
-logger.add(stdout, colorize=True, format=log_formatter)
-
-douyin_logger = create_logger('douyin', 'logs/douyin.log')
-tencent_logger = create_logger('tencent', 'logs/tencent.log')
-xhs_logger = create_logger('xhs', 'logs/xhs.log')
-tiktok_logger = create_logger('tiktok', 'logs/tiktok.log')
-bilibili_logger = create_logger('bilibili', 'logs/bilibili.log')
-kuaishou_logger = create_logger('kuaishou', 'logs/kuaishou.log')
-baijiahao_logger = create_logger('baijiahao', 'logs/baijiahao.log')
-xiaohongshu_logger = create_logger('xiaohongshu', 'logs/xiaohongshu.log')
+if LOG_ASYNC:
+    logger.add(BoundedQueueSink(stdout, name='log-writer-console'), colorize=True, format=log_formatter,
+               filter=_not_suppressed, backtrace=LOG_DIAGNOSE, diagnose=LOG_DIAGNOSE)
+else:
+    logger.add(stdout, colorize=True, format=log_formatter, filter=_not_suppressed,
+               backtrace=LOG_DIAGNOSE, diagnose=LOG_DIAGNOSE)
+
+# 业务日志：变量名 -> (业务名, 日志文件)，首次使用时才创建对应的文件输出
+BUSINESS_LOGGERS = {
+    'douyin_logger': ('douyin', 'logs/douyin.log'),
+    'tencent_logger': ('tencent', 'logs/tencent.log'),
+    'xhs_logger': ('xhs', 'logs/xhs.log'),
+    'tiktok_logger': ('tiktok', 'logs/tiktok.log'),
+    'bilibili_logger': ('bilibili', 'logs/bilibili.log'),
+    'kuaishou_logger': ('kuaishou', 'logs/kuaishou.log'),
+    'baijiahao_logger': ('baijiahao', 'logs/baijiahao.log'),
+    'xiaohongshu_logger': ('xiaohongshu', 'logs/xiaohongshu.log'),
+    'media_logger': ('media', 'logs/media.log'),
+}
+_business_logger_lock = threading.Lock()
+
+
+def __getattr__(name):
+    """from utils.log import douyin_logger 时按需创建业务日志"""
+    if name not in BUSINESS_LOGGERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _business_logger_lock:
+        if name not in globals():
+            globals()[name] = create_logger(*BUSINESS_LOGGERS[name])
+    return globals()[name]
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+素材预览生成工具
+素材入库后在后台线程池中调用ffprobe建立元数据索引，并用ffmpeg生成封面帧(JPEG)和
+低码率预览视频(480p H.264)，前端素材库优先加载预览文件，不再直接拉取原始视频
+"""
+
+import os
+import sqlite3
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.log import media_logger
+from utils.media_probe import probe_media, save_media_metadata
+from utils.metrics import TimedConnection, media_ingest_queue_depth, transcode_duration
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+VIDEO_DIR = Path(BASE_DIR / "videoFile")
+PREVIEW_DIR = VIDEO_DIR / "previews"
+
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv'}
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif'}
+
+# 预览状态
+PREVIEW_PENDING = 'pending'
+PREVIEW_READY = 'ready'
+PREVIEW_FAILED = 'failed'
+PREVIEW_SKIPPED = 'skipped'
+
+
+def ensure_preview_columns(conn):
+    """为旧数据库的 file_records 表补充预览相关字段"""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(file_records)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if 'poster_path' not in columns:
+        cursor.execute("ALTER TABLE file_records ADD COLUMN poster_path TEXT")
+    if 'preview_path' not in columns:
+        cursor.execute("ALTER TABLE file_records ADD COLUMN preview_path TEXT")
+    if 'preview_status' not in columns:
+        cursor.execute(f"ALTER TABLE file_records ADD COLUMN preview_status TEXT DEFAULT '{PREVIEW_PENDING}'")
+    conn.commit()
+
+
+class MediaPreviewGenerator:
+    """封面帧与预览视频生成器"""
+
+    def __init__(self, output_dir=PREVIEW_DIR, max_height=480, video_bitrate='500k', audio_bitrate='64k'):
+        self.output_dir = Path(output_dir)
+        self.max_height = max_height
+        self.video_bitrate = video_bitrate
+        self.audio_bitrate = audio_bitrate
+
+    def poster_path(self, file_path):
+        return self.output_dir / f"{Path(file_path).stem}_poster.jpg"
+
+    def preview_path(self, file_path):
+        return self.output_dir / f"{Path(file_path).stem}_preview.mp4"
+
+    def _run_ffmpeg(self, cmd, timeout):
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg执行失败: {result.stderr[-500:]}")
+
+    def generate_poster(self, input_file):
+        """截取一帧并缩放为JPEG封面，视频过短时退回到第一帧"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.poster_path(input_file)
+        scale = f"scale=-2:'min({self.max_height},ih)'"
+        for seek in ('1', '0'):
+            cmd = [
+                'ffmpeg', '-ss', seek, '-i', str(input_file),
+                '-frames:v', '1',
+                '-vf', scale,
+                '-q:v', '4',
+                '-y', str(output_file)
+            ]
+            try:
+                with transcode_duration.time(kind='poster'):
+                    self._run_ffmpeg(cmd, timeout=60)
+            except RuntimeError:
+                continue
+            if output_file.exists() and output_file.stat().st_size > 0:
+                return output_file
+        raise RuntimeError(f"封面生成失败: {input_file}")
+
+    def generate_preview(self, input_file):
+        """转码为480p低码率H.264预览视频"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.preview_path(input_file)
+        cmd = [
+            'ffmpeg', '-i', str(input_file),
+            '-vf', f"scale=-2:'min({self.max_height},ih)'",
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-b:v', self.video_bitrate,
+            '-maxrate', self.video_bitrate,
+            '-bufsize', '1M',
+            '-c:a', 'aac',
+            '-b:a', self.audio_bitrate,
+            '-ac', '1',
+            '-movflags', '+faststart',
+            '-y', str(output_file)
+        ]
+        with transcode_duration.time(kind='preview'):
+            self._run_ffmpeg(cmd, timeout=900)
+        if not output_file.exists() or output_file.stat().st_size == 0:
+            raise RuntimeError(f"预览视频生成失败: {input_file}")
+        return output_file
+
+    def remove_previews(self, file_path):
+        """删除素材对应的预览文件"""
+        for path in (self.poster_path(file_path), self.preview_path(file_path)):
+            try:
+                if path.exists():
+                    os.remove(path)
+            except OSError as e:
+                media_logger.warning(f"⚠️  删除预览文件失败: {path}, 错误: {e}")
+
+
+class MediaIngestPool:
+    """素材入库后台处理线程池（ffmpeg为子进程，线程即可并行）"""
+
+    def __init__(self, max_workers=2, db_file=DB_FILE, generator=None):
+        self.db_file = db_file
+        self.generator = generator or MediaPreviewGenerator()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='media-ingest')
+        self._schema_checked = False
+        # 已提交、尚未处理完的记录ID，用于区分"生成中"和没有任务的旧记录
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+
+    def _update_record(self, record_id, **fields):
+        with sqlite3.connect(self.db_file, factory=TimedConnection) as conn:
+            if not self._schema_checked:
+                ensure_preview_columns(conn)
+                self._schema_checked = True
+            assignments = ', '.join(f"{key} = ?" for key in fields)
+            conn.execute(f"UPDATE file_records SET {assignments} WHERE id = ?", (*fields.values(), record_id))
+            conn.commit()
+
+    def _probe(self, record_id, file_path):
+        try:
+            save_media_metadata(probe_media(file_path), file_record_id=record_id, db_file=self.db_file)
+            media_logger.info(f"📇 元数据已索引: {file_path.name}")
+        except Exception as e:
+            media_logger.error(f"❌ 元数据提取失败: {file_path.name}, 错误: {e}")
+
+    def _generate(self, record_id, file_path):
+        media_ingest_queue_depth.dec()
+        try:
+            return self._process(record_id, file_path)
+        finally:
+            with self._queued_lock:
+                self._queued.discard(record_id)
+
+    def _process(self, record_id, file_path):
+        file_path = Path(file_path)
+        suffix = file_path.suffix.lower()
+        if suffix not in VIDEO_EXTENSIONS and suffix not in IMAGE_EXTENSIONS:
+            self._update_record(record_id, preview_status=PREVIEW_SKIPPED)
+            return None
+        self._probe(record_id, file_path)
+        try:
+            media_logger.info(f"🎞️  开始生成预览: {file_path.name}")
+            poster = self.generator.generate_poster(file_path)
+            preview = self.generator.generate_preview(file_path) if suffix in VIDEO_EXTENSIONS else None
+            self._update_record(
+                record_id,
+                poster_path=poster.relative_to(VIDEO_DIR).as_posix(),
+                preview_path=preview.relative_to(VIDEO_DIR).as_posix() if preview else None,
+                preview_status=PREVIEW_READY
+            )
+            media_logger.success(f"✅ 预览生成完成: {file_path.name}")
+            return poster, preview
+        except Exception as e:
+            media_logger.error(f"❌ 预览生成失败: {file_path.name}, 错误: {e}")
+            self._update_record(record_id, preview_status=PREVIEW_FAILED)
+            return None
+
+    def submit(self, record_id, file_path):
+        """提交元数据提取与预览生成任务，立即返回 Future"""
+        with self._queued_lock:
+            self._queued.add(record_id)
+        media_ingest_queue_depth.inc()
+        return self.executor.submit(self._generate, record_id, file_path)
+
+    def is_queued(self, record_id):
+        """记录是否已有排队或进行中的预览任务"""
+        with self._queued_lock:
+            return record_id in self._queued
+
+    def backfill(self):
+        """为加字段之前入库的素材补提交预览任务（状态为 pending 且没有封面），返回提交数量"""
+        with sqlite3.connect(self.db_file, factory=TimedConnection) as conn:
+            ensure_preview_columns(conn)
+            self._schema_checked = True
+            rows = conn.execute(
+                "SELECT id, file_path FROM file_records "
+                "WHERE (preview_status IS NULL OR preview_status = ?) AND poster_path IS NULL",
+                (PREVIEW_PENDING,)
+            ).fetchall()
+
+        submitted = 0
+        for record_id, file_name in rows:
+            if self.is_queued(record_id):
+                continue
+            file_path = VIDEO_DIR / file_name
+            if not file_path.exists():
+                # 原文件已不存在，无法生成预览
+                self._update_record(record_id, preview_status=PREVIEW_SKIPPED)
+                continue
+            self.submit(record_id, file_path)
+            submitted += 1
+        if submitted:
+            media_logger.info(f"🔁 已为 {submitted} 个旧素材补提交预览任务")
+        return submitted
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+# 创建全局入库处理池
+media_ingest_pool = MediaIngestPool()
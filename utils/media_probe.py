@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+素材元数据索引
+素材入库时用ffprobe提取一次时长、编码、分辨率、码率、帧率、旋转角度、音轨和内容哈希，
+写入带索引的 media_metadata 表，上传调度和转码判断直接查表，无需重复探测
+"""
+
+import hashlib
+import json
+import sqlite3
+import subprocess
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.metrics import TimedConnection
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+
+MEDIA_METADATA_COLUMNS = (
+    'file_record_id', 'file_path', 'format_name', 'duration', 'width', 'height',
+    'video_codec', 'audio_codec', 'bitrate', 'fps', 'rotation', 'has_audio', 'content_hash'
+)
+
+
+def ensure_media_metadata_table(conn):
+    """创建元数据表及索引（已存在时跳过）"""
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS media_metadata (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_record_id INTEGER,               -- 对应 file_records.id
+        file_path TEXT NOT NULL UNIQUE,       -- 文件绝对路径
+        format_name TEXT,                     -- 容器格式（ffprobe format_name）
+        duration REAL,                        -- 时长（秒）
+        width INTEGER,                        -- 显示宽度（已考虑旋转）
+        height INTEGER,                       -- 显示高度（已考虑旋转）
+        video_codec TEXT,                     -- 视频编码
+        audio_codec TEXT,                     -- 音频编码
+        bitrate INTEGER,                      -- 总码率（bps）
+        fps REAL,                             -- 帧率
+        rotation INTEGER DEFAULT 0,           -- 旋转角度
+        has_audio INTEGER DEFAULT 0,          -- 是否有音轨
+        content_hash TEXT,                    -- 内容SHA-256
+        probed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_record ON media_metadata (file_record_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_hash ON media_metadata (content_hash)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_metadata_duration ON media_metadata (duration)")
+    conn.commit()
+
+
+def compute_content_hash(file_path, chunk_size=1024 * 1024):
+    """分块计算文件SHA-256，避免大文件一次性读入内存"""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _parse_fps(rate):
+    """解析ffprobe的 '30000/1001' 格式帧率"""
+    try:
+        num, den = rate.split('/')
+        return round(int(num) / int(den), 3) if int(den) else None
+    except (AttributeError, ValueError):
+        return None
+
+
+def _parse_rotation(stream):
+    """旋转角度可能在 tags.rotate 或 side_data_list 的 displaymatrix 中"""
+    rotate = stream.get('tags', {}).get('rotate')
+    if rotate is None:
+        for side_data in stream.get('side_data_list', []):
+            if 'rotation' in side_data:
+                rotate = side_data['rotation']
+                break
+    try:
+        return int(float(rotate)) % 360 if rotate is not None else 0
+    except ValueError:
+        return 0
+
+
+def probe_media(file_path):
+    """
+    调用ffprobe提取媒体元数据
+
+    Args:
+        file_path: 媒体文件路径
+
+    Returns:
+        dict: 元数据字典（字段同 media_metadata 表）
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-print_format', 'json',
+        '-show_format', '-show_streams',
+        str(file_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe执行失败: {result.stderr.strip()}")
+
+    info = json.loads(result.stdout or '{}')
+    fmt = info.get('format', {})
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+
+    rotation = _parse_rotation(video) if video else 0
+    width, height = video.get('width'), video.get('height')
+    if rotation in (90, 270):
+        width, height = height, width
+
+    bitrate = fmt.get('bit_rate')
+    duration = fmt.get('duration') or video.get('duration')
+    return {
+        'file_path': str(Path(file_path).resolve()),
+        'format_name': fmt.get('format_name'),
+        'duration': round(float(duration), 3) if duration else None,
+        'width': width,
+        'height': height,
+        'video_codec': video.get('codec_name'),
+        'audio_codec': audio.get('codec_name'),
+        'bitrate': int(bitrate) if bitrate else None,
+        'fps': _parse_fps(video.get('avg_frame_rate') or video.get('r_frame_rate')),
+        'rotation': rotation,
+        'has_audio': 1 if audio else 0,
+        'content_hash': compute_content_hash(file_path),
+    }
+
+
+def save_media_metadata(metadata, file_record_id=None, db_file=DB_FILE):
+    """写入（或覆盖）元数据记录"""
+    row = dict(metadata, file_record_id=file_record_id)
+    placeholders = ', '.join('?' for _ in MEDIA_METADATA_COLUMNS)
+    with sqlite3.connect(db_file, factory=TimedConnection) as conn:
+        ensure_media_metadata_table(conn)
+        conn.execute(
+            f"INSERT OR REPLACE INTO media_metadata ({', '.join(MEDIA_METADATA_COLUMNS)}) VALUES ({placeholders})",
+            tuple(row.get(column) for column in MEDIA_METADATA_COLUMNS)
+        )
+        conn.commit()
+
+
+def _query_metadata(conn, file_path=None, content_hash=None):
+    cursor = conn.cursor()
+    if content_hash:
+        cursor.execute("SELECT * FROM media_metadata WHERE content_hash = ? LIMIT 1", (content_hash,))
+    else:
+        cursor.execute("SELECT * FROM media_metadata WHERE file_path = ?", (str(Path(file_path).resolve()),))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+def get_media_metadata(file_path=None, content_hash=None, db_file=DB_FILE, conn=None):
+    """
+    按文件路径或内容哈希查询已索引的元数据
+
+    Args:
+        conn: 可选的已打开连接，批量查询时复用，避免每次查询都新建连接
+
+    Returns:
+        dict | None: 未索引时返回 None
+    """
+    if conn is not None:
+        return _query_metadata(conn, file_path, content_hash)
+    if not Path(db_file).exists():
+        return None
+    with sqlite3.connect(db_file, factory=TimedConnection) as conn:
+        ensure_media_metadata_table(conn)
+        return _query_metadata(conn, file_path, content_hash)
+
+
+def load_media_metadata(file_paths, db_file=DB_FILE):
+    """
+    用同一个连接批量查询多个文件的元数据，上传任务创建时每个文件只查一次
+
+    Returns:
+        dict: {文件路径: 元数据 | None}
+    """
+    file_paths = list(file_paths)
+    if not file_paths or not Path(db_file).exists():
+        return {file_path: None for file_path in file_paths}
+    with sqlite3.connect(db_file, factory=TimedConnection) as conn:
+        ensure_media_metadata_table(conn)
+        return {file_path: _query_metadata(conn, file_path) for file_path in file_paths}
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程内指标（Prometheus 文本格式）
+提供 Counter / Gauge / Histogram 三种指标，由 sau_backend 的 /metrics 接口统一输出，
+不依赖 prometheus_client；上传、cookie校验、转码、SQLite 查询等处直接调用全局指标对象记录
+"""
+
+import bisect
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 各类耗时的默认分桶（秒）
+UPLOAD_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+COOKIE_CHECK_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+TRANSCODE_BUCKETS = (0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+SQLITE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+FETCH_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(object):
+    type_name = ''
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        if not self.labelnames and self.type_name != 'histogram':
+            # 无标签指标从 0 开始输出
+            self._values[()] = 0
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, label_values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, label_values, extra)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """只增计数器"""
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [('', key, None, value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [('', key, None, value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """分桶直方图，输出 _bucket / _sum / _count"""
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=UPLOAD_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels):
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append(('_bucket', key, ('le', _format_value(bound)), cumulative))
+            samples.append(('_sum', key, None, round(total, 6)))
+            samples.append(('_count', key, None, cumulative))
+        return samples
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """生成 Prometheus 文本格式（text/plain; version=0.0.4）"""
+        with self._lock:
+            metrics = list(self._metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# 上传
+uploads_started = Counter('sau_uploads_started_total', '开始的上传任务数', ['platform'])
+uploads_succeeded = Counter('sau_uploads_succeeded_total', '成功的上传任务数', ['platform'])
+uploads_failed = Counter('sau_uploads_failed_total', '失败的上传任务数', ['platform'])
+upload_duration = Histogram('sau_upload_duration_seconds', '单个上传任务耗时', ['platform'], buckets=UPLOAD_BUCKETS)
+upload_bytes = Counter('sau_upload_bytes_total', '成功上传的文件字节数', ['platform'])
+upload_queue_depth = Gauge('sau_upload_queue_depth', '等待执行的上传任务数', ['platform'])
+uploads_in_progress = Gauge('sau_uploads_in_progress', '正在执行的上传任务数', ['platform'])
+upload_stage_timeouts = Counter('sau_upload_stage_timeouts_total', '被看门狗取消的上传任务数（按超时阶段）',
+                                ['platform', 'stage'])
+
+# 重试
+retry_attempts = Counter('sau_retry_attempts_total', '重试次数', ['platform', 'operation', 'error_class'])
+retry_giveups = Counter('sau_retry_giveups_total', '放弃重试次数（auth / rejected / max_attempts / timeout / budget）',
+                        ['platform', 'operation', 'reason'])
+
+# 浏览器
+browser_active_contexts = Gauge('sau_browser_active_contexts', '浏览器池中打开的浏览器上下文数')
+blocked_requests = Counter('sau_blocked_requests_total', '上传页面被拦截的资源请求数', ['platform', 'resource_type'])
+
+# cookie 校验
+cookie_check_duration = Histogram('sau_cookie_check_seconds', 'cookie校验耗时', ['platform', 'result'],
+                                  buckets=COOKIE_CHECK_BUCKETS)
+
+# 缓存命中（命中率 = hit / (hit + miss)）
+cache_requests = Counter('sau_cache_requests_total', '缓存查询次数', ['cache', 'result'])
+
+# 素材处理
+transcode_duration = Histogram('sau_transcode_seconds', 'ffmpeg转码耗时', ['kind'], buckets=TRANSCODE_BUCKETS)
+media_ingest_queue_depth = Gauge('sau_media_ingest_queue_depth', '等待处理的素材入库任务数')
+
+# 文章抓取
+article_fetch_duration = Histogram('sau_article_fetch_seconds', '文章页面下载耗时', ['result'], buckets=FETCH_BUCKETS)
+
+# AI 增强
+ai_requests = Counter('sau_ai_requests_total', 'AI生成请求数（cached / coalesced / completed / timeout / error）',
+                      ['result'])
+
+# SQLite
+sqlite_query_duration = Histogram('sau_sqlite_query_seconds', 'SQLite语句执行耗时', ['operation'],
+                                  buckets=SQLITE_BUCKETS)
+
+
+def record_cache(cache, hit):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def _sql_operation(sql):
+    words = sql.lstrip().split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+
+class TimedCursor(sqlite3.Cursor):
+    """记录语句耗时的游标"""
+
+    def execute(self, sql, parameters=()):
+        with sqlite_query_duration.time(operation=_sql_operation(sql)):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with sqlite_query_duration.time(operation=_sql_operation(sql)):
+            return super().executemany(sql, seq_of_parameters)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    记录语句耗时的连接，用法：
+    sqlite3.connect(db_file, factory=TimedConnection)
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def render_metrics():
+    return REGISTRY.render()
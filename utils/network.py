@@ -1,28 +1,251 @@
+"""
+重试引擎
+按错误类型决定是否重试：
+- cookie 失效（auth）：立即失败，由上层把账号标记为失效
+- 平台拒绝（rejected，如内容违规、格式不支持）：不重试
+- 网络抖动、超时等（transient）及未识别的错误：指数退避 + 随机抖动后重试
+每个平台有独立的重试策略和重试预算（滑动窗口内的最大重试次数），平台整体异常时不会因大量重试浪费浏览器时间
+
+使用方法：
+    @async_retry(timeout=300, platform='baijiahao')
+    async def publish_video(self, page): ...
+
+    @retry(platform='xhs_sign')
+    def sign_local(...): ...
+
+    # 手写的重试循环
+    retry_state = RetryState('douyin', 'reupload')
+    await retry_state.wait(error)   # 超出次数或预算时抛出 RetryExhaustedError
+"""
+
 import asyncio
+import os
+import random
+import threading
 import time
+from collections import deque
 from functools import wraps
 
+from utils import metrics
+
+ERROR_TRANSIENT = 'transient'
+ERROR_AUTH = 'auth'
+ERROR_REJECTED = 'rejected'
+
+# 按错误信息识别（Playwright 等库的异常没有细分类型）
+AUTH_KEYWORDS = ('cookie失效', 'cookie无效', 'cookie已失效', '扫码登录', '手机号登录', '请先登录', '登录已过期')
+REJECTED_KEYWORDS = ('违规', '审核不通过', '不支持的格式', '格式不支持', '文件过大', '超过上限', '重复上传', '账号被封')
+
+
+class UploadError(Exception):
+    """上传错误基类，error_class 决定重试策略"""
+    error_class = ERROR_TRANSIENT
+
+
+class CookieExpiredError(UploadError):
+    """cookie 失效，重试无意义"""
+    error_class = ERROR_AUTH
+
+
+class PlatformRejectedError(UploadError):
+    """平台明确拒绝（内容、格式、频率等），重试无意义"""
+    error_class = ERROR_REJECTED
+
+
+class RetryExhaustedError(UploadError):
+    """重试次数、时间或平台重试预算用尽"""
+    error_class = ERROR_REJECTED
+
+
+def classify_error(error):
+    """错误分类：auth / rejected / transient，未识别的按 transient 处理"""
+    if isinstance(error, UploadError):
+        return error.error_class
+    message = str(error).lower()
+    if any(keyword in message for keyword in AUTH_KEYWORDS):
+        return ERROR_AUTH
+    if any(keyword in message for keyword in REJECTED_KEYWORDS):
+        return ERROR_REJECTED
+    return ERROR_TRANSIENT
+
+
+class RetryPolicy(object):
+    """重试策略：最大尝试次数 + 指数退避（带抖动）"""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, multiplier=2.0, jitter=0.5):
+        self.max_attempts = max_attempts  # None 表示只受超时和预算限制
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter  # 抖动比例，0.5 表示在 [50%, 100%] 的退避时间内随机
+
+    def backoff(self, attempt):
+        """第 attempt 次失败后的等待秒数"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class RetryBudget(object):
+    """平台重试预算：window 秒内最多重试 max_retries 次，超出后新的失败不再重试"""
+
+    def __init__(self, max_retries=30, window=60.0):
+        self.max_retries = max_retries
+        self.window = window
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._retries and now - self._retries[0] > self.window:
+                self._retries.popleft()
+            if len(self._retries) >= self.max_retries:
+                return False
+            self._retries.append(now)
+            return True
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# 各平台重试策略，上传页面较重的平台退避更久
+PLATFORM_RETRY_POLICIES = {
+    'douyin': RetryPolicy(max_attempts=3, base_delay=2.0),
+    'tencent': RetryPolicy(max_attempts=3, base_delay=2.0),
+    'kuaishou': RetryPolicy(max_attempts=3, base_delay=2.0),
+    'xiaohongshu': RetryPolicy(max_attempts=3, base_delay=2.0),
+    'bilibili': RetryPolicy(max_attempts=3, base_delay=3.0),
+    'baijiahao': RetryPolicy(max_attempts=5, base_delay=1.0),
+    'xhs_sign': RetryPolicy(max_attempts=10, base_delay=0.5, max_delay=5.0),
+}
 
-def async_retry(timeout=60, max_retries=None):
+# 平台重试预算（window 内最大重试次数），可用 SAU_RETRY_BUDGET_<平台> 覆盖
+DEFAULT_RETRY_BUDGET = int(os.environ.get('SAU_RETRY_BUDGET', 30))
+RETRY_BUDGET_WINDOW = 60.0
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+
+def get_retry_policy(platform):
+    return PLATFORM_RETRY_POLICIES.get(platform, DEFAULT_RETRY_POLICY)
+
+
+def get_retry_budget(platform):
+    platform = platform or 'default'
+    with _budgets_lock:
+        budget = _budgets.get(platform)
+        if budget is None:
+            max_retries = int(os.environ.get(f"SAU_RETRY_BUDGET_{platform.upper()}", DEFAULT_RETRY_BUDGET))
+            budget = _budgets[platform] = RetryBudget(max_retries, RETRY_BUDGET_WINDOW)
+        return budget
+
+
+class RetryState(object):
+    """
+    一次操作的重试状态：判断失败是否值得重试，值得时按策略退避
+    async_retry / retry 装饰器和手写的重试循环共用
+    """
+
+    def __init__(self, platform=None, operation='', policy=None, timeout=None):
+        self.platform = platform or 'default'
+        self.operation = operation
+        self.policy = policy or get_retry_policy(platform)
+        self.timeout = timeout
+        self.attempts = 0
+        self._started_at = time.monotonic()
+
+    def next_delay(self, error=None):
+        """记录一次失败，返回重试前的等待秒数；不应重试时抛出（原错误作为 __cause__）"""
+        self.attempts += 1
+        error_class = classify_error(error) if error is not None else ERROR_TRANSIENT
+        reason = None
+        if error_class == ERROR_AUTH:
+            reason = ERROR_AUTH
+        elif error_class == ERROR_REJECTED:
+            reason = ERROR_REJECTED
+        elif self.policy.max_attempts is not None and self.attempts >= self.policy.max_attempts:
+            reason = 'max_attempts'
+        elif self.timeout is not None and time.monotonic() - self._started_at > self.timeout:
+            reason = 'timeout'
+        elif not get_retry_budget(self.platform).acquire():
+            reason = 'budget'
+        if reason is not None:
+            metrics.retry_giveups.inc(platform=self.platform, operation=self.operation, reason=reason)
+            self._give_up(error, reason)
+        metrics.retry_attempts.inc(platform=self.platform, operation=self.operation, error_class=error_class)
+        return self.policy.backoff(self.attempts)
+
+    def _give_up(self, error, reason):
+        if reason in (ERROR_AUTH, ERROR_REJECTED) and error is not None:
+            raise error
+        messages = {
+            'max_attempts': f"重试 {self.attempts} 次后仍失败",
+            'timeout': f"超过 {self.timeout} 秒仍未成功",
+            'budget': f"{self.platform} 重试预算已用尽",
+        }
+        raise RetryExhaustedError(f"{self.operation or '操作'}{messages[reason]}: {error}") from error
+
+    def _log(self, error, delay):
+        print(f"🔁 {self.operation or '操作'}第 {self.attempts} 次失败: {error}，{delay:.1f} 秒后重试")
+
+    async def wait(self, error=None):
+        """记录一次失败并退避等待，不应重试时抛出"""
+        delay = self.next_delay(error)
+        self._log(error, delay)
+        await asyncio.sleep(delay)
+
+    def wait_sync(self, error=None):
+        delay = self.next_delay(error)
+        self._log(error, delay)
+        time.sleep(delay)
+
+
+def async_retry(timeout=60, max_retries=None, platform=None, policy=None):
+    """
+    重试装饰器
+    :param timeout: 总重试时间上限（秒）
+    :param max_retries: 最大尝试次数，默认使用平台策略；显式传入时覆盖策略中的次数
+    :param platform: 平台标识，决定重试策略和重试预算
+    """
     def decorator(func):
+        retry_policy = policy or get_retry_policy(platform)
+        if max_retries is not None or policy is None and platform is None:
+            # 兼容原有用法：未指定平台时只按 timeout / max_retries 限制
+            retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=retry_policy.base_delay,
+                                       max_delay=retry_policy.max_delay, multiplier=retry_policy.multiplier,
+                                       jitter=retry_policy.jitter)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            start_time = time.time()
-            attempts = 0
+            state = RetryState(platform, func.__name__, retry_policy, timeout)
             while True:
                 try:
                     return await func(*args, **kwargs)
                 except Exception as e:
-                    attempts += 1
-                    if max_retries is not None and attempts >= max_retries:
-                        print(f"Reached maximum retries of {max_retries}.")
-                        raise Exception(f"Failed after {max_retries} retries.") from e
-                    if time.time() - start_time > timeout:
-                        print(f"Function timeout after {timeout} seconds.")
-                        raise TimeoutError(f"Function execution exceeded {timeout} seconds timeout.") from e
-                    print(f"Attempt {attempts} failed: {e}. Retrying...")
-                    await asyncio.sleep(1)  # Sleep to avoid tight loop or provide backoff logic here
+                    await state.wait(e)
+
+        return wrapper
+
+    return decorator
+
+
+def retry(timeout=None, max_retries=None, platform=None, policy=None):
+    """同步函数的重试装饰器，参数同 async_retry"""
+    def decorator(func):
+        retry_policy = policy or get_retry_policy(platform)
+        if max_retries is not None:
+            retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=retry_policy.base_delay,
+                                       max_delay=retry_policy.max_delay, multiplier=retry_policy.multiplier,
+                                       jitter=retry_policy.jitter)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            state = RetryState(platform, func.__name__, retry_policy, timeout)
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    state.wait_sync(e)
 
         return wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+选择器学习缓存
+平台改版频繁，上传器里很多步骤准备了多个候选选择器逐个尝试，每个失败的候选都要白白等待或探测一次。
+SelectorResolver 记录每个平台、页面、页面版本下哪个候选选择器成功过：
+1. 先只试上次成功的选择器（命中时只需一次探测）
+2. 未命中时同时探测其余候选，多个同时匹配时按候选顺序取优先级最高的
+3. 都还没出现时并发等待，谁先出现用谁，直到超时
+成功记录保存在 selector_stats 表，跨进程、跨次运行生效
+
+页面版本取页面脚本包路径的摘要（平台发版后脚本文件名中的 hash 会变化），改版后自动重新学习，
+不会一直优先尝试旧版本的选择器
+
+使用方法：
+    resolver = SelectorResolver('douyin')
+    locator = await resolver.resolve(page, 'toutiao_switch', [
+        '[class^="info"] > [class^="first-part"] div div.semi-switch',
+        'div.semi-switch',
+    ], state='visible')
+    if locator is not None:
+        await locator.click()
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+from pathlib import Path
+from urllib.parse import urlparse
+
+from conf import BASE_DIR
+from utils.metrics import TimedConnection, record_cache
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+
+PROBE_TIMEOUT = 1000      # 上次成功的选择器等待时间（毫秒）
+RESOLVE_TIMEOUT = 10000   # 所有候选一起等待的时间（毫秒）
+
+# 页面版本指纹：脚本包路径（不含查询参数），只取同源或 CDN 上的前 50 个
+PAGE_VERSION_JS = """() => Array.from(document.querySelectorAll('script[src]'))
+    .slice(0, 50)
+    .map(s => { try { return new URL(s.src).pathname } catch (e) { return s.src } })
+    .sort()
+    .join('\\n')"""
+
+# (platform, page, page_version, name) -> 最近成功的选择器，进程内共享
+_winners = {}
+_loaded_platforms = set()
+
+
+def ensure_selector_stats_table(conn):
+    """创建选择器命中统计表（已存在时跳过）"""
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS selector_stats (
+        platform TEXT NOT NULL,
+        page TEXT NOT NULL,                   -- 页面路径，如 /creator-micro/content/publish
+        page_version TEXT NOT NULL,           -- 页面脚本包指纹
+        name TEXT NOT NULL,                   -- 步骤名，如 toutiao_switch
+        selector TEXT NOT NULL,               -- 成功的候选选择器
+        hits INTEGER DEFAULT 0,
+        last_hit_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (platform, page, page_version, name, selector)
+    )''')
+    conn.commit()
+
+
+def load_winners(platform):
+    """读取平台各步骤最近成功的选择器"""
+    if not DB_FILE.exists():
+        return {}
+    with sqlite3.connect(DB_FILE, factory=TimedConnection) as conn:
+        ensure_selector_stats_table(conn)
+        rows = conn.execute(
+            "SELECT page, page_version, name, selector FROM selector_stats WHERE platform = ? "
+            "ORDER BY last_hit_at ASC, hits ASC",
+            (platform,)
+        ).fetchall()
+    # 按时间升序覆盖，留下的是每个步骤最近成功的选择器
+    return {(platform, page, version, name): selector for page, version, name, selector in rows}
+
+
+def record_hit(platform, page, page_version, name, selector):
+    with sqlite3.connect(DB_FILE, factory=TimedConnection) as conn:
+        ensure_selector_stats_table(conn)
+        conn.execute(
+            "INSERT INTO selector_stats (platform, page, page_version, name, selector, hits) VALUES (?, ?, ?, ?, ?, 1) "
+            "ON CONFLICT (platform, page, page_version, name, selector) "
+            "DO UPDATE SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP",
+            (platform, page, page_version, name, selector)
+        )
+        conn.commit()
+
+
+def _with_state(selector, state):
+    """xpath 写法补上前缀，visible 状态下只匹配可见元素"""
+    if selector.startswith('//') or selector.startswith('(//'):
+        selector = f'xpath={selector}'
+    if state == 'visible':
+        selector = f'{selector} >> visible=true'
+    return selector
+
+
+class SelectorResolver(object):
+    """按平台解析多候选选择器，记住并优先使用成功过的候选"""
+
+    def __init__(self, platform, persist=True):
+        self.platform = platform
+        self.persist = persist
+        self._versions = {}
+
+    async def _load(self):
+        if not self.persist or self.platform in _loaded_platforms:
+            return
+        _loaded_platforms.add(self.platform)
+        try:
+            _winners.update(await asyncio.to_thread(load_winners, self.platform))
+        except sqlite3.Error as e:
+            print(f"⚠️  读取选择器缓存失败: {e}")
+
+    async def page_key(self, page):
+        """(页面路径, 页面版本)，同一页面地址只计算一次指纹"""
+        url = page.url
+        version = self._versions.get(url)
+        if version is None:
+            try:
+                scripts = await page.evaluate(PAGE_VERSION_JS)
+            except Exception:
+                scripts = ''
+            version = self._versions[url] = hashlib.sha1(scripts.encode('utf-8')).hexdigest()[:12]
+        return urlparse(url).path or '/', version
+
+    @staticmethod
+    async def _matches(page, selector):
+        try:
+            return await page.locator(selector).count() > 0
+        except Exception:
+            return False
+
+    async def _race(self, page, selectors, timeout):
+        """并发等待所有候选，返回最先出现的选择器"""
+        tasks = {
+            asyncio.ensure_future(page.locator(selector).first.wait_for(state='attached', timeout=timeout)): selector
+            for selector in selectors
+        }
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [tasks[task] for task in done if not task.cancelled() and task.exception() is None]
+                if winners:
+                    # 同一轮完成的按候选顺序取
+                    return min(winners, key=selectors.index)
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # 回收被取消任务的异常，避免 "exception was never retrieved"
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def resolve(self, page, name, candidates, state='attached', timeout=RESOLVE_TIMEOUT):
+        """
+        解析候选选择器
+
+        :param name: 步骤名，和平台、页面一起作为缓存键
+        :param candidates: 候选选择器（CSS / xpath / Playwright 文本选择器），按优先级排列
+        :param state: attached 只要求存在（如隐藏的 file input），visible 要求可见
+        :param timeout: 候选都未出现时的最长等待（毫秒），0 表示只探测一次
+        :return: 匹配元素的 Locator（多个匹配时取第一个），都未匹配返回 None
+        """
+        await self._load()
+        page_path, version = await self.page_key(page)
+        key = (self.platform, page_path, version, name)
+        selectors = [_with_state(candidate, state) for candidate in candidates]
+
+        winner = _winners.get(key)
+        found = None
+        if winner in candidates:
+            selector = selectors[candidates.index(winner)]
+            if timeout:
+                try:
+                    await page.locator(selector).first.wait_for(state='attached', timeout=min(PROBE_TIMEOUT, timeout))
+                    found = winner
+                except Exception:
+                    pass
+            elif await self._matches(page, selector):
+                found = winner
+        record_cache('selector', found is not None)
+
+        if found is None:
+            others = [selector for candidate, selector in zip(candidates, selectors) if candidate != winner]
+            # 先一起探测一次已经出现的元素，保持原有候选顺序的优先级
+            matched = await asyncio.gather(*(self._matches(page, selector) for selector in others))
+            hit = next((selector for selector, ok in zip(others, matched) if ok), None)
+            if hit is None and timeout:
+                hit = await self._race(page, selectors, timeout)
+            if hit is not None:
+                found = candidates[selectors.index(hit)]
+
+        if found is None:
+            return None
+        _winners[key] = found
+        if self.persist:
+            try:
+                await asyncio.to_thread(record_hit, self.platform, page_path, version, name, found)
+            except sqlite3.Error as e:
+                print(f"⚠️  保存选择器缓存失败: {e}")
+        return page.locator(selectors[candidates.index(found)]).first
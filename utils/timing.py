@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+上传分阶段计时
+每次上传由一个 UploadTimer 记录各阶段（启动浏览器、打开页面、上传文件、等待转码、填写标题等）的耗时，
+结束时以 JSONL 追加写入 logs/timings.jsonl，每行一个阶段，带 platform/account/file 标签
+
+使用方法：
+    timer = UploadTimer('douyin', account_file, file_path)
+    with timer:
+        timer.stage('launch')
+        ...
+        timer.stage('goto')
+        ...
+        with timer.span('set_location'):
+            ...
+
+汇总报告（按平台、阶段输出 p50/p95）：
+python -m utils.timing
+python -m utils.timing --platform douyin --since 2025-01-11
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.log import bind_log_fields
+
+# 可用 SAU_TIMINGS_FILE 指定其他文件（压测时不混入正式记录）
+TIMINGS_FILE = Path(os.environ.get("SAU_TIMINGS_FILE") or BASE_DIR / "logs" / "timings.jsonl")
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+_export_lock = threading.Lock()
+
+
+class UploadTimer(object):
+    """单次上传的阶段计时器"""
+
+    def __init__(self, platform, account_file='', file_path='', export_path=TIMINGS_FILE):
+        self.platform = platform
+        self.account = Path(str(account_file)).stem if account_file else ''
+        self.file = Path(str(file_path)).name if file_path else ''
+        self.export_path = export_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+        self._current = None
+        self._started_at = None
+        self._failed = False
+
+    def _record(self, stage, started_at, status=STATUS_OK, **labels):
+        span = {
+            "run_id": self.run_id,
+            "platform": self.platform,
+            "account": self.account,
+            "file": self.file,
+            "stage": stage,
+            "start": datetime.fromtimestamp(started_at[0]).isoformat(timespec='milliseconds'),
+            "duration": round(time.perf_counter() - started_at[1], 4),
+            "status": status,
+        }
+        if labels:
+            span["labels"] = labels
+        self.spans.append(span)
+        return span
+
+    def stage(self, stage, **labels):
+        """进入下一个顺序阶段，自动结束上一个阶段"""
+        self.end_stage()
+        self._current = (stage, (time.time(), time.perf_counter()), labels)
+        bind_log_fields(stage=stage)
+
+    def end_stage(self, status=STATUS_OK):
+        """结束当前顺序阶段"""
+        if self._current is not None:
+            stage, started_at, labels = self._current
+            self._current = None
+            self._record(stage, started_at, status, **labels)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """记录一段嵌套或独立的耗时，不影响当前顺序阶段"""
+        started_at = (time.time(), time.perf_counter())
+        try:
+            yield
+        except BaseException:
+            self._record(stage, started_at, STATUS_ERROR, **labels)
+            raise
+        self._record(stage, started_at, STATUS_OK, **labels)
+
+    def mark_failed(self):
+        """上传以返回值（而非异常）表示失败时调用，当前阶段和总耗时记为失败"""
+        self._failed = True
+
+    @property
+    def failed(self):
+        return self._failed
+
+    @property
+    def current_stage(self):
+        """当前顺序阶段及已进行的秒数，没有进行中的阶段时为 (None, 0)"""
+        if self._current is None:
+            return None, 0.0
+        stage, started_at, _ = self._current
+        return stage, time.perf_counter() - started_at[1]
+
+    def start(self):
+        self.spans = []
+        self._current = None
+        self._failed = False
+        self._started_at = (time.time(), time.perf_counter())
+        return self
+
+    def finish(self, status=STATUS_OK):
+        """结束计时，记录总耗时并导出（重复调用不会重复导出）"""
+        if self._started_at is None:
+            return self.spans
+        if self._failed:
+            status = STATUS_ERROR
+        self.end_stage(status)
+        self._record('total', self._started_at, status)
+        self._started_at = None
+        self.export()
+        return self.spans
+
+    def export(self):
+        if not self.export_path or not self.spans:
+            return
+        try:
+            Path(self.export_path).parent.mkdir(parents=True, exist_ok=True)
+            lines = ''.join(json.dumps(span, ensure_ascii=False) + '\n' for span in self.spans)
+            with _export_lock:
+                with open(self.export_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+        except OSError as e:
+            print(f"⚠️  写入计时文件失败: {e}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(STATUS_ERROR if exc_type else STATUS_OK)
+        return False
+
+
+def load_spans(path=TIMINGS_FILE, platform=None, since=None):
+    """读取 JSONL 计时记录，可按平台和起始日期过滤"""
+    spans = []
+    path = Path(path)
+    if not path.exists():
+        return spans
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                span = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if platform and span.get("platform") != platform:
+                continue
+            if since and span.get("start", "") < since:
+                continue
+            spans.append(span)
+    return spans
+
+
+def percentile(values, pct):
+    """线性插值百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(spans, group_by=('platform', 'stage')):
+    """按标签分组汇总：次数、失败数、平均、p50、p95、最大耗时（秒）"""
+    groups = {}
+    for span in spans:
+        key = tuple(span.get(field, '') for field in group_by)
+        groups.setdefault(key, []).append(span)
+
+    report = []
+    # 阶段保持首次出现的顺序（即上传流程顺序），其余标签排序
+    for key, items in sorted(groups.items(), key=lambda item: item[0][:-1]):
+        durations = [item["duration"] for item in items]
+        row = dict(zip(group_by, key))
+        row.update({
+            "count": len(items),
+            "errors": sum(1 for item in items if item.get("status") == STATUS_ERROR),
+            "mean": round(sum(durations) / len(durations), 3),
+            "p50": round(percentile(durations, 50), 3),
+            "p95": round(percentile(durations, 95), 3),
+            "max": round(max(durations), 3),
+        })
+        report.append(row)
+    return report
+
+
+def print_report(report, group_by=('platform', 'stage')):
+    if not report:
+        print("📭 没有计时记录")
+        return
+    header = ''.join(f"{field:<22}" for field in group_by)
+    print(f"{header}{'次数':>6}{'失败':>6}{'平均(s)':>10}{'p50(s)':>10}{'p95(s)':>10}{'最大(s)':>10}")
+    for row in report:
+        labels = ''.join(f"{str(row[field]):<22}" for field in group_by)
+        print(f"{labels}{row['count']:>6}{row['errors']:>6}{row['mean']:>10.2f}{row['p50']:>10.2f}"
+              f"{row['p95']:>10.2f}{row['max']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上传分阶段耗时报告')
+    parser.add_argument('--path', default=str(TIMINGS_FILE), help='计时文件路径 (默认: logs/timings.jsonl)')
+    parser.add_argument('--platform', '-p', help='只统计指定平台')
+    parser.add_argument('--since', help='起始日期 (格式: YYYY-MM-DD)')
+    parser.add_argument('--by-account', action='store_true', help='按账号细分')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出')
+    args = parser.parse_args()
+
+    group_by = ('platform', 'account', 'stage') if args.by_account else ('platform', 'stage')
+    report = summarize(load_spans(args.path, args.platform, args.since), group_by)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report, group_by)
+
+
+if __name__ == '__main__':
+    main()
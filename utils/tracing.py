@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Playwright trace / HAR 采集
+开启后每次上传都录制 Playwright trace（滚动窗口，只保留最近两个窗口）和 HAR（不含响应体），
+只有上传失败或总耗时超出预算时才保存到 logs/traces，并按 job_id 记录到 upload_traces 表，
+事后用 playwright show-trace 查看慢请求和选择器等待，无需线上复现
+
+配置（环境变量）：
+SAU_TRACE=1                      开启录制，默认关闭
+SAU_TRACE_WINDOW=60              滚动窗口（秒），保存时包含上一个窗口和当前窗口
+SAU_TRACE_BUDGET=600             耗时预算（秒），成功但超出预算的上传也会保存
+SAU_TRACE_BUDGET_<平台>=300       单个平台的耗时预算，如 SAU_TRACE_BUDGET_DOUYIN
+SAU_TRACE_HAR=0                  不录制 HAR
+SAU_TRACE_DIR                    保存目录，默认 logs/traces
+
+使用方法：
+    tracer = TraceRecorder('douyin', timer=self.timer)
+    async with tracer:
+        context = await tracer.new_context(browser, storage_state=account_file)
+        ...
+        await tracer.close_context(context)
+
+查询某个任务的 trace：
+python -m utils.tracing --job-id 1a2b3c4d5e6f
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from conf import BASE_DIR
+from utils.log import current_log_fields
+from utils.metrics import TimedConnection
+
+DB_FILE = Path(BASE_DIR / "db" / "database.db")
+
+TRACE_ENABLED = os.environ.get('SAU_TRACE', '').lower() in ('1', 'true', 'yes', 'on')
+TRACE_WINDOW = float(os.environ.get('SAU_TRACE_WINDOW', 60))
+TRACE_BUDGET = float(os.environ.get('SAU_TRACE_BUDGET', 600))
+TRACE_HAR = os.environ.get('SAU_TRACE_HAR', '1').lower() not in ('0', 'false', 'no', 'off')
+TRACE_DIR = Path(os.environ.get('SAU_TRACE_DIR') or BASE_DIR / 'logs' / 'traces')
+
+REASON_FAILED = 'failed'
+REASON_SLOW = 'slow'
+
+
+def get_trace_budget(platform):
+    """平台耗时预算（秒），SAU_TRACE_BUDGET_<平台> 优先"""
+    value = os.environ.get(f"SAU_TRACE_BUDGET_{platform.upper()}")
+    return float(value) if value else TRACE_BUDGET
+
+
+def ensure_upload_traces_table(conn):
+    """创建 trace 索引表（已存在时跳过）"""
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS upload_traces (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,                 -- 上传任务ID（UploadJob.job_id）
+        run_id TEXT,                          -- 计时记录ID（logs/timings.jsonl 中的 run_id）
+        platform TEXT,
+        account TEXT,
+        reason TEXT,                          -- failed / slow
+        duration REAL,                        -- 上传耗时（秒）
+        trace_dir TEXT,                       -- trace.zip / network.har 所在目录
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_traces_job ON upload_traces (job_id)")
+    conn.commit()
+
+
+def record_trace(job_id, run_id, platform, account, reason, duration, trace_dir):
+    with sqlite3.connect(DB_FILE, factory=TimedConnection) as conn:
+        ensure_upload_traces_table(conn)
+        conn.execute(
+            "INSERT INTO upload_traces (job_id, run_id, platform, account, reason, duration, trace_dir) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, run_id, platform, account, reason, round(duration, 2), str(trace_dir))
+        )
+        conn.commit()
+
+
+def find_traces(job_id=None, platform=None, limit=50):
+    """按 job_id / 平台查询已保存的 trace，最新的在前"""
+    if not DB_FILE.exists():
+        return []
+    with sqlite3.connect(DB_FILE, factory=TimedConnection) as conn:
+        conn.row_factory = sqlite3.Row
+        ensure_upload_traces_table(conn)
+        sql = "SELECT * FROM upload_traces WHERE 1=1"
+        params = []
+        if job_id:
+            sql += " AND job_id = ?"
+            params.append(job_id)
+        if platform:
+            sql += " AND platform = ?"
+            params.append(platform)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+
+class TraceRecorder(object):
+    """单次上传的 trace / HAR 录制器，未开启时所有方法都是空操作"""
+
+    def __init__(self, platform, timer=None, enabled=None, window=TRACE_WINDOW, budget=None,
+                 har=TRACE_HAR, output_dir=TRACE_DIR):
+        self.platform = platform
+        self.timer = timer
+        self.enabled = TRACE_ENABLED if enabled is None else enabled
+        self.window = window
+        self.budget = get_trace_budget(platform) if budget is None else budget
+        self.har = har
+        self.output_dir = Path(output_dir)
+        self.context = None
+        self._work_dir = None
+        self._started_at = None
+        self._rotate_task = None
+        self._chunk_lock = asyncio.Lock()
+        self._recording = False
+        self._failed = False
+
+    @property
+    def failed(self):
+        return self._failed or bool(self.timer is not None and self.timer.failed)
+
+    def elapsed(self):
+        return time.monotonic() - self._started_at if self._started_at else 0.0
+
+    def _should_keep(self):
+        return self.failed or self.elapsed() > self.budget
+
+    def mark_failed(self):
+        self._failed = True
+
+    async def new_context(self, browser, **options):
+        """创建浏览器上下文并开始录制（HAR 需要在创建上下文时指定）"""
+        if not self.enabled:
+            return await browser.new_context(**options)
+        self._work_dir = self.output_dir / '.tmp' / uuid.uuid4().hex[:12]
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        if self.har:
+            options.setdefault('record_har_path', str(self._work_dir / 'network.har'))
+            options.setdefault('record_har_content', 'omit')
+        context = await browser.new_context(**options)
+        self.context = context
+        try:
+            await context.tracing.start(screenshots=True, snapshots=True)
+            await context.tracing.start_chunk(title=self.platform)
+            self._recording = True
+            self._rotate_task = asyncio.ensure_future(self._rotate_loop())
+        except Exception as e:
+            print(f"⚠️  开启 trace 录制失败: {e}")
+        return context
+
+    async def _rotate_loop(self):
+        """每个窗口结束时把当前 chunk 存为上一个窗口，只保留最近两个窗口"""
+        while True:
+            await asyncio.sleep(self.window)
+            async with self._chunk_lock:
+                if not self._recording:
+                    return
+                try:
+                    await self.context.tracing.stop_chunk(path=str(self._work_dir / 'trace_prev.zip'))
+                    await self.context.tracing.start_chunk(title=self.platform)
+                except Exception:
+                    self._recording = False
+                    return
+
+    async def _stop_recording(self):
+        async with self._chunk_lock:
+            # 持有锁时取消，滚动任务不会停在 stop_chunk / start_chunk 之间
+            if self._rotate_task is not None:
+                self._rotate_task.cancel()
+                self._rotate_task = None
+            if not self._recording:
+                return
+            self._recording = False
+            try:
+                # 不需要保存时直接丢弃当前 chunk，省去打包 zip 的开销
+                if self._should_keep():
+                    await self.context.tracing.stop_chunk(path=str(self._work_dir / 'trace.zip'))
+                else:
+                    await self.context.tracing.stop_chunk()
+                await self.context.tracing.stop()
+            except Exception as e:
+                print(f"⚠️  停止 trace 录制失败: {e}")
+
+    async def close_context(self, context):
+        """代替 context.close()：先停止录制再关闭上下文（关闭时写出 HAR）"""
+        if self.enabled and context is self.context:
+            await self._stop_recording()
+        await context.close()
+
+    async def finish(self, failed=False):
+        """上传结束：失败或超出预算时保存并记录到数据库，否则删除临时文件，返回保存目录"""
+        if not self.enabled or self._work_dir is None:
+            return None
+        if failed:
+            self._failed = True
+        await self._stop_recording()
+        keep = self._should_keep()
+        if keep and self.context is not None:
+            # 失败时上下文通常还没关闭，关闭后才会写出 HAR
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+        work_dir, self._work_dir, self.context = self._work_dir, None, None
+        if not keep or not any(work_dir.iterdir()):
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return None
+
+        fields = current_log_fields()
+        job_id = fields.get('job_id') or (self.timer.run_id if self.timer is not None else work_dir.name)
+        account = fields.get('account') or (self.timer.account if self.timer is not None else '')
+        reason = REASON_FAILED if self.failed else REASON_SLOW
+        duration = self.elapsed()
+        trace_dir = self.output_dir / f"{self.platform}_{datetime.now():%Y%m%d_%H%M%S}_{job_id}"
+        try:
+            await asyncio.to_thread(shutil.move, str(work_dir), str(trace_dir))
+            await asyncio.to_thread(record_trace, job_id, self.timer.run_id if self.timer is not None else None,
+                                    self.platform, account, reason, duration, trace_dir)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  保存 trace 失败: {e}")
+            return None
+        print(f"🧭 已保存 trace（{reason}，耗时 {duration:.1f}s）: {trace_dir}")
+        return trace_dir
+
+    async def __aenter__(self):
+        self._started_at = time.monotonic()
+        self._failed = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.finish(failed=exc_type is not None)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询已保存的上传 trace')
+    parser.add_argument('--job-id', help='上传任务ID')
+    parser.add_argument('--platform', '-p', help='只看指定平台')
+    parser.add_argument('--limit', type=int, default=20, help='最多显示条数 (默认: 20)')
+    args = parser.parse_args()
+
+    traces = find_traces(args.job_id, args.platform, args.limit)
+    if not traces:
+        print("📭 没有保存的 trace")
+        return
+    for trace in traces:
+        print(json.dumps(trace, ensure_ascii=False))
+    print("\n查看: playwright show-trace <trace_dir>/trace.zip")
+
+
+if __name__ == '__main__':
+    main()
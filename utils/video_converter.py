@@ -9,8 +9,11 @@
 import os
 import subprocess
 import tempfile
+import uuid
 from pathlib import Path
 from utils.log import xiaohongshu_logger
+from utils.media_probe import get_media_metadata
+from utils.metrics import record_cache, transcode_duration
 
 
 class VideoConverter:
@@ -18,10 +21,23 @@ class VideoConverter:
     
     def __init__(self):
         self.supported_formats = {'.mp4', '.mov', '.avi'}  # 小红书支持的格式
+        self.supported_containers = {'mp4', 'mov', 'avi'}  # 对应的ffprobe容器名
         self.temp_files = []  # 用于跟踪临时文件
     
-    def is_supported_format(self, file_path):
-        """检查文件格式是否被平台支持"""
+    def is_supported_format(self, file_path, metadata=None):
+        """
+        检查文件格式是否被平台支持，优先使用入库时索引的容器格式和视频流，未索引时按扩展名判断
+        只有音频流的 m4a / 3gp 等文件容器格式同样是 mp4/mov，要求存在视频编码才算支持
+
+        Args:
+            metadata: 上传任务创建时已查好的元数据，未传入时才查表
+        """
+        if metadata is None:
+            metadata = get_media_metadata(file_path)
+        record_cache('media_metadata', bool(metadata and metadata.get('format_name')))
+        if metadata and metadata.get('format_name'):
+            return bool(metadata.get('video_codec')) and bool(
+                self.supported_containers & set(metadata['format_name'].split(',')))
         return Path(file_path).suffix.lower() in self.supported_formats
     
     def is_format_supported(self, file_path, supported_formats):
@@ -37,21 +53,28 @@ class VideoConverter:
         except (subprocess.CalledProcessError, FileNotFoundError):
             return False
     
-    def convert_to_mp4(self, input_file, output_file=None):
+    def convert_to_mp4(self, input_file, output_file=None, metadata=None):
         """
         将视频转换为MP4格式
         
         Args:
             input_file: 输入视频文件路径
             output_file: 输出文件路径（可选，默认生成临时文件）
+            metadata: 已索引的媒体元数据（可选）
         
         Returns:
             str: 转换后的文件路径
         """
         input_path = Path(input_file)
+        if metadata is None:
+            metadata = get_media_metadata(input_file)
+        
+        # 已索引的文件没有视频流（纯音频），转码也得不到可上传的视频
+        if metadata and metadata.get('format_name') and not metadata.get('video_codec'):
+            raise ValueError(f"文件没有视频流，无法上传: {input_path.name}")
         
         # 如果已经是支持的格式，直接返回原文件
-        if self.is_supported_format(input_file):
+        if self.is_supported_format(input_file, metadata):
             xiaohongshu_logger.info(f"文件格式已支持，无需转换: {input_path.suffix}")
             return str(input_file)
         
@@ -65,7 +88,8 @@ class VideoConverter:
         if output_file is None:
             # 创建临时文件
             temp_dir = tempfile.gettempdir()
-            output_file = os.path.join(temp_dir, f"{input_path.stem}_converted.mp4")
+            # 文件名带随机后缀，避免同一素材被多个任务并发转换时互相覆盖
+            output_file = os.path.join(temp_dir, f"{input_path.stem}_converted_{uuid.uuid4().hex[:8]}.mp4")
             self.temp_files.append(output_file)  # 记录临时文件用于后续清理
         
         xiaohongshu_logger.info(f"🔄 开始转换视频格式: {input_path.suffix} -> .mp4")
@@ -90,12 +114,13 @@ class VideoConverter:
             xiaohongshu_logger.info(f"🔧 转换命令: {' '.join(cmd)}")
             
             # 执行转换命令 - 增加超时时间到15分钟
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=900  # 15分钟超时
-            )
+            with transcode_duration.time(kind='convert'):
+                result = subprocess.run(
+                    cmd, 
+                    capture_output=True, 
+                    text=True, 
+                    timeout=900  # 15分钟超时
+                )
             
             if result.returncode == 0:
                 xiaohongshu_logger.success(f"✅ 视频转换成功: {output_file}")
@@ -147,19 +172,20 @@ class VideoConverter:
 video_converter = VideoConverter()
 
 
-def convert_video_if_needed(file_path, platform="xiaohongshu"):
+def convert_video_if_needed(file_path, platform="xiaohongshu", metadata=None):
     """
     如果需要，转换视频格式
     
     Args:
         file_path: 视频文件路径
         platform: 目标平台（用于确定支持的格式）
+        metadata: 上传任务携带的媒体元数据（可选，避免重复查表）
     
     Returns:
         str: 可用的视频文件路径（原文件或转换后的文件）
     """
     try:
-        return video_converter.convert_to_mp4(file_path)
+        return video_converter.convert_to_mp4(file_path, metadata=metadata)
     except Exception as e:
         xiaohongshu_logger.error(f"❌ 视频格式转换失败: {e}")
         raise
@@ -167,4 +193,10 @@ def convert_video_if_needed(file_path, platform="xiaohongshu"):
 
 def cleanup_converted_files():
     """清理所有转换生成的临时文件"""
-    video_converter.cleanup_temp_files() 
\ No newline at end of file
+    video_converter.cleanup_temp_files()
+
+
+def cleanup_converted_file(file_path):
+    """只清理指定任务转换生成的临时文件（并发上传时不影响其他任务）"""
+    if str(file_path) in video_converter.temp_files:
+        video_converter.cleanup_temp_file(str(file_path)) 
\ No newline at end of file
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+条件等待
+上传流程中不要用固定时长的 asyncio.sleep / page.wait_for_timeout 等页面“反应过来”，
+而是等待明确的就绪条件（元素状态、输入框的值、URL、某个请求完成），并设置最长等待时间：
+条件满足时立即继续，页面慢时也不会因为等待不够而失败
+
+Playwright 自带的条件等待优先使用（locator.wait_for、page.wait_for_url、page.expect_response），
+没有现成接口的条件用 wait_until 轮询
+
+新增固定等待的检查：python -m utils.lint_sleeps
+"""
+
+import asyncio
+import time
+
+POLL_INTERVAL = 0.2
+
+
+async def wait_until(condition, timeout=10.0, interval=POLL_INTERVAL, message=None):
+    """
+    轮询直到 condition() 返回真值，返回该值；超过 timeout 秒抛出 TimeoutError
+
+    :param condition: 普通函数或协程函数，异常视为条件未满足
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = condition()
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result:
+                return result
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            raise TimeoutError(message or f"等待条件超时（{timeout:g} 秒）")
+        await asyncio.sleep(interval)  # sleep-ok: 轮询间隔
+
+
+async def wait_for_value(locator, expected, timeout=5.0):
+    """等待输入框的值包含 expected（日期、标题等输入后由页面组件回填）"""
+    async def filled():
+        return expected in (await locator.input_value())
+    return await wait_until(filled, timeout, message=f"输入框的值未变为 {expected}")
+
+
+async def wait_for_text(locator, expected, timeout=5.0):
+    """等待元素文本包含 expected（富文本编辑器中输入的话题等）"""
+    async def contains():
+        return expected in (await locator.inner_text())
+    return await wait_until(contains, timeout, message=f"元素文本中未出现 {expected}")
+
+
+async def wait_for_class(locator, class_name, timeout=5.0):
+    """等待元素 class 中出现 class_name（开关、单选框切换状态）"""
+    async def has_class():
+        return class_name in ((await locator.get_attribute('class')) or '').split()
+    return await wait_until(has_class, timeout, message=f"元素未出现 class {class_name}")
+
+
+async def wait_quietly(awaitable):
+    """等待可选的条件，超时或失败时忽略（条件只用于尽快继续，不影响流程）"""
+    try:
+        return await awaitable
+    except Exception:
+        return None
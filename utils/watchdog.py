@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+上传看门狗
+按 UploadTimer 的当前阶段检查耗时，某个阶段或整个任务超出时限时取消上传任务，
+回收任务占用的浏览器池上下文，并以 StageTimeoutError 报告超时的阶段，
+避免一个卡死的任务（等待发布页、等待转码、等待发布结果的无限循环）长时间占住 worker 和批量队列
+
+时限配置（秒，环境变量）：
+SAU_JOB_TIMEOUT=3600                 单个上传任务总时限
+SAU_STAGE_TIMEOUT=300                未单独配置的阶段时限
+SAU_STAGE_TIMEOUT_<阶段>=600          单个阶段时限，如 SAU_STAGE_TIMEOUT_WAIT_TRANSCODE=3600
+设为 0 表示不限制
+
+使用方法：
+    async with UploadWatchdog('douyin', timer=app.timer):
+        await app.main()
+"""
+
+import asyncio
+import os
+import random
+import time
+
+from utils import metrics
+from utils.job_resources import track_job_resources, untrack_job_resources
+
+JOB_TIMEOUT = float(os.environ.get('SAU_JOB_TIMEOUT', 3600))
+DEFAULT_STAGE_TIMEOUT = float(os.environ.get('SAU_STAGE_TIMEOUT', 300))
+
+# 各阶段默认时限，转码、等待平台处理视频的阶段放宽
+STAGE_TIMEOUTS = {
+    'convert': 1800,
+    'launch': 60,
+    'goto': 90,
+    'set_input_files': 120,
+    'wait_publish_page': 180,
+    'wait_transcode': 1800,
+    'wait_cover': 300,
+    'publish': 300,
+    'confirm_published': 300,
+    'confirm_submitted': 300,
+    'save_cookie': 30,
+}
+
+JOB_STAGE = 'total'
+CHECK_INTERVAL = 1.0
+# 取消后留出时间给上传代码做清理（失败截图、保存 trace），仍未结束说明取消被轮询循环里的 except 吞掉了，
+# 再次取消；间隔加随机抖动，避免与循环的固定 sleep 同步导致每次都落在 try 内
+CANCEL_GRACE = 10.0
+MAX_CANCEL_ATTEMPTS = 10
+
+
+def get_stage_timeout(stage):
+    """阶段时限（秒），SAU_STAGE_TIMEOUT_<阶段> 优先，0 表示不限制"""
+    value = os.environ.get(f"SAU_STAGE_TIMEOUT_{stage.upper()}")
+    if value:
+        return float(value)
+    return STAGE_TIMEOUTS.get(stage, DEFAULT_STAGE_TIMEOUT)
+
+
+class StageTimeoutError(TimeoutError):
+    """上传任务在某个阶段超时被取消"""
+
+    def __init__(self, platform, stage, timeout):
+        self.platform = platform
+        self.stage = stage
+        self.timeout = timeout
+        if stage == JOB_STAGE:
+            message = f"{platform} 上传超时：任务总耗时超过 {timeout:g} 秒"
+        else:
+            message = f"{platform} 上传超时：阶段 {stage} 超过 {timeout:g} 秒"
+        super().__init__(message)
+
+
+class UploadWatchdog(object):
+    """单个上传任务的看门狗，需在执行上传的任务内使用"""
+
+    def __init__(self, platform, timer=None, job_timeout=JOB_TIMEOUT, interval=CHECK_INTERVAL):
+        self.platform = platform
+        self.timer = timer
+        self.job_timeout = job_timeout
+        self.interval = interval
+        self.timed_out = None  # (阶段, 时限)
+        self.released_contexts = 0
+        self._task = None
+        self._monitor = None
+        self._started_at = None
+        self._resources = None
+        self._token = None
+
+    def _check(self):
+        """返回超时的 (阶段, 时限)，未超时返回 None"""
+        if self.job_timeout and time.monotonic() - self._started_at > self.job_timeout:
+            return JOB_STAGE, self.job_timeout
+        if self.timer is not None:
+            stage, elapsed = self.timer.current_stage
+            if stage is not None:
+                timeout = get_stage_timeout(stage)
+                if timeout and elapsed > timeout:
+                    return stage, timeout
+        return None
+
+    async def _watch(self):
+        while self.timed_out is None:
+            await asyncio.sleep(self.interval)
+            self.timed_out = self._check()
+        stage, timeout = self.timed_out
+        metrics.upload_stage_timeouts.inc(platform=self.platform, stage=stage)
+        print(f"⏰ [{self.platform}] 阶段 {stage} 超过 {timeout:g} 秒，取消上传任务")
+        for _ in range(MAX_CANCEL_ATTEMPTS):
+            if self._task.done():
+                return
+            self._task.cancel()
+            await asyncio.sleep(CANCEL_GRACE + random.random())
+
+    async def __aenter__(self):
+        self._task = asyncio.current_task()
+        self._started_at = time.monotonic()
+        self.timed_out = None
+        self._resources, self._token = track_job_resources()
+        self._monitor = asyncio.ensure_future(self._watch())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._monitor.cancel()
+        untrack_job_resources(self._token)
+        if exc_type is not None:
+            # 异常退出时上传代码来不及关闭的上下文，在这里归还给浏览器池
+            try:
+                self.released_contexts = await self._resources.release()
+            except asyncio.CancelledError:
+                # 超时后补发的取消可能落在这里，不影响按超时报告
+                if self.timed_out is None:
+                    raise
+        if self.timed_out is not None and exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            raise StageTimeoutError(self.platform, *self.timed_out) from None
+        return False